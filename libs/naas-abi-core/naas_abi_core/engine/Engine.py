@@ -1,4 +1,6 @@
 
+import time
+
 from naas_abi_core import logger
 from naas_abi_core.engine.context import (
     set_default_event_service,
@@ -14,6 +16,10 @@ from naas_abi_core.engine.engine_loaders.EngineOntologyLoader import (
 from naas_abi_core.engine.engine_loaders.EngineServiceLoader import EngineServiceLoader
 from naas_abi_core.engine.IEngine import IEngine
 from naas_abi_core.module.Module import BaseModule
+from naas_abi_core.services.triple_store.SchemaLoadPipeline import (
+    SchemaLoadPipeline,
+    SchemaLoadReport,
+)
 
 
 class Engine(IEngine):
@@ -27,6 +33,9 @@ class Engine(IEngine):
 
     __services: IEngine.Services
 
+    __boot_timings: dict[str, float]
+    __schema_load_report: SchemaLoadReport | None = None
+
     @property
     def configuration(self) -> EngineConfiguration:
         return self.__configuration
@@ -44,11 +53,23 @@ class Engine(IEngine):
     def services(self) -> IEngine.Services:
         return self.__services
 
+    @property
+    def boot_timings(self) -> dict[str, float]:
+        """Seconds spent in each phase of the last ``load`` (services,
+        ontologies_index, modules, ontologies, initialized)."""
+        return dict(self.__boot_timings)
+
+    @property
+    def schema_load_report(self) -> SchemaLoadReport | None:
+        """Per-phase breakdown of the last ontology load, if one ran."""
+        return self.__schema_load_report
+
     def __init__(self, configuration: str | None = None):
         # Load configuration
         self.__configuration = EngineConfiguration.load_configuration(configuration)
         self.__engine_module_loader = EngineModuleLoader(self.__configuration)
         self.__engine_service_loader = EngineServiceLoader(self.__configuration)
+        self.__boot_timings = {}
 
     def load(self, module_names: list[str] | None = None):
         # Per-module CLI invocations (e.g. ``abi chat <module> <agent>``)
@@ -81,33 +102,62 @@ class Engine(IEngine):
             module_names
         )
 
+        timings: dict[str, float] = {}
+        self.__boot_timings = timings
+        self.__schema_load_report = None
+        start = time.perf_counter()
+
         logger.debug("Loading engine services")
         self.__services = self.__engine_service_loader.load_services(
             module_dependencies
         )
         logger.debug("Engine services loaded")
+        timings["services"] = time.perf_counter() - start
 
-        logger.debug("Loading engine modules")
-        self.__modules = self.__engine_module_loader.load_modules(self, module_names)
-        logger.debug("Engine modules loaded")
-
-        if self.__services.model_registry_available():
-            # Modules registered their models during on_load; now hard-fail if
-            # any configured default cannot be resolved against the registry.
-            self.__services.model_registry.validate_defaults()
-
-        if self.__services.triple_store_available():
-            if not self.__configuration.global_config.skip_ontology_loading:
-                logger.debug("Loading engine ontologies")
-                EngineOntologyLoader.load_ontologies(
-                    self.__services.triple_store,
-                    self.__engine_module_loader.ordered_modules,
-                )
-                logger.debug("Engine ontologies loaded")
-            else:
-                logger.debug("Skipping ontology loading")
-        else:
+        # Ontologies are read, hashed and parsed in the background while the
+        # remaining modules run on_load; ``finish`` below writes the changes.
+        schema_pipeline: SchemaLoadPipeline | None = None
+        if not self.__services.triple_store_available():
             logger.debug("No triple store available, skipping ontology loading")
+        elif self.__configuration.global_config.skip_ontology_loading:
+            logger.debug("Skipping ontology loading")
+        else:
+            start = time.perf_counter()
+            schema_pipeline = EngineOntologyLoader.start(self.__services.triple_store)
+            timings["ontologies_index"] = time.perf_counter() - start
+
+        logger.debug("Loading engine modules")
+        start = time.perf_counter()
+        try:
+            self.__modules = self.__engine_module_loader.load_modules(
+                self,
+                module_names,
+                on_module_loaded=(
+                    None
+                    if schema_pipeline is None
+                    else lambda module: EngineOntologyLoader.submit(
+                        schema_pipeline, module
+                    )
+                ),
+            )
+            logger.debug("Engine modules loaded")
+            timings["modules"] = time.perf_counter() - start
+
+            if self.__services.model_registry_available():
+                # Modules registered their models during on_load; now hard-fail if
+                # any configured default cannot be resolved against the registry.
+                self.__services.model_registry.validate_defaults()
+        except BaseException:
+            if schema_pipeline is not None:
+                schema_pipeline.cancel()
+            raise
+
+        if schema_pipeline is not None:
+            logger.debug("Loading engine ontologies")
+            start = time.perf_counter()
+            self.__schema_load_report = schema_pipeline.finish()
+            timings["ontologies"] = time.perf_counter() - start
+            logger.debug("Engine ontologies loaded")
 
         # Publish the EventService + ModelRegistry as process-wide accessors
         # for cross-cutting consumers (agents, background threads, library
@@ -125,8 +175,14 @@ class Engine(IEngine):
             set_default_model_registry(None)
 
         logger.debug("Initializing engine")
+        start = time.perf_counter()
         self.on_initialized()
+        timings["initialized"] = time.perf_counter() - start
         logger.debug("Engine initialized")
+        logger.debug(
+            "Engine.load timings: "
+            + ", ".join(f"{phase}={seconds:.2f}s" for phase, seconds in timings.items())
+        )
 
     def on_initialized(self):
         for module in self.__modules.values():
@@ -3,6 +3,9 @@ from typing import Literal
 from naas_abi_core.engine.engine_configuration.EngineConfiguration_GenericLoader import (
     GenericLoader,
 )
+from naas_abi_core.engine.engine_configuration.EngineConfiguration_ObjectStorageService import (
+    ObjectStorageServiceConfiguration,
+)
 from naas_abi_core.engine.engine_configuration.utils.PydanticModelValidator import (
     pydantic_model_validator,
 )
@@ -18,11 +21,38 @@ class EventAdapterSqliteConfiguration(BaseModel):
       adapter: "sqlite"
       config:
         db_path: "storage/events/events.sqlite"
+        # Optional: fsync every commit, and let concurrent publishers
+        # share commits (group commit).
+        synchronous: "FULL"
+        commit_window_ms: 2.0
+        commit_max_size: 64
+        # Optional: filter paths to serve from an index, per event class IRI.
+        indexed_paths:
+          "http://ontology.naas.ai/abi/agent/AgentToolCalled": ["workspace_id"]
+        # Optional: seal the log into read-only segment files, expire old
+        # events per event class IRI ("*" = every other class) and copy
+        # sealed segments to object storage.
+        segment_max_events: 1000000
+        segment_max_age_seconds: 86400
+        retention_seconds:
+          "http://ontology.naas.ai/abi/bus/BusMessagePublished": 604800
+          "*": 7776000
+        archive_object_storage: *object_storage_service
+        archive_prefix: "events/segments"
     """
 
     model_config = ConfigDict(extra="forbid")
 
     db_path: str = "storage/events/events.sqlite"
+    commit_window_ms: float = 0.0
+    commit_max_size: int = 64
+    synchronous: Literal["NORMAL", "FULL"] = "NORMAL"
+    indexed_paths: dict[str, list[str]] = {}
+    segment_max_events: int | None = None
+    segment_max_age_seconds: float | None = None
+    retention_seconds: dict[str, float] = {}
+    archive_object_storage: ObjectStorageServiceConfiguration | None = None
+    archive_prefix: str = "events/segments"
 
 
 class EventAdapterConfiguration(GenericLoader):
@@ -56,7 +86,14 @@ class EventAdapterConfiguration(GenericLoader):
                     EventSQLiteAdapter,
                 )
 
-                return EventSQLiteAdapter(**self.config)
+                config = EventAdapterSqliteConfiguration.model_validate(self.config)
+                arguments = config.model_dump(exclude={"archive_object_storage"})
+                archive_storage = (
+                    config.archive_object_storage.load()
+                    if config.archive_object_storage is not None
+                    else None
+                )
+                return EventSQLiteAdapter(**arguments, archive_storage=archive_storage)
             else:
                 raise ValueError(f"Unknown adapter: {self.adapter}")
         else:
@@ -40,6 +40,7 @@ class ObjectStorageAdapterS3Configuration(BaseModel):
         secret_access_key: "{{ secret.AWS_SECRET_ACCESS_KEY }}"
         session_token: "{{ secret.AWS_SESSION_TOKEN }}"
         endpoint_url: "http://localhost:9000"
+        max_pool_connections: 32
     """
     model_config = ConfigDict(extra="forbid")
 
@@ -49,6 +50,7 @@ class ObjectStorageAdapterS3Configuration(BaseModel):
     secret_access_key: str
     session_token: str | None = None
     endpoint_url: str | None = None
+    max_pool_connections: int = 32
 
 
 class ObjectStorageAdapterNaasConfiguration(BaseModel):
@@ -12,6 +12,7 @@ from naas_abi_core.engine.engine_configuration.EngineConfiguration_ObjectStorage
 from naas_abi_core.engine.engine_configuration.utils.PydanticModelValidator import (
     pydantic_model_validator,
 )
+from naas_abi_core.services.triple_store.QueryResultCache import QueryResultCache
 from naas_abi_core.services.triple_store.TripleStorePorts import ITripleStorePort
 from naas_abi_core.services.triple_store.TripleStoreService import TripleStoreService
 from pydantic import BaseModel, ConfigDict, model_validator
@@ -27,12 +28,18 @@ class OxigraphAdapterConfiguration(BaseModel):
       config:
         oxigraph_url: "http://localhost:7878"
         timeout: 60
+        # Graphs above this many triples are streamed in N-Triples chunks
+        # through the Graph Store endpoint instead of one INSERT DATA.
+        bulk_load_threshold: 100000
+        bulk_chunk_bytes: 8388608
     """
 
     model_config = ConfigDict(extra="forbid")
 
     oxigraph_url: str = "http://localhost:7878"
     timeout: int = 60
+    bulk_load_threshold: int = 100_000
+    bulk_chunk_bytes: int = 8 * 1024 * 1024
 
 
 class ApacheJenaTDB2AdapterConfiguration(BaseModel):
@@ -51,6 +58,11 @@ class ApacheJenaTDB2AdapterConfiguration(BaseModel):
             adapter: "redis"
             config:
               redis_url: "redis://localhost:6379"
+        # Optional: merge the inserts/removes made while an update is in
+        # flight (collecting for up to 50 ms) into one update.
+        coalesce_window_ms: 50
+        coalesce_max_triples: 10000
+        coalesce_wait: true
     """
 
     model_config = ConfigDict(extra="forbid")
@@ -58,6 +70,9 @@ class ApacheJenaTDB2AdapterConfiguration(BaseModel):
     jena_tdb2_url: str = "http://localhost:3030/ds"
     timeout: int = 60
     key_value_service: KeyValueServiceConfiguration | None = None
+    coalesce_window_ms: int | None = None
+    coalesce_max_triples: int = 10_000
+    coalesce_wait: bool = True
 
 
 class AWSNeptuneAdapterConfiguration(BaseModel):
@@ -144,12 +159,24 @@ class TripleStoreAdapterObjectStorageConfiguration(BaseModel):
       config:
         object_storage_service: *object_storage_service
         triples_prefix: "triples"
+        # Packed snapshot + delta log for fast cold starts (default off).
+        # Only for a store with a single writing process.
+        packed: true
+        packed_prefix: "triples_packed"
+        segment_triples: 100000
+        snapshot_every_deltas: 1000
+        download_workers: 16
     """
 
     model_config = ConfigDict(extra="forbid")
 
     object_storage_service: ObjectStorageServiceConfiguration
     triples_prefix: str = "triples"
+    packed: bool = False
+    packed_prefix: str | None = None
+    segment_triples: int = 100_000
+    snapshot_every_deltas: int = 1000
+    download_workers: int = 16
 
 
 class TripleStoreAdapterConfiguration(GenericLoader):
@@ -296,6 +323,9 @@ class TripleStoreAdapterConfiguration(GenericLoader):
                     jena_tdb2_url=self.config.jena_tdb2_url,
                     timeout=self.config.timeout,
                     key_value_service=kv_service,
+                    coalesce_window_ms=self.config.coalesce_window_ms,
+                    coalesce_max_triples=self.config.coalesce_max_triples,
+                    coalesce_wait=self.config.coalesce_wait,
                 )
             elif self.adapter == "aws_neptune":
                 from naas_abi_core.services.triple_store.adaptors.secondary.AWSNeptune import (
@@ -345,8 +375,67 @@ class TripleStoreAdapterConfiguration(GenericLoader):
             return super().load()
 
 
+class TripleStoreQueryCacheConfiguration(BaseModel):
+    """Query result cache of the triple store service (off by default).
+
+    A cached read is invalidated by writes made through this service only.
+    Writes made elsewhere, such as by another worker process, stay invisible
+    for up to ``ttl_seconds`` (``null`` keeps entries until a local write).
+    With ``use_cache_service`` the per-graph generations and SELECT/ASK
+    results are kept in the engine's cache service, so processes sharing it
+    invalidate each other and a longer TTL is safe. Enable the cache without
+    it only for a single process, or when reads that are ``ttl_seconds`` stale
+    are acceptable.
+
+    triple_store:
+      query_cache:
+        max_entries: 1024
+        ttl_seconds: 60
+        use_cache_service: true
+    """
+
+    model_config = ConfigDict(extra="forbid")
+
+    max_entries: int = 0
+    ttl_seconds: float | None = 5.0
+    max_result_rows: int = 10_000
+    use_cache_service: bool = False
+
+    def load(self) -> QueryResultCache:
+        return QueryResultCache(
+            max_entries=self.max_entries,
+            ttl_seconds=self.ttl_seconds,
+            max_result_rows=self.max_result_rows,
+        )
+
+
 class TripleStoreServiceConfiguration(BaseModel):
+    """Triple store service configuration.
+
+    ``publish_all_triples`` (default on) publishes a bus message for every
+    inserted or removed triple, even when no subscription made in this process
+    can match it. Set it to false to only publish what this process subscribed
+    to; only do so when no other process binds to the ``triple_store`` bus
+    topic (e.g. with the in-process ``python_queue`` bus adapter).
+
+    Graph-change messages (one per write, carrying the N-Triples delta) are
+    only published while a subscription made in this process listens for the
+    graph. ``publish_graph_changes`` publishes them on every write, for
+    subscribers living in another process.
+    """
+
     triple_store_adapter: TripleStoreAdapterConfiguration
+    publish_all_triples: bool = True
+    publish_graph_changes: bool = False
+    query_cache: TripleStoreQueryCacheConfiguration = (
+        TripleStoreQueryCacheConfiguration()
+    )
 
     def load(self) -> TripleStoreService:
-        return TripleStoreService(triple_store_adapter=self.triple_store_adapter.load())
+        return TripleStoreService(
+            triple_store_adapter=self.triple_store_adapter.load(),
+            publish_all_triples=self.publish_all_triples,
+            publish_graph_changes=self.publish_graph_changes,
+            query_cache=self.query_cache.load(),
+            share_query_cache=self.query_cache.use_cache_service,
+        )
@@ -53,12 +53,22 @@ class VectorStoreAdapterSqliteVecConfiguration(BaseModel):
     File-backed, multi-process safe via SQLite WAL. Used as the dev default
     so api and dagster can share the store without a server.
 
+    ``default_index: "ivf"`` gives new collections an IVF index (collections
+    can also opt in with ``ensure_collection(..., index="ivf")``); ``nprobe``
+    trades recall for latency, ``min_train_size`` is the size at which the
+    index is first trained and ``retrain_growth`` how much a collection must
+    grow before it is retrained.
+
     vector_store_adapter:
       adapter: "sqlite_vec"
       config:
         persistence_path: "storage/vectorstore/vectors.sqlite3"
         journal_mode: "WAL"
         busy_timeout_ms: 5000
+        default_index: "flat"
+        nprobe: 8
+        min_train_size: 1024
+        retrain_growth: 4.0
     """
 
     model_config = ConfigDict(extra="forbid")
@@ -66,10 +76,38 @@ class VectorStoreAdapterSqliteVecConfiguration(BaseModel):
     persistence_path: str
     journal_mode: str = "WAL"
     busy_timeout_ms: int = 5000
+    default_index: Literal["flat", "ivf"] = "flat"
+    nprobe: int = 8
+    min_train_size: int = 1024
+    retrain_growth: float = 4.0
+
+
+class VectorStoreAdapterNumpyConfiguration(BaseModel):
+    """NumPy in-process vector store adapter configuration.
+
+    Exact search over one contiguous float32 matrix per collection; no
+    Qdrant or native extension required. Without ``persistence_path`` the
+    store is purely in memory; with it, changed collections are saved within
+    ``flush_interval`` seconds (0 saves on every write) and on shutdown, and
+    memory-mapped back on start (``mmap: false`` loads them into RAM).
+
+    vector_store_adapter:
+      adapter: "numpy"
+      config:
+        persistence_path: "storage/vectorstore/numpy"
+        mmap: true
+        flush_interval: 1.0
+    """
+
+    model_config = ConfigDict(extra="forbid")
+
+    persistence_path: str | None = None
+    mmap: bool = True
+    flush_interval: float = 1.0
 
 
 class VectorStoreAdapterConfiguration(GenericLoader):
-    adapter: Literal["qdrant", "qdrant_in_memory", "sqlite_vec", "custom"]
+    adapter: Literal["qdrant", "qdrant_in_memory", "sqlite_vec", "numpy", "custom"]
     config: dict | None = None
 
     @model_validator(mode="after")
@@ -100,6 +138,13 @@ class VectorStoreAdapterConfiguration(GenericLoader):
                 "Invalid configuration for services.vector_store.vector_store_adapter 'sqlite_vec' adapter",
             )
 
+        if self.adapter == "numpy":
+            pydantic_model_validator(
+                VectorStoreAdapterNumpyConfiguration,
+                self.config,
+                "Invalid configuration for services.vector_store.vector_store_adapter 'numpy' adapter",
+            )
+
         return self
 
     def load(self) -> IVectorStorePort:
@@ -127,6 +172,12 @@ class VectorStoreAdapterConfiguration(GenericLoader):
                 )
 
                 return SqliteVecAdapter(**self.config)
+            elif self.adapter == "numpy":
+                from naas_abi_core.services.vector_store.adapters.NumpyAdapter import (
+                    NumpyAdapter,
+                )
+
+                return NumpyAdapter(**self.config)
             else:
                 raise ValueError(f"Unknown adapter: {self.adapter}")
         else:
@@ -48,3 +48,20 @@ def test_vector_store_service_configuration_qdrant_in_memory(tmp_path):
     vector_store_adapter = configuration.vector_store_adapter.load()
     assert isinstance(vector_store_adapter, IVectorStorePort)
     assert isinstance(vector_store_adapter, QdrantInMemoryAdapter)
+
+
+def test_vector_store_service_configuration_numpy(tmp_path):
+    from naas_abi_core.services.vector_store.adapters.NumpyAdapter import (
+        NumpyAdapter,
+    )
+
+    configuration = VectorStoreServiceConfiguration(
+        vector_store_adapter=VectorStoreAdapterConfiguration(
+            adapter="numpy",
+            config={"persistence_path": str(tmp_path / "numpy-store")},
+        )
+    )
+
+    vector_store_adapter = configuration.vector_store_adapter.load()
+    assert isinstance(vector_store_adapter, IVectorStorePort)
+    assert isinstance(vector_store_adapter, NumpyAdapter)
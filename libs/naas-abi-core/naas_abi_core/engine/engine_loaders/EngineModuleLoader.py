@@ -1,6 +1,7 @@
 import importlib
 import importlib.util
 import os
+from collections.abc import Callable
 from pathlib import Path
 
 import pydantic_core
@@ -295,6 +296,7 @@ class EngineModuleLoader:
         self,
         engine: IEngine,
         module_names: list[str] | None = None,
+        on_module_loaded: Callable[[BaseModule], None] | None = None,
     ) -> dict[str, BaseModule]:
         if module_names is None:
             module_names = []
@@ -374,6 +376,8 @@ class EngineModuleLoader:
                     )
                     self.__modules[module_name] = module
                     module.on_load()
+                    if on_module_loaded is not None:
+                        on_module_loaded(module)
                 else:
                     raise ValueError("module must be provided for a module")
 
@@ -1,15 +1,29 @@
-
 from naas_abi_core import logger
 from naas_abi_core.module.Module import BaseModule
+from naas_abi_core.services.triple_store.SchemaLoadPipeline import (
+    SchemaLoadPipeline,
+    SchemaLoadReport,
+)
 from naas_abi_core.services.triple_store.TripleStoreService import TripleStoreService
 
 
 class EngineOntologyLoader:
+    @classmethod
+    def start(cls, triple_store: TripleStoreService) -> SchemaLoadPipeline:
+        """Open a schema load pipeline; submit each module's ontologies with
+        ``submit`` as soon as its ``on_load`` has run, then call ``finish``."""
+        logger.debug("Starting ontology loading")
+        return triple_store.schema_load_pipeline()
+
+    @classmethod
+    def submit(cls, pipeline: SchemaLoadPipeline, module: BaseModule) -> None:
+        pipeline.submit(module.ontologies)
+
     @classmethod
     def load_ontologies(
         cls, triple_store: TripleStoreService, modules: list[BaseModule]
-    ) -> None:
-        logger.debug("Loading ontologies")
+    ) -> SchemaLoadReport:
+        pipeline = cls.start(triple_store)
         for module in modules:
-            for ontology in module.ontologies:
-                triple_store.load_schema(ontology)
+            cls.submit(pipeline, module)
+        return pipeline.finish()
@@ -1,14 +1,168 @@
-from typing import Generic, TypeVar
+import functools
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Generic, TypeVar
 
+from jinja2 import Template
 from langchain_core.tools import BaseTool, StructuredTool
+from naas_abi_core import logger
 from naas_abi_core.services.triple_store.TripleStoreService import TripleStoreService
 from naas_abi_core.utils.SPARQL import SPARQLUtils
 from pydantic import BaseModel
 
 T = TypeVar("T", bound=BaseModel)
 
+BATCH_VARIABLE_PREFIX = "__arg_"
+
+# A template argument used as a whole RDF term: "{{ x }}", '{{ x }}' (plain
+# literal, no language tag or datatype) or <{{ x }}> (IRI).
+_LITERAL_ARGUMENT = re.compile(r"""(["'])\{\{\s*(\w+)\s*\}\}\1(?![@^])""")
+_IRI_ARGUMENT = re.compile(r"<\{\{\s*(\w+)\s*\}\}>")
+_SELECT = re.compile(
+    r"\bSELECT\s+((?:DISTINCT|REDUCED)\s+)?(.*?)\s*(?:\bWHERE\s*)?\{",
+    re.IGNORECASE | re.DOTALL,
+)
+# Constructs whose result would change if several argument sets were
+# evaluated together (row limits, aggregation, nested projections) or that
+# cannot take an extra VALUES block.
+_NOT_BATCHABLE = re.compile(
+    r"\b(LIMIT|OFFSET|GROUP\s+BY|HAVING|VALUES|COUNT|SUM|AVG|MIN|MAX|SAMPLE|GROUP_CONCAT)\b",
+    re.IGNORECASE,
+)
+_IRI_FORBIDDEN = re.compile(r"[\s<>\"{}|^`\\]")
+
+
+@functools.lru_cache(maxsize=512)
+def compile_template(source: str) -> Template:
+    """Compiled Jinja2 template for ``source``, shared by every workflow."""
+    return Template(source)
+
+
+@dataclass(frozen=True)
+class BatchTemplate:
+    """A template rewritten so its arguments are SPARQL variables.
+
+    ``query`` has one ``VALUES`` placeholder (``{values}``) per group that
+    uses an argument; ``arguments`` maps each argument name to ``"literal"``
+    or ``"iri"``.
+    """
+
+    query: str
+    arguments: dict[str, str]
+
+    @property
+    def variables(self) -> list[str]:
+        return [f"{BATCH_VARIABLE_PREFIX}{name}" for name in self.arguments]
+
+
+def _group_openings(query: str) -> list[tuple[int, int]]:
+    """``(start, end)`` offsets of every ``{ ... }`` group, skipping braces in
+    strings and IRIs."""
+    groups: list[tuple[int, int]] = []
+    stack: list[int] = []
+    i = 0
+    while i < len(query):
+        char = query[i]
+        if char in "\"'":
+            end = query.find(char, i + 1)
+            i = len(query) if end == -1 else end + 1
+            continue
+        if char == "<":
+            end = query.find(">", i + 1)
+            if end != -1 and not re.search(r"\s", query[i + 1 : end]):
+                i = end + 1
+                continue
+        if char == "#":
+            end = query.find("\n", i)
+            i = len(query) if end == -1 else end + 1
+            continue
+        if char == "{":
+            stack.append(i)
+        elif char == "}" and stack:
+            groups.append((stack.pop(), i))
+        i += 1
+    return groups
+
+
+@functools.lru_cache(maxsize=512)
+def batch_template(source: str) -> BatchTemplate | None:
+    """Rewrite ``source`` for batched execution, or ``None`` when it cannot be
+    batched without changing the per-argument results."""
+    arguments: dict[str, str] = {}
+
+    def replace(kind: str, name: str) -> str:
+        if arguments.setdefault(name, kind) != kind:
+            raise ValueError(f"argument {name} is used both as literal and IRI")
+        return f"?{BATCH_VARIABLE_PREFIX}{name}"
+
+    try:
+        query = _LITERAL_ARGUMENT.sub(lambda m: replace("literal", m.group(2)), source)
+        query = _IRI_ARGUMENT.sub(lambda m: replace("iri", m.group(1)), query)
+    except ValueError:
+        return None
+    if not arguments or "{{" in query or "{%" in query or _NOT_BATCHABLE.search(query):
+        return None
+
+    select = _SELECT.search(query)
+    if select is None or len(re.findall(r"\bSELECT\b", query, re.IGNORECASE)) != 1:
+        return None
+    where = select.end() - 1
+    groups = [g for g in _group_openings(query) if g[0] >= where]
+    if not any(start == where for start, _ in groups):
+        return None
+
+    # VALUES goes in the outer group (so every row carries its argument set)
+    # and in each nested group using an argument, where FILTERs and MINUS
+    # would otherwise not see the outer bindings.
+    openings = {where}
+    marker = f"?{BATCH_VARIABLE_PREFIX}"
+    position = query.find(marker)
+    while position != -1:
+        enclosing = [g for g in groups if g[0] < position < g[1]]
+        if not enclosing:
+            return None
+        openings.add(max(enclosing)[0])
+        position = query.find(marker, position + 1)
+
+    projection = select.group(2).strip()
+    variables = " ".join(f"?{BATCH_VARIABLE_PREFIX}{name}" for name in arguments)
+    parts: list[str] = []
+    last = 0
+    for opening in sorted(openings):
+        parts.append(query[last : opening + 1].replace("{", "{{").replace("}", "}}"))
+        parts.append(" {values} ")
+        last = opening + 1
+    parts.append(query[last:].replace("{", "{{").replace("}", "}}"))
+    rewritten = "".join(parts)
+    if projection != "*":
+        head = select.group(0).replace("{", "{{").replace("}", "}}")
+        new_head = head.replace(projection, f"{projection} {variables}", 1)
+        rewritten = rewritten.replace(head, new_head, 1)
+    return BatchTemplate(query=rewritten, arguments=arguments)
+
 
 class GenericWorkflow(Generic[T]):
+    """Runs a Jinja2 SPARQL template with validated arguments.
+
+    The template is compiled once. Results are cached per workflow, keyed by
+    the validated arguments and by ``TripleStoreService.query_state`` for the
+    rendered query, so any write to a graph the query reads makes the next
+    call hit the triple store again. ``run_many`` evaluates several argument
+    sets with a single SPARQL query by binding them in a ``VALUES`` block.
+
+    Args:
+        cache_size: Argument sets whose results are kept; 0 disables caching.
+        cache_ttl_seconds: Age limit bounding staleness from writers the
+            state token cannot see. ``None`` reuses the triple store query
+            cache's ``ttl_seconds``; a longer limit only applies when a shared
+            ``CacheService`` backs ``query_state`` (see
+            ``TripleStoreService.query_state_max_age``).
+    """
+
     def __init__(
         self,
         name: str,
@@ -16,28 +170,176 @@ class GenericWorkflow(Generic[T]):
         sparql_template: str,
         arguments_model: type[T],
         triple_store_service: TripleStoreService,
+        cache_size: int = 256,
+        cache_ttl_seconds: float | None = None,
     ):
         self.name = name
         self.description = description
         self.sparql_template = sparql_template
         self.arguments_model = arguments_model
         self.triple_store_service = triple_store_service
+        self.cache_size = cache_size
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.__cache: OrderedDict[tuple[str, str], tuple[float, Any]] = OrderedDict()
+        self.__cache_lock = threading.Lock()
 
-    def run(self, parameters: T):
-        try:
-            from jinja2 import Template
+    def render(self, parameters: T) -> str:
+        return compile_template(self.sparql_template).render(**parameters.model_dump())
+
+    # --- result cache -----------------------------------------------------
+
+    @staticmethod
+    def __arguments_key(parameters: T) -> str:
+        return json.dumps(parameters.model_dump(mode="json"), sort_keys=True)
 
-            template = Template(self.sparql_template)
-            sparql_query = template.render(
-                **parameters.model_dump(),
+    def __cache_key(self, parameters: T, sparql_query: str) -> tuple[str, str] | None:
+        if self.cache_size <= 0:
+            return None
+        state = self.triple_store_service.query_state(sparql_query)
+        if state is None:
+            return None
+        return (self.__arguments_key(parameters), state)
+
+    def __cache_get(self, key: tuple[str, str] | None) -> tuple[bool, Any]:
+        if key is None:
+            return False, None
+        with self.__cache_lock:
+            entry = self.__cache.get(key)
+            if entry is None:
+                return False, None
+            max_age = self.triple_store_service.query_state_max_age(
+                self.cache_ttl_seconds
             )
-            print(sparql_query)
+            if max_age is not None and time.monotonic() - entry[0] > max_age:
+                del self.__cache[key]
+                return False, None
+            self.__cache.move_to_end(key)
+            return True, self.__copy(entry[1])
+
+    def __cache_put(self, key: tuple[str, str] | None, rows: Any) -> None:
+        if key is None:
+            return
+        with self.__cache_lock:
+            self.__cache[key] = (time.monotonic(), self.__copy(rows))
+            self.__cache.move_to_end(key)
+            while len(self.__cache) > self.cache_size:
+                self.__cache.popitem(last=False)
+
+    @staticmethod
+    def __copy(rows: Any) -> Any:
+        return [dict(row) for row in rows] if rows is not None else None
+
+    def clear_cache(self) -> None:
+        with self.__cache_lock:
+            self.__cache.clear()
+
+    # --- execution --------------------------------------------------------
+
+    def run(self, parameters: T):
+        try:
+            sparql_query = self.render(parameters)
+            key = self.__cache_key(parameters, sparql_query)
+            hit, rows = self.__cache_get(key)
+            if hit:
+                return rows
+            logger.debug(f"{self.name}: {sparql_query}")
             results = self.triple_store_service.query(sparql_query)
 
-            return SPARQLUtils(self.triple_store_service).results_to_list(results)
+            rows = SPARQLUtils(self.triple_store_service).results_to_list(results)
+            self.__cache_put(key, rows)
+            return rows
         except Exception as e:  # noqa: BLE001
             return [{"error": str(e)}]
 
+    def run_many(self, parameters: list[T]) -> list:
+        """Results for each argument set, in order, as ``run`` returns them.
+
+        Cached sets are answered from the cache; the others are bound in one
+        ``VALUES`` block and evaluated with a single query when the template
+        allows it (whole-term arguments, no LIMIT/aggregates/subqueries),
+        otherwise one by one.
+        """
+        results: list[Any] = [None] * len(parameters)
+        pending: dict[str, list[int]] = {}
+        keys: dict[str, tuple[str, str] | None] = {}
+        try:
+            for index, parameter in enumerate(parameters):
+                sparql_query = self.render(parameter)
+                key = self.__cache_key(parameter, sparql_query)
+                hit, rows = self.__cache_get(key)
+                if hit:
+                    results[index] = rows
+                    continue
+                arguments = self.__arguments_key(parameter)
+                pending.setdefault(arguments, []).append(index)
+                keys[arguments] = key
+        except Exception as e:  # noqa: BLE001
+            return [[{"error": str(e)}] for _ in parameters]
+        if not pending:
+            return results
+
+        batch = batch_template(self.sparql_template)
+        representatives = [parameters[indexes[0]] for indexes in pending.values()]
+        values = self.__values(batch, representatives) if batch and len(pending) > 1 else None
+        if batch is None or values is None:
+            for indexes in pending.values():
+                rows = self.run(parameters[indexes[0]])
+                for index in indexes:
+                    results[index] = self.__copy(rows)
+            return results
+
+        try:
+            sparql_query = batch.query.format(values=values)
+            logger.debug(f"{self.name} ({len(pending)} argument sets): {sparql_query}")
+            rows = SPARQLUtils(self.triple_store_service).results_to_list(
+                self.triple_store_service.query(sparql_query)
+            ) or []
+        except Exception as e:  # noqa: BLE001
+            for indexes in pending.values():
+                for index in indexes:
+                    results[index] = [{"error": str(e)}]
+            return results
+
+        by_arguments: dict[tuple[str, ...], list[dict]] = {}
+        for row in rows:
+            bound = tuple(row.pop(variable, None) or "" for variable in batch.variables)
+            for variable in list(row):
+                if variable.startswith(BATCH_VARIABLE_PREFIX):
+                    del row[variable]
+            by_arguments.setdefault(bound, []).append(row)
+        for (arguments, indexes), parameter in zip(pending.items(), representatives):
+            dumped = parameter.model_dump()
+            bound = tuple(str(dumped[name]) for name in batch.arguments)
+            found = by_arguments.get(bound) or None
+            self.__cache_put(keys[arguments], found)
+            for index in indexes:
+                results[index] = self.__copy(found)
+        return results
+
+    @staticmethod
+    def __values(batch: BatchTemplate, parameters: list[T]) -> str | None:
+        """The VALUES block binding ``parameters``, or ``None`` if a value
+        cannot be written as the same RDF term the template would produce."""
+        variables = " ".join(f"?{variable}" for variable in batch.variables)
+        rows = []
+        for parameter in parameters:
+            dumped = parameter.model_dump()
+            terms = []
+            for name, kind in batch.arguments.items():
+                value = dumped.get(name)
+                if not isinstance(value, str):
+                    return None
+                if kind == "iri":
+                    if not value or _IRI_FORBIDDEN.search(value):
+                        return None
+                    terms.append(f"<{value}>")
+                else:
+                    if re.search(r"[\"'\\\r\n]", value):
+                        return None
+                    terms.append(f'"{value}"')
+            rows.append(f"({' '.join(terms)})")
+        return f"VALUES ({variables}) {{ {' '.join(rows)} }}"
+
     def as_tools(self) -> list[BaseTool]:
         return [
             StructuredTool(
@@ -0,0 +1,163 @@
+from naas_abi_core.modules.templatablesparqlquery.workflows.GenericWorkflow import (
+    GenericWorkflow,
+    batch_template,
+)
+from naas_abi_core.modules.templatablesparqlquery.workflows.TemplatableSparqlQueryLoader import (
+    TemplatableSparqlQueryLoader,
+)
+from pydantic import BaseModel
+from rdflib import RDF, RDFS, ConjunctiveGraph, Literal, URIRef
+
+EX = "http://example.org/"
+GRAPH = URIRef(f"{EX}graph")
+
+TEMPLATE = """
+    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+    SELECT DISTINCT ?person ?label
+    WHERE {
+        GRAPH <http://example.org/graph> {
+            ?person a <{{ type }}> ;
+                rdfs:label ?label .
+            FILTER(CONTAINS(?label, "{{ name }}"))
+        }
+    }
+    ORDER BY ?label
+"""
+
+
+class PeopleArguments(BaseModel):
+    type: str
+    name: str
+
+
+class _Store:
+    """Stand-in for TripleStoreService: SPARQL over a ConjunctiveGraph and a
+    generation bumped on every write."""
+
+    def __init__(self) -> None:
+        self.graph = ConjunctiveGraph()
+        self.generation = 0
+        self.queries: list[str] = []
+        self.max_age: float | None = 5.0
+
+    def add(self, name: str, type_: str = "Person") -> None:
+        context = self.graph.get_context(GRAPH)
+        subject = URIRef(f"{EX}{name.lower().replace(' ', '-')}")
+        context.add((subject, RDF.type, URIRef(f"{EX}{type_}")))
+        context.add((subject, RDFS.label, Literal(name)))
+        self.generation += 1
+
+    def query(self, query: str):
+        self.queries.append(query)
+        return self.graph.query(query)
+
+    def query_state(self, query: str) -> str:
+        return str(self.generation)
+
+    def query_state_max_age(self, requested: float | None = None) -> float | None:
+        if requested is None or self.max_age is None:
+            return self.max_age if requested is None else requested
+        return min(requested, self.max_age)
+
+
+def _workflow(store: _Store, template: str = TEMPLATE) -> GenericWorkflow:
+    return GenericWorkflow(
+        "people", "People by type and name", template, PeopleArguments, store  # type: ignore[arg-type]
+    )
+
+
+def _args(name: str, type_: str = "Person") -> PeopleArguments:
+    return PeopleArguments(type=f"{EX}{type_}", name=name)
+
+
+def test_results_are_cached_until_the_graph_state_changes():
+    store = _Store()
+    store.add("Alice Smith")
+    workflow = _workflow(store)
+
+    assert workflow.run(_args("Alice")) == [
+        {"person": f"{EX}alice-smith", "label": "Alice Smith"}
+    ]
+    workflow.run(_args("Alice"))[0]["label"] = "mutated"
+    assert workflow.run(_args("Alice"))[0]["label"] == "Alice Smith"
+    assert len(store.queries) == 1
+
+    store.add("Alice Jones")
+    assert len(workflow.run(_args("Alice"))) == 2
+    assert len(store.queries) == 2
+
+
+def test_cached_results_expire_after_the_query_cache_ttl(monkeypatch):
+    store = _Store()
+    store.add("Alice Smith")
+    workflow = _workflow(store)
+    now = [1000.0]
+    monkeypatch.setattr(
+        "naas_abi_core.modules.templatablesparqlquery.workflows.GenericWorkflow.time.monotonic",
+        lambda: now[0],
+    )
+
+    workflow.run(_args("Alice"))
+    now[0] += 4.0
+    workflow.run(_args("Alice"))
+    assert len(store.queries) == 1
+
+    now[0] += 2.0  # past the store's 5 s limit, with no local write
+    workflow.run(_args("Alice"))
+    assert len(store.queries) == 2
+
+
+def test_run_many_evaluates_argument_sets_in_one_values_query():
+    store = _Store()
+    store.add("Alice Smith")
+    store.add("Bob Smith")
+    store.add("Bob Robot", type_="Robot")
+    workflow = _workflow(store)
+    sets = [_args("Smith"), _args("Bob", "Robot"), _args("Nobody"), _args("Smith")]
+
+    batched = workflow.run_many(sets)
+
+    assert len(store.queries) == 1 and "VALUES" in store.queries[0]
+    assert batched == [workflow.run(arguments) for arguments in sets]
+    assert len(store.queries) == 1  # run() answered from the batch's cache
+    assert [len(rows or []) for rows in batched] == [2, 1, 0, 2]
+    assert batched[2] is None
+
+
+def test_run_many_falls_back_to_one_query_per_set_when_it_cannot_batch():
+    store = _Store()
+    store.add("Alice Smith")
+    store.add("Bob Smith")
+    workflow = _workflow(store, TEMPLATE + " LIMIT 1")
+
+    assert batch_template(workflow.sparql_template) is None
+    assert [len(rows) for rows in workflow.run_many([_args("Alice"), _args("Bob")])] == [1, 1]
+    assert len(store.queries) == 2
+
+    # A value that would need escaping runs on its own too.
+    plain = _workflow(_Store())
+    assert plain.run_many([_args('Al"ice'), _args("Bob")])[0] == [
+        {"error": plain.run(_args('Al"ice'))[0]["error"]}
+    ]
+
+
+def test_template_discovery_is_reread_after_a_write_or_the_max_age(monkeypatch):
+    store = _Store()
+    now = [1000.0]
+    monkeypatch.setattr(
+        "naas_abi_core.modules.templatablesparqlquery.workflows.TemplatableSparqlQueryLoader.time.monotonic",
+        lambda: now[0],
+    )
+
+    def discover() -> int:
+        TemplatableSparqlQueryLoader(store, str(GRAPH)).templatable_queries()  # type: ignore[arg-type]
+        return len(store.queries)
+
+    assert discover() == 2  # queries, then arguments
+    assert discover() == 2
+    store.add("Alice Smith")
+    assert discover() == 4
+
+    now[0] += 6.0  # templates written by another process: no local write
+    assert discover() == 6
+    assert discover() == 6
@@ -1,9 +1,11 @@
 import asyncio
+import threading
+import time
+import weakref
 
 from naas_abi_core import logger
 from naas_abi_core.services.triple_store.TripleStoreService import TripleStoreService
 from pydantic import Field, create_model
-from rdflib import RDF, Graph, URIRef
 
 from .GenericWorkflow import GenericWorkflow
 
@@ -20,6 +22,11 @@ def asyncio_thread_job(jobs):
     return asyncio.run(async_asyncio_thread_jobs(jobs))
 
 
+_discovery_lock = threading.Lock()
+# triple store service -> graph name -> (query_state, cached_at, (queries, arguments))
+_discovery_cache: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
 class TemplatableSparqlQueryLoader:
     triple_store_service: TripleStoreService
 
@@ -31,8 +38,8 @@ class TemplatableSparqlQueryLoader:
         self.triple_store_service = triple_store_service
         self.graph_name = graph_name
 
-    def templatable_queries(self):
-        results = self.triple_store_service.query(
+    def __queries_query(self) -> str:
+        return (
             """
             PREFIX intentMapping: <http://ontology.naas.ai/intentMapping/>
             PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
@@ -51,26 +58,8 @@ class TemplatableSparqlQueryLoader:
         """
         )
 
-        queries = {}
-
-        for result in results:
-            query, label, description, sparqlTemplate, hasArgument = result
-            queries[query] = {
-                "label": label,
-                "description": description,
-                "sparqlTemplate": sparqlTemplate,
-                "hasArgument": [hasArgument]
-                if (query not in queries or queries[query].get("hasArgument") is None)
-                else queries[query].get("hasArgument") + [hasArgument],
-            }
-
-        arguments = {}
-
-        argument_graph = Graph()
-        argument_graph.bind(
-            "intentMapping", URIRef("http://ontology.naas.ai/intentMapping/")
-        )
-        results = self.triple_store_service.query(
+    def __arguments_query(self) -> str:
+        return (
             """
                     PREFIX intentMapping: <http://ontology.naas.ai/intentMapping/>
 
@@ -89,77 +78,66 @@ class TemplatableSparqlQueryLoader:
                 """
         )
 
-        for argument, name, description, validationPattern, validationFormat in results:
-            argument_graph.add(
-                (
-                    argument,
-                    RDF.type,
-                    URIRef("http://ontology.naas.ai/intentMapping/QueryArgument"),
-                )
-            )
-            argument_graph.add(
-                (
-                    argument,
-                    URIRef("http://ontology.naas.ai/intentMapping/argumentName"),
-                    name,
-                )
-            )
-            argument_graph.add(
-                (
-                    argument,
-                    URIRef("http://ontology.naas.ai/intentMapping/argumentDescription"),
-                    description,
-                )
-            )
-            argument_graph.add(
-                (
-                    argument,
-                    URIRef("http://ontology.naas.ai/intentMapping/validationPattern"),
-                    validationPattern,
-                )
-            )
-            argument_graph.add(
-                (
-                    argument,
-                    URIRef("http://ontology.naas.ai/intentMapping/validationFormat"),
-                    validationFormat,
-                )
+    def templatable_queries(self):
+        """Queries and arguments defined in the schema graph.
+
+        Discovery is memoized per triple store service and graph, keyed by
+        the schema graph's ``query_state``: loading again (another engine
+        load, a module re-initialisation) only re-reads the graph after it
+        has been written to, or once ``query_state_max_age`` has passed, which
+        bounds how long templates written by another process go unseen.
+        """
+        state = self.triple_store_service.query_state(self.__queries_query())
+        with _discovery_lock:
+            cached = _discovery_cache.get(self.triple_store_service, {}).get(
+                self.graph_name
             )
+        if state is not None and cached is not None and cached[0] == state:
+            max_age = self.triple_store_service.query_state_max_age()
+            if max_age is None or time.monotonic() - cached[1] <= max_age:
+                return cached[2]
+
+        discovered = self.__discover()
+        if state is not None:
+            with _discovery_lock:
+                _discovery_cache.setdefault(self.triple_store_service, {})[
+                    self.graph_name
+                ] = (state, time.monotonic(), discovered)
+        return discovered
+
+    def __discover(self):
+        results = self.triple_store_service.query(self.__queries_query())
+
+        queries = {}
+
+        for result in results:
+            query, label, description, sparqlTemplate, hasArgument = result
+            queries[query] = {
+                "label": label,
+                "description": description,
+                "sparqlTemplate": sparqlTemplate,
+                "hasArgument": [hasArgument]
+                if (query not in queries or queries[query].get("hasArgument") is None)
+                else queries[query].get("hasArgument") + [hasArgument],
+            }
 
         arguments = {}
-        for templatableQuery in queries:
-            for argument in queries[templatableQuery].get("hasArgument"):
-                q = (
-                    """
-                    PREFIX intentMapping: <http://ontology.naas.ai/intentMapping/>
+        results = self.triple_store_service.query(self.__arguments_query())
+        for argument, name, description, validationPattern, validationFormat in results:
+            arguments[argument] = {
+                "name": name,
+                "description": description,
+                "validationPattern": validationPattern,
+                "validationFormat": validationFormat,
+            }
 
-                    SELECT ?argument ?name ?description ?validationPattern ?validationFormat
-                    WHERE {
-                        BIND(<"""
-                    + str(argument)
-                    + """> AS ?argument)
-                        ?argument a intentMapping:QueryArgument ;
-                            intentMapping:argumentName ?name ;
-                            intentMapping:argumentDescription ?description ;
-                            intentMapping:validationPattern ?validationPattern ;
-                            intentMapping:validationFormat ?validationFormat .
-                    }
-                """
-                )
-                # logger.debug(f"Query: {q}")
-                results = argument_graph.query(q)
-
-                for result in results:
-                    argument, name, description, validationPattern, validationFormat = (
-                        result
-                    )
-
-                    arguments[argument] = {
-                        "name": name,
-                        "description": description,
-                        "validationPattern": validationPattern,
-                        "validationFormat": validationFormat,
-                    }
+        # Only keep the arguments of the discovered queries.
+        arguments = {
+            argument: arguments[argument]
+            for templatableQuery in queries
+            for argument in queries[templatableQuery].get("hasArgument")
+            if argument in arguments
+        }
 
         return queries, arguments
 
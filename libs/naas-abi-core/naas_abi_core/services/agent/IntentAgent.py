@@ -1,4 +1,5 @@
 from collections.abc import Callable
+from functools import lru_cache
 from queue import Queue
 from typing import Any, Union
 
@@ -43,6 +44,13 @@ def get_nlp():
     return _nlp
 
 
+@lru_cache(maxsize=4096)
+def _named_entities(text: str) -> tuple[str, ...]:
+    # Intent values are static and `entity_check` re-parses the same user
+    # message once per mapped intent, so spaCy runs once per distinct text.
+    return tuple(ent.text.lower() for ent in get_nlp()(text).ents)
+
+
 MULTIPLES_INTENTS_MESSAGE = "I found multiple intents that could handle your request"
 
 
@@ -521,8 +529,7 @@ Last user message: "{last_human_message.content}"
         Returns:
             list[str]: List of extracted entity texts in lowercase
         """
-        doc = get_nlp()(text)
-        return [ent.text.lower() for ent in doc.ents]
+        return list(_named_entities(text))
 
     def entity_check(self, state: IntentState) -> Command:
         """Validate entity consistency between user message and intents.
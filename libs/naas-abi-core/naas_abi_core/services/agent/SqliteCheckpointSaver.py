@@ -2,27 +2,80 @@ from __future__ import annotations
 
 import os
 import pickle
+import random
 import sqlite3
 import threading
 import time
-from collections import defaultdict
+from collections.abc import AsyncIterator, Iterator, Sequence
+from contextlib import contextmanager
 from typing import Any
 
 from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
     ChannelVersions,
     Checkpoint,
     CheckpointMetadata,
     CheckpointTuple,
     RunnableConfig,
+    SerializerProtocol,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
 )
-from langgraph.checkpoint.memory import InMemorySaver
 
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT NOT NULL,
+    checkpoint BLOB NOT NULL,
+    metadata_type TEXT NOT NULL,
+    metadata BLOB NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS checkpoint_blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    type TEXT NOT NULL,
+    blob BLOB NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE TABLE IF NOT EXISTS checkpoint_writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT NOT NULL,
+    value BLOB NOT NULL,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+CREATE INDEX IF NOT EXISTS idx_checkpoints_created_at ON checkpoints(created_at);
+"""
 
-class SqliteCheckpointSaver(InMemorySaver):
+
+class SqliteCheckpointSaver(BaseCheckpointSaver[str]):
     """SQLite-backed checkpoint saver for local persistence.
 
-    This saver extends LangGraph's in-memory saver and persists its internal
-    structures after each write/delete operation.
+    Checkpoints, channel blobs and pending writes are stored one row each,
+    keyed by thread / namespace, so ``put`` and ``put_writes`` only write the
+    delta of an agent step and ``get_tuple`` / ``list`` only read the thread
+    they are asked about. Nothing is loaded at startup.
+
+    Retention: with ``max_checkpoints_per_thread`` set, each ``put`` keeps only
+    the newest checkpoints of its thread / namespace; ``prune`` applies the
+    same policy (and/or an age limit) to every thread on demand. Channel blobs
+    no longer referenced by a remaining checkpoint are dropped with them.
+
+    Databases written by the previous single-row layout (one pickled copy of
+    every conversation) are migrated on first open.
     """
 
     def __init__(
@@ -30,100 +83,228 @@ class SqliteCheckpointSaver(InMemorySaver):
         path: str,
         journal_mode: str = "WAL",
         busy_timeout_ms: int = 5000,
+        max_checkpoints_per_thread: int | None = None,
+        *,
+        serde: SerializerProtocol | None = None,
     ) -> None:
-        super().__init__()
+        super().__init__(serde=serde)
         self._lock = threading.RLock()
         self._path = path
+        self.max_checkpoints_per_thread = max_checkpoints_per_thread
 
         os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
         self._conn = sqlite3.connect(
             path,
             timeout=max(0.0, busy_timeout_ms / 1000),
             check_same_thread=False,
+            isolation_level=None,  # autocommit; we manage transactions
         )
         self._conn.execute(f"PRAGMA journal_mode={journal_mode}")
         self._conn.execute(f"PRAGMA busy_timeout={busy_timeout_ms}")
         self._conn.execute("PRAGMA synchronous=NORMAL")
-        self._conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS checkpoint_state (
-                id INTEGER PRIMARY KEY CHECK(id = 1),
-                storage BLOB NOT NULL,
-                writes BLOB NOT NULL,
-                blobs BLOB NOT NULL,
-                updated_at REAL NOT NULL
-            )
-            """
-        )
-        self._conn.commit()
-        self._load_state()
+        self._conn.executescript(_SCHEMA)
+        self._migrate_legacy_state()
+
+    # ------------------------------------------------------------------
+    # Storage helpers
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._conn
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
 
-    def _serialize_storage(self) -> dict[str, dict[str, dict[str, tuple[Any, ...]]]]:
+    def _migrate_legacy_state(self) -> None:
+        """Explode the legacy pickled ``checkpoint_state`` row into rows."""
+        with self._lock:
+            exists = self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'checkpoint_state'"
+            ).fetchone()
+            if exists is None:
+                return
+            with self._transaction() as conn:
+                row = conn.execute(
+                    "SELECT storage, writes, blobs, updated_at FROM checkpoint_state WHERE id = 1"
+                ).fetchone()
+                if row is not None:
+                    storage = pickle.loads(row[0])  # nosec B301 - data written by this process to a local SQLite DB; never deserializes external/untrusted input
+                    writes = pickle.loads(row[1])  # nosec B301
+                    blobs = pickle.loads(row[2])  # nosec B301
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO checkpoints(thread_id, checkpoint_ns,"
+                        " checkpoint_id, parent_checkpoint_id, type, checkpoint,"
+                        " metadata_type, metadata, created_at)"
+                        " VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        [
+                            (
+                                thread_id,
+                                checkpoint_ns,
+                                checkpoint_id,
+                                parent_id,
+                                checkpoint[0],
+                                checkpoint[1],
+                                metadata[0],
+                                metadata[1],
+                                row[3],
+                            )
+                            for thread_id, namespaces in storage.items()
+                            for checkpoint_ns, checkpoints in namespaces.items()
+                            for checkpoint_id, (
+                                checkpoint,
+                                metadata,
+                                parent_id,
+                            ) in checkpoints.items()
+                        ],
+                    )
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO checkpoint_blobs(thread_id, checkpoint_ns,"
+                        " channel, version, type, blob) VALUES(?, ?, ?, ?, ?, ?)",
+                        [
+                            (thread_id, checkpoint_ns, channel, str(version), typed[0], typed[1])
+                            for (thread_id, checkpoint_ns, channel, version), typed in blobs.items()
+                        ],
+                    )
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO checkpoint_writes(thread_id, checkpoint_ns,"
+                        " checkpoint_id, task_id, idx, channel, type, value, task_path)"
+                        " VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        [
+                            (
+                                thread_id,
+                                checkpoint_ns,
+                                checkpoint_id,
+                                task_id,
+                                idx,
+                                channel,
+                                typed[0],
+                                typed[1],
+                                task_path,
+                            )
+                            for (thread_id, checkpoint_ns, checkpoint_id), inner in writes.items()
+                            for (task_id, idx), (_, channel, typed, task_path) in inner.items()
+                        ],
+                    )
+                conn.execute("DROP TABLE checkpoint_state")
+
+    def _load_blobs(
+        self, thread_id: str, checkpoint_ns: str, versions: ChannelVersions
+    ) -> dict[str, Any]:
+        if not versions:
+            return {}
+        pairs = [(channel, str(version)) for channel, version in versions.items()]
+        # Only "(?, ?)" fragments are formatted in; values are bound.
+        values_sql = ",".join("(?, ?)" for _ in pairs)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT channel, type, blob FROM checkpoint_blobs"
+                " WHERE thread_id = ? AND checkpoint_ns = ?"
+                f" AND (channel, version) IN (VALUES {values_sql})",  # nosec B608
+                [thread_id, checkpoint_ns, *(v for pair in pairs for v in pair)],
+            ).fetchall()
         return {
-            thread_id: {
-                checkpoint_ns: dict(checkpoints)
-                for checkpoint_ns, checkpoints in namespaces.items()
-            }
-            for thread_id, namespaces in self.storage.items()
+            channel: self.serde.loads_typed((type_, blob))
+            for channel, type_, blob in rows
+            if type_ != "empty"
         }
 
-    def _load_state(self) -> None:
-        row = self._conn.execute(
-            "SELECT storage, writes, blobs FROM checkpoint_state WHERE id = 1"
-        ).fetchone()
-        if row is None:
-            return
-
-        raw_storage = pickle.loads(row[0])  # nosec B301 - data written by this process to a local SQLite DB; never deserializes external/untrusted input
-        raw_writes = pickle.loads(row[1])  # nosec B301
-        raw_blobs = pickle.loads(row[2])  # nosec B301
-
-        storage: defaultdict[
-            str,
-            dict[
-                str, dict[str, tuple[tuple[str, bytes], tuple[str, bytes], str | None]]
-            ],
-        ] = defaultdict(lambda: defaultdict(dict))
-        for thread_id, namespaces in raw_storage.items():
-            for checkpoint_ns, checkpoints in namespaces.items():
-                storage[thread_id][checkpoint_ns].update(checkpoints)
-
-        writes: defaultdict[
-            tuple[str, str, str],
-            dict[tuple[str, int], tuple[str, str, tuple[str, bytes], str]],
-        ] = defaultdict(dict)
-        for key, value in raw_writes.items():
-            writes[key] = value
-
-        self.storage = storage
-        self.writes = writes
-        self.blobs = raw_blobs
-
-    def _persist_state(self) -> None:
-        self._conn.execute(
-            """
-            INSERT INTO checkpoint_state(id, storage, writes, blobs, updated_at)
-            VALUES(1, ?, ?, ?, ?)
-            ON CONFLICT(id) DO UPDATE SET
-                storage=excluded.storage,
-                writes=excluded.writes,
-                blobs=excluded.blobs,
-                updated_at=excluded.updated_at
-            """,
-            (
-                pickle.dumps(
-                    self._serialize_storage(), protocol=pickle.HIGHEST_PROTOCOL
+    def _load_writes(
+        self, thread_id: str, checkpoint_ns: str, checkpoint_id: str
+    ) -> list[tuple[str, str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT task_id, channel, type, value FROM checkpoint_writes"
+                " WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?"
+                " ORDER BY task_path, task_id, idx",
+                (thread_id, checkpoint_ns, checkpoint_id),
+            ).fetchall()
+        return [
+            (task_id, channel, self.serde.loads_typed((type_, value)))
+            for task_id, channel, type_, value in rows
+        ]
+
+    def _to_tuple(
+        self, row: tuple, metadata: CheckpointMetadata | None = None
+    ) -> CheckpointTuple:
+        (
+            thread_id,
+            checkpoint_ns,
+            checkpoint_id,
+            parent_checkpoint_id,
+            type_,
+            checkpoint_b,
+            metadata_type,
+            metadata_b,
+        ) = row
+        checkpoint_: Checkpoint = self.serde.loads_typed((type_, checkpoint_b))
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={
+                **checkpoint_,
+                "channel_values": self._load_blobs(
+                    thread_id, checkpoint_ns, checkpoint_["channel_versions"]
                 ),
-                pickle.dumps(dict(self.writes), protocol=pickle.HIGHEST_PROTOCOL),
-                pickle.dumps(dict(self.blobs), protocol=pickle.HIGHEST_PROTOCOL),
-                time.time(),
+            },
+            metadata=metadata
+            if metadata is not None
+            else self.serde.loads_typed((metadata_type, metadata_b)),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
             ),
+            pending_writes=self._load_writes(thread_id, checkpoint_ns, checkpoint_id),
         )
-        self._conn.commit()
+
+    _CHECKPOINT_COLUMNS = (
+        "thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id,"
+        " type, checkpoint, metadata_type, metadata"
+    )
+
+    # ------------------------------------------------------------------
+    # BaseCheckpointSaver
+    # ------------------------------------------------------------------
 
     def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        thread_id: str = config["configurable"]["thread_id"]
+        checkpoint_ns: str = config["configurable"].get("checkpoint_ns", "")
         with self._lock:
-            return super().get_tuple(config)
+            if checkpoint_id := get_checkpoint_id(config):
+                row = self._conn.execute(
+                    f"SELECT {self._CHECKPOINT_COLUMNS} FROM checkpoints"  # nosec B608
+                    " WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    f"SELECT {self._CHECKPOINT_COLUMNS} FROM checkpoints"  # nosec B608
+                    " WHERE thread_id = ? AND checkpoint_ns = ?"
+                    " ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns),
+                ).fetchone()
+        if row is None:
+            return None
+        result = self._to_tuple(row)
+        if checkpoint_id:
+            # Echo the caller's config, as the in-memory saver does.
+            return result._replace(config=config)
+        return result
 
     def list(
         self,
@@ -132,9 +313,48 @@ class SqliteCheckpointSaver(InMemorySaver):
         filter: dict[str, Any] | None = None,
         before: RunnableConfig | None = None,
         limit: int | None = None,
-    ):
+    ) -> Iterator[CheckpointTuple]:
+        clauses: list[str] = []
+        params: list[Any] = []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            checkpoint_ns = config["configurable"].get("checkpoint_ns")
+            if checkpoint_ns is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_checkpoint_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_checkpoint_id)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = (
+            f"SELECT {self._CHECKPOINT_COLUMNS} FROM checkpoints{where}"  # nosec B608
+            " ORDER BY checkpoint_id DESC"
+        )
+        # Metadata filters are applied after deserialization, so the SQL
+        # limit is only safe without one.
+        if limit is not None and not filter:
+            sql += " LIMIT ?"
+            params.append(limit)
         with self._lock:
-            yield from super().list(config, filter=filter, before=before, limit=limit)
+            rows = self._conn.execute(sql, params).fetchall()
+
+        remaining = limit
+        for row in rows:
+            if remaining is not None and remaining <= 0:
+                break
+            metadata = self.serde.loads_typed((row[6], row[7]))
+            if filter and not all(
+                query_value == metadata.get(query_key)
+                for query_key, query_value in filter.items()
+            ):
+                continue
+            if remaining is not None:
+                remaining -= 1
+            yield self._to_tuple(row, metadata)
 
     def put(
         self,
@@ -143,26 +363,250 @@ class SqliteCheckpointSaver(InMemorySaver):
         metadata: CheckpointMetadata,
         new_versions: ChannelVersions,
     ) -> RunnableConfig:
-        with self._lock:
-            updated_config = super().put(config, checkpoint, metadata, new_versions)
-            self._persist_state()
-            return updated_config
+        c = checkpoint.copy()
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        values: dict[str, Any] = c.pop("channel_values")  # type: ignore[misc]
+        blob_rows = []
+        for channel, version in new_versions.items():
+            type_, blob = (
+                self.serde.dumps_typed(values[channel])
+                if channel in values
+                else ("empty", b"")
+            )
+            blob_rows.append((thread_id, checkpoint_ns, channel, str(version), type_, blob))
+        type_, checkpoint_b = self.serde.dumps_typed(c)
+        metadata_type, metadata_b = self.serde.dumps_typed(
+            get_checkpoint_metadata(config, metadata)
+        )
+        with self._lock, self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO checkpoint_blobs(thread_id, checkpoint_ns,"
+                " channel, version, type, blob) VALUES(?, ?, ?, ?, ?, ?)",
+                blob_rows,
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoints(thread_id, checkpoint_ns,"
+                " checkpoint_id, parent_checkpoint_id, type, checkpoint,"
+                " metadata_type, metadata, created_at)"
+                " VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id,
+                    checkpoint_ns,
+                    checkpoint["id"],
+                    config["configurable"].get("checkpoint_id"),  # parent
+                    type_,
+                    checkpoint_b,
+                    metadata_type,
+                    metadata_b,
+                    time.time(),
+                ),
+            )
+            if self.max_checkpoints_per_thread is not None:
+                self._prune_namespace(
+                    conn, thread_id, checkpoint_ns, self.max_checkpoints_per_thread, None
+                )
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
 
     def put_writes(
         self,
         config: RunnableConfig,
-        writes,
+        writes: Sequence[tuple[str, Any]],
         task_id: str,
         task_path: str = "",
     ) -> None:
-        with self._lock:
-            super().put_writes(config, writes, task_id, task_path)
-            self._persist_state()
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        # Regular writes keep the first value recorded for (task, idx);
+        # special channels (negative idx) always take the latest one.
+        keep_first: list[tuple[Any, ...]] = []
+        replace: list[tuple[Any, ...]] = []
+        for idx, (channel, value) in enumerate(writes):
+            write_idx = WRITES_IDX_MAP.get(channel, idx)
+            type_, blob = self.serde.dumps_typed(value)
+            row = (
+                thread_id,
+                checkpoint_ns,
+                checkpoint_id,
+                task_id,
+                write_idx,
+                channel,
+                type_,
+                blob,
+                task_path,
+            )
+            (keep_first if write_idx >= 0 else replace).append(row)
+        columns = (
+            "INTO checkpoint_writes(thread_id, checkpoint_ns, checkpoint_id,"
+            " task_id, idx, channel, type, value, task_path)"
+            " VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?)"
+        )
+        with self._lock, self._transaction() as conn:
+            if keep_first:
+                conn.executemany(f"INSERT OR IGNORE {columns}", keep_first)
+            if replace:
+                conn.executemany(f"INSERT OR REPLACE {columns}", replace)
 
     def delete_thread(self, thread_id: str) -> None:
+        with self._lock, self._transaction() as conn:
+            for table in ("checkpoints", "checkpoint_blobs", "checkpoint_writes"):
+                conn.execute(
+                    f"DELETE FROM {table} WHERE thread_id = ?",  # nosec B608
+                    (thread_id,),
+                )
+
+    # ------------------------------------------------------------------
+    # Retention
+    # ------------------------------------------------------------------
+
+    def prune(
+        self,
+        keep_last: int | None = None,
+        max_age_seconds: float | None = None,
+        thread_id: str | None = None,
+    ) -> int:
+        """Drop old checkpoints and return how many were removed.
+
+        Keeps at most ``keep_last`` checkpoints per thread / namespace and/or
+        drops checkpoints older than ``max_age_seconds``; the newest checkpoint
+        of a thread is always kept so the conversation can resume. Restrict to
+        one conversation with ``thread_id``.
+        """
+        if keep_last is None and max_age_seconds is None:
+            return 0
+        cutoff = time.time() - max_age_seconds if max_age_seconds is not None else None
         with self._lock:
-            super().delete_thread(thread_id)
-            self._persist_state()
+            if thread_id is None:
+                namespaces = self._conn.execute(
+                    "SELECT DISTINCT thread_id, checkpoint_ns FROM checkpoints"
+                ).fetchall()
+            else:
+                namespaces = self._conn.execute(
+                    "SELECT DISTINCT thread_id, checkpoint_ns FROM checkpoints"
+                    " WHERE thread_id = ?",
+                    (thread_id,),
+                ).fetchall()
+            removed = 0
+            for thread, checkpoint_ns in namespaces:
+                with self._transaction() as conn:
+                    removed += self._prune_namespace(
+                        conn, thread, checkpoint_ns, keep_last, cutoff
+                    )
+            return removed
+
+    def _prune_namespace(
+        self,
+        conn: sqlite3.Connection,
+        thread_id: str,
+        checkpoint_ns: str,
+        keep_last: int | None,
+        cutoff: float | None,
+    ) -> int:
+        rows = conn.execute(
+            "SELECT checkpoint_id, created_at, type, checkpoint FROM checkpoints"
+            " WHERE thread_id = ? AND checkpoint_ns = ? ORDER BY checkpoint_id DESC",
+            (thread_id, checkpoint_ns),
+        ).fetchall()
+        keep_count = max(1, keep_last) if keep_last is not None else len(rows)
+        doomed = [
+            r[0]
+            for i, r in enumerate(rows)
+            if i > 0 and (i >= keep_count or (cutoff is not None and r[1] < cutoff))
+        ]
+        if not doomed:
+            return 0
+        for start in range(0, len(doomed), 500):
+            chunk = doomed[start : start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for table in ("checkpoints", "checkpoint_writes"):
+                conn.execute(
+                    f"DELETE FROM {table} WHERE thread_id = ? AND checkpoint_ns = ?"  # nosec B608
+                    f" AND checkpoint_id IN ({placeholders})",
+                    [thread_id, checkpoint_ns, *chunk],
+                )
+
+        # Blobs are shared between checkpoints: keep those still referenced.
+        doomed_set = set(doomed)
+        referenced: set[tuple[str, str]] = set()
+        for checkpoint_id, _, type_, checkpoint_b in rows:
+            if checkpoint_id in doomed_set:
+                continue
+            versions = self.serde.loads_typed((type_, checkpoint_b))["channel_versions"]
+            referenced.update((channel, str(v)) for channel, v in versions.items())
+        stale = [
+            (thread_id, checkpoint_ns, channel, version)
+            for channel, version in conn.execute(
+                "SELECT channel, version FROM checkpoint_blobs"
+                " WHERE thread_id = ? AND checkpoint_ns = ?",
+                (thread_id, checkpoint_ns),
+            ).fetchall()
+            if (channel, version) not in referenced
+        ]
+        conn.executemany(
+            "DELETE FROM checkpoint_blobs WHERE thread_id = ? AND checkpoint_ns = ?"
+            " AND channel = ? AND version = ?",
+            stale,
+        )
+        return len(doomed)
+
+    # ------------------------------------------------------------------
+    # Async API (the SQLite calls are short; run them inline)
+    # ------------------------------------------------------------------
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return self.get_tuple(config)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        for item in self.list(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        return self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return self.delete_thread(thread_id)
+
+    def get_next_version(self, current: str | None, channel: None) -> str:
+        # Same scheme as InMemorySaver, so databases written before the
+        # normalized layout keep ordering correctly.
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        next_v = current_v + 1
+        next_h = random.random()
+        return f"{next_v:032}.{next_h:016}"
 
     def close(self) -> None:
         with self._lock:
@@ -0,0 +1,224 @@
+import operator
+import pickle
+import sqlite3
+import time
+from typing import Annotated, TypedDict
+
+import pytest
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, START, StateGraph
+from naas_abi_core.services.agent.SqliteCheckpointSaver import SqliteCheckpointSaver
+
+
+class _State(TypedDict):
+    messages: Annotated[list[str], operator.add]
+    steps: int
+
+
+def _graph(checkpointer):
+    def respond(state: _State) -> dict:
+        return {"messages": [f"reply-{state['steps']}"], "steps": state["steps"] + 1}
+
+    builder = StateGraph(_State)
+    builder.add_node("respond", respond)
+    builder.add_edge(START, "respond")
+    builder.add_edge("respond", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def _run(checkpointer, thread_id: str, turns: int) -> dict:
+    graph = _graph(checkpointer)
+    config = {"configurable": {"thread_id": thread_id}}
+    state: dict = {}
+    for turn in range(turns):
+        state = graph.invoke(
+            {"messages": [f"user-{turn}"], "steps": turn}, config
+        )
+    return state
+
+
+@pytest.fixture
+def saver(tmp_path):
+    saver = SqliteCheckpointSaver(str(tmp_path / "checkpoints.sqlite3"))
+    yield saver
+    saver.close()
+
+
+def _count(saver: SqliteCheckpointSaver, table: str, thread_id: str) -> int:
+    return saver._conn.execute(
+        f"SELECT COUNT(*) FROM {table} WHERE thread_id = ?", (thread_id,)
+    ).fetchone()[0]
+
+
+def test_state_survives_reopening_the_database(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite3")
+    first = SqliteCheckpointSaver(path)
+    state = _run(first, "thread-a", turns=3)
+    first.close()
+
+    reopened = SqliteCheckpointSaver(path)
+    restored = _graph(reopened).get_state({"configurable": {"thread_id": "thread-a"}})
+    assert restored.values["messages"] == state["messages"]
+    assert restored.values["messages"][-2:] == ["user-2", "reply-2"]
+    reopened.close()
+
+
+def test_matches_in_memory_saver(saver):
+    memory = InMemorySaver()
+    _run(saver, "t", turns=2)
+    _run(memory, "t", turns=2)
+    config = {"configurable": {"thread_id": "t"}}
+
+    ours = list(saver.list(config))
+    theirs = list(memory.list(config))
+
+    assert [c.metadata for c in ours] == [c.metadata for c in theirs]
+    assert [c.checkpoint["channel_values"] for c in ours] == [
+        c.checkpoint["channel_values"] for c in theirs
+    ]
+    assert [bool(c.parent_config) for c in ours] == [bool(c.parent_config) for c in theirs]
+
+
+def test_get_tuple_and_list_are_scoped_to_the_thread(saver):
+    _run(saver, "t1", turns=2)
+    _run(saver, "t2", turns=1)
+    config = {"configurable": {"thread_id": "t1"}}
+
+    latest = saver.get_tuple(config)
+    history = list(saver.list(config))
+    assert latest is not None
+    assert history[0].config == latest.config
+    assert {c.config["configurable"]["thread_id"] for c in history} == {"t1"}
+
+    by_id = saver.get_tuple(history[2].config)
+    assert by_id is not None and by_id.checkpoint["id"] == history[2].checkpoint["id"]
+
+    assert [c.checkpoint["id"] for c in saver.list(config, limit=2)] == [
+        c.checkpoint["id"] for c in history[:2]
+    ]
+    before = list(saver.list(config, before=history[1].config))
+    assert [c.checkpoint["id"] for c in before] == [c.checkpoint["id"] for c in history[2:]]
+    inputs = list(saver.list(config, filter={"source": "input"}))
+    assert inputs and all(c.metadata["source"] == "input" for c in inputs)
+    assert saver.get_tuple({"configurable": {"thread_id": "missing"}}) is None
+
+
+def test_each_step_only_appends_rows(saver):
+    _run(saver, "t", turns=1)
+    checkpoints = _count(saver, "checkpoints", "t")
+    blobs = _count(saver, "checkpoint_blobs", "t")
+
+    _run(saver, "other", turns=1)
+
+    assert _count(saver, "checkpoints", "t") == checkpoints
+    assert _count(saver, "checkpoint_blobs", "t") == blobs
+
+
+def test_put_writes_keeps_first_value_for_regular_channels(saver):
+    _run(saver, "t", turns=1)
+    config = saver.get_tuple({"configurable": {"thread_id": "t"}}).config
+
+    saver.put_writes(config, [("messages", ["a"])], task_id="task-1")
+    saver.put_writes(config, [("messages", ["b"])], task_id="task-1")
+    saver.put_writes(config, [("__error__", "first")], task_id="task-1")
+    saver.put_writes(config, [("__error__", "second")], task_id="task-1")
+
+    pending = saver.get_tuple(config).pending_writes
+    assert ("task-1", "messages", ["a"]) in pending
+    assert ("task-1", "__error__", "second") in pending
+    assert len(pending) == 2
+
+
+def test_max_checkpoints_per_thread_prunes_on_put(tmp_path):
+    saver = SqliteCheckpointSaver(
+        str(tmp_path / "checkpoints.sqlite3"), max_checkpoints_per_thread=2
+    )
+    state = _run(saver, "t", turns=5)
+
+    assert _count(saver, "checkpoints", "t") == 2
+    restored = _graph(saver).get_state({"configurable": {"thread_id": "t"}})
+    assert restored.values == state
+    # Exactly the channel versions referenced by the kept checkpoints remain.
+    referenced = {
+        (channel, version)
+        for c in saver.list({"configurable": {"thread_id": "t"}})
+        for channel, version in c.checkpoint["channel_versions"].items()
+    }
+    stored = set(
+        saver._conn.execute(
+            "SELECT channel, version FROM checkpoint_blobs WHERE thread_id = 't'"
+        ).fetchall()
+    )
+    assert stored == referenced
+    saver.close()
+
+
+def test_prune_by_age_keeps_the_latest_checkpoint(saver):
+    _run(saver, "old", turns=2)
+    saver._conn.execute(
+        "UPDATE checkpoints SET created_at = ? WHERE thread_id = 'old'",
+        (time.time() - 3600,),
+    )
+    _run(saver, "fresh", turns=1)
+    fresh = _count(saver, "checkpoints", "fresh")
+
+    removed = saver.prune(max_age_seconds=60)
+
+    assert removed > 0
+    assert _count(saver, "checkpoints", "old") == 1
+    assert _count(saver, "checkpoints", "fresh") == fresh
+    assert saver.get_tuple({"configurable": {"thread_id": "old"}}) is not None
+
+
+def test_delete_thread(saver):
+    _run(saver, "t1", turns=1)
+    _run(saver, "t2", turns=1)
+
+    saver.delete_thread("t1")
+
+    for table in ("checkpoints", "checkpoint_blobs", "checkpoint_writes"):
+        assert _count(saver, table, "t1") == 0
+    assert saver.get_tuple({"configurable": {"thread_id": "t2"}}) is not None
+
+
+def test_migrates_the_legacy_single_row_layout(tmp_path):
+    memory = InMemorySaver()
+    state = _run(memory, "legacy", turns=2)
+    path = str(tmp_path / "checkpoints.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        """
+        CREATE TABLE checkpoint_state (
+            id INTEGER PRIMARY KEY CHECK(id = 1),
+            storage BLOB NOT NULL,
+            writes BLOB NOT NULL,
+            blobs BLOB NOT NULL,
+            updated_at REAL NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        "INSERT INTO checkpoint_state VALUES (1, ?, ?, ?, ?)",
+        (
+            pickle.dumps(
+                {t: {ns: dict(c) for ns, c in n.items()} for t, n in memory.storage.items()}
+            ),
+            pickle.dumps(dict(memory.writes)),
+            pickle.dumps(dict(memory.blobs)),
+            time.time(),
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+    saver = SqliteCheckpointSaver(path)
+    config = {"configurable": {"thread_id": "legacy"}}
+    assert _graph(saver).get_state(config).values == state
+    assert len(list(saver.list(config))) == len(list(memory.list(config)))
+    assert (
+        saver._conn.execute(
+            "SELECT name FROM sqlite_master WHERE name = 'checkpoint_state'"
+        ).fetchone()
+        is None
+    )
+    saver.close()
@@ -0,0 +1,220 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from urllib.parse import quote
+
+import numpy as np
+from naas_abi_core import logger
+from naas_abi_core.utils.Storage import NoStorageFolderFound, find_storage_folder
+
+VECTORS_FILE = "vectors.npy"
+TEXTS_FILE = "texts.json"
+# Generations folded into one when an index is opened with more than this.
+MAX_GENERATIONS = 32
+
+
+def default_index_path() -> str:
+    """Directory holding the persisted intent embeddings, next to the other
+    filesystem caches (``storage/cache/intent_index``)."""
+    try:
+        storage = find_storage_folder(os.getcwd())
+    except NoStorageFolderFound:
+        storage = os.path.join(os.getcwd(), "storage")
+    return os.path.join(storage, "cache", "intent_index")
+
+
+class IntentIndex:
+    """Process-wide store of intent embeddings for one embedding model.
+
+    Every IntentMapper built on the same embedding model shares one instance
+    (see :meth:`shared`), so an intent text is embedded once per process — and,
+    thanks to the on-disk copy, once per deployment — no matter how many agents
+    (or ``IntentAgent.duplicate`` copies) declare it. Rows are L2-normalised
+    float32 vectors in a single matrix; a mapper only keeps the row numbers of
+    its own intents and scores that slice, which gives Qdrant's cosine scores
+    without a client per mapper.
+
+    The matrix is append-only. Appends build a new array and swap the
+    reference under the lock, so searches never see a half-written row.
+
+    On disk, every save is a new generation directory holding both files for
+    the rows it appended, written under a temporary name and renamed into
+    place, so a warm-up that embeds intents mapper by mapper writes each
+    vector once. Opening the index reads every complete generation in order
+    (texts already read are skipped, so generations from concurrent workers
+    merge) and folds them into one once there are more than
+    ``MAX_GENERATIONS``.
+    """
+
+    _shared: "dict[tuple[str | None, str], IntentIndex]" = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, namespace: str, path: str | None = None):
+        self.namespace = namespace
+        self.path = (
+            os.path.join(path, quote(namespace, safe="")) if path is not None else None
+        )
+        self._lock = threading.Lock()
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._texts: list[str] = []
+        self._rows: dict[str, int] = {}
+        self._load()
+
+    @classmethod
+    def shared(cls, namespace: str, path: str | None = None) -> "IntentIndex":
+        """Return the process-wide index for ``namespace``, creating it (and
+        loading its persisted vectors) on first use."""
+        if path is None:
+            path = default_index_path()
+        key = (path, namespace)
+        with cls._shared_lock:
+            index = cls._shared.get(key)
+            if index is None:
+                index = cls(namespace, path=path)
+                cls._shared[key] = index
+            return index
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    @property
+    def dimension(self) -> int:
+        return self._matrix.shape[1]
+
+    def _generations(self) -> list[str]:
+        """Saved generation directories, oldest first."""
+        assert self.path is not None
+        try:
+            entries = os.listdir(self.path)
+        except OSError:
+            return []
+        return sorted(e for e in entries if not e.startswith("."))
+
+    def _load(self) -> None:
+        if self.path is None:
+            return
+        loaded: list[str] = []
+        matrices: list[np.ndarray] = []
+        for generation in self._generations():
+            directory = os.path.join(self.path, generation)
+            try:
+                with open(os.path.join(directory, TEXTS_FILE), "r", encoding="utf-8") as fh:
+                    texts = json.load(fh)
+                matrix = np.load(os.path.join(directory, VECTORS_FILE))
+            except (OSError, ValueError) as exc:
+                logger.warning(f"Ignoring unreadable intent index at {directory}: {exc}")
+                continue
+            if (
+                matrix.ndim != 2
+                or matrix.shape[0] != len(texts)
+                or (matrices and matrix.shape[1] != matrices[0].shape[1])
+            ):
+                logger.warning(f"Ignoring inconsistent intent index at {directory}")
+                continue
+            new: list[int] = []
+            for row, text in enumerate(texts):
+                if text not in self._rows:
+                    self._rows[text] = len(self._texts)
+                    self._texts.append(text)
+                    new.append(row)
+            matrices.append(matrix[new])
+            loaded.append(generation)
+        if not matrices:
+            return
+        self._matrix = np.ascontiguousarray(np.vstack(matrices), dtype=np.float32)
+        if len(loaded) > MAX_GENERATIONS:
+            try:
+                self._persist(self._matrix, self._texts, replaces=loaded)
+            except OSError as exc:
+                logger.warning(f"Could not compact intent index at {self.path}: {exc}")
+
+    def _persist(
+        self, matrix: np.ndarray, texts: list[str], replaces: list[str] | None = None
+    ) -> None:
+        """Save ``texts`` and their rows as a new generation, then delete the
+        ``replaces`` generations it supersedes."""
+        if self.path is None:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=".tmp-", dir=self.path)
+        try:
+            np.save(os.path.join(tmp, VECTORS_FILE), matrix)
+            with open(os.path.join(tmp, TEXTS_FILE), "w", encoding="utf-8") as fh:
+                json.dump(texts, fh)
+            generation = f"{time.time_ns():020d}-{uuid.uuid4().hex}"
+            os.rename(tmp, os.path.join(self.path, generation))
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        for old in replaces or []:
+            shutil.rmtree(os.path.join(self.path, old), ignore_errors=True)
+
+    def rows_for(
+        self,
+        texts: list[str],
+        embed: Callable[[list[str]], list[list[float]]],
+    ) -> np.ndarray:
+        """Return the matrix row of every text, embedding the missing ones.
+
+        ``embed`` is only called with texts the index has never seen. The
+        lock is held across the call so two mappers warming the same intents
+        concurrently embed them once.
+        """
+        with self._lock:
+            missing = list(dict.fromkeys(t for t in texts if t not in self._rows))
+            if missing:
+                vectors = np.asarray(embed(missing), dtype=np.float32)
+                if vectors.ndim != 2 or vectors.shape[0] != len(missing) or vectors.shape[1] == 0:
+                    raise ValueError(
+                        "Unable to build intent index: empty embedding vectors"
+                    )
+                if len(self._texts) and vectors.shape[1] != self.dimension:
+                    raise ValueError(
+                        f"Intent index dimension mismatch for {self.namespace}: "
+                        f"expected {self.dimension}, got {vectors.shape[1]}"
+                    )
+                norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+                norms[norms == 0] = 1.0
+                vectors = np.ascontiguousarray(vectors / norms, dtype=np.float32)
+                matrix = (
+                    np.vstack([self._matrix, vectors]) if len(self._texts) else vectors
+                )
+                for text in missing:
+                    self._rows[text] = len(self._texts)
+                    self._texts.append(text)
+                self._matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+                try:
+                    self._persist(vectors, missing)
+                except OSError as exc:
+                    logger.warning(f"Could not persist intent index to {self.path}: {exc}")
+            return np.fromiter(
+                (self._rows[t] for t in texts), dtype=np.int64, count=len(texts)
+            )
+
+    def search(
+        self, query: list[float], rows: np.ndarray, k: int
+    ) -> list[tuple[int, float]]:
+        """Score ``query`` against ``rows`` by cosine similarity.
+
+        Returns up to ``k`` ``(position, score)`` pairs, best first, where
+        ``position`` indexes into ``rows`` (i.e. the caller's own intents).
+        """
+        if len(rows) == 0 or k <= 0:
+            return []
+        q = np.asarray(query, dtype=np.float32)
+        norm = float(np.linalg.norm(q))
+        if norm > 0:
+            q = q / norm
+        scores = self._matrix[rows] @ q
+        k = min(k, len(scores))
+        if k < len(scores):
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+        else:
+            top = np.argsort(-scores, kind="stable")
+        return [(int(i), float(scores[i])) for i in top]
@@ -0,0 +1,155 @@
+import hashlib
+import json
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from naas_abi_core.services.agent.beta import IntentIndex as IntentIndex_module
+from naas_abi_core.services.agent.beta.IntentIndex import IntentIndex
+from naas_abi_core.services.agent.beta.IntentMapper import (
+    Intent,
+    IntentMapper,
+    IntentType,
+)
+from naas_abi_core.services.agent.beta.QueryEmbedder import QueryEmbedder
+
+
+class _CountingEmbeddings(Embeddings):
+    """Deterministic hash-seeded vectors; records every text it embeds."""
+
+    model = "counting"
+
+    def __init__(self, dimension: int = 16):
+        self.dimension = dimension
+        self.embedded: list[str] = []
+
+    def _vector(self, text: str) -> list[float]:
+        seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:4], "little")
+        return np.random.default_rng(seed).normal(size=self.dimension).tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.embedded.extend(texts)
+        return [self._vector(t) for t in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._vector(text)
+
+
+def _intents(*values: str) -> list[Intent]:
+    return [Intent(value, IntentType.RAW, f"target:{value}") for value in values]
+
+
+def _mapper(intents, embeddings, index) -> IntentMapper:
+    return IntentMapper(
+        intents,
+        embedding_model=embeddings,
+        model=FakeListChatModel(responses=["unused"]),
+        intent_index=index,
+        # Queries go through their own model so `embedded` only lists intents.
+        query_embedder=QueryEmbedder(_CountingEmbeddings(embeddings.dimension)),
+    )
+
+
+def test_mappers_share_embeddings_and_rank_by_cosine(tmp_path):
+    embeddings = _CountingEmbeddings()
+    index = IntentIndex("counting", path=str(tmp_path))
+    first = _mapper(_intents("greet", "weather", "invoice"), embeddings, index)
+    second = _mapper(_intents("weather", "invoice", "translate"), embeddings, index)
+
+    results = first.map_intent("what is the weather like", k=2)
+    second.map_intent("translate this", k=1)
+
+    assert sorted(embeddings.embedded) == ["greet", "invoice", "translate", "weather"]
+    assert len(index) == 4
+
+    query = np.asarray(embeddings.embed_query("what is the weather like"))
+    expected = sorted(
+        (
+            float(np.dot(query, v) / (np.linalg.norm(query) * np.linalg.norm(v)))
+            for v in map(np.asarray, embeddings.embed_documents(["greet", "weather", "invoice"]))
+        ),
+        reverse=True,
+    )[:2]
+    np.testing.assert_allclose([r["score"] for r in results], expected, rtol=1e-5)
+    for result in results:
+        assert result["intent"] is first.intents[result["metadata"]["index"]]
+        assert result["text"] == result["intent"].intent_value
+
+
+def test_duplicate_values_in_one_mapper_are_both_returned(tmp_path):
+    embeddings = _CountingEmbeddings()
+    intents = [
+        Intent("send an email", IntentType.RAW, "a"),
+        Intent("send an email", IntentType.RAW, "b"),
+        Intent("book a flight", IntentType.RAW, "c"),
+    ]
+    mapper = _mapper(intents, embeddings, IntentIndex("counting", path=str(tmp_path)))
+
+    results = mapper.map_intent("send an email", k=3)
+
+    assert embeddings.embedded == ["send an email", "book a flight"]
+    assert {r["intent"].intent_target for r in results[:2]} == {"a", "b"}
+    assert results[0]["score"] > 0.999
+
+
+def test_vectors_persist_between_processes(tmp_path):
+    embeddings = _CountingEmbeddings()
+    _mapper(
+        _intents("greet", "weather"), embeddings, IntentIndex("counting", path=str(tmp_path))
+    ).map_intent("hello")
+
+    restarted = _CountingEmbeddings()
+    reloaded = IntentIndex("counting", path=str(tmp_path))
+    mapper = _mapper(_intents("weather", "greet"), restarted, reloaded)
+
+    assert [r["intent"].intent_value for r in mapper.map_intent("greet", k=1)] == ["greet"]
+    assert restarted.embedded == []
+    assert len(reloaded) == 2
+
+
+def test_each_save_writes_only_the_rows_it_appends(tmp_path, monkeypatch):
+    index = IntentIndex("counting", path=str(tmp_path))
+    embeddings = _CountingEmbeddings()
+    index.rows_for(["greet"], embeddings.embed_documents)
+    index.rows_for(["weather", "greet"], embeddings.embed_documents)
+
+    saved = sorted((tmp_path / "counting").iterdir())
+    assert len(saved) == 2
+    assert sorted(p.name for p in saved[0].iterdir()) == ["texts.json", "vectors.npy"]
+    assert [json.loads((p / "texts.json").read_text()) for p in saved] == [
+        ["greet"],
+        ["weather"],
+    ]
+    assert len(IntentIndex("counting", path=str(tmp_path))) == 2
+
+    monkeypatch.setattr(IntentIndex_module, "MAX_GENERATIONS", 1)
+    compacted = IntentIndex("counting", path=str(tmp_path))
+    saved = list((tmp_path / "counting").iterdir())
+    assert len(saved) == 1
+    assert json.loads((saved[0] / "texts.json").read_text()) == ["greet", "weather"]
+    np.testing.assert_allclose(
+        compacted.search(embeddings.embed_query("weather"), np.arange(2), k=1)[0][1], 1.0, rtol=1e-5
+    )
+
+
+def test_generations_from_concurrent_workers_merge(tmp_path):
+    embeddings = _CountingEmbeddings()
+    first = IntentIndex("counting", path=str(tmp_path))
+    second = IntentIndex("counting", path=str(tmp_path))
+    first.rows_for(["greet", "weather"], embeddings.embed_documents)
+    second.rows_for(["weather", "invoice"], embeddings.embed_documents)
+
+    merged = IntentIndex("counting", path=str(tmp_path))
+    restarted = _CountingEmbeddings()
+    rows = merged.rows_for(["invoice", "greet", "weather"], restarted.embed_documents)
+
+    assert restarted.embedded == []
+    assert len(merged) == 3
+    for row, text in zip(rows, ["invoice", "greet", "weather"]):
+        assert merged.search(embeddings.embed_query(text), np.asarray([row]), k=1)[0][1] > 0.999
+
+
+def test_shared_returns_one_index_per_namespace(tmp_path):
+    a = IntentIndex.shared("model-a", path=str(tmp_path))
+    assert IntentIndex.shared("model-a", path=str(tmp_path)) is a
+    assert IntentIndex.shared("model-b", path=str(tmp_path)) is not a
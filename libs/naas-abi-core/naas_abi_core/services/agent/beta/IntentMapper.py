@@ -5,16 +5,14 @@ from dataclasses import dataclass
 from enum import Enum
 from typing import Any
 
+import numpy as np
 from langchain_core.embeddings import Embeddings
 from langchain_core.language_models.chat_models import BaseChatModel
 from naas_abi_core import logger
 from naas_abi_core.engine.context import get_default_model_registry
-from naas_abi_core.services.cache.CacheFactory import CacheFactory
-from naas_abi_core.services.cache.CachePort import DataType
 
-from .VectorStore import VectorStore
-
-cache = CacheFactory.CacheFS_find_storage(subpath="intent_mapper")
+from .IntentIndex import IntentIndex
+from .QueryEmbedder import QueryEmbedder, QueryEmbedderStats
 
 
 def _resolve_default_embedding_model() -> Embeddings:
@@ -71,7 +69,7 @@ class Intent:
 
 class IntentMapper:
     intents: list[Intent]
-    vector_store: VectorStore | None
+    intent_index: IntentIndex | None
     _embedding_model: Embeddings
     model: BaseChatModel
     system_prompt: str
@@ -88,19 +86,35 @@ class IntentMapper:
         embedding_model: Embeddings | None = None,
         model: BaseChatModel | None = None,
         embedding_workers: int = 4,
+        intent_index: IntentIndex | None = None,
+        query_embedder: QueryEmbedder | None = None,
     ):
         self.intents = intents
         self._embedding_model = embedding_model or _resolve_default_embedding_model()
         self.model = model or _resolve_default_chat_model()
-        self.vector_store = None
         self.embedding_workers = max(1, int(embedding_workers))
 
+        # Intent embeddings live in a process-wide IntentIndex shared by every
+        # mapper on the same embedding model (resolved lazily, see
+        # `_ensure_index`). The mapper only keeps `_rows`: the index row of
+        # each of its intents, in `self.intents` order.
+        self.intent_index = intent_index
+        self._rows: np.ndarray | None = None
+
+        # Prompts are embedded through a QueryEmbedder, shared per embedding
+        # model like the index, which coalesces concurrent requests into one
+        # `embed_documents` call and caches recent queries.
+        self.query_embedder = query_embedder or QueryEmbedder.shared(
+            self._embedding_cache_namespace(), self._embedding_model
+        )
+
         # Lazy-index state. Embedding + Qdrant upsert used to happen here in
         # __init__; cProfile showed it cost ~280ms per agent (mostly Qdrant
         # client-side pydantic schema work) and was the dominant boot cost
-        # when constructing many agents. We defer the work to the first
-        # `map_intent` / `map_prompt` call. The lock guards against two
-        # concurrent requests racing the first-time build. In production a
+        # when constructing many agents. The shared IntentIndex removed the
+        # Qdrant client, but embedding is still network-bound, so we defer it
+        # to the first `map_intent` / `map_prompt` call. The lock guards
+        # against two concurrent requests racing the first-time build. In production a
         # background warmup thread (see `warm_all`) typically builds the
         # index before any request arrives, so the latency is invisible.
         self._index_lock = threading.Lock()
@@ -157,7 +171,9 @@ You: code a project
         return thread
 
     def _ensure_index(self) -> None:
-        """Build the vector index on first use. Idempotent and thread-safe."""
+        """Resolve this mapper's rows in the shared intent index on first use,
+        embedding only intents no other mapper has embedded yet. Idempotent
+        and thread-safe."""
         if self._index_built:
             return
         with self._index_lock:
@@ -169,44 +185,43 @@ You: code a project
                 self._index_built = True
                 return
 
-            if len(intents_values) <= 1 or self.embedding_workers <= 1:
-                vectors = self._embed_documents(intents_values)
-            else:
-                batch_count = min(self.embedding_workers, len(intents_values))
-                batch_size = (len(intents_values) + batch_count - 1) // batch_count
-                batches: list[tuple[int, list[str]]] = [
-                    (start, intents_values[start : start + batch_size])
-                    for start in range(0, len(intents_values), batch_size)
-                ]
-
-                vectors_by_start: dict[int, list[list[float]]] = {}
-                with ThreadPoolExecutor(max_workers=batch_count) as executor:
-                    future_to_start = {
-                        executor.submit(self._embed_documents, batch): start
-                        for start, batch in batches
-                    }
-                    for future in as_completed(future_to_start):
-                        start = future_to_start[future]
-                        vectors_by_start[start] = future.result()
-
-                vectors = []
-                for start, _batch in batches:
-                    vectors.extend(vectors_by_start[start])
-
-            if len(vectors) == 0 or len(vectors[0]) == 0:
-                raise ValueError(
-                    "Unable to build intent index: empty embedding vectors"
+            if self.intent_index is None:
+                self.intent_index = IntentIndex.shared(
+                    self._embedding_cache_namespace()
                 )
-
-            self.vector_store = VectorStore(dimension=len(vectors[0]))
-            metadatas = [{"index": index} for index in range(len(intents_values))]
-            self.vector_store.add_texts(
-                intents_values,
-                embeddings=vectors,
-                metadatas=metadatas,
+            self._rows = self.intent_index.rows_for(
+                intents_values, self._embed_intent_values
             )
             self._index_built = True
 
+    def _embed_intent_values(self, texts: list[str]) -> list[list[float]]:
+        """Embed ``texts`` in up to ``embedding_workers`` concurrent batches,
+        preserving order."""
+        if len(texts) <= 1 or self.embedding_workers <= 1:
+            return self._embed_documents(texts)
+
+        batch_count = min(self.embedding_workers, len(texts))
+        batch_size = (len(texts) + batch_count - 1) // batch_count
+        batches: list[tuple[int, list[str]]] = [
+            (start, texts[start : start + batch_size])
+            for start in range(0, len(texts), batch_size)
+        ]
+
+        vectors_by_start: dict[int, list[list[float]]] = {}
+        with ThreadPoolExecutor(max_workers=batch_count) as executor:
+            future_to_start = {
+                executor.submit(self._embed_documents, batch): start
+                for start, batch in batches
+            }
+            for future in as_completed(future_to_start):
+                start = future_to_start[future]
+                vectors_by_start[start] = future.result()
+
+        vectors: list[list[float]] = []
+        for start, _batch in batches:
+            vectors.extend(vectors_by_start[start])
+        return vectors
+
     def get_intent_from_value(self, value: str) -> Intent | None:
         for intent in self.intents:
             if intent.intent_value == value:
@@ -218,26 +233,32 @@ You: code a project
         model_id = getattr(self._embedding_model, "model_id", None)
         return f"{type(self._embedding_model).__name__}:{model_name}:{model_id}"
 
-    @cache(
-        lambda self, texts: f"embed_documents_{self._embedding_cache_namespace()}_{texts}",
-        cache_type=DataType.PICKLE,
-    )
     def _embed_documents(self, texts: list[str]) -> list[list[float]]:
         return self._embedding_model.embed_documents(texts)
 
     def _embed_query(self, text: str) -> list[float]:
-        return self._embedding_model.embed_query(text)
+        return self.query_embedder.embed(text)
+
+    def query_stats(self) -> QueryEmbedderStats:
+        """Batching, cache and latency counters of the query embedder (shared
+        by every mapper on the same embedding model)."""
+        return self.query_embedder.stats()
 
     def map_intent(self, intent: str, k: int = 1) -> list[dict]:
         self._ensure_index()
-        if self.vector_store is None:
+        if self.intent_index is None or self._rows is None:
             return []
 
-        results = self.vector_store.similarity_search(self._embed_query(intent), k=k)
-        for result in results:
-            result["intent"] = self.intents[result["metadata"]["index"]]
-
-        return results
+        hits = self.intent_index.search(self._embed_query(intent), self._rows, k)
+        return [
+            {
+                "text": self.intents[index].intent_value,
+                "metadata": {"index": index},
+                "score": score,
+                "intent": self.intents[index],
+            }
+            for index, score in hits
+        ]
 
     def map_prompt(self, prompt: str, k: int = 1) -> tuple[list[dict], list[dict]]:
         # Use direct prompt mapping without LLM intent extraction for speed
@@ -0,0 +1,196 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+
+from langchain_core.embeddings import Embeddings
+from naas_abi_core import logger
+
+DEFAULT_WINDOW_SECONDS = 0.005
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_CACHE_SIZE = 2048
+# Number of recent request latencies kept for the percentile figures.
+LATENCY_SAMPLES = 1024
+
+
+@dataclass(frozen=True)
+class QueryEmbedderStats:
+    """Point-in-time counters of a :class:`QueryEmbedder`.
+
+    ``requests`` counts every ``embed`` call, ``cache_hits`` those served from
+    the LRU, and ``batches`` / ``batched_texts`` the ``embed_documents`` calls
+    and the distinct texts they carried. Latencies are per request, in
+    milliseconds, over the last ``LATENCY_SAMPLES`` requests.
+    """
+
+    requests: int
+    cache_hits: int
+    batches: int
+    batched_texts: int
+    max_batch_size: int
+    errors: int
+    latency_p50_ms: float
+    latency_p95_ms: float
+    latency_max_ms: float
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.batched_texts / self.batches if self.batches else 0.0
+
+    @property
+    def cache_hit_rate(self) -> float:
+        return self.cache_hits / self.requests if self.requests else 0.0
+
+
+class _Batch:
+    __slots__ = ("done", "error", "full", "texts", "vectors")
+
+    def __init__(self):
+        self.texts: dict[str, None] = {}
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.vectors: dict[str, list[float]] = {}
+        self.error: BaseException | None = None
+
+
+class QueryEmbedder:
+    """Coalesces concurrent query embeddings into ``embed_documents`` calls.
+
+    The first caller that misses the cache opens a batch and waits up to
+    ``window_seconds`` (or until ``max_batch_size`` distinct texts have
+    joined) before sending the whole batch in a single request; callers that
+    arrive meanwhile just wait for it. Results go into an LRU of
+    ``cache_size`` recent queries, so repeated prompts skip the network.
+
+    Mappers on the same embedding model share one instance (see
+    :meth:`shared`) so that concurrent chat requests coalesce across agents.
+    """
+
+    _shared: "dict[str, QueryEmbedder]" = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        embedding_model: Embeddings,
+        window_seconds: float = DEFAULT_WINDOW_SECONDS,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+    ):
+        self.embedding_model = embedding_model
+        self.window_seconds = max(0.0, float(window_seconds))
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.cache_size = max(0, int(cache_size))
+
+        self._lock = threading.Lock()
+        self._cache: OrderedDict[str, list[float]] = OrderedDict()
+        self._pending: _Batch | None = None
+
+        self._requests = 0
+        self._cache_hits = 0
+        self._batches = 0
+        self._batched_texts = 0
+        self._max_batch_seen = 0
+        self._errors = 0
+        self._latencies: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    @classmethod
+    def shared(cls, namespace: str, embedding_model: Embeddings) -> "QueryEmbedder":
+        """Return the process-wide embedder for ``namespace``, creating it
+        around ``embedding_model`` on first use."""
+        with cls._shared_lock:
+            embedder = cls._shared.get(namespace)
+            if embedder is None:
+                embedder = cls(embedding_model)
+                cls._shared[namespace] = embedder
+            return embedder
+
+    def embed(self, text: str) -> list[float]:
+        started = time.perf_counter()
+        leader = False
+        with self._lock:
+            self._requests += 1
+            cached = self._cache.get(text)
+            if cached is not None:
+                self._cache.move_to_end(text)
+                self._cache_hits += 1
+                self._latencies.append(time.perf_counter() - started)
+                return cached
+
+            batch = self._pending
+            if batch is None:
+                batch = self._pending = _Batch()
+                leader = True
+            batch.texts[text] = None
+            if len(batch.texts) >= self.max_batch_size:
+                # Close it now so later callers start a fresh batch.
+                self._pending = None
+                batch.full.set()
+
+        if leader:
+            self._run(batch)
+        else:
+            batch.done.wait()
+
+        with self._lock:
+            self._latencies.append(time.perf_counter() - started)
+        if batch.error is not None:
+            raise batch.error
+        return batch.vectors[text]
+
+    def _run(self, batch: _Batch) -> None:
+        if self.window_seconds > 0:
+            batch.full.wait(self.window_seconds)
+        with self._lock:
+            if self._pending is batch:
+                self._pending = None
+            texts = list(batch.texts)
+
+        try:
+            vectors = self.embedding_model.embed_documents(texts)
+            if len(vectors) != len(texts):
+                raise ValueError(
+                    f"embed_documents returned {len(vectors)} vectors for {len(texts)} texts"
+                )
+            batch.vectors = dict(zip(texts, vectors))
+        except BaseException as exc:  # noqa: BLE001 — re-raised in every waiter
+            logger.warning(f"Query embedding batch of {len(texts)} failed: {exc}")
+            batch.error = exc
+
+        with self._lock:
+            self._batches += 1
+            self._batched_texts += len(texts)
+            self._max_batch_seen = max(self._max_batch_seen, len(texts))
+            if batch.error is not None:
+                self._errors += 1
+            elif self.cache_size:
+                for text, vector in batch.vectors.items():
+                    self._cache[text] = vector
+                    self._cache.move_to_end(text)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        batch.done.set()
+
+    def stats(self) -> QueryEmbedderStats:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            return QueryEmbedderStats(
+                requests=self._requests,
+                cache_hits=self._cache_hits,
+                batches=self._batches,
+                batched_texts=self._batched_texts,
+                max_batch_size=self._max_batch_seen,
+                errors=self._errors,
+                latency_p50_ms=_percentile(latencies, 0.50) * 1000,
+                latency_p95_ms=_percentile(latencies, 0.95) * 1000,
+                latency_max_ms=(latencies[-1] if latencies else 0.0) * 1000,
+            )
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
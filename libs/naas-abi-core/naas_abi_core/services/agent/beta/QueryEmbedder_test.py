@@ -0,0 +1,101 @@
+import threading
+import time
+
+import pytest
+from langchain_core.embeddings import Embeddings
+from naas_abi_core.services.agent.beta.QueryEmbedder import QueryEmbedder
+
+
+class _SlowEmbeddings(Embeddings):
+    """Records each ``embed_documents`` call; optionally fails."""
+
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.calls: list[list[str]] = []
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.calls.append(list(texts))
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("embedding backend down")
+        return [[float(len(t)), float(sum(map(ord, t)))] for t in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        raise AssertionError("queries must go through embed_documents")
+
+
+def _concurrently(embedder: QueryEmbedder, texts: list[str]) -> dict:
+    results: dict = {}
+    barrier = threading.Barrier(len(texts))
+
+    def run(text: str) -> None:
+        barrier.wait()
+        try:
+            results[text] = embedder.embed(text)
+        except Exception as exc:  # noqa: BLE001
+            results[text] = exc
+
+    threads = [threading.Thread(target=run, args=(t,)) for t in texts]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_queries_share_one_embedding_call():
+    model = _SlowEmbeddings()
+    embedder = QueryEmbedder(model, window_seconds=0.2)
+    texts = [f"prompt {i}" for i in range(8)] + ["prompt 0"]
+
+    results = _concurrently(embedder, texts)
+
+    assert len(model.calls) == 1
+    assert sorted(model.calls[0]) == sorted(set(texts))
+    for text in texts:
+        assert results[text] == [float(len(text)), float(sum(map(ord, text)))]
+    stats = embedder.stats()
+    assert stats.requests == 9
+    assert stats.batches == 1 and stats.max_batch_size == 8
+    assert stats.latency_p95_ms > 0
+
+
+def test_max_batch_size_flushes_before_the_window():
+    model = _SlowEmbeddings()
+    embedder = QueryEmbedder(model, window_seconds=5, max_batch_size=4)
+
+    started = time.perf_counter()
+    _concurrently(embedder, [f"q{i}" for i in range(4)])
+
+    assert time.perf_counter() - started < 2
+    assert [len(call) for call in model.calls] == [4]
+
+
+def test_lru_cache_serves_repeated_queries_and_evicts_oldest():
+    model = _SlowEmbeddings()
+    embedder = QueryEmbedder(model, window_seconds=0, cache_size=2)
+
+    embedder.embed("a")
+    embedder.embed("b")
+    embedder.embed("a")  # hit, and now most recent
+    embedder.embed("c")  # evicts "b"
+    embedder.embed("b")
+
+    assert model.calls == [["a"], ["b"], ["c"], ["b"]]
+    stats = embedder.stats()
+    assert stats.cache_hits == 1
+    assert stats.cache_hit_rate == pytest.approx(1 / 5)
+    assert stats.mean_batch_size == 1
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    model = _SlowEmbeddings(fail=True)
+    embedder = QueryEmbedder(model, window_seconds=0.1)
+
+    results = _concurrently(embedder, ["x", "y"])
+
+    assert all(isinstance(r, RuntimeError) for r in results.values())
+    assert embedder.stats().errors == 1
+    model.fail = False
+    assert embedder.embed("x") == [1.0, 120.0]
@@ -1,3 +1,4 @@
+import itertools
 import os
 import sqlite3
 import threading
@@ -7,6 +8,152 @@ from threading import Event, Thread
 
 from naas_abi_core.services.bus.BusPorts import IBusAdapter
 
+# Rows read per dispatcher round-trip; bounds memory when a bulk publish
+# (e.g. one message per triple of a large insert) lands at once.
+_DISPATCH_BATCH_SIZE = 1000
+# Distinct routing keys remembered per topic trie before the match cache is
+# reset. Triple-store and event keys repeat heavily, so this rarely fills.
+_ROUTE_CACHE_SIZE = 4096
+
+
+class _Wakeup:
+    """Generation counter + condition shared by every adapter instance on the
+    same database in this process, so in-process publishers wake pollers
+    immediately instead of waiting out ``poll_interval_seconds``."""
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self.generation = 0
+
+    def notify(self) -> None:
+        with self._cond:
+            self.generation += 1
+            self._cond.notify_all()
+
+    def wait(self, seen: int, timeout: float) -> None:
+        with self._cond:
+            if self.generation == seen:
+                self._cond.wait(timeout)
+
+
+class _TrieNode:
+    __slots__ = ("children", "subscribers")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _TrieNode] = {}
+        self.subscribers: set[int] = set()
+
+
+class _RoutingTrie:
+    """AMQP topic patterns (``.`` separators, ``*`` for one segment, ``#``
+    for zero or more) compiled into a trie, so a routing key is matched
+    against every pattern in one walk. Results are cached per routing key
+    and invalidated whenever a pattern is added or removed.
+    """
+
+    def __init__(self) -> None:
+        self._root = _TrieNode()
+        self._cache: dict[str, tuple[int, ...]] = {}
+
+    @staticmethod
+    def _split(value: str) -> list[str]:
+        return value.split(".") if value else [""]
+
+    def add(self, pattern: str, subscriber_id: int) -> None:
+        node = self._root
+        for token in self._split(pattern):
+            node = node.children.setdefault(token, _TrieNode())
+        node.subscribers.add(subscriber_id)
+        self._cache.clear()
+
+    def remove(self, pattern: str, subscriber_id: int) -> None:
+        node = self._root
+        for token in self._split(pattern):
+            child = node.children.get(token)
+            if child is None:
+                return
+            node = child
+        node.subscribers.discard(subscriber_id)
+        self._cache.clear()
+
+    def match(self, routing_key: str) -> tuple[int, ...]:
+        """Subscriber ids whose pattern matches ``routing_key``, in
+        subscription order."""
+        cached = self._cache.get(routing_key)
+        if cached is not None:
+            return cached
+        parts = self._split(routing_key)
+        found: set[int] = set()
+        self._walk(self._root, parts, 0, found)
+        result = tuple(sorted(found))
+        if len(self._cache) >= _ROUTE_CACHE_SIZE:
+            self._cache.clear()
+        self._cache[routing_key] = result
+        return result
+
+    def _walk(self, node: _TrieNode, parts: list[str], index: int, found: set[int]) -> None:
+        hash_node = node.children.get("#")
+        if hash_node is not None:
+            # ``#`` swallows zero or more segments.
+            for next_index in range(index, len(parts) + 1):
+                self._walk(hash_node, parts, next_index, found)
+        if index == len(parts):
+            found.update(node.subscribers)
+            return
+        exact = node.children.get(parts[index])
+        if exact is not None:
+            self._walk(exact, parts, index + 1, found)
+        star = node.children.get("*")
+        if star is not None:
+            self._walk(star, parts, index + 1, found)
+
+
+class _Subscription:
+    __slots__ = ("after_seq", "callback", "id", "routing_key")
+
+    def __init__(
+        self,
+        subscription_id: int,
+        routing_key: str,
+        callback: Callable[[bytes], None],
+        after_seq: int,
+    ) -> None:
+        self.id = subscription_id
+        self.routing_key = routing_key
+        self.callback = callback
+        # Rows at or below this seq predate the subscription (no replay).
+        self.after_seq = after_seq
+
+
+class _TopicDispatcher:
+    """The single reader of one topic's pub/sub log in this adapter."""
+
+    def __init__(self, topic: str, cursor: int) -> None:
+        self.topic = topic
+        self.cursor = cursor
+        self.lock = threading.Lock()
+        self.trie = _RoutingTrie()
+        self.subscriptions: dict[int, _Subscription] = {}
+        self.thread: Thread | None = None
+
+    def add(self, subscription: _Subscription) -> None:
+        with self.lock:
+            self.subscriptions[subscription.id] = subscription
+            self.trie.add(subscription.routing_key, subscription.id)
+
+    def remove(self, subscription: _Subscription) -> None:
+        with self.lock:
+            self.subscriptions.pop(subscription.id, None)
+            self.trie.remove(subscription.routing_key, subscription.id)
+
+    def match(self, routing_key: str) -> list[_Subscription]:
+        with self.lock:
+            return [
+                self.subscriptions[i]
+                for i in self.trie.match(routing_key)
+                if i in self.subscriptions
+            ]
+
 
 class PythonQueueAdapter(IBusAdapter):
     """Process-local durable queue using sqlite.
@@ -17,6 +164,9 @@ class PythonQueueAdapter(IBusAdapter):
 
     _SHARED_IN_MEMORY_URI = "file:python_queue_adapter?mode=memory&cache=shared"
 
+    _wakeups: dict[str, _Wakeup] = {}
+    _wakeups_lock = threading.Lock()
+
     def __init__(
         self,
         persistence_path: str | None = None,
@@ -42,6 +192,13 @@ class PythonQueueAdapter(IBusAdapter):
             db_target = persistence_path
             uri = False
 
+        wakeup_key = db_target if uri else os.path.abspath(db_target)
+        with PythonQueueAdapter._wakeups_lock:
+            self._wakeup = PythonQueueAdapter._wakeups.setdefault(wakeup_key, _Wakeup())
+        self._dispatchers: dict[str, _TopicDispatcher] = {}
+        self._dispatch_lock = threading.Lock()
+        self._subscription_ids = itertools.count(1)
+
         self._conn = sqlite3.connect(
             db_target,
             uri=uri,
@@ -99,6 +256,7 @@ class PythonQueueAdapter(IBusAdapter):
                 (topic, routing_key, payload, time.time()),
             )
             self._conn.commit()
+        self._wakeup.notify()
 
     def _claim_next(self, topic: str, routing_key: str) -> tuple[int, bytes] | None:
         now = time.time()
@@ -160,9 +318,12 @@ class PythonQueueAdapter(IBusAdapter):
 
         def _consume_loop() -> None:
             while not stop_event.is_set():
+                seen = self._wakeup.generation
                 claimed = self._claim_next(topic=topic, routing_key=routing_key)
                 if claimed is None:
-                    time.sleep(self._poll_interval_seconds)
+                    # Woken early by an in-process enqueue; the timeout still
+                    # picks up other processes' jobs (and expired leases).
+                    self._wakeup.wait(seen, self._poll_interval_seconds)
                     continue
 
                 message_id, payload = claimed
@@ -181,8 +342,9 @@ class PythonQueueAdapter(IBusAdapter):
         return thread
 
     # ------------------------------------------------------------------
-    # Pub/sub — append-only log + per-subscriber cursor + routing-key match.
-    # Every matching subscriber receives every matching message; no
+    # Pub/sub — append-only log, read by one dispatcher thread per topic
+    # that routes each row to the matching subscribers through a routing-key
+    # trie. Every matching subscriber receives every matching message; no
     # competition. Ephemeral: late subscribers don't replay history.
     # ------------------------------------------------------------------
 
@@ -215,10 +377,21 @@ class PythonQueueAdapter(IBusAdapter):
                 (now - self._broadcast_retention_seconds,),
             )
             self._conn.commit()
+        self._wakeup.notify()
 
     def subscribe(
         self, topic: str, routing_key: str, callback: Callable[[bytes], None]
     ) -> Thread:
+        """Register ``callback`` for messages on ``topic`` matching
+        ``routing_key``.
+
+        All subscriptions to a topic on this adapter share one dispatcher
+        thread, which is what this returns: it reads each batch of rows once
+        and hands every row to the matching callbacks in subscription order.
+        A callback raising ``StopIteration`` unsubscribes itself; the thread
+        exits once the topic has no subscriptions left. Callbacks run on the
+        dispatcher thread, so a slow one delays the others on that topic.
+        """
         # Start the cursor at the current max seq for this topic so we
         # don't replay history — Redis pub/sub semantics: late joiners
         # don't see past messages. Use the EventService log for replay.
@@ -227,41 +400,74 @@ class PythonQueueAdapter(IBusAdapter):
                 "SELECT COALESCE(MAX(seq), 0) FROM bus_pubsub WHERE topic=?",
                 (topic,),
             ).fetchone()
-        cursor = int(row[0]) if row else 0
-        stop_event = Event()
+        after_seq = int(row[0]) if row else 0
+        subscription = _Subscription(
+            next(self._subscription_ids), routing_key, callback, after_seq
+        )
 
-        def _consume_loop() -> None:
-            nonlocal cursor
-            while not stop_event.is_set():
-                with self._db_lock:
-                    rows = self._conn.execute(
-                        "SELECT seq, routing_key, payload FROM bus_pubsub "
-                        "WHERE topic=? AND seq>? ORDER BY seq",
-                        (topic, cursor),
-                    ).fetchall()
-                if not rows:
-                    time.sleep(self._poll_interval_seconds)
-                    continue
-                for seq, msg_routing_key, payload in rows:
-                    # Advance cursor regardless of match/mismatch so we
-                    # don't loop on the same rows.
-                    cursor = int(seq)
-                    if not self._match_routing_key(routing_key, str(msg_routing_key)):
+        with self._dispatch_lock:
+            dispatcher = self._dispatchers.get(topic)
+            new_dispatcher = dispatcher is None
+            if dispatcher is None:
+                dispatcher = _TopicDispatcher(topic, cursor=after_seq)
+                dispatcher.thread = Thread(
+                    target=self._dispatch_loop,
+                    args=(dispatcher,),
+                    name=f"bus-dispatch-{topic}",
+                    daemon=True,
+                )
+                self._dispatchers[topic] = dispatcher
+            dispatcher.add(subscription)
+        assert dispatcher.thread is not None
+        if new_dispatcher:
+            dispatcher.thread.start()
+        return dispatcher.thread
+
+    def _retire_if_idle(self, dispatcher: _TopicDispatcher) -> bool:
+        """Drop ``dispatcher`` once its last subscription is gone. Done under
+        the dispatch lock so a concurrent ``subscribe`` either joins it
+        before this check or starts a fresh dispatcher after it."""
+        with self._dispatch_lock:
+            if dispatcher.subscriptions:
+                return False
+            if self._dispatchers.get(dispatcher.topic) is dispatcher:
+                del self._dispatchers[dispatcher.topic]
+            return True
+
+    def _dispatch_loop(self, dispatcher: _TopicDispatcher) -> None:
+        while True:
+            seen = self._wakeup.generation
+            with self._db_lock:
+                rows = self._conn.execute(
+                    "SELECT seq, routing_key, payload FROM bus_pubsub "
+                    "WHERE topic=? AND seq>? ORDER BY seq LIMIT ?",
+                    (dispatcher.topic, dispatcher.cursor, _DISPATCH_BATCH_SIZE),
+                ).fetchall()
+            if not rows:
+                if self._retire_if_idle(dispatcher):
+                    return
+                # Woken early by an in-process publish; the timeout still
+                # picks up rows written by other processes.
+                self._wakeup.wait(seen, self._poll_interval_seconds)
+                continue
+            for seq, msg_routing_key, payload in rows:
+                # Advance cursor regardless of match/mismatch so we
+                # don't loop on the same rows.
+                dispatcher.cursor = int(seq)
+                for subscription in dispatcher.match(str(msg_routing_key)):
+                    if dispatcher.cursor <= subscription.after_seq:
                         continue
                     try:
-                        callback(bytes(payload))
+                        subscription.callback(bytes(payload))
                     except StopIteration:
-                        stop_event.set()
-                        return
+                        dispatcher.remove(subscription)
                     except Exception:  # noqa: BLE001,S110
                         # Best-effort: pub/sub does not redeliver on
                         # subscriber failure. Caller-side error handling
                         # is the subscriber's responsibility.
                         pass
-
-        thread = Thread(target=_consume_loop, daemon=True)
-        thread.start()
-        return thread
+            if self._retire_if_idle(dispatcher):
+                return
 
     @staticmethod
     def _match_routing_key(pattern: str, routing_key: str) -> bool:
@@ -263,3 +263,109 @@ def test_broadcast_failing_subscriber_does_not_block_others(tmp_path) -> None:
 
     assert done.wait(timeout=2)
     assert received_good == [b"first", b"second"]
+
+
+# ---------------------------------------------------------------------------
+# per-topic dispatcher + routing trie
+# ---------------------------------------------------------------------------
+
+
+def test_routing_trie_agrees_with_pattern_matcher() -> None:
+    from naas_abi_core.services.bus.adapters.secondary.PythonQueueAdapter import (
+        _RoutingTrie,
+    )
+
+    patterns = [
+        "#", "*", "a", "a.*", "a.#", "#.c", "a.#.c", "*.b.*", "a.*.#",
+        "#.#", "", "a.b.c", "*.*", "#.b.#",
+    ]
+    keys = ["", "a", "b", "a.b", "a.c", "a.b.c", "x.b.y", "a.x.y.c", "c", "a.b.c.d"]
+    trie = _RoutingTrie()
+    for index, pattern in enumerate(patterns):
+        trie.add(pattern, index)
+
+    for key in keys:
+        expected = tuple(
+            i
+            for i, pattern in enumerate(patterns)
+            if PythonQueueAdapter._match_routing_key(pattern, key)
+        )
+        assert trie.match(key) == expected, key
+
+    trie.remove("#", 0)
+    assert 0 not in trie.match("a.b")
+
+
+def test_subscribers_on_a_topic_share_one_dispatcher(tmp_path) -> None:
+    bus = PythonQueueAdapter(persistence_path=str(tmp_path / "bus-dispatch.sqlite3"))
+    received: dict[str, list[bytes]] = {"users": [], "all": [], "once": []}
+    done = threading.Event()
+
+    def record(name: str):
+        def _cb(payload: bytes) -> None:
+            received[name].append(payload)
+            if name == "once":
+                raise StopIteration()
+            if name == "all" and len(received["all"]) == 3:
+                done.set()
+        return _cb
+
+    first = bus.subscribe("evt.t", "user.*", record("users"))
+    second = bus.subscribe("evt.t", "#", record("all"))
+    third = bus.subscribe("evt.t", "#", record("once"))
+    assert first is second is third
+
+    bus.publish_many(
+        "evt.t",
+        [("user.created", b"1"), ("system.boot", b"2"), ("user.deleted", b"3")],
+    )
+
+    assert done.wait(timeout=2)
+    assert received == {"users": [b"1", b"3"], "all": [b"1", b"2", b"3"], "once": [b"1"]}
+
+
+def test_dispatcher_exits_when_last_subscriber_stops(tmp_path) -> None:
+    bus = PythonQueueAdapter(persistence_path=str(tmp_path / "bus-stop.sqlite3"))
+
+    def cb(payload: bytes) -> None:
+        raise StopIteration()
+
+    thread = bus.subscribe("evt.s", "#", cb)
+    bus.publish("evt.s", "evt", b"stop")
+    thread.join(timeout=2)
+    assert not thread.is_alive()
+
+    # A later subscription starts a fresh dispatcher.
+    received: list[bytes] = []
+    done = threading.Event()
+
+    def again(payload: bytes) -> None:
+        received.append(payload)
+        done.set()
+
+    assert bus.subscribe("evt.s", "#", again) is not thread
+    bus.publish("evt.s", "evt", b"again")
+    assert done.wait(timeout=2)
+    assert received == [b"again"]
+
+
+def test_in_process_publish_wakes_subscribers_without_polling(tmp_path) -> None:
+    db_path = str(tmp_path / "bus-wakeup.sqlite3")
+    # A poll interval far longer than the assertion timeout: delivery has to
+    # come from the wakeup, not the poll.
+    subscriber = PythonQueueAdapter(persistence_path=db_path, poll_interval_seconds=30)
+    publisher = PythonQueueAdapter(persistence_path=db_path, poll_interval_seconds=30)
+    received: list[bytes] = []
+    done = threading.Event()
+
+    def cb(payload: bytes) -> None:
+        received.append(payload)
+        done.set()
+
+    subscriber.subscribe("evt.v", "#", cb)
+    import time
+    time.sleep(0.05)
+    publisher.publish("evt.v", "evt", b"fast")
+
+    assert done.wait(timeout=2)
+    assert received == [b"fast"]
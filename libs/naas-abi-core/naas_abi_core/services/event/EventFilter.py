@@ -13,11 +13,17 @@ subset of EventBridge's content-filter language.
 
 Path safety: keys are restricted to ``[A-Za-z0-9_.\\-]+`` so they cannot
 break out of the SQL string. Values are always parameterized.
+
+Indexed paths: an adapter may materialize hot paths as generated columns
+(``payload ->> '$.path'``) and pass ``indexed={path: column}`` to
+:func:`build_where`, which then compares against the column so SQLite can
+use its index instead of parsing every payload.
 """
 
 from __future__ import annotations
 
 import re
+from collections.abc import Mapping
 from typing import Any
 
 _PATH_RE = re.compile(r"^[A-Za-z0-9_\-]+(?:\.[A-Za-z0-9_\-]+)*$")
@@ -29,7 +35,8 @@ class FilterError(ValueError):
     """Raised when a filter dict is malformed."""
 
 
-def _path_to_json_path(key: str) -> str:
+def json_path(key: str) -> str:
+    """Validate a dotted filter path and return its JSON path (``$.a.b``)."""
     if not _PATH_RE.match(key):
         raise FilterError(
             f"Invalid filter path {key!r}: must match {_PATH_RE.pattern}"
@@ -37,16 +44,22 @@ def _path_to_json_path(key: str) -> str:
     return "$." + key
 
 
-def _extractor(column: str, key: str) -> str:
+def extractor(column: str, key: str) -> str:
     """SQLite JSON1 extractor for a dotted path key."""
-    return f"{column} ->> '{_path_to_json_path(key)}'"
+    return f"{column} ->> '{json_path(key)}'"
 
 
-def build_where(filter: dict[str, Any], column: str = "payload") -> tuple[str, list]:
+def build_where(
+    filter: dict[str, Any],
+    column: str = "payload",
+    indexed: Mapping[str, str] | None = None,
+) -> tuple[str, list]:
     """Translate a filter dict to (SQL WHERE fragment, params list).
 
     The SQL fragment does NOT include the leading "WHERE" or "AND". The
-    caller composes it into a larger query.
+    caller composes it into a larger query. ``indexed`` maps filter paths to
+    generated columns holding ``extractor(column, path)``; those paths are
+    compared against the column instead.
 
     Returns ("", []) if the filter is empty.
     """
@@ -57,7 +70,10 @@ def build_where(filter: dict[str, Any], column: str = "payload") -> tuple[str, l
     params: list[Any] = []
 
     for key, value in filter.items():
-        ext = _extractor(column, key)
+        if indexed and key in indexed:
+            ext = indexed[key]
+        else:
+            ext = extractor(column, key)
 
         if isinstance(value, dict):
             # Operator dict: one or more {op: value} pairs, AND-joined.
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from collections.abc import Callable, Iterator
+from collections.abc import Callable, Iterator, Sequence
 from dataclasses import dataclass
 from threading import Thread
 from typing import Any
@@ -43,6 +43,24 @@ class IEventAdapter(ABC):
     ) -> StoredEvent:
         """Persist one event. Returns the stored record with its assigned `seq`."""
 
+    def append_many(
+        self, events: Sequence[tuple[str, str, str, bytes]]
+    ) -> list[StoredEvent]:
+        """Persist ``(event_id, event_type, timestamp, payload)`` tuples, in order.
+
+        Adapters that can write a batch in one transaction should override
+        this; the default appends one by one.
+        """
+        return [self.append(*event) for event in events]
+
+    def index_paths(self, event_type: str, paths: Sequence[str]) -> None:
+        """Make ``json_filter`` lookups on ``paths`` (dotted filter keys) fast
+        for events of ``event_type``, e.g. by materializing indexed columns.
+
+        Optional: adapters without secondary indexes ignore it and keep
+        evaluating the filter against the payload.
+        """
+
     @abstractmethod
     def query(
         self,
@@ -116,6 +134,22 @@ class IEventService(ABC):
         Raises `InvalidEventError` if `event` is not a LogProcess subclass instance.
         """
 
+    @abstractmethod
+    def publish_many(self, events: Sequence[Any]) -> list[StoredEvent]:
+        """Persist `events` in one batch (one commit on the SQLite adapter),
+        then broadcast each on the bus. Returns the stored records in order.
+
+        Every event is validated before anything is persisted: one invalid
+        event raises `InvalidEventError` and stores none of the batch.
+        """
+
+    @abstractmethod
+    def index_filter_paths(self, event_class: type, paths: Sequence[str]) -> None:
+        """Declare hot ``filter`` paths of `event_class` (e.g. ``workspace_id``,
+        ``graph_name``) so the adapter can serve them from an index instead of
+        scanning payloads. Idempotent; the first call may build the index.
+        """
+
     @abstractmethod
     def query(
         self,
@@ -14,7 +14,7 @@ from __future__ import annotations
 
 import datetime
 import hashlib
-from collections.abc import Callable, Iterator
+from collections.abc import Callable, Iterator, Sequence
 from threading import Thread
 from typing import Any
 
@@ -81,6 +81,24 @@ class EventService(ServiceBase, IEventService):
     # ------------------------------------------------------------------
 
     def publish(self, event: Any) -> StoredEvent:
+        event_id, event_type, timestamp, payload = self._prepare(event)
+        stored = self._adapter.append(event_id, event_type, timestamp, payload)
+        self._broadcast([stored])
+        return stored
+
+    def publish_many(self, events: Sequence[Any]) -> list[StoredEvent]:
+        """Persist a batch of events in one adapter call, then broadcast them.
+
+        High-rate emitters should prefer this over a ``publish`` loop: the
+        SQLite adapter writes the whole batch in a single transaction.
+        """
+        rows = [self._prepare(event) for event in events]
+        stored = self._adapter.append_many(rows)
+        self._broadcast(stored)
+        return stored
+
+    def _prepare(self, event: Any) -> tuple[str, str, str, bytes]:
+        """Validate and serialize ``event`` into an adapter row."""
         if not isinstance(event, LogProcess):
             raise InvalidEventError(
                 f"publish() expects a LogProcess subclass instance, got {type(event).__name__}"
@@ -97,32 +115,44 @@ class EventService(ServiceBase, IEventService):
             event.created_at = created_at
         timestamp = created_at.isoformat()
 
-        payload = EventCodec.serialize(event)
-
-        stored = self._adapter.append(event_id, event_type, timestamp, payload)
+        return event_id, event_type, timestamp, EventCodec.serialize(event)
 
-        if self._bus is not None:
+    def _broadcast(self, stored: list[StoredEvent]) -> None:
+        bus = self._bus
+        if bus is None or not stored:
+            return
+        # Publish on the event-class topic. EventService events use the bus's
+        # pub/sub semantics so every registered subscriber receives the event
+        # (no competing-consumer races). The event_id is the routing key —
+        # subscribers default to "#" so they receive every event of this class.
+        by_topic: dict[str, list[tuple[str, bytes]]] = {}
+        for row in stored:
+            by_topic.setdefault(class_iri_to_topic(row.event_type), []).append(
+                (row.id, row.payload)
+            )
+        for topic, messages in by_topic.items():
             try:
-                # Publish on the event-class topic. EventService events use
-                # the bus's pub/sub semantics so every registered subscriber
-                # receives the event (no competing-consumer races). The
-                # event_id is the routing key — subscribers default to "#"
-                # so they receive every event of this class.
-                self._bus.publish(
-                    topic=class_iri_to_topic(event_type),
-                    routing_key=event_id,
-                    payload=payload,
-                )
+                if len(messages) == 1:
+                    bus.publish(topic=topic, routing_key=messages[0][0], payload=messages[0][1])
+                else:
+                    bus.publish_many(topic, messages)
             except Exception as exc:  # noqa: BLE001
                 # Durability is the contract; bus failure must not lose the event.
-                logger.warning(f"EventService: bus broadcast failed for {event_id}: {exc}")
-
-        return stored
+                ids = ", ".join(routing_key for routing_key, _ in messages)
+                logger.warning(f"EventService: bus broadcast failed for {ids}: {exc}")
 
     # ------------------------------------------------------------------
     # query
     # ------------------------------------------------------------------
 
+    def index_filter_paths(
+        self, event_class: type[LogProcess], paths: Sequence[str]
+    ) -> None:
+        """Index ``filter`` paths of ``event_class`` (see
+        ``EventSQLiteAdapter.index_paths``). Queries and consumer drains that
+        filter on these paths then seek an index instead of scanning."""
+        self._adapter.index_paths(str(event_class._class_uri), list(paths))
+
     def query(
         self,
         event_class: type[LogProcess] | None = None,
@@ -182,6 +182,34 @@ def test_publish_persists_even_if_bus_fails(tmp_path):
 # ---------------------------------------------------------------------------
 
 
+def test_publish_many_persists_in_one_batch_and_broadcasts_each(tmp_path):
+    service, _, bus_adapter = _make_service(tmp_path)
+    events = [UserAuthenticated(user_id=f"u{i}") for i in range(3)]
+
+    stored = service.publish_many(events)
+
+    assert [s.seq for s in stored] == [1, 2, 3]
+    assert [e.user_id for e in service.query(UserAuthenticated)] == ["u0", "u1", "u2"]
+    topic = class_iri_to_topic(UserAuthenticated._class_uri)
+    assert [(t, k) for t, k, _ in bus_adapter.published] == [
+        (topic, str(e._uri)) for e in events
+    ]
+
+
+def test_publish_many_validates_every_event_before_storing(tmp_path):
+    service, adapter, bus_adapter = _make_service(tmp_path)
+
+    try:
+        service.publish_many([UserAuthenticated(user_id="u"), _NotAnEvent()])
+    except InvalidEventError:
+        pass
+    else:
+        raise AssertionError("expected InvalidEventError")
+
+    assert adapter.max_seq() == 0
+    assert bus_adapter.published == []
+
+
 def test_query_reconstructs_instances(tmp_path):
     service, _, _ = _make_service(tmp_path)
 
@@ -434,6 +462,27 @@ def test_query_filter_operators(tmp_path):
     assert sorted(r.user_id for r in rows) == ["alice-1", "alice-2"]
 
 
+def test_indexed_filter_paths_return_the_same_rows(tmp_path):
+    service, adapter, _ = _make_service(tmp_path)
+    for uid in ("alice-1", "bob", "alice-2", "carol"):
+        service.publish(UserAuthenticated(user_id=uid))
+    filters = [
+        {"user_id": "bob"},
+        {"user_id": ["alice-1", "carol"]},
+        {"user_id": {"prefix": "alice"}},
+        {"user_id": {"exists": False}},
+    ]
+    before = [[r.user_id for r in service.query(UserAuthenticated, filter=f)] for f in filters]
+
+    service.index_filter_paths(UserAuthenticated, ["user_id"])
+
+    assert "user_id" in adapter.indexed_paths()
+    after = [[r.user_id for r in service.query(UserAuthenticated, filter=f)] for f in filters]
+    assert after == before
+    drained = service.query_for_consumer("c1", UserAuthenticated, filter={"user_id": "bob"})
+    assert [e.user_id for e in drained] == ["bob"]
+
+
 def test_query_for_consumer_pushes_down_filter(tmp_path):
     service, _, _ = _make_service(tmp_path)
     service.publish(UserAuthenticated(user_id="alice-1"))
@@ -3,12 +3,18 @@
 from __future__ import annotations
 
 import datetime
+import json
+import os
+import sqlite3
+import threading
+import time
 
 import pytest
 
 from naas_abi_core.services.event.adapters.secondary.EventSQLiteAdapter import (
     EventSQLiteAdapter,
 )
+from naas_abi_core.services.event.EventFilter import FilterError
 
 
 @pytest.fixture()
@@ -50,6 +56,67 @@ def test_append_rejects_duplicate_id(adapter):
         adapter.append("urn:e1", "urn:Type:A", _ts(1), b"p2")
 
 
+def test_append_many_commits_the_batch_in_order(adapter):
+    adapter.append("urn:e0", "urn:Type:A", _ts(0), b"p0")
+    stored = adapter.append_many(
+        [(f"urn:e{i}", "urn:Type:A", _ts(i), f"p{i}".encode()) for i in (1, 2, 3)]
+    )
+
+    assert [r.seq for r in stored] == [2, 3, 4]
+    assert [r.id for r in adapter.query()] == ["urn:e0", "urn:e1", "urn:e2", "urn:e3"]
+
+
+def test_append_many_is_all_or_nothing(adapter):
+    adapter.append("urn:e1", "urn:Type:A", _ts(0), b"p")
+    with pytest.raises(Exception):
+        adapter.append_many(
+            [
+                ("urn:e2", "urn:Type:A", _ts(1), b"p"),
+                ("urn:e1", "urn:Type:A", _ts(2), b"dup"),
+            ]
+        )
+
+    assert [r.id for r in adapter.query()] == ["urn:e1"]
+    # The rolled-back batch leaves no gap in seq.
+    assert adapter.append("urn:e3", "urn:Type:A", _ts(3), b"p").seq == 2
+
+
+def test_group_commit_batches_appends_arriving_during_a_commit(tmp_path):
+    adapter = EventSQLiteAdapter(
+        str(tmp_path / "events.sqlite"), commit_window_ms=5_000, commit_max_size=8
+    )
+    adapter.append("urn:dup", "urn:Type:A", _ts(0), b"p")  # nothing in flight: solo
+    results: dict[str, object] = {}
+
+    def run(event_id: str) -> None:
+        try:
+            results[event_id] = adapter.append(event_id, "urn:Type:A", _ts(1), b"p")
+        except Exception as exc:  # noqa: BLE001
+            results[event_id] = exc
+
+    ids = ["urn:first"] + [f"urn:g{i}" for i in range(6)] + ["urn:dup"]
+    threads = [threading.Thread(target=run, args=(i,)) for i in ids]
+    # Stall the first group's transaction so the other appends queue behind it.
+    with adapter._lock:
+        threads[0].start()
+        while adapter._commits_in_flight == 0:
+            time.sleep(0.001)
+        for t in threads[1:]:
+            t.start()
+        while adapter._current_group is None or len(adapter._current_group.members) < 7:
+            time.sleep(0.001)
+    for t in threads:
+        t.join(timeout=5)
+
+    # solo + {first} + one group of 7 in which only the duplicate failed.
+    assert (adapter._batch_count, adapter._batched_appends) == (3, 9)
+    assert isinstance(results["urn:dup"], Exception)
+    seqs = sorted(results[i].seq for i in ids[:7])  # type: ignore[union-attr]
+    assert seqs == list(range(2, 9))
+    assert len(adapter.query()) == 8
+    adapter.close()
+
+
 # ---------------------------------------------------------------------------
 # query
 # ---------------------------------------------------------------------------
@@ -264,3 +331,225 @@ def test_events_persist_across_reopens(tmp_path):
         assert rows[0].payload == b"payload"
     finally:
         a2.close()
+
+
+# ---------------------------------------------------------------------------
+# indexed filter paths
+# ---------------------------------------------------------------------------
+
+
+def test_indexed_path_is_served_from_its_index_and_persists(tmp_path):
+    db = str(tmp_path / "events.sqlite")
+    adapter = EventSQLiteAdapter(db, indexed_paths={"urn:Type:A": ["actor.id"]})
+    adapter.append_many(
+        [
+            (f"urn:e{i}", "urn:Type:A", _ts(i), json.dumps({"actor": {"id": f"a{i % 3}"}}).encode())
+            for i in range(9)
+        ]
+    )
+
+    rows = adapter.query_for_consumer("c", "urn:Type:A", json_filter={"actor.id": "a1"})
+    assert [r.seq for r in rows] == [2, 5, 8]
+
+    column = adapter.indexed_paths()["actor.id"]
+    plan = adapter._conn.execute(
+        "EXPLAIN QUERY PLAN SELECT seq FROM events "
+        f"WHERE event_type = ? AND seq > ? AND {column} = ? ORDER BY seq",
+        ("urn:Type:A", 0, "a1"),
+    ).fetchall()
+    assert f"idx_events_{column}" in plan[0][3]
+    adapter.close()
+
+    reopened = EventSQLiteAdapter(db)
+    assert reopened.indexed_paths() == {"actor.id": column}
+    reopened.index_paths("urn:Type:B", ["actor.id"])  # idempotent, shares the column
+    assert len(reopened.query(json_filter={"actor.id": "a2"})) == 3
+    reopened.close()
+
+
+def test_index_paths_rejects_unsafe_paths(adapter):
+    with pytest.raises(FilterError):
+        adapter.index_paths("urn:Type:A", ["x') OR 1=1 --"])
+    assert adapter.indexed_paths() == {}
+
+
+# ---------------------------------------------------------------------------
+# segments
+# ---------------------------------------------------------------------------
+
+
+def _fill(adapter, start: int, count: int, event_type: str = "urn:Type:A") -> None:
+    adapter.append_many(
+        [
+            (f"urn:e{i}", event_type, _ts(i), json.dumps({"n": f"v{i % 2}"}).encode())
+            for i in range(start, start + count)
+        ]
+    )
+
+
+def test_queries_span_sealed_segments_and_the_active_log(tmp_path):
+    adapter = EventSQLiteAdapter(
+        str(tmp_path / "events.sqlite"), indexed_paths={"urn:Type:A": ["n"]}
+    )
+    _fill(adapter, 0, 4)
+    first = adapter.rotate()
+    _fill(adapter, 4, 4)
+    adapter.rotate()
+    _fill(adapter, 8, 2)
+
+    assert first is not None and (first.first_seq, first.last_seq) == (1, 4)
+    assert len(adapter.list_segments()) == 2
+    assert adapter.rotate() is not None and adapter.rotate() is None
+    _fill(adapter, 10, 2)
+    assert [r.seq for r in adapter.query()] == list(range(1, 13))
+    assert [r.seq for r in adapter.query(since_seq=3, until_seq=9)] == list(range(4, 10))
+    assert [r.seq for r in adapter.query(newest_first=True, limit=3)] == [12, 11, 10]
+    assert [r.seq for r in adapter.query(json_filter={"n": "v1"}, limit=3)] == [2, 4, 6]
+    assert [r.seq for r in adapter.query(since_timestamp=_ts(9))] == [10, 11, 12]
+    assert adapter.max_seq() == 12
+    adapter.close()
+
+
+def test_consumer_cursor_resumes_across_a_rotation(adapter):
+    _fill(adapter, 0, 3)
+    assert [r.seq for r in adapter.query_for_consumer("c", "urn:Type:A", limit=2)] == [1, 2]
+    adapter.rotate()
+    _fill(adapter, 3, 2)
+
+    rows = adapter.query_for_consumer("c", "urn:Type:A")
+    assert [r.seq for r in rows] == [3, 4, 5]
+    assert adapter.get_cursor("c", "urn:Type:A") == 5
+
+
+def test_max_seq_falls_back_to_sealed_segments(adapter):
+    _fill(adapter, 0, 2, "urn:Type:A")
+    _fill(adapter, 2, 1, "urn:Type:B")
+    adapter.rotate()
+
+    assert adapter.max_seq() == 3
+    assert adapter.max_seq("urn:Type:A") == 2
+    assert adapter.max_seq("urn:Type:C") == 0
+
+
+def test_retention_expires_per_type_and_compacts_sealed_segments(tmp_path):
+    adapter = EventSQLiteAdapter(
+        str(tmp_path / "events.sqlite"),
+        retention_seconds={"urn:Type:B": 10, "*": 100},
+    )
+    _fill(adapter, 0, 4, "urn:Type:A")  # _ts(0..3)
+    _fill(adapter, 4, 4, "urn:Type:B")  # _ts(4..7)
+    sealed = adapter.rotate()
+    _fill(adapter, 8, 2, "urn:Type:B")  # active, _ts(8..9)
+
+    now = datetime.datetime.fromisoformat(_ts(20))
+    assert adapter.apply_retention(now) == 6  # every B is older than 10s
+
+    [compacted] = adapter.list_segments()
+    assert compacted.file_name != sealed.file_name
+    assert (compacted.first_seq, compacted.last_seq, compacted.event_count) == (1, 8, 4)
+    assert not (tmp_path / "events.sqlite.segments" / sealed.file_name).exists()
+    assert [r.seq for r in adapter.query()] == [1, 2, 3, 4]
+
+    assert adapter.apply_retention(datetime.datetime.fromisoformat(_ts(200))) == 4
+    assert adapter.list_segments() == [] and adapter.query() == []
+    assert adapter.append("urn:new", "urn:Type:A", _ts(300), b"{}").seq == 11
+    adapter.close()
+
+
+def test_sealed_event_ids_stay_unique_until_retention_drops_them(tmp_path):
+    adapter = EventSQLiteAdapter(
+        str(tmp_path / "events.sqlite"),
+        commit_window_ms=5,
+        retention_seconds={"urn:Type:B": 10},
+    )
+    _fill(adapter, 0, 2, "urn:Type:A")
+    _fill(adapter, 2, 2, "urn:Type:B")
+    adapter.rotate()
+
+    with pytest.raises(sqlite3.IntegrityError):
+        adapter.append("urn:e0", "urn:Type:A", _ts(10), b"{}")
+    with pytest.raises(sqlite3.IntegrityError):
+        adapter.append_many(
+            [
+                ("urn:new", "urn:Type:A", _ts(10), b"{}"),
+                ("urn:e1", "urn:Type:A", _ts(10), b"{}"),
+            ]
+        )
+    assert [r.id for r in adapter.query()] == ["urn:e0", "urn:e1", "urn:e2", "urn:e3"]
+
+    assert adapter.apply_retention(datetime.datetime.fromisoformat(_ts(20))) == 2
+    assert adapter.append("urn:e2", "urn:Type:B", _ts(20), b"{}").seq == 5
+    with pytest.raises(sqlite3.IntegrityError):
+        adapter.append("urn:e1", "urn:Type:A", _ts(20), b"{}")
+    adapter.close()
+
+    reopened = EventSQLiteAdapter(str(tmp_path / "events.sqlite"))
+    with pytest.raises(sqlite3.IntegrityError):
+        reopened.append("urn:e0", "urn:Type:A", _ts(30), b"{}")
+    reopened.close()
+
+
+class _FakeObjectStorage:
+    def __init__(self) -> None:
+        self.objects: dict[tuple[str, str], bytes] = {}
+
+    def put_object(self, prefix: str, key: str, content: bytes) -> None:
+        self.objects[(prefix, key)] = content
+
+
+def test_maintenance_rotates_and_archives_sealed_segments(tmp_path):
+    storage = _FakeObjectStorage()
+    db = str(tmp_path / "events.sqlite")
+    adapter = EventSQLiteAdapter(
+        db, segment_max_events=5, archive_storage=storage, archive_prefix="log"
+    )
+    _fill(adapter, 0, 5)
+    adapter.close()  # waits for the background pass
+
+    reopened = EventSQLiteAdapter(db)
+    [segment] = reopened.list_segments()
+    assert segment.archived_key == f"log/{segment.file_name}"
+    content = storage.objects[("log", segment.file_name)]
+    assert content == (tmp_path / "events.sqlite.segments" / segment.file_name).read_bytes()
+    assert [r.seq for r in reopened.query()] == [1, 2, 3, 4, 5]
+    reopened.close()
+
+
+def test_reopen_discards_an_interrupted_rotation(tmp_path):
+    db = str(tmp_path / "events.sqlite")
+    adapter = EventSQLiteAdapter(db)
+    _fill(adapter, 0, 3)
+    adapter.rotate()
+    adapter.close()
+    segments_dir = tmp_path / "events.sqlite.segments"
+    stale = time.time() - 3600
+    for name in ("seg-orphan.sqlite.tmp", "seg-unregistered.sqlite"):
+        (segments_dir / name).write_bytes(b"partial")
+        os.utime(segments_dir / name, (stale, stale))
+    # Possibly still being written by another process.
+    (segments_dir / "seg-writing.sqlite.tmp").write_bytes(b"partial")
+
+    reopened = EventSQLiteAdapter(db)
+    assert sorted(p.name for p in segments_dir.iterdir()) == sorted(
+        [reopened.list_segments()[0].file_name, "seg-writing.sqlite.tmp"]
+    )
+    assert [r.seq for r in reopened.query()] == [1, 2, 3]
+    reopened.close()
+
+
+def test_adapters_sharing_a_database_see_each_others_rotations(tmp_path):
+    db = str(tmp_path / "events.sqlite")
+    first = EventSQLiteAdapter(db)
+    second = EventSQLiteAdapter(db)
+    _fill(first, 0, 3)
+
+    assert first.rotate() is not None
+    _fill(second, 3, 2)
+
+    assert [r.seq for r in second.query()] == [1, 2, 3, 4, 5]
+    second.rotate()
+    assert first.rotate() is None
+    assert [r.seq for r in first.query()] == [1, 2, 3, 4, 5]
+    assert [(s.first_seq, s.last_seq) for s in first.list_segments()] == [(1, 3), (4, 5)]
+    first.close()
+    second.close()
@@ -0,0 +1,190 @@
+"""Sealed segment files of the SQLite event log.
+
+``EventSQLiteAdapter`` keeps recent events in its own database (the *active*
+segment). Rotation copies them into a sealed segment: a standalone,
+read-only SQLite file under ``<db_path>.segments/`` holding one contiguous
+``seq`` range. Sealed segments are registered in the active database's
+``event_segments`` table, read through read-only connections, rewritten
+(compacted) when retention expires part of them, and can be exported to
+object storage as-is.
+"""
+
+from __future__ import annotations
+
+import datetime
+import os
+import sqlite3
+import uuid
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+from naas_abi_core.services.event.EventFilter import extractor
+
+REGISTRY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS event_segments (
+    file_name     TEXT PRIMARY KEY,
+    first_seq     INTEGER NOT NULL,
+    last_seq      INTEGER NOT NULL,
+    min_timestamp TEXT,
+    max_timestamp TEXT,
+    event_count   INTEGER NOT NULL,
+    sealed_at     TEXT NOT NULL,
+    archived_key  TEXT
+);
+"""
+
+_SEGMENT_SCHEMA = """
+CREATE TABLE events (
+    seq        INTEGER PRIMARY KEY,
+    id         TEXT NOT NULL,
+    event_type TEXT NOT NULL,
+    timestamp  TEXT NOT NULL,
+    payload    BLOB NOT NULL
+);
+"""
+
+_SEGMENT_INDEXES = """
+CREATE INDEX idx_events_type_seq  ON events(event_type, seq);
+CREATE INDEX idx_events_timestamp ON events(timestamp);
+"""
+
+_COLUMNS = "seq, id, event_type, timestamp, payload"
+
+
+@dataclass(frozen=True)
+class EventSegment:
+    """A sealed, read-only slice ``[first_seq, last_seq]`` of the event log."""
+
+    file_name: str
+    first_seq: int
+    last_seq: int
+    min_timestamp: str | None
+    max_timestamp: str | None
+    event_count: int
+    sealed_at: str
+    archived_key: str | None = None
+
+    @classmethod
+    def from_row(cls, row: Sequence) -> EventSegment:
+        return cls(*row)
+
+    def overlaps(
+        self,
+        since_seq: int | None,
+        until_seq: int | None,
+        since_timestamp: str | None,
+        until_timestamp: str | None,
+    ) -> bool:
+        """Whether rows matching these bounds can live in this segment."""
+        if since_seq is not None and self.last_seq <= since_seq:
+            return False
+        if until_seq is not None and self.first_seq > until_seq:
+            return False
+        if since_timestamp is not None and (self.max_timestamp or "") < since_timestamp:
+            return False
+        return not (
+            until_timestamp is not None and (self.min_timestamp or "") > until_timestamp
+        )
+
+
+def segment_file_name(first_seq: int, last_seq: int) -> str:
+    # The random suffix keeps a compacted rewrite of the same range distinct.
+    return f"seg-{first_seq:012d}-{last_seq:012d}-{uuid.uuid4().hex[:8]}.sqlite"
+
+
+def expired_clause(
+    retention_seconds: Mapping[str, float], now: datetime.datetime
+) -> tuple[str, list]:
+    """SQL predicate selecting events older than their type's retention.
+
+    ``retention_seconds`` maps event type IRIs to a maximum age; the ``"*"``
+    key applies to every type not listed. Returns ``("", [])`` when nothing
+    can expire.
+    """
+    clauses: list[str] = []
+    params: list = []
+    explicit = [t for t in retention_seconds if t != "*"]
+    for event_type in explicit:
+        cutoff = now - datetime.timedelta(seconds=retention_seconds[event_type])
+        clauses.append("(event_type = ? AND timestamp < ?)")
+        params += [event_type, cutoff.isoformat()]
+    if "*" in retention_seconds:
+        cutoff = now - datetime.timedelta(seconds=retention_seconds["*"])
+        if explicit:
+            placeholders = ",".join("?" for _ in explicit)
+            clauses.append(f"(event_type NOT IN ({placeholders}) AND timestamp < ?)")
+            params += [*explicit, cutoff.isoformat()]
+        else:
+            clauses.append("timestamp < ?")
+            params.append(cutoff.isoformat())
+    return " OR ".join(clauses), params
+
+
+def write_segment(
+    source_path: str,
+    target_path: str,
+    where_sql: str,
+    params: Sequence,
+    indexed_columns: Mapping[str, str],
+) -> tuple[int, int, int, str | None, str | None] | None:
+    """Copy the rows of ``source_path`` matching ``where_sql`` into a new
+    sealed segment file at ``target_path``.
+
+    Uses its own connections, so the writer of ``source_path`` is not
+    blocked (WAL). The file is written under a temporary name, made
+    read-only and renamed into place. Returns ``(first_seq, last_seq,
+    count, min_timestamp, max_timestamp)``, or ``None`` (and no file) when
+    no row matched.
+    """
+    tmp_path = target_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    target = sqlite3.connect(tmp_path, isolation_level=None)
+    try:
+        target.executescript(_SEGMENT_SCHEMA)
+        for path, column in indexed_columns.items():
+            target.execute(
+                f"ALTER TABLE events ADD COLUMN {column} "
+                f"GENERATED ALWAYS AS ({extractor('payload', path)}) VIRTUAL"
+            )
+        target.execute("ATTACH DATABASE ? AS source", (source_path,))
+        target.execute("BEGIN")
+        target.execute(
+            f"INSERT INTO main.events ({_COLUMNS}) "
+            f"SELECT {_COLUMNS} FROM source.events WHERE {where_sql} "
+            "ORDER BY seq",
+            list(params),
+        )
+        target.execute("COMMIT")
+        target.execute("DETACH DATABASE source")
+        stats = target.execute(
+            "SELECT MIN(seq), MAX(seq), COUNT(*), MIN(timestamp), MAX(timestamp) "
+            "FROM events"
+        ).fetchone()
+        if not stats[2]:
+            target.close()
+            os.remove(tmp_path)
+            return None
+        target.executescript(_SEGMENT_INDEXES)
+        for column in indexed_columns.values():
+            target.execute(
+                f"CREATE INDEX idx_events_{column} ON events(event_type, {column}, seq)"
+            )
+        target.execute("ANALYZE")
+    finally:
+        target.close()
+    os.chmod(tmp_path, 0o444)
+    os.replace(tmp_path, target_path)
+    return stats
+
+
+def open_segment(path: str) -> tuple[sqlite3.Connection, set[str]]:
+    """Read-only connection to a sealed segment and its column names."""
+    conn = sqlite3.connect(
+        Path(path).absolute().as_uri() + "?mode=ro&immutable=1",
+        uri=True,
+        check_same_thread=False,
+    )
+    columns = {row[1] for row in conn.execute("PRAGMA table_xinfo(events)")}
+    return conn, columns
@@ -17,7 +17,7 @@ import tempfile
 import threading
 import time
 from contextlib import contextmanager
-from typing import ClassVar
+from typing import ClassVar, Literal
 
 from naas_abi_core.services.bus.adapters.secondary.PythonQueueAdapter import (
     PythonQueueAdapter,
@@ -30,6 +30,8 @@ from naas_abi_core.services.event.adapters.secondary.EventSQLiteAdapter import (
 from naas_abi_core.services.event.EventService import EventService
 from naas_abi_core.services.event.ontologies.modules.EventOntology import LogProcess
 
+Synchronous = Literal["NORMAL", "FULL"]
+
 
 class _InMemoryBusAdapter(IBusAdapter):
     """Synchronous in-memory bus. Isolates EventService overhead from bus
@@ -224,6 +226,65 @@ def bench_adapter_append_only(n: int, db_path: str) -> float:
     return t[0]
 
 
+def _publish_concurrently(service: EventService, n: int, threads: int) -> float:
+    per_thread = n // threads
+    batches = [
+        [make_event(t * per_thread + i) for i in range(per_thread)]
+        for t in range(threads)
+    ]
+    barrier = threading.Barrier(threads + 1)
+
+    def run(events: list[BenchEvent]) -> None:
+        barrier.wait()
+        for e in events:
+            service.publish(e)
+
+    workers = [threading.Thread(target=run, args=(b,)) for b in batches]
+    for w in workers:
+        w.start()
+    with timer() as t:
+        barrier.wait()
+        for w in workers:
+            w.join()
+    return t[0]
+
+
+def _bench_concurrent(synchronous: Synchronous, commit_window_ms: float):
+    def bench(n: int, db_path: str, threads: int = 8) -> float:
+        adapter = EventSQLiteAdapter(
+            db_path, commit_window_ms=commit_window_ms, synchronous=synchronous
+        )
+        service = EventService(adapter=adapter, bus=None)
+        elapsed = _publish_concurrently(service, n, threads)
+        adapter.close()
+        return elapsed
+
+    return bench
+
+
+def bench_publish_many(n: int, db_path: str, batch_size: int = 500) -> float:
+    adapter = EventSQLiteAdapter(db_path)
+    service = EventService(adapter=adapter, bus=None)
+    events = [make_event(i) for i in range(n)]
+    with timer() as t:
+        for start in range(0, n, batch_size):
+            service.publish_many(events[start : start + batch_size])
+    adapter.close()
+    return t[0]
+
+
+def bench_adapter_append_many(n: int, db_path: str, batch_size: int = 500) -> float:
+    adapter = EventSQLiteAdapter(db_path)
+    payload = b"x" * 200
+    ts = time.strftime("%Y-%m-%dT%H:%M:%S")
+    rows = [(f"urn:e{i}", "urn:Type:Bench", ts, payload) for i in range(n)]
+    with timer() as t:
+        for start in range(0, n, batch_size):
+            adapter.append_many(rows[start : start + batch_size])
+    adapter.close()
+    return t[0]
+
+
 def bench_adapter_query_only(n: int, db_path: str) -> float:
     """Skip RDF reconstruction: measure pure adapter read cost."""
     adapter = EventSQLiteAdapter(db_path)
@@ -238,6 +299,66 @@ def bench_adapter_query_only(n: int, db_path: str) -> float:
     return t[0]
 
 
+def _fill_filter_log(adapter: EventSQLiteAdapter, n: int) -> None:
+    """``n`` events across 4 types, 1,000 workspaces and 50 graphs."""
+    ts = time.strftime("%Y-%m-%dT%H:%M:%S")
+    batch: list[tuple[str, str, str, bytes]] = []
+    for i in range(n):
+        payload = (
+            f'{{"_uri":"urn:e{i}","_class_uri":"urn:Type:{i % 4}",'
+            f'"workspace_id":"ws-{i % 1000}","graph_name":"urn:graph:{i % 50}",'
+            f'"actor_id":"user-{i % 20_000}","method":"oauth_google"}}'
+        ).encode()
+        batch.append((f"urn:e{i}", f"urn:Type:{i % 4}", ts, payload))
+        if len(batch) == 10_000:
+            adapter.append_many(batch)
+            batch = []
+    adapter.append_many(batch)
+
+
+def bench_indexed_filters(n: int, repeats: int = 20) -> None:
+    """Filtered reads over an ``n``-event log, before and after indexing
+    ``workspace_id`` / ``graph_name``. Prints one line per case."""
+    cases = {
+        "query_for_consumer(workspace_id=, limit=100)": lambda a, k: a.query_for_consumer(
+            f"bench-{k}", "urn:Type:1", limit=100, json_filter={"workspace_id": "ws-5"}
+        ),
+        "query(graph_name=, newest_first, limit=100)": lambda a, k: a.query(
+            event_type="urn:Type:2",
+            json_filter={"graph_name": "urn:graph:10"},
+            newest_first=True,
+            limit=100,
+        ),
+        "query(workspace_id IN 2 values), full result": lambda a, k: a.query(
+            event_type="urn:Type:3",
+            json_filter={"workspace_id": ["ws-7", "ws-11"]},
+        ),
+    }
+    with tempfile.TemporaryDirectory() as d:
+        adapter = EventSQLiteAdapter(os.path.join(d, "events.sqlite"))
+        with timer() as t:
+            _fill_filter_log(adapter, n)
+        print(f"  {'fill (append_many, batches of 10k)':48s} n={n:>9,}   {fmt_rate(n, t[0])}")
+
+        def measure(label: str) -> None:
+            for name, case in cases.items():
+                times = []
+                for k in range(repeats):
+                    with timer() as t:
+                        case(adapter, f"{label}-{k}")
+                    times.append(t[0])
+                median = statistics.median(times)
+                print(f"  {name + ', ' + label:60s} {median * 1000:>9.2f} ms")
+
+        measure("scan")
+        with timer() as t:
+            adapter.index_paths("urn:Type:1", ["workspace_id"])
+            adapter.index_paths("urn:Type:2", ["graph_name"])
+        print(f"  {'index_paths (2 paths, one-off)':60s} {t[0] * 1000:>9.2f} ms")
+        measure("indexed")
+        adapter.close()
+
+
 # ---------------------------------------------------------------------------
 
 
@@ -264,6 +385,17 @@ def main():
     run_bench("publish (in-memory bus)", bench_publish_with_bus_in_memory, 5_000)
     run_bench("publish (PythonQueueAdapter bus)", bench_publish_with_bus_python_queue, 5_000)
     run_bench("publish (in-memory bus, 1 live subscriber)", bench_publish_with_live_subscriber, 5_000)
+    run_bench("publish_many (no bus, batches of 500)", bench_publish_many, 5_000)
+
+    print("\n--- Commit modes (8 publisher threads, no bus) ---")
+    modes: tuple[Synchronous, ...] = ("NORMAL", "FULL")
+    for synchronous in modes:
+        for label, window_ms in (("solo commit", 0.0), ("group commit, 2 ms", 2.0)):
+            run_bench(
+                f"publish, synchronous={synchronous}, {label}",
+                _bench_concurrent(synchronous, window_ms),
+                5_000,
+            )
 
     print("\n--- Read (full reconstruction into Pydantic instances) ---")
     run_bench("query (eager, returns list)", bench_query_eager, 5_000)
@@ -272,7 +404,11 @@ def main():
 
     print("\n--- Adapter only (no RDF serialize / reconstruct) ---")
     run_bench("adapter.append", bench_adapter_append_only, 10_000)
+    run_bench("adapter.append_many (batches of 500)", bench_adapter_append_many, 10_000)
     run_bench("adapter.query", bench_adapter_query_only, 10_000)
+
+    print("\n--- Filtered reads at 1M events (median of 20) ---")
+    bench_indexed_filters(1_000_000)
     print()
 
 
@@ -5,6 +5,7 @@ from queue import Queue
 from typing import BinaryIO
 
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from naas_abi_core.services.object_storage.ObjectStoragePort import (
     Exceptions,
@@ -25,6 +26,7 @@ class ObjectStorageSecondaryAdapterS3(IObjectStorageAdapter):
         session_token: str | None = None,
         endpoint_url: str | None = None,
         region_name: str | None = None,
+        max_pool_connections: int = 32,
     ):
         """Initialize S3 adapter with bucket name and credentials.
 
@@ -37,6 +39,9 @@ class ObjectStorageSecondaryAdapterS3(IObjectStorageAdapter):
             endpoint_url (str, optional): Custom endpoint (MinIO, R2, ...). Defaults to None
             region_name (str, optional): Region to sign requests with (e.g. "auto" for
                 Cloudflare R2). Defaults to None
+            max_pool_connections (int, optional): Size of the HTTP connection pool
+                shared by threads using this adapter (botocore defaults to 10).
+                Defaults to 32
         """
         self.bucket_name = bucket_name
         self.base_prefix = base_prefix.rstrip("/")  # Remove trailing slash if present
@@ -49,6 +54,7 @@ class ObjectStorageSecondaryAdapterS3(IObjectStorageAdapter):
                 aws_session_token=session_token,
                 endpoint_url=endpoint_url,
                 region_name=region_name,
+                config=Config(max_pool_connections=max_pool_connections),
             )
         else:
             self.s3_client = boto3.client(
@@ -57,6 +63,7 @@ class ObjectStorageSecondaryAdapterS3(IObjectStorageAdapter):
                 aws_secret_access_key=secret_access_key,
                 aws_session_token=session_token,
                 region_name=region_name,
+                config=Config(max_pool_connections=max_pool_connections),
             )
 
     def __get_full_key(self, prefix: str, key: str | None = None) -> str:
@@ -0,0 +1,36 @@
+"""N-Triples serialisation of single terms and triples.
+
+The adaptors that write N-Triples themselves (the filesystem subject index,
+the object-storage packed layout, Oxigraph bulk loads) build each line from
+these helpers rather than rdflib's private serializer functions.
+"""
+
+from __future__ import annotations
+
+from rdflib import Literal
+from rdflib.term import Node
+
+
+def term_nt(term: Node) -> str:
+    """N-Triples form of ``term`` (``Literal.n3()`` may emit Turtle-only
+    long strings)."""
+    if isinstance(term, Literal):
+        escaped = (
+            str(term)
+            .replace("\\", "\\\\")
+            .replace("\n", "\\n")
+            .replace('"', '\\"')
+            .replace("\r", "\\r")
+        )
+        quoted = f'"{escaped}"'
+        if term.language:
+            return f"{quoted}@{term.language}"
+        if term.datatype:
+            return f"{quoted}^^<{term.datatype}>"
+        return quoted
+    return term.n3()
+
+
+def triple_nt(s: Node, p: Node, o: Node) -> str:
+    """One N-Triples line, newline included."""
+    return f"{term_nt(s)} {term_nt(p)} {term_nt(o)} .\n"
@@ -0,0 +1,435 @@
+"""Query-result cache for :class:`TripleStoreService`.
+
+Results are keyed by the normalised query text plus the *generation* of every
+named graph the query reads. ``TripleStoreService`` bumps a graph's generation
+after each ``insert``/``remove``/``clear_graph``/``drop_graph`` on it, so a
+write makes exactly the entries that read that graph unreachable — no TTL
+guesswork, no manual cache wiping. Queries whose graphs cannot be determined
+statically (``GRAPH ?g``, triple patterns on the default graph, sub-selects)
+are keyed on a global generation bumped by every write instead.
+
+Two tiers: an in-process LRU holding the materialised ``rdflib`` results, and
+an optional :class:`CacheService` that also stores the generation counters, so
+several processes sharing it invalidate each other's entries. Without it, a
+write made by another process is only seen once the entry's short TTL runs
+out. Callers always get their own copy of a cached result.
+"""
+
+import datetime
+import hashlib
+import io
+import itertools
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from typing import Any
+
+import rdflib
+from naas_abi_core import logger
+from naas_abi_core.services.cache.CachePort import (
+    CacheExpiredError,
+    CacheNotFoundError,
+    ICacheService,
+)
+
+ALL_GRAPHS = "*"
+
+_IRI = re.compile(r"<[^<>\"{}|^`\\\s]*>")
+# An update request starts (after its prologue) with an update keyword.
+_UPDATE = re.compile(
+    r"^\s*(?:(?:PREFIX\s+[\w.-]*:\s*|BASE\s+)<i\d+>\s*)*"
+    r"(?:INSERT|DELETE|LOAD|CLEAR|DROP|CREATE|ADD|MOVE|COPY|WITH)\b",
+    re.IGNORECASE,
+)
+# Not cacheable: federated or non-deterministic.
+_VOLATILE = re.compile(
+    r"(?<![?$\w:.-])(?:SERVICE\s|(?:NOW|RAND|UUID|STRUUID|BNODE)\s*\()", re.IGNORECASE
+)
+_GRAPH_IRI = re.compile(r"(?<![?$\w:])GRAPH\s+<i(\d+)>\s*\{", re.IGNORECASE)
+_GRAPH_OTHER = re.compile(r"(?<![?$\w:])GRAPH\s+(?!<i\d+>)", re.IGNORECASE)
+_FROM = re.compile(r"(?<![?$\w:])FROM\s+(NAMED\s+)?<i(\d+)>", re.IGNORECASE)
+_WHERE = re.compile(r"(?<![?$\w:])WHERE\s*\{", re.IGNORECASE)
+_VALUES = re.compile(
+    r"(?<![?$\w:])VALUES\s+(?:[?$]\w+|\([^)]*\))\s*\{[^{}]*\}", re.IGNORECASE
+)
+_CALL = re.compile(r"(?<![?$\w:])(?:FILTER|BIND)\s*\w*\s*\(", re.IGNORECASE)
+_GROUP_KEYWORDS = re.compile(r"(?<![?$\w:])(?:UNION|OPTIONAL|MINUS)\b", re.IGNORECASE)
+_EXISTS = re.compile(r"(?<![?$\w:])EXISTS\b", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class QueryScope:
+    """What a query reads, as far as the cache is concerned.
+
+    ``graphs`` is ``None`` when the query may read any graph.
+    """
+
+    cacheable: bool
+    is_update: bool
+    graphs: frozenset[str] | None
+
+
+def _scan(query: str) -> tuple[str, str, list[str]]:
+    """Return ``(normalised, masked, iris)`` for ``query``.
+
+    ``normalised`` drops comments and collapses whitespace outside string
+    literals. ``masked`` additionally empties string literals and replaces
+    each IRI by ``<iN>`` (``iris[N]``) so keyword regexes cannot match
+    inside them.
+    """
+    normalised: list[str] = []
+    masked: list[str] = []
+    iris: list[str] = []
+    i, n = 0, len(query)
+    pending_space = False
+
+    def emit(norm: str, mask: str) -> None:
+        nonlocal pending_space
+        if pending_space and normalised:
+            normalised.append(" ")
+            masked.append(" ")
+        pending_space = False
+        normalised.append(norm)
+        masked.append(mask)
+
+    while i < n:
+        ch = query[i]
+        if ch.isspace():
+            pending_space = True
+            i += 1
+        elif ch == "#":
+            end = query.find("\n", i)
+            i = n if end == -1 else end
+            pending_space = True
+        elif ch == "<" and (m := _IRI.match(query, i)):
+            emit(m.group(0), f"<i{len(iris)}>")
+            iris.append(m.group(0)[1:-1])
+            i = m.end()
+        elif ch in "\"'":
+            quote = query[i : i + 3] if query[i : i + 3] in ('"""', "'''") else ch
+            j = i + len(quote)
+            while j < n and not query.startswith(quote, j):
+                j += 2 if query[j] == "\\" else 1
+            j = min(n, j + len(quote))
+            emit(query[i:j], '""')
+            i = j
+        else:
+            j = i
+            while (
+                j < n
+                and not query[j].isspace()
+                and query[j] not in "#<\"'"
+            ):
+                j += 1
+            if j == i:  # a lone "<" that does not start an IRI
+                j = i + 1
+            emit(query[i:j], query[i:j])
+            i = j
+    return "".join(normalised), "".join(masked), iris
+
+
+def _block_end(text: str, open_index: int) -> int:
+    """Index just past the brace (or parenthesis) closing ``text[open_index]``."""
+    opening = text[open_index]
+    closing = "}" if opening == "{" else ")"
+    depth = 0
+    for index in range(open_index, len(text)):
+        if text[index] == opening:
+            depth += 1
+        elif text[index] == closing:
+            depth -= 1
+            if depth == 0:
+                return index + 1
+    return len(text)
+
+
+def _reads_default_graph(body: str) -> bool:
+    """True when ``body`` (the WHERE group, GRAPH blocks already removed)
+    still contains triple patterns."""
+    if _EXISTS.search(body):
+        return True
+    body = _VALUES.sub(" ", body)
+    while m := _CALL.search(body):
+        body = body[: m.start()] + " " + body[_block_end(body, m.end() - 1) :]
+    body = _GROUP_KEYWORDS.sub(" ", body)
+    return bool(body.strip(" {}."))
+
+
+def classify(query: str) -> tuple[str, QueryScope]:
+    """Normalise ``query`` and work out which graphs it reads."""
+    normalised, masked, iris = _scan(query)
+    if _UPDATE.match(masked):
+        return normalised, QueryScope(cacheable=False, is_update=True, graphs=None)
+    if _VOLATILE.search(masked):
+        return normalised, QueryScope(cacheable=False, is_update=False, graphs=None)
+    if _GRAPH_OTHER.search(masked):
+        return normalised, QueryScope(cacheable=True, is_update=False, graphs=None)
+
+    from_graphs = {
+        iris[int(m.group(2))] for m in _FROM.finditer(masked) if not m.group(1)
+    }
+    where = _WHERE.search(masked)
+    start = where.end() - 1 if where else masked.find("{")
+    if start < 0:
+        return normalised, QueryScope(cacheable=True, is_update=False, graphs=None)
+    body = masked[start : _block_end(masked, start)]
+
+    graphs: set[str] = set()
+    while m := _GRAPH_IRI.search(body):
+        graphs.add(iris[int(m.group(1))])
+        body = body[: m.start()] + " " + body[_block_end(body, m.end() - 1) :]
+    if _reads_default_graph(body):
+        if not from_graphs:
+            return normalised, QueryScope(cacheable=True, is_update=False, graphs=None)
+        graphs |= from_graphs
+    if not graphs:
+        return normalised, QueryScope(cacheable=True, is_update=False, graphs=None)
+    return normalised, QueryScope(
+        cacheable=True, is_update=False, graphs=frozenset(graphs)
+    )
+
+
+def _chain(head: list[Any], rest: Iterator[Any]) -> Iterator[Any]:
+    yield from head
+    yield from rest
+
+
+def _copy(result: rdflib.query.Result) -> rdflib.query.Result:
+    """A result the caller may consume or modify without touching the cache."""
+    copy = rdflib.query.Result(result.type)
+    copy.vars = result.vars
+    copy.askAnswer = result.askAnswer
+    if result.type == "SELECT":
+        copy.bindings = list(result.bindings)
+    elif result.graph is not None:
+        graph = rdflib.Graph()
+        graph += result.graph
+        copy.graph = graph
+    return copy
+
+
+class QueryResultCache:
+    """Generation-keyed LRU of SPARQL query results.
+
+    Args:
+        max_entries: Results kept in memory.
+        ttl_seconds: Optional age limit. Writes made through the service are
+            invalidated precisely without it; it only bounds staleness from
+            writers that bypass the service (another process, a direct
+            adapter call) when no shared ``CacheService`` backs the counters,
+            so keep it short unless ``backing`` is set.
+        max_result_rows: Larger SELECT results are returned but not cached.
+        backing: Returns the ``CacheService`` holding shared generations and
+            SELECT/ASK results, or ``None`` for memory-only operation. Called
+            on every lookup so it can be wired after construction.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float | None = 5.0,
+        max_result_rows: int = 10_000,
+        backing: Callable[[], ICacheService | None] | None = None,
+    ) -> None:
+        self.max_entries = max(0, int(max_entries))
+        self.ttl_seconds = ttl_seconds
+        self.max_result_rows = max_result_rows
+        self.backing = backing
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, rdflib.query.Result]] = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+
+    # -- generations -------------------------------------------------------
+
+    @staticmethod
+    def _generation_key(graph: str) -> str:
+        return "triple_store_query_generation_" + hashlib.sha256(
+            graph.encode("utf-8")
+        ).hexdigest()[:32]
+
+    def _backing_service(self) -> ICacheService | None:
+        if self.backing is None:
+            return None
+        try:
+            return self.backing()
+        except Exception:  # noqa: BLE001 — services not wired yet
+            return None
+
+    def _generation(self, graph: str, backing: ICacheService | None) -> str:
+        if backing is not None:
+            try:
+                return str(backing.get(self._generation_key(graph)))
+            except (CacheNotFoundError, CacheExpiredError):
+                return "0"
+            except Exception as exc:  # noqa: BLE001
+                logger.warning(f"Query cache: cannot read generation: {exc}")
+        return str(self._generations.get(graph, 0))
+
+    @property
+    def shared(self) -> bool:
+        """Whether a ``CacheService`` currently backs the generations, so
+        ``state`` tokens also change on writes made by other processes."""
+        return self._backing_service() is not None
+
+    def bump(self, graph_name: object) -> None:
+        """Invalidate every cached query reading ``graph_name``."""
+        graphs = (str(graph_name), ALL_GRAPHS)
+        with self._lock:
+            for graph in graphs:
+                self._generations[graph] = self._generations.get(graph, 0) + 1
+        backing = self._backing_service()
+        if backing is not None:
+            for graph in graphs:
+                try:
+                    backing.set_text(self._generation_key(graph), uuid.uuid4().hex)
+                except Exception as exc:  # noqa: BLE001
+                    logger.warning(f"Query cache: cannot bump generation: {exc}")
+
+    def invalidate_all(self) -> None:
+        """Drop every cached result (e.g. after a SPARQL update whose target
+        graphs are unknown)."""
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+        backing = self._backing_service()
+        if backing is not None:
+            try:
+                backing.set_text(self._generation_key("__epoch__"), uuid.uuid4().hex)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning(f"Query cache: cannot bump epoch: {exc}")
+
+    # -- lookup ------------------------------------------------------------
+
+    def _state_parts(self, scope: QueryScope, backing: ICacheService | None) -> list[str]:
+        graphs = sorted(scope.graphs) if scope.graphs is not None else [ALL_GRAPHS]
+        parts = [f"epoch={self._epoch}:{self._generation('__epoch__', backing)}"]
+        parts += [f"{g}={self._generation(g, backing)}" for g in graphs]
+        return parts
+
+    def _key(self, normalised: str, scope: QueryScope, backing: ICacheService | None) -> str:
+        parts = self._state_parts(scope, backing)
+        parts.append(normalised)
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def state(self, query: str) -> str | None:
+        """Token that changes whenever a write could change ``query``'s result.
+
+        Built from the generations of the graphs the query reads, so callers
+        can key their own derived caches on it. ``None`` when the query is an
+        update or is not cacheable (e.g. it calls ``NOW()``).
+        """
+        _, scope = classify(query)
+        if scope.is_update or not scope.cacheable:
+            return None
+        parts = self._state_parts(scope, self._backing_service())
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def get_or_compute(
+        self, query: str, compute: Callable[[str], rdflib.query.Result]
+    ) -> rdflib.query.Result:
+        normalised, scope = classify(query)
+        if scope.is_update:
+            try:
+                return compute(query)
+            finally:
+                self.invalidate_all()
+        if not scope.cacheable or self.max_entries == 0:
+            return compute(query)
+
+        backing = self._backing_service()
+        key = self._key(normalised, scope, backing)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (
+                self.ttl_seconds is None or now - entry[0] <= self.ttl_seconds
+            ):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _copy(entry[1])
+
+        result = self._load_backing(key, backing) if backing is not None else None
+        if result is None:
+            with self._lock:
+                self.misses += 1
+            result, cacheable = self._materialise(compute(query))
+            if not cacheable:
+                return result
+            if backing is not None:
+                self._store_backing(key, result, backing)
+        else:
+            with self._lock:
+                self.hits += 1
+
+        with self._lock:
+            self._entries[key] = (now, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return _copy(result)
+
+    def _materialise(
+        self, result: rdflib.query.Result
+    ) -> tuple[rdflib.query.Result, bool]:
+        """A safely re-iterable ``result`` and whether it may be cached.
+
+        A streamed SELECT is read at most ``max_result_rows + 1`` rows ahead;
+        a larger one keeps streaming the rest to the caller.
+        """
+        if result.type != "SELECT":
+            return result, result.type in ("ASK", "CONSTRUCT", "DESCRIBE")
+        variables = result.vars or []
+        rows = (
+            {var: value for var, value in zip(variables, row) if value is not None}
+            for row in result
+        )
+        head = list(itertools.islice(rows, self.max_result_rows + 1))
+        materialised = rdflib.query.Result("SELECT")
+        materialised.vars = result.vars
+        if len(head) > self.max_result_rows:
+            materialised.bindings = _chain(head, rows)
+            return materialised, False
+        materialised.bindings = head
+        return materialised, True
+
+    def _backing_key(self, key: str) -> str:
+        return f"triple_store_query_{key}"
+
+    def _load_backing(
+        self, key: str, backing: ICacheService
+    ) -> rdflib.query.Result | None:
+        try:
+            ttl = None
+            if self.ttl_seconds is not None:
+                ttl = datetime.timedelta(seconds=self.ttl_seconds)
+            data = backing.get(self._backing_key(key), ttl=ttl)
+            return rdflib.query.Result.parse(io.BytesIO(data), format="json")
+        except (CacheNotFoundError, CacheExpiredError):
+            return None
+        except Exception as exc:  # noqa: BLE001
+            logger.warning(f"Query cache: cannot read cached result: {exc}")
+            return None
+
+    def _store_backing(
+        self, key: str, result: rdflib.query.Result, backing: ICacheService
+    ) -> None:
+        # Graph results stay in memory only; SPARQL JSON covers SELECT/ASK.
+        if result.type not in ("SELECT", "ASK"):
+            return
+        try:
+            data = result.serialize(format="json")
+            if data is not None:
+                backing.set_binary(self._backing_key(key), data)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning(f"Query cache: cannot store result: {exc}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
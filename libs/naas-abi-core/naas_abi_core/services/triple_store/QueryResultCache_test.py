@@ -0,0 +1,175 @@
+import pytest
+from naas_abi_core.services.cache.adapters.secondary.CacheFSAdapter import (
+    CacheFSAdapter,
+)
+from naas_abi_core.services.cache.CacheService import CacheService
+from naas_abi_core.services.triple_store.QueryResultCache import (
+    QueryResultCache,
+    classify,
+)
+from rdflib import ConjunctiveGraph, Literal, URIRef
+
+_A = "http://example.org/graph/a"
+_B = "http://example.org/graph/b"
+
+
+@pytest.mark.parametrize(
+    "query, graphs",
+    [
+        (f"SELECT ?s WHERE {{ GRAPH <{_A}> {{ ?s ?p ?o }} }}", {_A}),
+        (
+            (
+                f"SELECT ?s WHERE {{ GRAPH <{_A}> {{ ?s ?p ?o }} "
+                f"OPTIONAL {{ GRAPH <{_B}> {{ ?s ?q ?x }} }} }}"
+            ),
+            {_A, _B},
+        ),
+        (f"SELECT ?s FROM <{_A}> WHERE {{ ?s ?p ?o }}", {_A}),
+        ("SELECT ?s WHERE { ?s ?p ?o }", None),
+        ("SELECT ?s WHERE { GRAPH ?g { ?s ?p ?o } }", None),
+        (f"SELECT ?s WHERE {{ GRAPH <{_A}> {{ ?s ?p ?o }} ?s ?p ?o }}", None),
+    ],
+)
+def test_classify_finds_the_graphs_a_query_reads(query, graphs):
+    _, scope = classify(query)
+    assert scope.cacheable and not scope.is_update
+    assert scope.graphs == (frozenset(graphs) if graphs is not None else None)
+
+
+def test_classify_detects_updates_and_volatile_queries():
+    assert classify("PREFIX ex: <http://e/> INSERT DATA { ex:a ex:b ex:c }")[1].is_update
+    assert not classify("SELECT ?x WHERE { ?x <http://e/is-delete> ?y }")[1].is_update
+    assert not classify("SELECT (NOW() AS ?t) WHERE {}")[1].cacheable
+    assert not classify("SELECT ?s WHERE { SERVICE <http://x/> { ?s ?p ?o } }")[1].cacheable
+    # Literal contents and comments do not change the classification.
+    assert classify('SELECT ?s WHERE { ?s ?p "INSERT NOW()" } # DELETE')[1].cacheable
+
+
+def test_normalisation_ignores_whitespace_and_comments_but_not_literals():
+    first, _ = classify("SELECT ?s\n  WHERE { ?s ?p 'a  b' }  # comment")
+    second, _ = classify("SELECT ?s WHERE {\t?s ?p 'a  b' }")
+    third, _ = classify("SELECT ?s WHERE { ?s ?p 'a b' }")
+    assert first == second != third
+
+
+class _CountingStore:
+    def __init__(self) -> None:
+        self.graph = ConjunctiveGraph()
+        self.queries = 0
+
+    def add(self, graph: str, value: str) -> None:
+        self.graph.get_context(URIRef(graph)).add(
+            (URIRef("http://e/s"), URIRef("http://e/p"), Literal(value))
+        )
+
+    def query(self, query: str):
+        self.queries += 1
+        return self.graph.query(query)
+
+
+def _over(graph: str) -> str:
+    return f"SELECT ?o WHERE {{ GRAPH <{graph}> {{ ?s ?p ?o }} }}"
+
+
+def test_a_write_only_invalidates_queries_over_that_graph():
+    store, cache = _CountingStore(), QueryResultCache()
+    store.add(_A, "a1")
+    store.add(_B, "b1")
+
+    cache.get_or_compute(_over(_A), store.query)
+    cache.get_or_compute(_over(_B), store.query)
+    store.add(_A, "a2")
+    cache.bump(_A)
+    a_rows = {str(r.o) for r in cache.get_or_compute(_over(_A), store.query)}
+    b_rows = {str(r.o) for r in cache.get_or_compute(_over(_B), store.query)}
+
+    assert a_rows == {"a1", "a2"} and b_rows == {"b1"}
+    assert store.queries == 3
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_update_queries_run_and_invalidate_everything():
+    store, cache = _CountingStore(), QueryResultCache()
+    store.add(_A, "a1")
+    cache.get_or_compute(_over(_A), store.query)
+
+    cache.get_or_compute(
+        f"INSERT DATA {{ GRAPH <{_A}> {{ <http://e/s> <http://e/p> 'a2' }} }}",
+        lambda q: store.graph.update(q),
+    )
+
+    assert len(cache.get_or_compute(_over(_A), store.query)) == 2
+    assert store.queries == 2
+
+
+def test_oversized_results_are_not_cached():
+    store, cache = _CountingStore(), QueryResultCache(max_result_rows=1)
+    store.add(_A, "a1")
+    store.add(_A, "a2")
+
+    cache.get_or_compute(_over(_A), store.query)
+    cache.get_or_compute(_over(_A), store.query)
+
+    assert store.queries == 2
+
+
+def test_oversized_streamed_results_are_returned_whole():
+    store, cache = _CountingStore(), QueryResultCache(max_result_rows=2)
+    for value in ("a1", "a2", "a3"):
+        store.add(_A, value)
+
+    def streamed(query: str):
+        result = store.query(query)
+        rows = list(result.bindings)
+        result.bindings = (row for row in rows)
+        return result
+
+    rows = cache.get_or_compute(_over(_A), streamed)
+
+    assert sorted(str(r.o) for r in rows) == ["a1", "a2", "a3"]
+    assert len(cache.get_or_compute(_over(_A), streamed)) == 3
+    assert store.queries == 2
+
+
+def test_cached_graph_results_are_copies():
+    store, cache = _CountingStore(), QueryResultCache()
+    store.add(_A, "a1")
+    construct = f"CONSTRUCT {{ ?s ?p ?o }} WHERE {{ GRAPH <{_A}> {{ ?s ?p ?o }} }}"
+
+    first = cache.get_or_compute(construct, store.query)
+    assert first.graph is not None
+    first.graph.remove((None, None, None))
+    second = cache.get_or_compute(construct, store.query)
+
+    assert second.graph is not None and len(second.graph) == 1
+    assert store.queries == 1
+
+
+def test_backing_cache_service_shares_results_and_generations(tmp_path):
+    shared = CacheService(adapters=[("cold", CacheFSAdapter(str(tmp_path)))])
+    store = _CountingStore()
+    store.add(_A, "a1")
+    first = QueryResultCache(backing=lambda: shared)
+    second = QueryResultCache(backing=lambda: shared)
+
+    first.get_or_compute(_over(_A), store.query)
+    assert [str(r.o) for r in second.get_or_compute(_over(_A), store.query)] == ["a1"]
+    assert store.queries == 1
+
+    # A write seen by one process invalidates the other's in-memory entry.
+    store.add(_A, "a2")
+    second.bump(_A)
+    assert len(first.get_or_compute(_over(_A), store.query)) == 2
+    assert store.queries == 2
+
+
+def test_state_changes_only_when_a_graph_the_query_reads_is_written():
+    cache = QueryResultCache()
+    state = cache.state(_over(_A))
+
+    cache.bump(_B)
+    assert cache.state(_over(_A)) == state
+    cache.bump(_A)
+    assert cache.state(_over(_A)) != state
+    assert cache.state("SELECT (NOW() AS ?t) WHERE {}") is None
+    assert cache.state(f"CLEAR GRAPH <{_A}>") is None
@@ -0,0 +1,349 @@
+"""Pipelined schema loading (``TripleStoreService.schema_load_pipeline``).
+
+Registering ontologies file by file costs one filtered index query per file
+and several writes per changed file. The pipeline instead:
+
+1. reads the schema index once, when it is created;
+2. reads, hashes and parses submitted files on a thread pool while the
+   caller keeps working (``Engine.load`` submits each module's ontologies
+   right after its ``on_load``);
+3. on ``finish``, fetches the stored content of every changed file with one
+   query and applies the changes in batches of whole files, each one
+   ``remove`` and one ``insert`` on the schema graph of at most
+   ``max_batch_triples`` triples (a larger file is written alone). When a
+   batch fails its files are retried one by one, so a bad file only fails
+   itself.
+
+Files whose hash matches the index are only read and hashed. ``finish``
+returns a ``SchemaLoadReport`` with per-phase timings.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import os
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+import rdflib
+from naas_abi_core import logger
+from naas_abi_core.services.triple_store.ontologies.modules.TripleStoreEventOntology import (
+    SchemaLoaded,
+    TripleStoreError,
+)
+from rdflib import Graph, Literal, URIRef
+from rdflib.util import guess_format
+
+if TYPE_CHECKING:
+    from naas_abi_core.services.triple_store.TripleStoreService import (
+        SchemaIndexEntry,
+        TripleStoreService,
+    )
+
+INTERNAL = rdflib.Namespace("http://triple-store.internal#")
+
+
+@dataclass
+class SchemaLoadReport:
+    """Outcome and timings of one schema load.
+
+    ``read_seconds`` and ``parse_seconds`` add up the time spent by every
+    worker; ``wait_seconds`` is how long ``finish`` waited for them, i.e.
+    the part of that work that did not overlap with the caller.
+    """
+
+    files: int = 0
+    new: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    index_seconds: float = 0.0
+    read_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    wait_seconds: float = 0.0
+    write_seconds: float = 0.0
+    total_seconds: float = 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.files} schemas ({self.new} new, {self.changed} changed, "
+            f"{self.unchanged} unchanged, {self.failed} failed) in "
+            f"{self.total_seconds:.2f}s: index {self.index_seconds:.2f}s, "
+            f"read+hash {self.read_seconds:.2f}s, parse {self.parse_seconds:.2f}s, "
+            f"wait {self.wait_seconds:.2f}s, write {self.write_seconds:.2f}s"
+        )
+
+
+@dataclass
+class _PreparedSchema:
+    filepath: str
+    content: str
+    content_hash: str
+    file_last_update_time: float
+    primary: SchemaIndexEntry | None
+    duplicates: list[URIRef] = field(default_factory=list)
+    # Parsed content; None when the stored hash matches.
+    graph: Graph | None = None
+
+
+def schema_metadata(
+    subject: URIRef,
+    content_hash: str,
+    file_last_update_time: object,
+    content_b64: str,
+    filepath: str | None = None,
+) -> Graph:
+    """The ``internal:Schema`` triples recorded for a loaded file (the type
+    and ``filePath`` only when ``filepath`` is given)."""
+    graph = Graph()
+    if filepath is not None:
+        graph.add((subject, rdflib.RDF.type, INTERNAL.Schema))
+        graph.add((subject, INTERNAL.filePath, Literal(filepath)))
+    graph.add((subject, INTERNAL.hash, Literal(content_hash)))
+    graph.add((subject, INTERNAL.fileLastUpdateTime, Literal(str(file_last_update_time))))
+    graph.add((subject, INTERNAL.content, Literal(content_b64)))
+    return graph
+
+
+class SchemaLoadPipeline:
+    def __init__(
+        self,
+        service: TripleStoreService,
+        schema_graph: URIRef,
+        publish_event: Callable[[object], None],
+        max_workers: int = 8,
+        max_batch_triples: int = 50_000,
+    ):
+        self.__service = service
+        self.__max_batch_triples = max_batch_triples
+        self.__schema_graph = schema_graph
+        self.__publish_event = publish_event
+        self.__started = time.perf_counter()
+        self.__report = SchemaLoadReport()
+        self.__lock = threading.Lock()
+        self.__futures: dict[str, Future] = {}
+        self.__executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="ts-schema-load"
+        )
+
+        start = time.perf_counter()
+        self.__index = service.schema_index()
+        self.__report.index_seconds = time.perf_counter() - start
+
+    def submit(self, filepaths: Iterable[str]) -> None:
+        """Start reading, hashing and parsing ``filepaths`` in the background."""
+        for filepath in filepaths:
+            if filepath not in self.__futures:
+                self.__futures[filepath] = self.__executor.submit(
+                    self.__prepare, filepath
+                )
+
+    def cancel(self) -> None:
+        """Stop the workers without writing anything."""
+        self.__executor.shutdown(wait=False, cancel_futures=True)
+
+    def __prepare(self, filepath: str) -> _PreparedSchema:
+        start = time.perf_counter()
+        with open(filepath, "r") as file:
+            content = file.read()
+        content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        prepared = _PreparedSchema(
+            filepath=filepath,
+            content=content,
+            content_hash=content_hash,
+            file_last_update_time=os.path.getmtime(filepath),
+            primary=None,
+        )
+        entries = self.__index.get(filepath, [])
+        if entries:
+            matching = next((e for e in entries if e.hash == content_hash), None)
+            prepared.primary = matching if matching is not None else entries[0]
+            prepared.duplicates = [
+                e.subject for e in entries if e.subject != prepared.primary.subject
+            ]
+        read_seconds = time.perf_counter() - start
+
+        parse_seconds = 0.0
+        if prepared.primary is None or prepared.primary.hash != content_hash:
+            start = time.perf_counter()
+            prepared.graph = Graph().parse(
+                data=content, format=guess_format(filepath) or "turtle"
+            )
+            parse_seconds = time.perf_counter() - start
+
+        with self.__lock:
+            self.__report.read_seconds += read_seconds
+            self.__report.parse_seconds += parse_seconds
+        return prepared
+
+    def __fail(self, filepath: str, exc: Exception) -> None:
+        logger.error(f"Error loading schema ({filepath}): {exc!s}")
+        self.__report.failed += 1
+        self.__publish_event(
+            TripleStoreError(
+                operation="load_schema",
+                filepath=filepath,
+                message=self.__service.error_message(exc),
+            )
+        )
+
+    def __fetch_contents(self, subjects: list[URIRef]) -> dict[URIRef, str]:
+        if not subjects:
+            return {}
+        values = " ".join(f"<{subject!s}>" for subject in subjects)
+        results = self.__service.query(
+            f"""
+            PREFIX internal: <http://triple-store.internal#>
+            SELECT ?schema ?content
+            WHERE {{
+                VALUES ?schema {{ {values} }}
+                GRAPH <{self.__schema_graph!s}> {{
+                    ?schema internal:content ?content .
+                }}
+            }}
+            """
+        )
+        contents: dict[URIRef, str] = {}
+        for row in results:
+            assert isinstance(row, rdflib.query.ResultRow)
+            contents.setdefault(URIRef(row[0]), str(row[1]))
+        return contents
+
+    def __batches(
+        self, changes: list[tuple[str, Graph, Graph]]
+    ) -> Iterator[list[tuple[str, Graph, Graph]]]:
+        """Group whole files into batches of at most ``max_batch_triples``."""
+        batch: list[tuple[str, Graph, Graph]] = []
+        size = 0
+        for change in changes:
+            triples = len(change[1]) + len(change[2])
+            if batch and size + triples > self.__max_batch_triples:
+                yield batch
+                batch, size = [], 0
+            batch.append(change)
+            size += triples
+        if batch:
+            yield batch
+
+    def __write(self, batch: list[tuple[str, Graph, Graph]]) -> None:
+        removals, additions = Graph(), Graph()
+        for _, file_removals, file_additions in batch:
+            removals += file_removals
+            additions += file_additions
+        if len(removals) > 0:
+            self.__service.remove(removals, graph_name=self.__schema_graph)
+        if len(additions) > 0:
+            self.__service.insert(additions, graph_name=self.__schema_graph)
+
+    def finish(self) -> SchemaLoadReport:
+        """Wait for the submitted files, write the changes and report."""
+        report = self.__report
+        report.files = len(self.__futures)
+
+        start = time.perf_counter()
+        prepared: list[_PreparedSchema] = []
+        for filepath, future in self.__futures.items():
+            try:
+                prepared.append(future.result())
+            except Exception as exc:  # noqa: BLE001
+                self.__fail(filepath, exc)
+        self.__executor.shutdown(wait=True)
+        report.wait_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        changed = [p for p in prepared if p.primary is not None and p.graph is not None]
+        old_contents = self.__fetch_contents([p.primary.subject for p in changed])  # type: ignore[union-attr]
+
+        # (filepath, removals, additions) per new or changed file
+        changes: list[tuple[str, Graph, Graph]] = []
+        loaded: list[str] = []
+        duplicates: list[URIRef] = []
+        for schema in prepared:
+            additions, removals = Graph(), Graph()
+            try:
+                content_b64 = base64.b64encode(schema.content.encode("utf-8")).decode(
+                    "utf-8"
+                )
+                if schema.graph is None:
+                    report.unchanged += 1
+                elif schema.primary is None:
+                    logger.debug(f"Loading new schema: '{schema.filepath}'")
+                    additions += schema.graph
+                    additions += schema_metadata(
+                        URIRef(f"http://triple-store.internal/{uuid.uuid4()}"),
+                        schema.content_hash,
+                        schema.file_last_update_time,
+                        content_b64,
+                        filepath=schema.filepath,
+                    )
+                    report.new += 1
+                else:
+                    logger.debug(f"Loading schema: '{schema.filepath}'")
+                    old_content_b64 = old_contents.get(schema.primary.subject)
+                    if old_content_b64 is None:
+                        raise ValueError(
+                            f"Schema metadata for '{schema.filepath}' is missing stored content."
+                        )
+                    old_schema = Graph().parse(
+                        data=base64.b64decode(old_content_b64).decode("utf-8"),
+                        format="turtle",
+                    )
+                    removals += old_schema - schema.graph
+                    additions += schema.graph - old_schema
+                    removals += schema_metadata(
+                        schema.primary.subject,
+                        schema.primary.hash,
+                        schema.primary.file_last_update_time,
+                        old_content_b64,
+                    )
+                    additions += schema_metadata(
+                        schema.primary.subject,
+                        schema.content_hash,
+                        schema.file_last_update_time,
+                        content_b64,
+                    )
+                    report.changed += 1
+            except Exception as exc:  # noqa: BLE001
+                self.__fail(schema.filepath, exc)
+                continue
+            duplicates.extend(schema.duplicates)
+            if schema.graph is None:
+                loaded.append(schema.filepath)
+            else:
+                changes.append((schema.filepath, removals, additions))
+
+        for batch in self.__batches(changes):
+            try:
+                self.__write(batch)
+            except Exception as exc:  # noqa: BLE001
+                if len(batch) == 1:
+                    self.__fail(batch[0][0], exc)
+                    continue
+                for change in batch:
+                    try:
+                        self.__write([change])
+                    except Exception as file_exc:  # noqa: BLE001
+                        self.__fail(change[0], file_exc)
+                    else:
+                        loaded.append(change[0])
+                continue
+            loaded.extend(filepath for filepath, _, _ in batch)
+        if duplicates:
+            logger.debug(
+                f"Cleaning up {len(duplicates)} duplicate schema metadata entries."
+            )
+            for subject in duplicates:
+                self.__service.remove_schema_subject(subject)
+        report.write_seconds = time.perf_counter() - start
+
+        for filepath in loaded:
+            self.__publish_event(SchemaLoaded(filepath=filepath))
+        report.total_seconds = time.perf_counter() - self.__started
+        logger.debug(f"Schema load: {report.summary()}")
+        return report
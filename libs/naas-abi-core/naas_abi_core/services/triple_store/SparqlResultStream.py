@@ -0,0 +1,181 @@
+"""Incremental parsing of SPARQL 1.1 JSON results for ``iter_query``.
+
+The HTTP adaptors request ``application/sparql-results+json`` with a
+streamed response and feed its chunks to :func:`iter_json_rows`, which walks
+the document key by key and decodes the ``results.bindings`` array one
+binding object at a time. At most ``batch_size`` decoded bindings (plus one
+network chunk) are held at once, so memory stays flat whatever the result
+size; closing the iterator (``break``, ``close()``, garbage collection)
+closes the HTTP response and the server stops streaming.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+import requests
+from rdflib.query import ResultRow
+from rdflib.term import BNode, Identifier, Literal, URIRef, Variable
+
+SPARQL_JSON = "application/sparql-results+json"
+DEFAULT_BATCH_SIZE = 1000
+CHUNK_BYTES = 64 * 1024
+
+
+def json_term(binding: dict[str, Any]) -> Identifier:
+    """rdflib term for one SPARQL JSON RDF term object."""
+    kind = binding.get("type", "literal")
+    value = binding["value"]
+    if kind == "uri":
+        return URIRef(value)
+    if kind == "bnode":
+        return BNode(value)
+    if kind not in ("literal", "typed-literal"):
+        raise ValueError(f"Unsupported SPARQL JSON term type: {kind!r}")
+    lang = binding.get("xml:lang")
+    if lang:
+        return Literal(value, lang=lang)
+    datatype = binding.get("datatype")
+    if datatype:
+        return Literal(value, datatype=URIRef(datatype))
+    return Literal(value)
+
+
+class _JsonStream:
+    """A growing text buffer over byte chunks with ``raw_decode`` helpers.
+
+    A value is only accepted once input continues past it: a JSON number cut
+    at a chunk boundary would otherwise decode as a shorter number.
+    """
+
+    def __init__(self, chunks: Iterable[bytes | str]) -> None:
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._exhausted = False
+
+    def _more(self) -> bool:
+        if self._exhausted:
+            return False
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self._exhausted = True
+            chunk = b""
+        text = chunk if isinstance(chunk, str) else self._utf8.decode(chunk, final=self._exhausted)
+        # Drop what has been consumed so the buffer stays one chunk wide.
+        self._buffer = self._buffer[self._pos :] + text
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ("" at end of input)."""
+        while True:
+            buffer, pos = self._buffer, self._pos
+            while pos < len(buffer) and buffer[pos] in " \t\n\r":
+                pos += 1
+            self._pos = pos
+            if pos < len(buffer):
+                return buffer[pos]
+            if not self._more():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Malformed SPARQL JSON results: expected {char!r}, got {found!r}")
+        self._pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as exc:
+                if self._more():
+                    continue
+                raise ValueError(f"Malformed SPARQL JSON results: {exc}") from exc
+            if end == len(self._buffer) and self._more():
+                continue
+            self._pos = end
+            return value
+
+
+def iter_json_rows(
+    chunks: Iterable[bytes | str], batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[ResultRow]:
+    """Rows of a SPARQL JSON SELECT result, decoded ``batch_size`` at a time.
+
+    Raises ``ValueError`` for a boolean (ASK) result or malformed input.
+    """
+    stream = _JsonStream(chunks)
+    variables: list[Variable] | None = None
+
+    def rows(bindings: list[dict[str, Any]]) -> list[ResultRow]:
+        out = []
+        for binding in bindings:
+            labels = variables or [Variable(name) for name in binding]
+            out.append(
+                ResultRow(
+                    {Variable(name): json_term(term) for name, term in binding.items()},
+                    labels,
+                )
+            )
+        return out
+
+    stream.expect("{")
+    while stream.peek() != "}":
+        key = stream.value()
+        stream.expect(":")
+        if key == "head":
+            head = stream.value()
+            variables = [Variable(name) for name in head.get("vars", [])]
+        elif key == "boolean":
+            raise ValueError("iter_query only supports SELECT queries (got an ASK result)")
+        elif key == "results":
+            stream.expect("{")
+            while stream.peek() != "}":
+                results_key = stream.value()
+                stream.expect(":")
+                if results_key != "bindings":
+                    stream.value()
+                else:
+                    stream.expect("[")
+                    batch: list[dict[str, Any]] = []
+                    while stream.peek() != "]":
+                        batch.append(stream.value())
+                        if len(batch) >= batch_size:
+                            yield from rows(batch)
+                            batch = []
+                        if stream.peek() == ",":
+                            stream.expect(",")
+                    stream.expect("]")
+                    yield from rows(batch)
+                if stream.peek() == ",":
+                    stream.expect(",")
+            stream.expect("}")
+        else:
+            stream.value()
+        if stream.peek() == ",":
+            stream.expect(",")
+
+
+def iter_response_rows(
+    response: requests.Response, batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[ResultRow]:
+    """Stream the rows of a ``stream=True`` SPARQL JSON response, closing
+    the response when iteration ends or is abandoned."""
+    try:
+        content_type = response.headers.get("Content-Type", "")
+        if "sparql-results+json" not in content_type:
+            raise ValueError(
+                f"iter_query only supports SELECT queries (got {content_type or 'no content type'})"
+            )
+        yield from iter_json_rows(response.iter_content(chunk_size=CHUNK_BYTES), batch_size)
+    finally:
+        response.close()
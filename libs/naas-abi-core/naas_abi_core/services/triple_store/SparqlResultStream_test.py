@@ -0,0 +1,82 @@
+import json
+from unittest.mock import Mock
+
+import pytest
+from naas_abi_core.services.triple_store.SparqlResultStream import (
+    iter_json_rows,
+    iter_response_rows,
+)
+from rdflib import XSD, BNode, Literal, URIRef, Variable
+
+_DOCUMENT = {
+    "head": {"vars": ["s", "o"], "link": ["http://e/info"]},
+    "results": {
+        "distinct": False,
+        "ordered": True,
+        "bindings": [
+            {
+                "s": {"type": "uri", "value": f"http://e/s{i}"},
+                "o": {"type": "literal", "value": str(i), "datatype": str(XSD.integer)},
+            }
+            for i in range(25)
+        ]
+        + [
+            {"s": {"type": "bnode", "value": "b0"}, "o": {"type": "literal", "value": "é \"x\"", "xml:lang": "fr"}},
+            {"s": {"type": "uri", "value": "http://e/unbound"}},
+        ],
+    },
+}
+
+
+def _chunks(text: str, size: int) -> list[bytes]:
+    data = text.encode("utf-8")
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 20])
+@pytest.mark.parametrize("batch_size", [1, 10, 1000])
+def test_rows_decode_across_any_chunk_boundary(chunk_size, batch_size):
+    rows = list(iter_json_rows(_chunks(json.dumps(_DOCUMENT, indent=1), chunk_size), batch_size))
+
+    assert len(rows) == 27
+    assert rows[3].s == URIRef("http://e/s3") and rows[3].o == Literal(3)
+    assert rows[25].s == BNode("b0") and rows[25].o == Literal('é "x"', lang="fr")
+    assert rows[26].o is None and rows[26].labels == {"s": 0, "o": 1}
+
+
+def test_rows_are_decoded_lazily_one_batch_at_a_time():
+    consumed = []
+
+    def chunks():
+        for chunk in _chunks(json.dumps(_DOCUMENT), 64):
+            consumed.append(chunk)
+            yield chunk
+
+    rows = iter_json_rows(chunks(), batch_size=5)
+    next(rows)
+    assert sum(map(len, consumed)) < len(json.dumps(_DOCUMENT)) / 2
+
+
+def test_ask_results_and_malformed_input_are_rejected():
+    with pytest.raises(ValueError, match="SELECT"):
+        list(iter_json_rows([b'{"head": {}, "boolean": true}']))
+    with pytest.raises(ValueError, match="Malformed"):
+        list(iter_json_rows([b'{"head": {"vars": ["s"]}, "results": {"bindings": [{"s": ']))
+
+
+def test_vars_default_to_binding_keys_when_head_comes_last():
+    document = '{"results": {"bindings": [{"x": {"type": "uri", "value": "http://e/x"}}]}, "head": {"vars": ["x"]}}'
+    [row] = iter_json_rows([document.encode()])
+    assert row[Variable("x")] == URIRef("http://e/x")
+
+
+def test_abandoning_the_iterator_closes_the_response():
+    response = Mock()
+    response.headers = {"Content-Type": "application/sparql-results+json; charset=utf-8"}
+    response.iter_content.return_value = iter(_chunks(json.dumps(_DOCUMENT), 128))
+
+    rows = iter_response_rows(response, batch_size=2)
+    assert next(rows).s == URIRef("http://e/s0")
+    rows.close()
+
+    response.close.assert_called_once()
@@ -0,0 +1,201 @@
+"""Write-behind coalescing of ``INSERT DATA`` / ``DELETE DATA`` updates.
+
+Bursts of small writes (one triple per graph-editor action, many schema files
+loaded in parallel) pay a lock acquisition and an HTTP round trip each. A
+:class:`SparqlWriteCoalescer` collects the changes submitted while an update
+is in flight and sends them as one SPARQL update::
+
+    DELETE DATA { ... GRAPH <g> { ... } } ;
+    INSERT DATA { ... GRAPH <g> { ... } }
+
+Pending changes are kept per named graph (``None`` is the default graph) as
+triple -> insert/remove, so the last submitted operation on a triple wins:
+insert-then-remove of the same triple leaves a single removal, remove-then-
+insert a single insertion. A triple is never in both halves of an update, so
+the merged request leaves the store exactly as the calls applied one by one
+would have.
+
+Batches are sent one at a time, in submission order, by a background thread.
+A change that finds no update in flight is sent at once, so a lone sequential
+writer never waits for a window. A batch that opens behind an in-flight update
+keeps collecting until that update is done and ``window_ms`` has passed since
+its first change. A batch is also sent when it reaches ``max_triples``
+distinct triples, or on :meth:`flush`.
+
+Every change returns the ``concurrent.futures.Future`` of its batch: it
+resolves once the update has been accepted by the store, or carries the
+error of the failed update (which then applies to every change in the batch,
+as the update is one server-side transaction).
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any
+
+from rdflib.term import Node, URIRef
+
+logger = logging.getLogger(__name__)
+
+Triple = tuple[Node, Node, Node]
+
+
+@dataclass
+class _Batch:
+    # graph name -> triple -> True (insert) / False (remove), in first-seen order.
+    changes: dict[URIRef | None, dict[Triple, bool]] = field(default_factory=dict)
+    size: int = 0
+    # Opened while an update was in flight: collects for the window.
+    behind_update: bool = False
+    opened_at: float = field(default_factory=time.monotonic)
+    future: Future = field(default_factory=Future)
+
+
+def build_update(changes: dict[URIRef | None, dict[Triple, bool]]) -> str:
+    """One SPARQL update (``DELETE DATA`` then ``INSERT DATA``) for ``changes``."""
+    operations: list[str] = []
+    for operation, wanted in (("DELETE DATA", False), ("INSERT DATA", True)):
+        blocks: list[str] = []
+        for graph_name, triples in changes.items():
+            lines = [
+                f"  {s.n3()} {p.n3()} {o.n3()} ."
+                for (s, p, o), insert in triples.items()
+                if insert is wanted
+            ]
+            if not lines:
+                continue
+            if graph_name is None:
+                blocks.append("\n".join(lines))
+            else:
+                blocks.append(
+                    f"  GRAPH <{graph_name!s}> {{\n" + "\n".join(lines) + "\n  }"
+                )
+        if blocks:
+            operations.append(f"{operation} {{\n" + "\n".join(blocks) + "\n}")
+    return " ;\n".join(operations)
+
+
+class SparqlWriteCoalescer:
+    """Merges data changes into batched SPARQL updates sent through ``apply``."""
+
+    def __init__(
+        self,
+        apply: Callable[[str], Any],
+        window_ms: int = 50,
+        max_triples: int = 10_000,
+    ):
+        if window_ms < 0:
+            raise ValueError("window_ms must be >= 0")
+        if max_triples < 1:
+            raise ValueError("max_triples must be >= 1")
+        self._apply = apply
+        self._window = window_ms / 1000
+        self._max_triples = max_triples
+        self._cond = threading.Condition()
+        self._batch: _Batch | None = None
+        # Future of the batch sent last (or being sent): waiting on it waits
+        # for every earlier batch too.
+        self._last: Future | None = None
+        self._sending = False
+        self._flush_requested = False
+        self._closed = False
+        self._thread: threading.Thread | None = None
+
+    def submit(
+        self, triples: Iterable[Triple], graph_name: URIRef | None, insert: bool
+    ) -> Future:
+        """Queue ``triples`` for insertion (or removal) in ``graph_name``."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("SparqlWriteCoalescer is closed")
+            batch = self._batch
+            for triple in triples:
+                if batch is None:
+                    batch = self._batch = _Batch(behind_update=self._sending)
+                pending = batch.changes.setdefault(graph_name, {})
+                if triple not in pending:
+                    batch.size += 1
+                pending[triple] = insert
+            if batch is None:
+                done: Future = Future()
+                done.set_result(None)
+                return done
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._worker, name="sparql-write-coalescer", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify_all()
+            return batch.future
+
+    def flush(self) -> Future:
+        """Send the pending batch now; the returned future resolves once it
+        (and every batch before it) has been sent."""
+        with self._cond:
+            if self._batch is not None:
+                self._flush_requested = True
+                self._cond.notify_all()
+                return self._batch.future
+            if self._last is not None:
+                return self._last
+        done: Future = Future()
+        done.set_result(None)
+        return done
+
+    def close(self) -> None:
+        """Send what is pending and stop the background thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+
+    def _next_batch(self) -> _Batch | None:
+        with self._cond:
+            while True:
+                batch = self._batch
+                if batch is None:
+                    if self._closed:
+                        return None
+                    self._cond.wait()
+                    continue
+                remaining = batch.opened_at + self._window - time.monotonic()
+                if (
+                    not batch.behind_update
+                    or self._closed
+                    or self._flush_requested
+                    or batch.size >= self._max_triples
+                    or remaining <= 0
+                ):
+                    self._batch = None
+                    self._flush_requested = False
+                    self._last = batch.future
+                    self._sending = True
+                    return batch
+                self._cond.wait(timeout=remaining)
+
+    def _worker(self) -> None:
+        while (batch := self._next_batch()) is not None:
+            error: Exception | None = None
+            try:
+                self._apply(build_update(batch.changes))
+            except Exception as exc:
+                logger.exception(
+                    "Coalesced SPARQL update of %d triples failed", batch.size
+                )
+                error = exc
+            # Idle before the writers wake up, so their next change is sent
+            # at once instead of collecting for a window.
+            with self._cond:
+                self._sending = False
+            if error is not None:
+                # Any failure must reach the writers waiting on the batch.
+                batch.future.set_exception(error)
+            else:
+                batch.future.set_result(None)
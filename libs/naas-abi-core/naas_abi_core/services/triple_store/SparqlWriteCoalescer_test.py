@@ -0,0 +1,143 @@
+import threading
+
+import pytest
+from naas_abi_core.services.triple_store.SparqlWriteCoalescer import (
+    SparqlWriteCoalescer,
+    build_update,
+)
+from rdflib import RDF, Literal, URIRef
+
+G1 = URIRef("http://example.org/graphs/one")
+G2 = URIRef("http://example.org/graphs/two")
+ALICE = (URIRef("http://example.org/alice"), RDF.type, URIRef("http://example.org/Person"))
+BOB = (URIRef("http://example.org/bob"), RDF.type, URIRef("http://example.org/Person"))
+NAME = (URIRef("http://example.org/alice"), URIRef("http://example.org/name"), Literal("Alice"))
+WARM_UP = (URIRef("http://example.org/carol"), RDF.type, URIRef("http://example.org/Person"))
+
+
+def test_build_update_deletes_then_inserts_per_graph():
+    update = build_update({None: {ALICE: True}, G1: {BOB: False, NAME: True}})
+
+    delete, insert = update.split(" ;\n")
+    assert delete.startswith("DELETE DATA {") and f"GRAPH <{G1}>" in delete
+    assert "<http://example.org/bob>" in delete and "alice" not in delete
+    assert insert.startswith("INSERT DATA {") and '"Alice"' in insert
+    # Default-graph triples sit outside any GRAPH block.
+    assert insert.index("<http://example.org/alice> <") < insert.index("GRAPH")
+
+
+def _behind_an_update(**kwargs):
+    """A coalescer whose first update blocks until ``release`` is set, so the
+    changes submitted meanwhile collect behind it."""
+    updates: list[str] = []
+    started, release = threading.Event(), threading.Event()
+
+    def apply(update: str) -> None:
+        updates.append(update)
+        if len(updates) == 1:
+            started.set()
+            release.wait(5)
+
+    coalescer = SparqlWriteCoalescer(apply, **kwargs)
+    coalescer.submit([WARM_UP], G1, insert=True)
+    assert started.wait(5)
+    return coalescer, updates, release
+
+
+def test_lone_writer_is_sent_without_waiting_for_the_window():
+    updates: list[str] = []
+    coalescer = SparqlWriteCoalescer(updates.append, window_ms=60_000)
+
+    for triple in (ALICE, BOB, NAME):
+        coalescer.submit([triple], G1, insert=True).result(timeout=5)
+
+    assert len(updates) == 3
+    coalescer.close()
+
+
+def test_changes_behind_an_update_are_sent_as_one_update():
+    coalescer, updates, release = _behind_an_update(window_ms=10_000)
+
+    first = coalescer.submit([ALICE], G1, insert=True)
+    second = coalescer.submit([BOB], G2, insert=True)
+    third = coalescer.submit([NAME], None, insert=False)
+    assert first is second is third and not first.done()
+
+    release.set()
+    coalescer.flush().result(timeout=5)
+    assert len(updates) == 2
+    assert f"GRAPH <{G1}>" in updates[1] and f"GRAPH <{G2}>" in updates[1]
+    assert updates[1].startswith("DELETE DATA")
+    coalescer.close()
+
+
+@pytest.mark.parametrize("last_insert, kept", [(False, "DELETE DATA"), (True, "INSERT DATA")])
+def test_last_operation_on_a_triple_wins(last_insert, kept):
+    coalescer, updates, release = _behind_an_update(window_ms=10_000)
+
+    coalescer.submit([ALICE], G1, insert=not last_insert)
+    coalescer.submit([ALICE], G1, insert=last_insert)
+    release.set()
+    coalescer.close()
+
+    assert updates[1:] == [build_update({G1: {ALICE: last_insert}})]
+    assert updates[1].startswith(kept) and " ;" not in updates[1]
+
+
+def test_batch_is_sent_when_it_reaches_max_triples():
+    coalescer, updates, release = _behind_an_update(window_ms=60_000, max_triples=2)
+
+    pending = coalescer.submit([ALICE], G1, insert=True)
+    release.set()
+    with pytest.raises(TimeoutError):
+        pending.result(timeout=0.1)
+    coalescer.submit([BOB], G1, insert=True).result(timeout=5)
+    assert len(updates) == 2
+    coalescer.close()
+
+
+def test_failed_update_is_reported_on_every_future_of_the_batch():
+    started, release = threading.Event(), threading.Event()
+
+    def fail(_):
+        started.set()
+        release.wait(5)
+        raise RuntimeError("boom")
+
+    coalescer = SparqlWriteCoalescer(fail, window_ms=10_000)
+    coalescer.submit([WARM_UP], G1, insert=True)
+    assert started.wait(5)
+    first = coalescer.submit([ALICE], G1, insert=True)
+    second = coalescer.submit([BOB], G1, insert=True)
+    release.set()
+    coalescer.flush()
+
+    assert first is second
+    with pytest.raises(RuntimeError, match="boom"):
+        first.result(timeout=5)
+    # Later batches still go through.
+    coalescer._apply = lambda _: None
+    coalescer.submit([NAME], G1, insert=True)
+    coalescer.flush().result(timeout=5)
+    coalescer.close()
+
+
+def test_flush_waits_for_the_batch_in_flight():
+    release = threading.Event()
+    coalescer = SparqlWriteCoalescer(lambda _: release.wait(5), window_ms=0)
+
+    future = coalescer.submit([ALICE], G1, insert=True)
+    while coalescer._batch is not None:
+        pass
+    assert coalescer.flush() is future and not future.done()
+    release.set()
+    future.result(timeout=5)
+    coalescer.close()
+
+
+def test_empty_submission_completes_immediately_and_close_rejects_writes():
+    coalescer = SparqlWriteCoalescer(lambda _: None)
+    assert coalescer.submit([], G1, insert=True).done()
+    coalescer.close()
+    with pytest.raises(RuntimeError):
+        coalescer.submit([ALICE], G1, insert=True)
@@ -1,9 +1,10 @@
 from abc import ABC, abstractmethod
-from collections.abc import Callable
+from collections.abc import Callable, Iterator
 from enum import Enum
 
 import rdflib
 from rdflib import Graph, URIRef
+from rdflib.query import ResultRow
 
 
 class Exceptions:
@@ -109,6 +110,19 @@ class ITripleStorePort(ABC):
     def query_view(self, view: str, query: str) -> rdflib.query.Result:
         pass
 
+    def iter_query(self, query: str, batch_size: int = 1000) -> Iterator[ResultRow]:
+        """Stream the rows of a SELECT query.
+
+        This default iterates :meth:`query`, which suits in-memory backends.
+        Adaptors that can stream (HTTP endpoints, embedded stores) override
+        it so that at most ``batch_size`` parsed rows are held at a time.
+        Closing the iterator stops the query.
+        """
+        result = self.query(query)
+        if getattr(result, "type", "SELECT") != "SELECT":
+            raise ValueError("iter_query only supports SELECT queries")
+        return iter(result)
+
     @abstractmethod
     def get_subject_graph(self, subject: URIRef, graph_name: str | URIRef) -> Graph:
         pass
@@ -189,6 +203,42 @@ class ITripleStoreService(ABC):
             ...     (None, RDF.type, None), print_triple, OntologyEvent.INSERT)
         """
 
+    @abstractmethod
+    def subscribe_graph_changes(
+        self,
+        callback: Callable[[bytes], None],
+        graph_name: URIRef | str = "*",
+        with_triples: bool = True,
+    ) -> None:
+        """
+        Register a callback receiving one coarse notification per change to a named graph.
+
+        Unlike :meth:`subscribe`, which delivers one message per matching triple, this
+        delivers a single message per ``insert``/``remove``/``clear_graph``/``drop_graph``
+        call. The payload is a JSON object with ``operation`` (``insert``, ``delete``,
+        ``clear`` or ``drop``), ``graph_name``, ``triple_count`` and ``ntriples`` (the
+        whole delta as one N-Triples document, empty for clear/drop). Use it when the
+        consumer needs to know that a graph changed, not to route individual triples.
+
+        Messages are only published while a subscription made through the same service
+        listens for the graph, unless the service was built with
+        ``publish_graph_changes`` (needed for subscribers living in other processes).
+
+        Args:
+            callback (Callable[[bytes], None]):
+                Function called with the JSON-encoded change. Raising ``StopIteration``
+                unsubscribes it.
+            graph_name (URIRef | str, optional):
+                Only report changes to this graph; ``"*"`` (default) reports every graph.
+            with_triples (bool, optional):
+                Whether the callback needs ``ntriples``. When no subscription to the
+                graph asks for it, the delta is not serialised and ``ntriples`` is empty.
+
+        Example:
+            >>> triple_store_service.subscribe_graph_changes(
+            ...     lambda payload: print(json.loads(payload)["triple_count"]))
+        """
+
     # @abstractmethod
     # def unsubscribe(self, subscription_id: str):
     #     """Unsubscribe from events using a subscription ID.
@@ -269,6 +319,19 @@ class ITripleStoreService(ABC):
     def query_view(self, view: str, query: str) -> rdflib.query.Result:
         pass
 
+    @abstractmethod
+    def iter_query(self, query: str, batch_size: int = 1000) -> Iterator[ResultRow]:
+        """Stream the rows of a SELECT query without materializing the result.
+
+        Use it for scans whose result may not fit in memory (exports, full
+        graph walks). Rows arrive as the backend produces them; stop early
+        by breaking out of the loop or calling ``close()`` on the iterator.
+
+        Example:
+            >>> for row in store.iter_query("SELECT ?s WHERE { ?s a owl:Class }"):
+            ...     print(row.s)
+        """
+
     @abstractmethod
     def get_subject_graph(self, subject: str, graph_name: str | URIRef) -> Graph:
         """Get the RDF graph containing all triples for a specific subject.
@@ -1,14 +1,16 @@
 import base64
 import hashlib
 import io
+import json
 import os
+import threading
 import uuid
-from collections.abc import Callable
-from concurrent.futures import ThreadPoolExecutor
+from collections.abc import Callable, Iterator
 from dataclasses import dataclass
 
 import rdflib
 from naas_abi_core import logger
+from naas_abi_core.services.cache.CachePort import ICacheService
 from naas_abi_core.services.ServiceBase import ServiceBase
 from naas_abi_core.services.triple_store.ontologies.modules.TripleStoreEventOntology import (
     GraphCleared,
@@ -20,6 +22,11 @@ from naas_abi_core.services.triple_store.ontologies.modules.TripleStoreEventOnto
     TriplesRemoved,
     TripleStoreError,
 )
+from naas_abi_core.services.triple_store.QueryResultCache import QueryResultCache
+from naas_abi_core.services.triple_store.SchemaLoadPipeline import (
+    SchemaLoadPipeline,
+    SchemaLoadReport,
+)
 from naas_abi_core.services.triple_store.TripleStorePorts import (
     Exceptions,
     ITripleStorePort,
@@ -27,10 +34,35 @@ from naas_abi_core.services.triple_store.TripleStorePorts import (
     OntologyEvent,
 )
 from rdflib import Graph, URIRef
+from rdflib.query import ResultRow
+
+GRAPH_CHANGES_TOPIC = "triple_store.graph"
+
+
+@dataclass(frozen=True)
+class _TripleSubscription:
+    """A live ``subscribe`` pattern; ``None`` fields are wildcards."""
+
+    operation: str  # "insert", "delete" or "*"
+    graph_name: str | None
+    subject: URIRef | None
+    predicate: URIRef | None
+    object: URIRef | None
+
+    def covers(self, operation: str, graph_name: str) -> bool:
+        return self.operation in ("*", operation) and (
+            self.graph_name is None or self.graph_name == graph_name
+        )
+
+    @property
+    def matches_every_triple(self) -> bool:
+        return self.subject is None and self.predicate is None and self.object is None
 
 
 @dataclass(frozen=True)
-class _SchemaIndexEntry:
+class SchemaIndexEntry:
+    """Stored metadata of one loaded schema file (see ``schema_index``)."""
+
     subject: URIRef
     hash: str
     file_last_update_time: str
@@ -95,11 +127,44 @@ class TripleStoreService(ServiceBase, ITripleStoreService):
     def __init__(
         self,
         triple_store_adapter: ITripleStorePort,
+        publish_all_triples: bool = True,
+        query_cache: QueryResultCache | None = None,
+        share_query_cache: bool = False,
+        publish_graph_changes: bool = False,
     ):
         super().__init__()
         self.__triple_store_adapter = triple_store_adapter
         self.__schema_graph = URIRef("http://ontology.naas.ai/graph/schema")
 
+        # Read queries are served from a result cache keyed by per-graph
+        # generations that every write below bumps (see QueryResultCache).
+        # With ``share_query_cache`` the generations (and SELECT/ASK results)
+        # also live in the engine's CacheService, so processes sharing it see
+        # each other's writes. Without ``query_cache`` the cache is off
+        # (``max_entries=0``), as in ``TripleStoreQueryCacheConfiguration``:
+        # a memory-only cache would serve other processes' stale data.
+        self.__query_cache = (
+            query_cache if query_cache is not None else QueryResultCache(max_entries=0)
+        )
+        if share_query_cache:
+            self.__query_cache.backing = self.__shared_query_cache
+
+        # Live subscriptions made through this service. With
+        # ``publish_all_triples`` off, per-triple bus messages (four hashes +
+        # an N-Triples line each) are only built for triples some
+        # subscription can match. Subscribers living in another process are
+        # invisible to this registry, so filtering is opt-in: only turn it
+        # off when every subscriber of the bus lives in this process.
+        # Graph-change messages are new, so they go the other way: they are
+        # only built when a subscription made here listens for the graph,
+        # unless ``publish_graph_changes`` asks for them on every write.
+        self.__publish_all_triples = publish_all_triples
+        self.__publish_graph_changes = publish_graph_changes
+        self.__subscriptions_lock = threading.Lock()
+        self.__triple_subscriptions: list[_TripleSubscription] = []
+        # (graph name or None for every graph, wants the N-Triples delta)
+        self.__graph_change_subscriptions: list[tuple[str | None, bool]] = []
+
         # Load SCHEMA_TTL in IOBuffer
         schema_ttl_buffer = io.StringIO(SCHEMA_TTL)
         self.insert(
@@ -119,7 +184,7 @@ class TripleStoreService(ServiceBase, ITripleStoreService):
             logger.warning(f"TripleStoreService: failed to publish event: {exc}")
 
     @staticmethod
-    def _error_message(exc: Exception) -> str:
+    def error_message(exc: Exception) -> str:
         """Build a rich, loggable message from an adapter exception.
 
         HTTP-backed adapters (e.g. Apache Jena Fuseki) raise
@@ -156,11 +221,12 @@ class TripleStoreService(ServiceBase, ITripleStoreService):
                 TripleStoreError(
                     operation="insert",
                     graph_name=str(graph_name),
-                    message=self._error_message(exc),
+                    message=self.error_message(exc),
                 )
             )
             raise
 
+        self.__query_cache.bump(graph_name)
         self.__publish_event(
             TriplesInserted(
                 graph_name=str(graph_name),
@@ -191,11 +257,12 @@ class TripleStoreService(ServiceBase, ITripleStoreService):
                 TripleStoreError(
                     operation="remove",
                     graph_name=str(graph_name),
-                    message=self._error_message(exc),
+                    message=self.error_message(exc),
                 )
             )
             raise
 
+        self.__query_cache.bump(graph_name)
         self.__publish_event(
             TriplesRemoved(
                 graph_name=str(graph_name),
@@ -212,43 +279,163 @@ class TripleStoreService(ServiceBase, ITripleStoreService):
     def __publish_triples(
         self, operation: str, triples: Graph, graph_name: URIRef
     ) -> None:
-        """Broadcast one bus message per triple, in a single batch.
+        """Broadcast the triples live subscriptions can match, in one batch,
+        plus a single graph-change message if anyone listens for those.
 
         Routing keys are unchanged (``ts.<operation>.g.<h>.s.<h>.p.<h>.o.<h>``),
         so subscriber bindings keep matching exactly as before.
         """
-        graph_hash = self._hash_value(str(graph_name))
-        messages: list[tuple[str, bytes]] = []
-        for s, p, o in triples.triples((None, None, None)):
-            routing_key = (
-                f"ts.{operation}.g.{graph_hash}"
-                f".s.{self._hash_value(s)}"
-                f".p.{self._hash_value(p)}"
-                f".o.{self._hash_value(o)}"
-            )
-            messages.append((routing_key, f"{s.n3()} {p.n3()} {o.n3()} .\n".encode()))
-        if not messages:
-            return
         try:
+            self.__publish_graph_change(operation, graph_name, triples)
+            selected = self.__subscribed_triples(operation, triples, graph_name)
+            if not selected:
+                return
+            graph_hash = self._hash_value(str(graph_name))
+            messages: list[tuple[str, bytes]] = []
+            for s, p, o in selected:
+                routing_key = (
+                    f"ts.{operation}.g.{graph_hash}"
+                    f".s.{self._hash_value(s)}"
+                    f".p.{self._hash_value(p)}"
+                    f".o.{self._hash_value(o)}"
+                )
+                messages.append(
+                    (routing_key, f"{s.n3()} {p.n3()} {o.n3()} .\n".encode())
+                )
             self.services.bus.publish_many("triple_store", messages)
         except Exception as e:
             logger.error(f"Error publishing triples: {e}")
             raise
 
+    def __subscribed_triples(
+        self, operation: str, triples: Graph, graph_name: URIRef
+    ) -> list[tuple]:
+        if self.__publish_all_triples:
+            return list(triples.triples((None, None, None)))
+        with self.__subscriptions_lock:
+            patterns = [
+                sub
+                for sub in self.__triple_subscriptions
+                if sub.covers(operation, str(graph_name))
+            ]
+        if not patterns:
+            return []
+        if any(sub.matches_every_triple for sub in patterns):
+            return list(triples.triples((None, None, None)))
+        # Bound patterns are index lookups on the rdflib graph instead of a
+        # scan; the dict dedupes triples matched by several patterns while
+        # keeping their order.
+        selected: dict = {}
+        for sub in patterns:
+            for triple in triples.triples((sub.subject, sub.predicate, sub.object)):
+                selected[triple] = None
+        return list(selected)
+
+    def __publish_graph_change(
+        self, operation: str, graph_name: URIRef, triples: Graph | None = None
+    ) -> None:
+        if self.__publish_graph_changes:
+            wanted, with_triples = True, True
+        else:
+            with self.__subscriptions_lock:
+                matching = [
+                    wants_triples
+                    for g, wants_triples in self.__graph_change_subscriptions
+                    if g is None or g == str(graph_name)
+                ]
+            wanted, with_triples = bool(matching), any(matching)
+        if not wanted:
+            return
+        payload = {
+            "operation": operation,
+            "graph_name": str(graph_name),
+            "triple_count": len(triples) if triples is not None else 0,
+            "ntriples": (
+                triples.serialize(format="nt")
+                if triples is not None and with_triples
+                else ""
+            ),
+        }
+        self.services.bus.publish(
+            GRAPH_CHANGES_TOPIC,
+            f"{operation}.g.{self._hash_value(str(graph_name))}",
+            json.dumps(payload).encode("utf-8"),
+        )
+
     def get(self) -> Graph:
         return self.__triple_store_adapter.get()
 
     def query(self, query: str) -> rdflib.query.Result:
+        return self.__query_cache.get_or_compute(query, self.__query_uncached)
+
+    def query_state(self, query: str) -> str | None:
+        """Token identifying the state of the graphs ``query`` reads.
+
+        It changes on every write made through this service to one of those
+        graphs (and on ``clear_query_cache``), so results derived from
+        ``query`` can be cached under it. ``None`` for updates and queries
+        that are never cached.
+        """
+        return self.__query_cache.state(query)
+
+    def query_state_max_age(self, requested: float | None = None) -> float | None:
+        """Age limit for results cached under ``query_state``.
+
+        Without a shared ``CacheService`` the token only follows this
+        process's writes, so ``requested`` is capped at the query cache's
+        ``ttl_seconds``; a longer limit is honoured only when the generations
+        are shared. ``None`` asks for the query cache's own TTL.
+        """
+        ttl = self.__query_cache.ttl_seconds
+        if requested is None:
+            return ttl
+        if ttl is None or self.__query_cache.shared:
+            return requested
+        return min(requested, ttl)
+
+    def __shared_query_cache(self) -> ICacheService | None:
+        if not self.services_wired or not self.services.cache_available():
+            return None
+        return self.services.cache
+
+    def clear_query_cache(self) -> None:
+        """Drop every cached query result (normally unnecessary: writes made
+        through this service invalidate the entries they affect)."""
+        self.__query_cache.invalidate_all()
+
+    def __query_uncached(self, query: str) -> rdflib.query.Result:
         try:
             return self.__triple_store_adapter.query(query)
         except Exception as exc:
-            self.__publish_event(
-                TripleStoreError(
-                    operation="query",
-                    message=self._error_message(exc),
-                )
-            )
+            self.__publish_query_error(exc)
+            raise
+
+    def iter_query(self, query: str, batch_size: int = 1000) -> Iterator[ResultRow]:
+        """Stream the rows of a SELECT query, ``batch_size`` parsed rows at a
+        time. Bypasses the query cache."""
+        if batch_size <= 0:
+            raise ValueError("batch_size must be > 0")
+        try:
+            rows = self.__triple_store_adapter.iter_query(query, batch_size)
+        except Exception as exc:
+            self.__publish_query_error(exc)
             raise
+        return self.__stream(rows)
+
+    def __stream(self, rows: Iterator[ResultRow]) -> Iterator[ResultRow]:
+        try:
+            yield from rows
+        except Exception as exc:
+            self.__publish_query_error(exc)
+            raise
+
+    def __publish_query_error(self, exc: Exception) -> None:
+        self.__publish_event(
+            TripleStoreError(
+                operation="query",
+                message=self.error_message(exc),
+            )
+        )
 
     def query_view(self, view: str, query: str) -> rdflib.query.Result:
         try:
@@ -257,7 +444,7 @@ class TripleStoreService(ServiceBase, ITripleStoreService):
             self.__publish_event(
                 TripleStoreError(
                     operation="query_view",
-                    message=self._error_message(exc),
+                    message=self.error_message(exc),
                 )
             )
             raise
@@ -273,7 +460,7 @@ class TripleStoreService(ServiceBase, ITripleStoreService):
                 TripleStoreError(
                     operation="create_graph",
                     graph_name=str(graph_name),
-                    message=self._error_message(exc),
+                    message=self.error_message(exc),
                 )
             )
             raise
@@ -291,12 +478,15 @@ class TripleStoreService(ServiceBase, ITripleStoreService):
                 TripleStoreError(
                     operation="clear_graph",
                     graph_name=str(graph_name),
-                    message=self._error_message(exc),
+                    message=self.error_message(exc),
                 )
             )
             raise
 
+        self.__query_cache.bump(graph_name)
         self.__publish_event(GraphCleared(graph_name=str(graph_name)))
+        if self.services_wired:
+            self.__publish_graph_change("clear", graph_name)
 
     def drop_graph(self, graph_name: URIRef) -> None:
         try:
@@ -306,12 +496,15 @@ class TripleStoreService(ServiceBase, ITripleStoreService):
                 TripleStoreError(
                     operation="drop_graph",
                     graph_name=str(graph_name),
-                    message=self._error_message(exc),
+                    message=self.error_message(exc),
                 )
             )
             raise
 
+        self.__query_cache.bump(graph_name)
         self.__publish_event(GraphDropped(graph_name=str(graph_name)))
+        if self.services_wired:
+            self.__publish_graph_change("drop", graph_name)
 
     def list_graphs(self) -> list[URIRef]:
         return self.__triple_store_adapter.list_graphs()
@@ -338,10 +531,53 @@ class TripleStoreService(ServiceBase, ITripleStoreService):
 
         topic_str = f"ts.{_event_type}.g.{graph_topic}.s.{s}.p.{p}.o.{o}"
 
+        subscription = _TripleSubscription(
+            operation=_event_type,
+            graph_name=None if graph_name == "*" else str(graph_name),
+            subject=topic[0],
+            predicate=topic[1],
+            object=topic[2],
+        )
+        with self.__subscriptions_lock:
+            self.__triple_subscriptions.append(subscription)
+
+        def _on_message(payload: bytes) -> None:
+            try:
+                callback(payload)
+            except StopIteration:
+                # The bus drops this subscriber; stop materialising for it.
+                with self.__subscriptions_lock:
+                    self.__triple_subscriptions.remove(subscription)
+                raise
+
         self.services.bus.subscribe(
             "triple_store",
             topic_str,
-            callback,
+            _on_message,
+        )
+
+    def subscribe_graph_changes(
+        self,
+        callback: Callable[[bytes], None],
+        graph_name: URIRef | str = "*",
+        with_triples: bool = True,
+    ) -> None:
+        subscription = (None if graph_name == "*" else str(graph_name), with_triples)
+        with self.__subscriptions_lock:
+            self.__graph_change_subscriptions.append(subscription)
+
+        def _on_message(payload: bytes) -> None:
+            try:
+                callback(payload)
+            except StopIteration:
+                with self.__subscriptions_lock:
+                    self.__graph_change_subscriptions.remove(subscription)
+                raise
+
+        self.services.bus.subscribe(
+            GRAPH_CHANGES_TOPIC,
+            f"*.g.{self._subscription_graph_topic_token(graph_name)}",
+            _on_message,
         )
 
     def get_subject_graph(self, subject: str, graph_name: str = "*") -> Graph:
@@ -353,9 +589,9 @@ class TripleStoreService(ServiceBase, ITripleStoreService):
     # Schema Management
     ############################################################
 
-    def _build_schema_index(
+    def schema_index(
         self, filepath_filter: str | None = None
-    ) -> dict[str, list[_SchemaIndexEntry]]:
+    ) -> dict[str, list[SchemaIndexEntry]]:
         """Read stored Schema metadata into a plain Python dict.
 
         The index is keyed by filePath and contains one entry per stored
@@ -387,13 +623,13 @@ class TripleStoreService(ServiceBase, ITripleStoreService):
                 }}
             }}
         """)
-        index: dict[str, list[_SchemaIndexEntry]] = {}
+        index: dict[str, list[SchemaIndexEntry]] = {}
         for row in results:
             assert isinstance(row, rdflib.query.ResultRow)
             schema, filePath, h, t = row
             assert isinstance(schema, URIRef)
             index.setdefault(str(filePath), []).append(
-                _SchemaIndexEntry(
+                SchemaIndexEntry(
                     subject=schema,
                     hash=str(h),
                     file_last_update_time=str(t),
@@ -418,7 +654,8 @@ class TripleStoreService(ServiceBase, ITripleStoreService):
             return str(row[0])
         return None
 
-    def _remove_schema_subject(self, subject: URIRef) -> None:
+    def remove_schema_subject(self, subject: URIRef) -> None:
+        """Remove every triple about ``subject`` from the schema graph."""
         triples = self.query(
             f"""
             SELECT ?p ?o
@@ -437,34 +674,31 @@ class TripleStoreService(ServiceBase, ITripleStoreService):
         if len(cleanup_graph) > 0:
             self.remove(cleanup_graph, graph_name=self.__schema_graph)
 
-    def load_schemas(self, filepaths: list[str]):
-        """Parallel schema load. See `_apply_schema_for_file` for per-file logic."""
+    def schema_load_pipeline(
+        self, max_workers: int = 8, max_batch_triples: int = 50_000
+    ) -> SchemaLoadPipeline:
+        """Start a pipelined schema load: reads the schema index now, then
+        prepares each file passed to ``submit`` in the background and writes
+        the changes in batches on ``finish``. See ``SchemaLoadPipeline``."""
+        return SchemaLoadPipeline(
+            self,
+            self.__schema_graph,
+            self.__publish_event,
+            max_workers=max_workers,
+            max_batch_triples=max_batch_triples,
+        )
+
+    def load_schemas(self, filepaths: list[str]) -> SchemaLoadReport | None:
+        """Load several schema files with one index read and batched writes."""
         if not filepaths:
-            return
+            return None
 
-        index = self._build_schema_index()
-
-        # Parallelize per-file work. For unchanged files this is just file I/O
-        # + SHA-256 + dict lookup — no Fuseki traffic at all. For changed/new
-        # files it also includes Fuseki writes; those overlap across workers.
-        # The shared `index` dict is read-only during this loop.
-        max_workers = min(8, len(filepaths))
-        with ThreadPoolExecutor(
-            max_workers=max_workers, thread_name_prefix="ts-schema-load"
-        ) as executor:
-            futures = [
-                executor.submit(
-                    self._apply_schema_for_file_with_event,
-                    filepath,
-                    index.get(filepath, []),
-                )
-                for filepath in filepaths
-            ]
-            for future in futures:
-                future.result()
+        pipeline = self.schema_load_pipeline(max_workers=min(8, len(filepaths)))
+        pipeline.submit(filepaths)
+        return pipeline.finish()
 
     def _apply_schema_for_file_with_event(
-        self, filepath: str, entries: list[_SchemaIndexEntry]
+        self, filepath: str, entries: list[SchemaIndexEntry]
     ) -> None:
         try:
             self._apply_schema_for_file(filepath, entries)
@@ -473,7 +707,7 @@ class TripleStoreService(ServiceBase, ITripleStoreService):
                 TripleStoreError(
                     operation="load_schema",
                     filepath=filepath,
-                    message=self._error_message(exc),
+                    message=self.error_message(exc),
                 )
             )
             raise
@@ -483,11 +717,11 @@ class TripleStoreService(ServiceBase, ITripleStoreService):
         """Single-file schema load. `schema_cache` is accepted for backward
         compatibility but ignored — we always look up via a filtered query."""
         del schema_cache  # legacy param, no longer used
-        entries = self._build_schema_index(filepath_filter=filepath).get(filepath, [])
+        entries = self.schema_index(filepath_filter=filepath).get(filepath, [])
         self._apply_schema_for_file_with_event(filepath, entries)
 
     def _apply_schema_for_file(
-        self, filepath: str, entries: list[_SchemaIndexEntry]
+        self, filepath: str, entries: list[SchemaIndexEntry]
     ) -> None:
         try:
             if not entries:
@@ -515,7 +749,7 @@ class TripleStoreService(ServiceBase, ITripleStoreService):
                         f"metadata entries for {filepath}."
                     )
                     for duplicate_subject in duplicate_subjects:
-                        self._remove_schema_subject(duplicate_subject)
+                        self.remove_schema_subject(duplicate_subject)
                 return
 
             logger.debug(f"Loading schema: '{filepath}'")
@@ -570,7 +804,7 @@ class TripleStoreService(ServiceBase, ITripleStoreService):
                     f"metadata entries for {filepath}."
                 )
                 for duplicate_subject in duplicate_subjects:
-                    self._remove_schema_subject(duplicate_subject)
+                    self.remove_schema_subject(duplicate_subject)
         except Exception as e:  # noqa: BLE001
             import traceback
 
@@ -617,7 +851,7 @@ class TripleStoreService(ServiceBase, ITripleStoreService):
                 TripleStoreError(
                     operation="remove_schema",
                     filepath=filepath,
-                    message=self._error_message(exc),
+                    message=self.error_message(exc),
                 )
             )
             raise
@@ -5,7 +5,9 @@ from collections.abc import Callable
 from types import SimpleNamespace
 from typing import Any, cast
 
+import pytest
 import rdflib
+from naas_abi_core.services.triple_store.QueryResultCache import QueryResultCache
 from naas_abi_core.services.triple_store.TripleStorePorts import (
     ITripleStorePort,
     OntologyEvent,
@@ -159,9 +161,11 @@ def _sha(value: object) -> str:
     return hashlib.sha256(str(value).encode("utf-8")).hexdigest()
 
 
-def _build_service() -> tuple[TripleStoreService, _FakeTripleStoreAdapter, _FakeBus]:
+def _build_service(
+    publish_all_triples: bool = False,
+) -> tuple[TripleStoreService, _FakeTripleStoreAdapter, _FakeBus]:
     adapter = _FakeTripleStoreAdapter()
-    service = TripleStoreService(adapter)
+    service = TripleStoreService(adapter, publish_all_triples=publish_all_triples)
 
     # Ignore constructor bootstrapping insert of SCHEMA_TTL.
     adapter.insert_calls.clear()
@@ -448,3 +452,289 @@ SELECT ?filePath (COUNT(?s) AS ?n) WHERE {
     service.load_schemas(filepaths)
     assert len(adapter.insert_calls) == inserts_before
     assert len(adapter.remove_calls) == removes_before
+
+
+# ---------------------------------------------------------------------------
+# subscription registry: only subscribed triples are materialised
+# ---------------------------------------------------------------------------
+
+_G1 = URIRef("http://example.org/graphs/g1")
+_G2 = URIRef("http://example.org/graphs/g2")
+_EX = "http://example.org/"
+
+
+def _sample_graph() -> Graph:
+    graph = Graph()
+    for i in range(3):
+        subject = URIRef(f"{_EX}s{i}")
+        graph.add((subject, RDF.type, URIRef(f"{_EX}Entity")))
+        graph.add((subject, URIRef(f"{_EX}label"), Literal(f"entity {i}")))
+    return graph
+
+
+def _triple_messages(bus: _FakeBus) -> list[tuple[str, str, bytes]]:
+    return [m for m in bus.published if m[0] == "triple_store"]
+
+
+def test_insert_without_subscribers_publishes_no_triple_messages():
+    service, _, bus = _build_service()
+
+    service.insert(_sample_graph(), graph_name=_G1)
+
+    assert _triple_messages(bus) == []
+
+
+def test_only_triples_matching_a_live_subscription_are_published():
+    service, _, bus = _build_service()
+    service.subscribe(
+        (None, RDF.type, None),
+        lambda _: None,
+        event_type=OntologyEvent.INSERT,
+        graph_name=_G1,
+    )
+
+    service.insert(_sample_graph(), graph_name=_G1)
+    service.insert(_sample_graph(), graph_name=_G2)
+    service.remove(_sample_graph(), graph_name=_G1)
+
+    messages = _triple_messages(bus)
+    assert len(messages) == 3
+    assert all(
+        key.startswith(f"ts.insert.g.{_sha(_G1)[:32]}.") and f".p.{_sha(RDF.type)[:32]}." in key
+        for _, key, _ in messages
+    )
+
+
+def test_wildcard_subscription_and_publish_all_publish_every_triple():
+    service, _, bus = _build_service()
+    service.subscribe((None, None, None), lambda _: None)
+    service.insert(_sample_graph(), graph_name=_G2)
+    assert len(_triple_messages(bus)) == 6
+
+    # Publishing everything is the default: subscribers may live in another process.
+    publish_all = TripleStoreService(_FakeTripleStoreAdapter())
+    other_bus = _FakeBus()
+    publish_all.set_services(cast(Any, SimpleNamespace(bus=other_bus)))
+    publish_all.remove(_sample_graph(), graph_name=_G1)
+    assert len(_triple_messages(other_bus)) == 6
+    # Graph changes are not part of it: nobody here listens for them.
+    assert [m for m in other_bus.published if m[0] == "triple_store.graph"] == []
+
+
+def test_subscriber_raising_stop_iteration_leaves_the_registry():
+    service, _, bus = _build_service()
+    service.subscribe((URIRef(f"{_EX}s0"), None, None), lambda _: None)
+
+    service.insert(_sample_graph(), graph_name=_G1)
+    assert len(_triple_messages(bus)) == 2
+
+    def stop(_: bytes) -> None:
+        raise StopIteration()
+
+    service.subscribe((URIRef(f"{_EX}s1"), None, None), stop)
+    _, _, stop_message = bus.consumed[1]
+    try:
+        stop_message(b"")
+    except StopIteration:
+        pass
+    bus.published.clear()
+
+    service.insert(_sample_graph(), graph_name=_G1)
+    assert {payload.split()[0] for _, _, payload in _triple_messages(bus)} == {
+        f"<{_EX}s0>".encode()
+    }
+
+
+def test_graph_change_subscribers_get_one_ntriples_delta_per_write():
+    import json
+
+    service, _, bus = _build_service()
+    service.subscribe_graph_changes(lambda _: None, graph_name=_G1)
+    assert bus.consumed[0][:2] == ("triple_store.graph", f"*.g.{_sha(_G1)[:32]}")
+
+    service.insert(_sample_graph(), graph_name=_G1)
+    service.insert(_sample_graph(), graph_name=_G2)
+    service.clear_graph(_G1)
+
+    changes = [m for m in bus.published if m[0] == "triple_store.graph"]
+    assert [key for _, key, _ in changes] == [
+        f"insert.g.{_sha(_G1)[:32]}",
+        f"clear.g.{_sha(_G1)[:32]}",
+    ]
+    delta = json.loads(changes[0][2])
+    assert delta["operation"] == "insert" and delta["triple_count"] == 6
+    assert set(Graph().parse(data=delta["ntriples"], format="nt")) == set(_sample_graph())
+    assert _triple_messages(bus) == []
+
+
+def test_graph_changes_skip_the_delta_unless_a_subscriber_wants_it():
+    import json
+
+    service, _, bus = _build_service(publish_all_triples=True)
+    service.subscribe_graph_changes(lambda _: None, with_triples=False)
+    service.insert(_sample_graph(), graph_name=_G1)
+    changes = [m for m in bus.published if m[0] == "triple_store.graph"]
+    assert len(changes) == 1
+    delta = json.loads(changes[0][2])
+    assert delta["triple_count"] == 6 and delta["ntriples"] == ""
+
+    # Cross-process subscribers are invisible here: opt in to every delta.
+    adapter = _FakeTripleStoreAdapter()
+    everywhere = TripleStoreService(adapter, publish_graph_changes=True)
+    other_bus = _FakeBus()
+    everywhere.set_services(cast(Any, SimpleNamespace(bus=other_bus)))
+    everywhere.insert(_sample_graph(), graph_name=_G1)
+    (change,) = [m for m in other_bus.published if m[0] == "triple_store.graph"]
+    delta = json.loads(change[2])
+    assert set(Graph().parse(data=delta["ntriples"], format="nt")) == set(
+        _sample_graph()
+    )
+
+
+def test_query_results_are_cached_until_the_service_writes_their_graph():
+    adapter = _InMemoryTripleStoreAdapter()
+    service = TripleStoreService(adapter, query_cache=QueryResultCache())
+    service.set_services(cast(Any, SimpleNamespace(bus=_FakeBus())))
+    calls: list[str] = []
+    run_query = adapter.query
+    adapter.query = lambda q: calls.append(q) or run_query(q)  # type: ignore[method-assign]
+    query = f"SELECT ?s WHERE {{ GRAPH <{_G1}> {{ ?s ?p ?o }} }}"
+
+    assert len(service.query(query)) == 0
+    assert len(service.query(query)) == 0
+    service.insert(_sample_graph(), graph_name=_G2)
+    assert len(service.query(query)) == 0
+    assert len(calls) == 1
+
+    service.insert(_sample_graph(), graph_name=_G1)
+    assert len(service.query(query)) == len(_sample_graph())
+    assert len(calls) == 2
+
+
+def test_iter_query_streams_rows_past_the_cache():
+    adapter = _InMemoryTripleStoreAdapter()
+    service = TripleStoreService(adapter)
+    service.set_services(cast(Any, SimpleNamespace(bus=_FakeBus())))
+    service.insert(_sample_graph(), graph_name=_G1)
+    query = f"SELECT ?s ?o WHERE {{ GRAPH <{_G1}> {{ ?s ?p ?o }} }}"
+
+    rows = list(service.iter_query(query, batch_size=1))
+    assert {(row.s, row.o) for row in rows} == {(s, o) for s, _, o in _sample_graph()}
+    assert len(service.query(query)) == len(rows)  # not served from iter_query
+
+    with pytest.raises(ValueError):
+        service.iter_query(query, batch_size=0)
+    with pytest.raises(ValueError):
+        list(service.iter_query(f"ASK {{ GRAPH <{_G1}> {{ ?s ?p ?o }} }}"))
+
+
+def test_query_state_follows_writes_to_the_graphs_a_query_reads():
+    service, _, _ = _build_service()
+    query = f"SELECT ?s WHERE {{ GRAPH <{_G1}> {{ ?s ?p ?o }} }}"
+    state = service.query_state(query)
+
+    service.insert(_sample_graph(), graph_name=_G2)
+    assert service.query_state(query) == state
+    service.insert(_sample_graph(), graph_name=_G1)
+    assert service.query_state(query) != state
+
+
+def test_query_state_max_age_allows_long_limits_only_with_a_shared_cache():
+    adapter = _InMemoryTripleStoreAdapter()
+    local = TripleStoreService(adapter, query_cache=QueryResultCache(ttl_seconds=5.0))
+    assert local.query_state_max_age() == 5.0
+    assert local.query_state_max_age(300.0) == 5.0
+    assert local.query_state_max_age(1.0) == 1.0
+
+    cache = QueryResultCache(ttl_seconds=5.0)
+    shared = TripleStoreService(adapter, query_cache=cache)
+    cache.backing = lambda: cast(Any, object())  # a CacheService is wired
+    assert shared.query_state_max_age() == 5.0
+    assert shared.query_state_max_age(300.0) == 300.0
+
+
+def _write_schema(path, body: str) -> str:
+    path.write_text(f"@prefix ex: <http://example.org/> .\n\n{body}\n", encoding="utf-8")
+    return str(path)
+
+
+def test_schema_pipeline_reads_the_index_once_and_batches_writes(tmp_path):
+    adapter = _InMemoryTripleStoreAdapter()
+    service = TripleStoreService(adapter)
+    queries: list[str] = []
+    run_query = adapter.query
+    adapter.query = lambda q: queries.append(q) or run_query(q)  # type: ignore[method-assign]
+    first = _write_schema(tmp_path / "first.ttl", "ex:A a ex:Class .")
+    second = _write_schema(tmp_path / "second.ttl", "ex:B a ex:Class .")
+
+    pipeline = service.schema_load_pipeline()
+    pipeline.submit([first])
+    pipeline.submit([first, second])
+    report = pipeline.finish()
+
+    assert (report.files, report.new, report.failed) == (2, 2, 0)
+    assert sum("internal:fileLastUpdateTime ?fileLastUpdateTime" in q for q in queries) == 1
+
+    _write_schema(tmp_path / "first.ttl", "ex:A2 a ex:Class .")
+    adapter.insert_calls.clear()
+    adapter.remove_calls.clear()
+    report = service.load_schemas([first, second])
+
+    assert (report.changed, report.unchanged) == (1, 1)
+    assert len(adapter.insert_calls) == 1 and len(adapter.remove_calls) == 1
+    schema = adapter.graph.get_context(URIRef("http://ontology.naas.ai/graph/schema"))
+    ex = "http://example.org/"
+    assert (URIRef(f"{ex}A2"), RDF.type, URIRef(f"{ex}Class")) in schema
+    assert (URIRef(f"{ex}A"), RDF.type, URIRef(f"{ex}Class")) not in schema
+    assert service.load_schemas([first, second]).unchanged == 2
+
+
+def test_schema_pipeline_isolates_a_file_the_store_rejects(tmp_path):
+    adapter = _InMemoryTripleStoreAdapter()
+    service = TripleStoreService(adapter)
+    rejected = URIRef("http://example.org/Rejected")
+    insert = adapter.insert
+
+    def rejecting_insert(triples: Graph, graph_name: URIRef | None = None):
+        if (rejected, None, None) in triples:
+            raise RuntimeError("update too large")
+        insert(triples, graph_name)
+
+    adapter.insert = rejecting_insert  # type: ignore[method-assign]
+    good = _write_schema(tmp_path / "good.ttl", "ex:A a ex:Class .")
+    bad = _write_schema(tmp_path / "bad.ttl", "ex:Rejected a ex:Class .")
+    other = _write_schema(tmp_path / "other.ttl", "ex:B a ex:Class .")
+
+    report = service.load_schemas([good, bad, other])
+
+    assert (report.new, report.failed) == (3, 1)
+    assert service.load_schemas([good, other]).unchanged == 2
+    schema = adapter.graph.get_context(URIRef("http://ontology.naas.ai/graph/schema"))
+    assert (rejected, RDF.type, URIRef("http://example.org/Class")) not in schema
+
+
+def test_schema_pipeline_splits_writes_into_batches_of_whole_files(tmp_path):
+    adapter = _InMemoryTripleStoreAdapter()
+    service = TripleStoreService(adapter)
+    files = [
+        _write_schema(tmp_path / f"f{i}.ttl", f"ex:C{i} a ex:Class .") for i in range(3)
+    ]
+    adapter.insert_calls.clear()
+
+    pipeline = service.schema_load_pipeline(max_batch_triples=10)
+    pipeline.submit(files)
+    assert pipeline.finish().new == 3
+
+    # Each file is its class triple plus five metadata triples.
+    assert [len(triples) for triples, _ in adapter.insert_calls] == [6, 6, 6]
+
+
+def test_schema_pipeline_reports_unreadable_files_and_loads_the_rest(tmp_path):
+    service = TripleStoreService(_InMemoryTripleStoreAdapter())
+    good = _write_schema(tmp_path / "good.ttl", "ex:A a ex:Class .")
+    broken = _write_schema(tmp_path / "broken.ttl", "ex:A a")
+
+    report = service.load_schemas([good, broken, str(tmp_path / "missing.ttl")])
+
+    assert (report.new, report.failed) == (1, 2)
+    assert service.load_schemas([good]).unchanged == 1
@@ -64,6 +64,7 @@ License: MIT
 
 import socket
 import tempfile
+from collections.abc import Iterator
 from io import StringIO
 from typing import TYPE_CHECKING, Any
 
@@ -73,6 +74,11 @@ import rdflib
 import requests
 from botocore.auth import SigV4Auth
 from botocore.awsrequest import AWSRequest
+from naas_abi_core.services.triple_store.SparqlResultStream import (
+    DEFAULT_BATCH_SIZE,
+    SPARQL_JSON,
+    iter_response_rows,
+)
 from naas_abi_core.services.triple_store.TripleStorePorts import OntologyEvent
 from naas_abi_core.services.triple_store.TripleStoreService import ITripleStorePort
 from rdflib import Graph, URIRef
@@ -302,7 +308,13 @@ class AWSNeptune(ITripleStorePort):
         ).add_auth(request)
         return request.headers
 
-    def submit_query(self, data: Any, timeout: int = 60) -> requests.Response:
+    def submit_query(
+        self,
+        data: Any,
+        timeout: int = 60,
+        accept: str = "application/sparql-results+xml",
+        stream: bool = False,
+    ) -> requests.Response:
         """
         Submit a SPARQL query or update to the Neptune endpoint.
 
@@ -313,6 +325,9 @@ class AWSNeptune(ITripleStorePort):
             data (Any): Query data containing either 'query' or 'update' key
                 with the SPARQL statement as the value
             timeout (int, optional): Request timeout in seconds. Defaults to 60.
+            accept (str, optional): Accepted result media type.
+            stream (bool, optional): Leave the body unread for the caller to
+                consume (and close). Defaults to False.
 
         Returns:
             requests.Response: HTTP response from Neptune endpoint
@@ -328,7 +343,7 @@ class AWSNeptune(ITripleStorePort):
             >>> print(response.status_code)  # Should be 200 for success
         """
         headers = {}
-        headers["Accept"] = "application/sparql-results+xml"
+        headers["Accept"] = accept
         headers["Content-Type"] = "application/x-www-form-urlencoded"
 
         headers = self.__get_signed_headers(
@@ -344,6 +359,7 @@ class AWSNeptune(ITripleStorePort):
             timeout=timeout,
             verify=True,
             data=data,
+            stream=stream,
         )
 
         try:
@@ -597,6 +613,25 @@ class AWSNeptune(ITripleStorePort):
         """
         return self.query(query)
 
+    def iter_query(
+        self, query: str, batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> Iterator[ResultRow]:
+        """
+        Stream the rows of a SELECT query.
+
+        Requests SPARQL JSON results and decodes them ``batch_size`` bindings
+        at a time while the response streams in, instead of parsing the whole
+        XML document. Closing the iterator closes the HTTP response.
+
+        Example:
+            >>> for row in neptune.iter_query("SELECT ?s WHERE { ?s ?p ?o }"):
+            ...     print(row.s)
+        """
+        response = self.submit_query(
+            {QueryMode.QUERY.value: query}, accept=SPARQL_JSON, stream=True
+        )
+        return iter_response_rows(response, batch_size)
+
     def get_subject_graph(self, subject: URIRef, graph_name: str | URIRef) -> Graph:
         """
         Get all triples for a specific subject as an RDFLib Graph.
@@ -30,7 +30,8 @@ Batching strategy
 -----------------
 Current behavior is intentionally simple:
 
-- One adapter call -> one HTTP request.
+- One adapter call -> one HTTP request (unless write coalescing is enabled,
+  see below, which merges calls but never splits one).
 - No chunking/splitting is done in the adapter.
 - The full graph payload is serialized into one SPARQL Update body.
 
@@ -106,6 +107,25 @@ When a ``KeyValueService`` is provided:
 If no ``KeyValueService`` is provided, the adapter falls back to the
 ``threading.Lock`` (existing behaviour, no extra dependency required).
 
+Write coalescing
+----------------
+With ``coalesce_window_ms`` set, ``insert()`` and ``remove()`` go through a
+:class:`SparqlWriteCoalescer`. A change that finds no update in flight is
+sent at once. Changes submitted while an update is in flight are merged per
+named graph (the last operation on a triple wins) for up to the window and
+sent as one ``DELETE DATA ... ; INSERT DATA ...`` update, so a burst of small
+writes pays one lock acquisition and one round trip. A batch is sent early
+once it holds ``coalesce_max_triples`` triples.
+
+Both calls return the ``Future`` of their batch. By default
+(``coalesce_wait=True``) they also wait on it, so a returned call is durable
+as before and concurrent writers share updates; with ``coalesce_wait=False``
+they return immediately and callers wait on the future when they need to.
+``query()``, ``iter_query()`` and the graph-management calls first wait for
+pending writes, so the process reads its own writes and updates stay ordered.
+``flush()`` sends pending writes now; ``close()`` also stops the background
+thread (it runs at interpreter exit too).
+
 Blank node handling
 -------------------
 Blank nodes are filtered out in ``insert()`` and ``remove()`` payload builders,
@@ -123,6 +143,7 @@ Query behavior
   - RDF payloads (N-Triples/Turtle) -> ``rdflib.Graph``
 """
 
+import atexit
 import hashlib
 import json
 import logging
@@ -131,7 +152,8 @@ import random
 import re
 import threading
 import time
-from collections.abc import Generator
+from collections.abc import Generator, Iterator
+from concurrent.futures import Future, wait
 from contextlib import contextmanager
 from typing import TYPE_CHECKING, Any, Optional
 
@@ -140,6 +162,14 @@ if TYPE_CHECKING:
 
 import rdflib
 import requests
+from naas_abi_core.services.triple_store.SparqlResultStream import (
+    DEFAULT_BATCH_SIZE,
+    SPARQL_JSON,
+    iter_response_rows,
+)
+from naas_abi_core.services.triple_store.SparqlWriteCoalescer import (
+    SparqlWriteCoalescer,
+)
 from naas_abi_core.services.triple_store.TripleStorePorts import (
     Exceptions,
     ITripleStorePort,
@@ -160,6 +190,9 @@ class ApacheJenaTDB2(ITripleStorePort):
         max_retries: int = 3,
         retry_delay: float = 0.5,
         key_value_service: Optional["KeyValueService"] = None,
+        coalesce_window_ms: int | None = None,
+        coalesce_max_triples: int = 10_000,
+        coalesce_wait: bool = True,
     ):
         self.jena_tdb2_url = jena_tdb2_url.rstrip("/")
         self.query_endpoint = f"{self.jena_tdb2_url}/query"
@@ -176,9 +209,19 @@ class ApacheJenaTDB2(ITripleStorePort):
         self._dataset_lock_key = f"fuseki:write_lock:{_url_hash}"
         # Fallback thread lock used when no KeyValueService is provided.
         self._write_lock = threading.Lock()
+        self._coalesce_wait = coalesce_wait
+        self._coalescer: SparqlWriteCoalescer | None = None
 
         self._test_connection()
 
+        if coalesce_window_ms is not None:
+            self._coalescer = SparqlWriteCoalescer(
+                self._post_update,
+                window_ms=coalesce_window_ms,
+                max_triples=coalesce_max_triples,
+            )
+            atexit.register(self.close)
+
         logger.info("ApacheJenaTDB2 adapter initialized: %s", self.jena_tdb2_url)
 
     def _test_connection(self) -> None:
@@ -399,21 +442,28 @@ class ApacheJenaTDB2(ITripleStorePort):
                 return response
             raise AssertionError("unreachable: update retry loop must return or raise")
 
-    def _post_query(self, sparql: str) -> requests.Response:
+    def _post_query(
+        self,
+        sparql: str,
+        accept: str = "application/sparql-results+json,application/n-triples,text/turtle",
+        stream: bool = False,
+    ) -> requests.Response:
         """POST to the SPARQL query endpoint, retrying on transient 500/503.
 
         Read queries are not serialised by the write lock — Fuseki/TDB2 allows
-        concurrent readers.
+        concurrent readers. With ``stream=True`` the body is left unread for
+        the caller to consume (and close).
         """
         for attempt in range(self.max_retries + 1):
             response = self._session.post(
                 self.query_endpoint,
                 headers={
                     "Content-Type": "application/sparql-query",
-                    "Accept": "application/sparql-results+json,application/n-triples,text/turtle",
+                    "Accept": accept,
                 },
                 data=sparql.encode("utf-8"),
                 timeout=self.timeout,
+                stream=stream,
             )
             if response.status_code in self._RETRYABLE_STATUS_CODES and attempt < self.max_retries:
                 delay = self.retry_delay * (2 ** attempt) + random.uniform(0, 0.1)
@@ -424,6 +474,7 @@ class ApacheJenaTDB2(ITripleStorePort):
                     self.max_retries + 1,
                     delay,
                 )
+                response.close()
                 time.sleep(delay)
                 continue
             self._raise_for_status(
@@ -472,10 +523,49 @@ class ApacheJenaTDB2(ITripleStorePort):
             + "\n  }\n}"
         )
 
+    def __submit(
+        self, triples: Graph, graph_name: URIRef | None, insert: bool
+    ) -> Future:
+        assert self._coalescer is not None
+        future = self._coalescer.submit(
+            (
+                triple
+                for triple in triples
+                if not any(isinstance(term, BNode) for term in triple)
+            ),
+            graph_name,
+            insert,
+        )
+        if self._coalesce_wait:
+            future.result()
+        return future
+
+    def _drain_writes(self) -> None:
+        """Wait until coalesced writes submitted so far have been sent."""
+        if self._coalescer is not None:
+            wait([self._coalescer.flush()])
+
+    def flush(self) -> Future:
+        """Send coalesced writes now; the future resolves once they are
+        durable (immediately when coalescing is off)."""
+        if self._coalescer is None:
+            done: Future = Future()
+            done.set_result(None)
+            return done
+        return self._coalescer.flush()
+
+    def close(self) -> None:
+        """Send pending coalesced writes and stop the coalescer thread."""
+        if self._coalescer is not None:
+            self._coalescer.close()
+
     def insert(self, triples: Graph, graph_name: URIRef | None = None):
         if len(triples) == 0:
             return
 
+        if self._coalescer is not None:
+            return self.__submit(triples, graph_name, insert=True)
+
         insert_query = self.__build_data_update(
             "INSERT DATA", triples, graph_name=graph_name
         )
@@ -485,6 +575,9 @@ class ApacheJenaTDB2(ITripleStorePort):
         if len(triples) == 0:
             return
 
+        if self._coalescer is not None:
+            return self.__submit(triples, graph_name, insert=False)
+
         delete_query = self.__build_data_update(
             "DELETE DATA", triples, graph_name=graph_name
         )
@@ -529,6 +622,7 @@ class ApacheJenaTDB2(ITripleStorePort):
         )
 
     def query(self, query: str) -> Any:
+        self._drain_writes()
         is_update = self.__is_update_query(query)
 
         if is_update:
@@ -602,6 +696,18 @@ class ApacheJenaTDB2(ITripleStorePort):
     def query_view(self, view: str, query: str) -> Any:
         return self.query(query)
 
+    def iter_query(
+        self, query: str, batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> Iterator[rdflib.query.ResultRow]:
+        """Stream the rows of a SELECT query: the SPARQL JSON response is
+        decoded ``batch_size`` bindings at a time; closing the iterator
+        closes the response."""
+        if self.__is_update_query(query):
+            raise ValueError("iter_query only supports SELECT queries")
+        self._drain_writes()
+        response = self._post_query(query, accept=SPARQL_JSON, stream=True)
+        return iter_response_rows(response, batch_size)
+
     def get_subject_graph(self, subject: URIRef, graph_name: str | URIRef) -> Graph:
         query = f"""
         CONSTRUCT {{ <{subject!s}> ?p ?o . }}
@@ -1,3 +1,5 @@
+import threading
+from typing import cast
 from unittest.mock import MagicMock, Mock, patch
 
 import pytest
@@ -17,7 +19,7 @@ def _ok_response() -> Mock:
     return resp
 
 
-def _build_adapter() -> ApacheJenaTDB2:
+def _build_adapter(**kwargs) -> ApacheJenaTDB2:
     """Build an adapter with a mocked session so no real HTTP is made."""
     mock_session = MagicMock()
     mock_session.get.return_value = _ok_response()
@@ -26,7 +28,9 @@ def _build_adapter() -> ApacheJenaTDB2:
         "naas_abi_core.services.triple_store.adaptors.secondary.ApacheJenaTDB2.requests.Session",
         return_value=mock_session,
     ):
-        return ApacheJenaTDB2(jena_tdb2_url="http://localhost:3030/ds", timeout=30)
+        return ApacheJenaTDB2(
+            jena_tdb2_url="http://localhost:3030/ds", timeout=30, **kwargs
+        )
 
 
 def test_init_endpoints():
@@ -121,6 +125,34 @@ def test_query_select_returns_rows():
     assert str(result[0].s) == "http://example.org/alice"
 
 
+def test_iter_query_streams_json_bindings_from_the_query_endpoint():
+    adapter = _build_adapter()
+
+    response = _ok_response()
+    response.headers = {"Content-Type": "application/sparql-results+json"}
+    body = (
+        b'{"head":{"vars":["s"]},"results":{"bindings":['
+        b'{"s":{"type":"uri","value":"http://example.org/alice"}},'
+        b'{"s":{"type":"uri","value":"http://example.org/bob"}}]}}'
+    )
+    response.iter_content.return_value = iter([body[:50], body[50:]])
+    adapter._session.post.return_value = response
+
+    rows = adapter.iter_query("SELECT ?s WHERE { ?s ?p ?o }", batch_size=1)
+
+    assert [str(row.s) for row in rows] == [
+        "http://example.org/alice",
+        "http://example.org/bob",
+    ]
+    call = adapter._session.post.call_args
+    assert call.args[0] == adapter.query_endpoint
+    assert call.kwargs["stream"] is True
+    assert call.kwargs["headers"]["Accept"] == "application/sparql-results+json"
+    response.close.assert_called_once()
+    with pytest.raises(ValueError):
+        adapter.iter_query('INSERT DATA { <http://example.org/s> <http://example.org/p> "o" . }')
+
+
 def test_query_construct_returns_graph():
     adapter = _build_adapter()
 
@@ -537,3 +569,94 @@ def test_test_connection_does_not_retry_non_retryable_status(mock_sleep):
     assert exc_info.value.status_code == 401
     assert exc_info.value.attempts == 1
     mock_sleep.assert_not_called()
+
+
+# ---------------------------------------------------------------------------
+# Write coalescing
+# ---------------------------------------------------------------------------
+
+
+def _update_bodies(adapter: ApacheJenaTDB2) -> list[str]:
+    post = cast(MagicMock, adapter._session.post)
+    return [
+        c.kwargs["data"].decode("utf-8")
+        for c in post.call_args_list
+        if c.args[0] == adapter.update_endpoint
+    ]
+
+
+def test_coalesced_writes_are_merged_into_one_update():
+    adapter = _build_adapter(coalesce_window_ms=60_000, coalesce_wait=False)
+    people = URIRef("http://example.org/graphs/people")
+    alice = (URIRef("http://example.org/alice"), RDF.type, URIRef("http://example.org/Person"))
+    name = (URIRef("http://example.org/alice"), URIRef("http://example.org/name"), Literal("Alice"))
+    bob = (URIRef("http://example.org/bob"), RDF.type, URIRef("http://example.org/Person"))
+    started, release = threading.Event(), threading.Event()
+
+    def post(*args, **kwargs):
+        started.set()
+        release.wait(5)
+        return _ok_response()
+
+    cast(MagicMock, adapter._session.post).side_effect = post
+    in_flight = adapter.insert(Graph().add(bob))  # nothing in flight: sent at once
+    assert started.wait(5)
+
+    first = adapter.insert(Graph().add(alice).add(name), people)
+    second = adapter.remove(Graph().add(name), people)
+    third = adapter.insert(Graph().add(alice))
+    assert first is second is third and first is not in_flight
+    assert len(_update_bodies(adapter)) == 1
+
+    release.set()
+    adapter.flush().result(timeout=5)
+    assert first.done()
+    update = _update_bodies(adapter)[1]
+    delete, insert = update.split(" ;\n")
+    assert delete.startswith("DELETE DATA") and '"Alice"' in delete
+    assert insert.startswith("INSERT DATA") and '"Alice"' not in insert
+    assert insert.count("<http://example.org/alice>") == 2  # people graph + default graph
+    adapter.close()
+
+
+def test_coalesced_insert_waits_for_durability_by_default():
+    adapter = _build_adapter(coalesce_window_ms=0)
+    graph = Graph().add(
+        (URIRef("http://example.org/alice"), RDF.type, URIRef("http://example.org/Person"))
+    )
+
+    future = adapter.insert(graph)
+
+    assert future.done() and len(_update_bodies(adapter)) == 1
+    adapter.close()
+
+
+def test_queries_wait_for_pending_coalesced_writes():
+    adapter = _build_adapter(coalesce_window_ms=60_000, coalesce_wait=False)
+    adapter.insert(
+        Graph().add(
+            (URIRef("http://example.org/alice"), RDF.type, URIRef("http://example.org/Person"))
+        )
+    )
+
+    adapter.clear_graph(URIRef("http://example.org/graphs/people"))
+
+    bodies = _update_bodies(adapter)
+    assert bodies[0].startswith("INSERT DATA") and bodies[1].startswith("CLEAR GRAPH")
+    adapter.close()
+
+
+@patch("naas_abi_core.services.triple_store.adaptors.secondary.ApacheJenaTDB2.time.sleep")
+def test_coalesced_write_error_is_raised_to_waiting_callers(mock_sleep):
+    adapter = _build_adapter(coalesce_window_ms=0, max_retries=0)
+    failing = Mock(status_code=400)
+    failing.text = "Bad Request"
+    adapter._session.post.return_value = failing
+
+    with pytest.raises(Exceptions.RequestError):
+        adapter.insert(
+            Graph().add(
+                (URIRef("http://example.org/alice"), RDF.type, URIRef("http://example.org/Person"))
+            )
+        )
+    adapter.close()
@@ -8,6 +8,7 @@ Features:
 - Direct HTTP/REST API connection to Oxigraph
 - Full SPARQL 1.1 query and update operations
 - Named graph support
+- Streaming, chunked N-Triples bulk load through the Graph Store endpoint
 - RDFLib integration for seamless graph operations
 - Minimal resource footprint, ideal for development and Apple Silicon
 
@@ -35,14 +36,24 @@ License: MIT
 
 import logging
 import os
+import time
+from collections.abc import Iterable, Iterator
 
 import rdflib
 import requests
+import requests.adapters
+from naas_abi_core.services.triple_store.NTriples import triple_nt
+from naas_abi_core.services.triple_store.SparqlResultStream import (
+    DEFAULT_BATCH_SIZE,
+    SPARQL_JSON,
+    iter_response_rows,
+)
 from naas_abi_core.services.triple_store.TripleStorePorts import (
     ITripleStorePort,
     OntologyEvent,
 )
 from rdflib import BNode, Graph, URIRef
+from rdflib.term import Node
 
 logger = logging.getLogger(__name__)
 
@@ -96,7 +107,14 @@ class Oxigraph(ITripleStorePort):
         ...     print(f"Person: {row.person}, Name: {row.name}")
     """
 
-    def __init__(self, oxigraph_url: str = "http://localhost:7878", timeout: int = 60):
+    def __init__(
+        self,
+        oxigraph_url: str = "http://localhost:7878",
+        timeout: int = 60,
+        bulk_load_threshold: int = 100_000,
+        bulk_chunk_bytes: int = 8 * 1024 * 1024,
+        pool_maxsize: int = 10,
+    ):
         """
         Initialize Oxigraph adapter.
 
@@ -107,6 +125,13 @@ class Oxigraph(ITripleStorePort):
                 lets ``abi dev`` inject a per-worktree URL without rewriting
                 the config file.
             timeout (int): Request timeout in seconds. Defaults to 60
+            bulk_load_threshold (int): Graphs with more triples than this are
+                streamed through the Graph Store endpoint (see :meth:`bulk_load`)
+                instead of a single ``INSERT DATA`` update. Defaults to 100,000
+            bulk_chunk_bytes (int): Upper bound of the N-Triples payload sent
+                per bulk request, in bytes. Defaults to 8 MiB
+            pool_maxsize (int): Size of the pooled HTTP connection pool.
+                Defaults to 10
 
         Raises:
             requests.exceptions.ConnectionError: If Oxigraph is not accessible
@@ -117,6 +142,17 @@ class Oxigraph(ITripleStorePort):
         self.update_endpoint = f"{self.oxigraph_url}/update"
         self.store_endpoint = f"{self.oxigraph_url}/store"
         self.timeout = timeout
+        self.bulk_load_threshold = bulk_load_threshold
+        self.bulk_chunk_bytes = bulk_chunk_bytes
+
+        # One pooled session for every request: bulk loads issue many
+        # sequential POSTs and must not pay a TCP handshake per chunk.
+        self._session = requests.Session()
+        http_adapter = requests.adapters.HTTPAdapter(
+            pool_connections=pool_maxsize, pool_maxsize=pool_maxsize
+        )
+        self._session.mount("http://", http_adapter)
+        self._session.mount("https://", http_adapter)
 
         # Test connection
         self._test_connection()
@@ -131,7 +167,7 @@ class Oxigraph(ITripleStorePort):
             requests.exceptions.ConnectionError: If Oxigraph is not accessible
         """
         try:
-            response = requests.get(
+            response = self._session.get(
                 self.query_endpoint,
                 params={"query": "SELECT * WHERE { ?s ?p ?o } LIMIT 1"},
                 timeout=self.timeout,
@@ -141,77 +177,164 @@ class Oxigraph(ITripleStorePort):
             logger.error(f"Failed to connect to Oxigraph at {self.oxigraph_url}: {e}")
             raise
 
-    def __remove_blank_nodes(self, triples: Graph) -> Graph:
+    @staticmethod
+    def _iter_ntriples_chunks(
+        triples: Iterable[tuple[Node, Node, Node]], chunk_bytes: int
+    ) -> Iterator[tuple[bytes, int]]:
         """
-        Sanitize a graph by removing blank nodes.
+        Serialize triples to N-Triples in bounded-size chunks.
+
+        Triples containing blank nodes are skipped. Each yielded chunk is at
+        most ``chunk_bytes`` long unless a single triple exceeds it, so the
+        full serialization is never held in memory at once.
 
         Args:
-            triples (Graph): RDFLib Graph to sanitize
+            triples: Triples to serialize (typically an RDFLib Graph)
+            chunk_bytes (int): Maximum payload size per chunk in bytes
+
+        Yields:
+            tuple[bytes, int]: The N-Triples payload and its triple count
         """
-        clean_graph = Graph()
+        lines: list[bytes] = []
+        size = 0
         for s, p, o in triples:
-            if (
-                not isinstance(s, BNode)
-                and not isinstance(p, BNode)
-                and not isinstance(o, BNode)
-            ):
-                clean_graph.add((s, p, o))
-
-        for prefix, namespace in triples.namespaces():
-            clean_graph.bind(prefix, namespace)
+            if isinstance(s, BNode) or isinstance(p, BNode) or isinstance(o, BNode):
+                continue
+            line = triple_nt(s, p, o).encode()
+            if lines and size + len(line) > chunk_bytes:
+                yield b"".join(lines), len(lines)
+                lines = []
+                size = 0
+            lines.append(line)
+            size += len(line)
+        if lines:
+            yield b"".join(lines), len(lines)
+
+    def __serialize_ntriples(self, triples: Graph) -> bytes:
+        return b"".join(
+            payload
+            for payload, _ in self._iter_ntriples_chunks(
+                triples, self.bulk_chunk_bytes
+            )
+        )
 
-        return clean_graph
+    def _store_params(self, graph_name: URIRef | None) -> dict[str, str] | str:
+        if graph_name is None:
+            return "default"
+        return {"graph": str(graph_name)}
+
+    def __build_data_update(
+        self, operation: str, payload: bytes, graph_name: URIRef | None
+    ) -> bytes:
+        if graph_name is None:
+            return f"{operation} {{\n".encode() + payload + b"}"
+        return (
+            f"{operation} {{\n  GRAPH <{graph_name!s}> {{\n".encode()
+            + payload
+            + b"  }\n}"
+        )
 
-    def __insert_large_graph(self, triples: Graph):
+    def bulk_load(self, triples: Graph, graph_name: URIRef | None) -> int:
         """
-        Insert a large graph into Oxigraph.
+        Stream triples into Oxigraph through the Graph Store endpoint.
+
+        Triples are serialized lazily to N-Triples chunks of at most
+        ``bulk_chunk_bytes`` and each chunk is POSTed to
+        ``/store?graph=<graph_name>`` (or ``/store?default``), which appends
+        to the target graph. Memory therefore stays flat regardless of the
+        graph size. Throughput is logged for every chunk.
 
         Args:
             triples (Graph): RDFLib Graph containing triples to insert
+            graph_name (URIRef | None): Target named graph, or None for the
+                default graph
+
+        Returns:
+            int: Number of triples sent to Oxigraph
+
+        Raises:
+            requests.exceptions.HTTPError: If a chunk upload fails
         """
-        serialized = self.__remove_blank_nodes(triples).serialize(format="ntriples")
-        response = requests.post(
-            f"{self.store_endpoint}?default",
-            headers={"Content-Type": "application/n-triples"},
-            data=serialized.encode("utf-8"),
-            timeout=self.timeout,
+        params = self._store_params(graph_name)
+        total_triples = 0
+        total_bytes = 0
+        started_at = time.perf_counter()
+
+        for index, (payload, count) in enumerate(
+            self._iter_ntriples_chunks(triples, self.bulk_chunk_bytes), start=1
+        ):
+            chunk_started_at = time.perf_counter()
+            response = self._session.post(
+                self.store_endpoint,
+                params=params,
+                headers={"Content-Type": "application/n-triples"},
+                data=payload,
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+            elapsed = max(time.perf_counter() - chunk_started_at, 1e-9)
+            total_triples += count
+            total_bytes += len(payload)
+            logger.info(
+                "Oxigraph bulk load chunk %d: %d triples (%.1f KiB) in %.2fs "
+                "(%.0f triples/s, %.2f MiB/s)",
+                index,
+                count,
+                len(payload) / 1024,
+                elapsed,
+                count / elapsed,
+                len(payload) / elapsed / (1024 * 1024),
+            )
+
+        elapsed = max(time.perf_counter() - started_at, 1e-9)
+        logger.info(
+            "Oxigraph bulk load into %s: %d triples (%.1f MiB) in %.2fs (%.0f triples/s)",
+            graph_name if graph_name is not None else "default graph",
+            total_triples,
+            total_bytes / (1024 * 1024),
+            elapsed,
+            total_triples / elapsed,
         )
-        response.raise_for_status()
-        logger.debug(f"Inserted {len(triples)} triples into Oxigraph")
+        return total_triples
 
-    def __remove_large_graph(self, triples: Graph):
+    def __bulk_remove(self, triples: Graph, graph_name: URIRef | None) -> None:
         """
-        Remove a large graph from Oxigraph.
+        Remove a large graph from Oxigraph in bounded-size DELETE DATA updates.
+
+        The Graph Store ``DELETE`` verb drops a whole graph, so triple-level
+        removal of large graphs is done with one ``DELETE DATA`` update per
+        chunk instead.
 
         Args:
             triples (Graph): RDFLib Graph containing triples to remove
+            graph_name (URIRef | None): Target named graph, or None for the
+                default graph
         """
-        # Serialize as N-Triples
-        serialized = self.__remove_blank_nodes(triples).serialize(format="ntriples")
-        # Use the store endpoint with DELETE method to remove all these triples
-        response = requests.delete(
-            f"{self.store_endpoint}?default",
-            headers={"Content-Type": "application/n-triples"},
-            data=serialized,
-            timeout=self.timeout,
-        )
-        response.raise_for_status()
-        logger.debug(
-            f"Removed {len(triples)} triples from Oxigraph via store endpoint (large remove)"
-        )
+        removed = 0
+        for payload, count in self._iter_ntriples_chunks(
+            triples, self.bulk_chunk_bytes
+        ):
+            response = self._session.post(
+                self.update_endpoint,
+                headers={"Content-Type": "application/sparql-update"},
+                data=self.__build_data_update("DELETE DATA", payload, graph_name),
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+            removed += count
+        logger.debug(f"Removed {removed} triples from Oxigraph (chunked remove)")
 
     def insert(self, triples: Graph, graph_name: URIRef):
         """
         Insert RDF triples into Oxigraph.
 
-        This method converts an RDFLib Graph into SPARQL INSERT DATA queries
-        and sends them to Oxigraph via the update endpoint. Batching is
-        performed based on the serialized UTF-8 byte size of the SPARQL
-        payload, targeting batches up to `chunk_size` bytes.
+        Graphs up to ``bulk_load_threshold`` triples are sent as a single
+        SPARQL ``INSERT DATA`` update. Larger graphs, or updates rejected with
+        HTTP 413, are streamed in chunks through :meth:`bulk_load`.
 
         Args:
             triples (Graph): RDFLib Graph containing triples to insert
-            chunk_size (int): Maximum payload size per request in bytes. Defaults to 1,000,000
+            graph_name (URIRef): Target named graph
 
         Raises:
             requests.exceptions.HTTPError: If the insert operation fails
@@ -219,83 +342,57 @@ class Oxigraph(ITripleStorePort):
         """
         if len(triples) == 0:
             return
-        elif len(triples) > 100000:
-            if graph_name is not None:
-                raise NotImplementedError(
-                    "Named graph insert for large graphs is not supported in Oxigraph adapter"
-                )
-        else:
-            # Build INSERT DATA query
-            insert_query = f"INSERT DATA {{\n  GRAPH <{graph_name!s}> {{\n"
-
-            for s, p, o in triples:
-                if isinstance(s, BNode) or isinstance(p, BNode) or isinstance(o, BNode):
-                    continue
-                insert_query += f"  {s.n3()} {p.n3()} {o.n3()} .\n"
-
-            insert_query += "  }\n}"
+        if len(triples) > self.bulk_load_threshold:
+            self.bulk_load(triples, graph_name)
+            return
 
-            response = requests.post(
-                self.update_endpoint,
-                headers={"Content-Type": "application/sparql-update"},
-                data=insert_query.encode("utf-8"),
-                timeout=self.timeout,
-            )
+        payload = self.__serialize_ntriples(triples)
+        response = self._session.post(
+            self.update_endpoint,
+            headers={"Content-Type": "application/sparql-update"},
+            data=self.__build_data_update("INSERT DATA", payload, graph_name),
+            timeout=self.timeout,
+        )
 
-            if response.status_code == 413:
-                self.__insert_large_graph(triples)
-            else:
-                response.raise_for_status()
-                logger.debug(f"Inserted {len(triples)} triples into Oxigraph")
+        if response.status_code == 413:
+            self.bulk_load(triples, graph_name)
+        else:
+            response.raise_for_status()
+            logger.debug(f"Inserted {len(triples)} triples into Oxigraph")
 
     def remove(self, triples: Graph, graph_name: URIRef):
         """
         Remove RDF triples from Oxigraph.
 
-        This method constructs SPARQL DELETE DATA queries from the provided
-        graph and executes them against Oxigraph. For large graphs, it uses
-        the Oxigraph store endpoint with the DELETE method, similarly to how
-        insert handles large graphs.
+        Graphs up to ``bulk_load_threshold`` triples are removed with a single
+        SPARQL ``DELETE DATA`` update. Larger graphs, or updates rejected with
+        HTTP 413, are removed in bounded-size chunks.
 
         Args:
             triples (Graph): RDFLib Graph containing triples to remove
-            chunk_size (int): Maximum payload size per request in bytes. Defaults to 1,000,000
+            graph_name (URIRef): Target named graph
 
         Raises:
             requests.exceptions.HTTPError: If the remove operation fails
         """
         if len(triples) == 0:
             return
-        elif len(triples) > 100000:
-            if graph_name is not None:
-                raise NotImplementedError(
-                    "Named graph remove for large graphs is not supported in Oxigraph adapter"
-                )
-        else:
-            # Build DELETE DATA query
-            delete_query = f"DELETE DATA {{\n  GRAPH <{graph_name!s}> {{\n"
-
-            for s, p, o in triples:
-                if isinstance(s, BNode) or isinstance(p, BNode) or isinstance(o, BNode):
-                    continue
-                delete_query += f"  {s.n3()} {p.n3()} {o.n3()} .\n"
-
-            if graph_name is None:
-                delete_query += "}"
-            else:
-                delete_query += "  }\n}"
+        if len(triples) > self.bulk_load_threshold:
+            self.__bulk_remove(triples, graph_name)
+            return
 
-            response = requests.post(
-                self.update_endpoint,
-                headers={"Content-Type": "application/sparql-update"},
-                data=delete_query.encode("utf-8"),
-                timeout=self.timeout,
-            )
-            if response.status_code == 413:
-                self.__insert_large_graph(triples)
-            else:
-                response.raise_for_status()
-                logger.debug(f"Inserted {len(triples)} triples into Oxigraph")
+        payload = self.__serialize_ntriples(triples)
+        response = self._session.post(
+            self.update_endpoint,
+            headers={"Content-Type": "application/sparql-update"},
+            data=self.__build_data_update("DELETE DATA", payload, graph_name),
+            timeout=self.timeout,
+        )
+        if response.status_code == 413:
+            self.__bulk_remove(triples, graph_name)
+        else:
+            response.raise_for_status()
+            logger.debug(f"Removed {len(triples)} triples from Oxigraph")
 
     def get(self) -> Graph:
         """
@@ -312,7 +409,7 @@ class Oxigraph(ITripleStorePort):
         Raises:
             requests.exceptions.HTTPError: If the query fails
         """
-        response = requests.get(
+        response = self._session.get(
             self.store_endpoint, headers={"Accept": "text/turtle"}, timeout=self.timeout
         )
 
@@ -389,7 +486,7 @@ class Oxigraph(ITripleStorePort):
 
         if is_update:
             # SPARQL Update
-            response = requests.post(
+            response = self._session.post(
                 self.update_endpoint,
                 headers={"Content-Type": "application/sparql-update"},
                 data=query.encode("utf-8"),
@@ -397,7 +494,7 @@ class Oxigraph(ITripleStorePort):
             )
         else:
             # SPARQL Query
-            response = requests.post(
+            response = self._session.post(
                 self.query_endpoint,
                 headers={
                     "Content-Type": "application/sparql-query",
@@ -517,6 +614,37 @@ class Oxigraph(ITripleStorePort):
         """
         return self.query(query)
 
+    def iter_query(
+        self, query: str, batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> Iterator[rdflib.query.ResultRow]:
+        """
+        Stream the rows of a SELECT query.
+
+        The SPARQL JSON response is read in chunks and decoded ``batch_size``
+        bindings at a time instead of being loaded whole. Breaking out of the
+        loop (or closing the iterator) closes the HTTP response.
+
+        Example:
+            >>> for row in oxigraph.iter_query("SELECT ?s WHERE { ?s ?p ?o }"):
+            ...     print(row.s)
+        """
+        response = self._session.post(
+            self.query_endpoint,
+            headers={
+                "Content-Type": "application/sparql-query",
+                "Accept": SPARQL_JSON,
+            },
+            data=query.encode("utf-8"),
+            timeout=self.timeout,
+            stream=True,
+        )
+        try:
+            response.raise_for_status()
+        except Exception:
+            response.close()
+            raise
+        return iter_response_rows(response, batch_size)
+
     def get_subject_graph(self, subject: URIRef, graph_name: str | URIRef) -> Graph:
         """
         Get all triples for a specific subject as an RDFLib Graph.
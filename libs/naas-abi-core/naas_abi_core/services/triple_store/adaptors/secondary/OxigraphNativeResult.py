@@ -0,0 +1,126 @@
+"""rdflib views over pyoxigraph query results, without a serialization round trip.
+
+The embedded Oxigraph adaptor used to serialize every result (SPARQL JSON
+for SELECT/ASK, N-Triples for CONSTRUCT) and parse it back with rdflib.
+Here pyoxigraph terms are converted to rdflib terms directly:
+
+* SELECT — an ``rdflib.query.Result`` whose bindings are a generator over
+  the pyoxigraph solutions, so rows are converted one at a time while the
+  caller iterates (rdflib's own lazy-bindings mechanism: ``ResultRow`` rows,
+  ``len()``/``bindings`` materialize on demand, re-iteration works).
+* ASK — a ``Result`` carrying ``askAnswer``.
+* CONSTRUCT/DESCRIBE — an rdflib ``Graph`` filled from the triples.
+
+:func:`solution_rows` streams ``ResultRow`` objects without keeping them
+(rdflib's ``Result`` retains every row it yields, for re-iteration); it
+backs the adaptor's ``iter_query``.
+
+pyoxigraph evaluates a query against a snapshot of the store, so a lazily
+consumed result is not affected by later writes.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from rdflib import BNode, Graph, Literal, URIRef, Variable
+from rdflib.query import Result, ResultRow
+
+XSD_STRING = "http://www.w3.org/2001/XMLSchema#string"
+
+# IRIs and blank nodes repeat across rows (predicates, types, graph names);
+# the cache is reset when it grows past this many entries.
+_MAX_CACHED_TERMS = 65_536
+
+
+def _iri(value: str) -> URIRef:
+    # Oxigraph only hands out IRIs it has already validated, so skip
+    # URIRef's own validation (a large share of the conversion cost).
+    return str.__new__(URIRef, value)
+
+
+class TermConverter:
+    """Converts pyoxigraph terms to rdflib terms, reusing the rdflib object
+    for IRIs and blank nodes already seen in the same result."""
+
+    __slots__ = ("_cache",)
+
+    def __init__(self) -> None:
+        self._cache: dict[Any, Any] = {}
+
+    def __call__(self, term: Any) -> Any:
+        from pyoxigraph import BlankNode, NamedNode
+        from pyoxigraph import Literal as OxLiteral
+
+        cached = self._cache.get(term)
+        if cached is not None:
+            return cached
+        kind = type(term)
+        if kind is OxLiteral:
+            # Literals are mostly distinct values; not worth caching.
+            if term.language:
+                return Literal(term.value, lang=term.language)
+            datatype = term.datatype
+            if datatype.value == XSD_STRING:
+                return Literal(term.value)
+            return Literal(term.value, datatype=self(datatype))
+        if kind is NamedNode:
+            converted: Any = _iri(term.value)
+        elif kind is BlankNode:
+            converted = BNode(term.value)
+        else:
+            raise ValueError(f"Unsupported Oxigraph term: {term!r}")
+        if len(self._cache) >= _MAX_CACHED_TERMS:
+            self._cache.clear()
+        self._cache[term] = converted
+        return converted
+
+
+def _bindings(
+    solutions: Any,
+) -> tuple[list[Variable], Iterator[dict[Variable, Any]]]:
+    variables = [Variable(v.value) for v in solutions.variables]
+    convert = TermConverter()
+
+    def bindings() -> Iterator[dict[Variable, Any]]:
+        for solution in solutions:
+            yield {
+                var: convert(term)
+                for var, term in zip(variables, solution)
+                if term is not None
+            }
+
+    return variables, bindings()
+
+
+def solutions_result(solutions: Any) -> Result:
+    """SELECT result streaming rows from pyoxigraph ``QuerySolutions``."""
+    variables, bindings = _bindings(solutions)
+    result = Result("SELECT")
+    result.vars = variables
+    result.bindings = bindings
+    return result
+
+
+def solution_rows(solutions: Any) -> Iterator[ResultRow]:
+    """``ResultRow`` per pyoxigraph solution, converted on demand."""
+    variables, bindings = _bindings(solutions)
+    for values in bindings:
+        yield ResultRow(values, variables)
+
+
+def boolean_result(answer: bool) -> Result:
+    result = Result("ASK")
+    result.askAnswer = answer
+    return result
+
+
+def triples_graph(triples: Iterable[Any]) -> Graph:
+    """rdflib ``Graph`` holding pyoxigraph ``QueryTriples``."""
+    convert = TermConverter()
+    graph = Graph()
+    graph.addN(
+        (convert(s), convert(p), convert(o), graph) for s, p, o in triples
+    )
+    return graph
@@ -1,4 +1,5 @@
 import uuid
+from unittest.mock import MagicMock, Mock, patch
 
 import pytest
 import requests
@@ -7,6 +8,132 @@ from rdflib import RDF, BNode, Graph, Literal, URIRef
 
 TEST_GRAPH_NAME = URIRef("http://example.org/test/graph1")
 
+
+def _ok_response(status_code: int = 200) -> Mock:
+    resp = Mock(status_code=status_code)
+    resp.raise_for_status = Mock()
+    return resp
+
+
+def _build_adapter(**kwargs) -> Oxigraph:
+    """Build an adapter with a mocked session so no real HTTP is made."""
+    mock_session = MagicMock()
+    mock_session.get.return_value = _ok_response()
+    mock_session.post.return_value = _ok_response()
+    with patch(
+        "naas_abi_core.services.triple_store.adaptors.secondary.Oxigraph.requests.Session",
+        return_value=mock_session,
+    ):
+        return Oxigraph(oxigraph_url="http://localhost:7878", **kwargs)
+
+
+def _people_graph(num_people: int) -> Graph:
+    g = Graph()
+    for i in range(num_people):
+        g.add(
+            (
+                URIRef(f"http://example.org/person{i}"),
+                RDF.type,
+                URIRef("http://example.org/Person"),
+            )
+        )
+    return g
+
+
+def test_iter_ntriples_chunks_respects_chunk_size_and_skips_blank_nodes():
+    g = _people_graph(50)
+    g.add((BNode(), RDF.type, URIRef("http://example.org/Person")))
+
+    chunks = list(Oxigraph._iter_ntriples_chunks(g, chunk_bytes=500))
+
+    assert len(chunks) > 1
+    assert all(len(payload) <= 500 for payload, _ in chunks)
+    assert sum(count for _, count in chunks) == 50
+    parsed = Graph().parse(data=b"".join(p for p, _ in chunks), format="nt")
+    assert len(parsed) == 50
+
+
+def test_iter_ntriples_chunks_escapes_multiline_literals():
+    g = Graph()
+    g.add(
+        (
+            URIRef("http://example.org/alice"),
+            URIRef("http://example.org/bio"),
+            Literal('line one\nline "two"'),
+        )
+    )
+
+    (payload, count), = list(Oxigraph._iter_ntriples_chunks(g, chunk_bytes=1024))
+
+    assert count == 1
+    assert b"\n" not in payload.rstrip(b"\n")
+    assert len(Graph().parse(data=payload, format="nt")) == 1
+
+
+def test_insert_small_graph_posts_single_insert_data_into_named_graph():
+    adapter = _build_adapter()
+
+    adapter.insert(_people_graph(3), TEST_GRAPH_NAME)
+
+    assert adapter._session.post.call_count == 1
+    call = adapter._session.post.call_args
+    assert call.args[0] == adapter.update_endpoint
+    assert call.kwargs["data"].startswith(b"INSERT DATA {")
+    assert f"GRAPH <{TEST_GRAPH_NAME}>".encode() in call.kwargs["data"]
+
+
+def test_insert_above_threshold_streams_chunks_to_named_graph_store():
+    adapter = _build_adapter(bulk_load_threshold=10, bulk_chunk_bytes=400)
+
+    adapter.insert(_people_graph(40), TEST_GRAPH_NAME)
+
+    calls = adapter._session.post.call_args_list
+    assert len(calls) > 1
+    for call in calls:
+        assert call.args[0] == adapter.store_endpoint
+        assert call.kwargs["params"] == {"graph": str(TEST_GRAPH_NAME)}
+        assert call.kwargs["headers"]["Content-Type"] == "application/n-triples"
+        assert len(call.kwargs["data"]) <= 400
+    loaded = Graph()
+    for call in calls:
+        loaded.parse(data=call.kwargs["data"], format="nt")
+    assert len(loaded) == 40
+
+
+def test_insert_falls_back_to_bulk_load_on_413():
+    adapter = _build_adapter()
+    adapter._session.post.side_effect = [_ok_response(413), _ok_response()]
+
+    adapter.insert(_people_graph(3), TEST_GRAPH_NAME)
+
+    calls = adapter._session.post.call_args_list
+    assert calls[0].args[0] == adapter.update_endpoint
+    assert calls[1].args[0] == adapter.store_endpoint
+    assert calls[1].kwargs["params"] == {"graph": str(TEST_GRAPH_NAME)}
+
+
+def test_bulk_load_returns_triple_count_and_targets_default_graph():
+    adapter = _build_adapter(bulk_chunk_bytes=300)
+
+    loaded = adapter.bulk_load(_people_graph(20), None)
+
+    assert loaded == 20
+    for call in adapter._session.post.call_args_list:
+        assert call.kwargs["params"] == "default"
+
+
+def test_remove_above_threshold_uses_chunked_delete_data():
+    adapter = _build_adapter(bulk_load_threshold=10, bulk_chunk_bytes=400)
+
+    adapter.remove(_people_graph(40), TEST_GRAPH_NAME)
+
+    calls = adapter._session.post.call_args_list
+    assert len(calls) > 1
+    for call in calls:
+        assert call.args[0] == adapter.update_endpoint
+        assert call.kwargs["data"].startswith(b"DELETE DATA {")
+        assert f"GRAPH <{TEST_GRAPH_NAME}>".encode() in call.kwargs["data"]
+
 # class TestOxigraph:
 #     """Test suite for the Oxigraph triple store adapter."""
 
@@ -0,0 +1,233 @@
+"""On-disk triple index for the filesystem triple store adaptor.
+
+The filesystem adaptor keeps one Turtle file per subject (named by the hash of
+the subject IRI). Parsing every file at startup made opening the store, and
+its memory, linear in the store size. :class:`SubjectIndex` keeps the same
+triples in one SQLite database next to the files:
+
+* ``triples`` — every triple as N-Triples terms, clustered by subject (a
+  subject's triples are one range scan) with ``(predicate, object)`` and
+  ``(object)`` indexes serving as posting lists for triple-pattern lookups.
+* ``subject_log`` — an append-only log of the subjects changed by each write.
+  The index is updated in the same transaction, so a write is durable once
+  logged; the subject's Turtle file is rewritten later, when the log is
+  compacted, and the entries up to the rewritten state are dropped.
+* ``namespaces`` — prefix bindings, re-applied when files are rewritten.
+
+The Turtle files stay the human-readable copy (views link to them); the index
+can always be rebuilt from them with :meth:`SubjectIndex.rebuild`.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from collections.abc import Iterable, Iterator
+
+from naas_abi_core.services.triple_store.NTriples import term_nt
+from rdflib import Graph
+from rdflib.term import Node
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS triples (
+    s TEXT NOT NULL,
+    p TEXT NOT NULL,
+    o TEXT NOT NULL,
+    PRIMARY KEY (s, p, o)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS triples_po ON triples (p, o);
+CREATE INDEX IF NOT EXISTS triples_o ON triples (o);
+CREATE TABLE IF NOT EXISTS subject_log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    s TEXT NOT NULL,
+    file_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS namespaces (
+    prefix TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def parse_rows(rows: Iterable[tuple[str, str, str]]) -> Graph:
+    """Graph of index rows (N-Triples terms)."""
+    graph = Graph()
+    data = "".join(f"{s} {p} {o} .\n" for s, p, o in rows)
+    if data:
+        graph.parse(data=data, format="nt")
+    return graph
+
+
+class SubjectIndex:
+    """SQLite triple index plus subject change log; thread safe."""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        self.is_new = version != SCHEMA_VERSION
+        if self.is_new:
+            self._conn.executescript(
+                "DROP TABLE IF EXISTS triples; DROP TABLE IF EXISTS subject_log;"
+                "DROP TABLE IF EXISTS namespaces; DROP TABLE IF EXISTS meta;"
+            )
+        self._conn.executescript(SCHEMA)
+        self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # --- writes -----------------------------------------------------------
+
+    def rebuild(self, graphs: Iterable[Graph]) -> None:
+        """Replace the index with the triples of ``graphs`` (the parsed
+        subject files); the change log is cleared."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM triples")
+            self._conn.execute("DELETE FROM subject_log")
+            for graph in graphs:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO triples (s, p, o) VALUES (?, ?, ?)",
+                    ((term_nt(s), term_nt(p), term_nt(o)) for s, p, o in graph),
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO namespaces (prefix, namespace) VALUES (?, ?)",
+                    ((prefix, str(ns)) for prefix, ns in graph.namespaces()),
+                )
+
+    def apply(
+        self,
+        triples: Graph,
+        file_hashes: dict[Node, str],
+        insert: bool,
+    ) -> None:
+        """Insert (or remove) ``triples`` and log their subjects, atomically."""
+        rows = [(term_nt(s), term_nt(p), term_nt(o)) for s, p, o in triples]
+        sql = (
+            "INSERT OR IGNORE INTO triples (s, p, o) VALUES (?, ?, ?)"
+            if insert
+            else "DELETE FROM triples WHERE s = ? AND p = ? AND o = ?"
+        )
+        with self._lock, self._conn:
+            self._conn.executemany(sql, rows)
+            self._conn.executemany(
+                "INSERT INTO subject_log (s, file_hash) VALUES (?, ?)",
+                ((term_nt(s), file_hash) for s, file_hash in file_hashes.items()),
+            )
+            if insert:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO namespaces (prefix, namespace) VALUES (?, ?)",
+                    ((prefix, str(ns)) for prefix, ns in triples.namespaces()),
+                )
+
+    # --- reads ------------------------------------------------------------
+
+    def match(
+        self, s: Node | None = None, p: Node | None = None, o: Node | None = None
+    ) -> list[tuple[str, str, str]]:
+        """Rows matching a triple pattern (``None`` is a wildcard)."""
+        clauses, params = [], []
+        for column, term in (("s", s), ("p", p), ("o", o)):
+            if term is not None:
+                clauses.append(f"{column} = ?")
+                params.append(term_nt(term))
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT s, p, o FROM triples{where}", params
+            ).fetchall()
+
+    def rows(self, batch_size: int = 10_000) -> Iterator[list[tuple[str, str, str]]]:
+        """Every row, ``batch_size`` at a time."""
+        last: tuple[str, str, str] = ("", "", "")
+        while True:
+            with self._lock:
+                batch = self._conn.execute(
+                    "SELECT s, p, o FROM triples WHERE (s, p, o) > (?, ?, ?) "
+                    "ORDER BY s, p, o LIMIT ?",
+                    (*last, batch_size),
+                ).fetchall()
+            if not batch:
+                return
+            yield batch
+            last = batch[-1]
+
+    def has_subject(self, s: Node) -> bool:
+        with self._lock:
+            return (
+                self._conn.execute(
+                    "SELECT 1 FROM triples WHERE s = ? LIMIT 1", (term_nt(s),)
+                ).fetchone()
+                is not None
+            )
+
+    def namespaces(self) -> list[tuple[str, str]]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT prefix, namespace FROM namespaces"
+            ).fetchall()
+
+    def logged(self, s: Node) -> bool:
+        """Whether ``s`` has changes not yet written to its subject file."""
+        with self._lock:
+            return (
+                self._conn.execute(
+                    "SELECT 1 FROM subject_log WHERE s = ? LIMIT 1", (term_nt(s),)
+                ).fetchone()
+                is not None
+            )
+
+    # --- compaction -------------------------------------------------------
+
+    def pending(self, limit: int) -> list[tuple[str, str, int]]:
+        """Up to ``limit`` logged subjects as ``(s, file_hash, last_seq)``."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT s, file_hash, MAX(seq) FROM subject_log "
+                "GROUP BY s ORDER BY MIN(seq) LIMIT ?",
+                (limit,),
+            ).fetchall()
+
+    def subject_rows(self, s: str) -> list[tuple[str, str, str]]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT s, p, o FROM triples WHERE s = ?", (s,)
+            ).fetchall()
+
+    def compacted(self, s: str, through_seq: int) -> None:
+        """Drop the log entries of ``s`` up to ``through_seq`` once its file
+        reflects them."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM subject_log WHERE s = ? AND seq <= ?", (s, through_seq)
+            )
+
+    def has_pending(self) -> bool:
+        with self._lock:
+            return (
+                self._conn.execute("SELECT 1 FROM subject_log LIMIT 1").fetchone()
+                is not None
+            )
+
+    def get_meta(self, key: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+            )
@@ -1,18 +1,40 @@
+"""Filesystem triple store: one Turtle file per subject under ``triples/``.
+
+Opening the store no longer parses the subject files. The triples are kept
+in a :class:`SubjectIndex` (``index.sqlite`` in the store directory), which
+answers ``get_subject_graph``, ``triples()`` pattern lookups and view label
+lookups directly. Writes update the index and append the changed subjects to
+its log; a background thread then rewrites those subjects' Turtle files
+(``compact()`` does it synchronously), so views, which link to the files,
+trail writes by up to a compaction round. The rdflib graph behind ``get()``
+and SPARQL ``query()`` is only built, from the index, on first use.
+
+The index is rebuilt from the Turtle files when it is missing, when its
+schema changed, or when a file under ``triples/`` was added, removed or
+edited outside the adaptor while no compaction was pending.
+"""
+
 import os
+import sqlite3
 import tempfile
-from threading import Lock
-from typing import Any
+from collections.abc import Iterator
+from threading import Event, Lock, Thread
+from typing import cast
 
 import rdflib
 from naas_abi_core.services.triple_store.adaptors.secondary.base.TripleStoreService__SecondaryAdaptor__FileBase import (
     TripleStoreService__SecondaryAdaptor__FileBase,
 )
+from naas_abi_core.services.triple_store.adaptors.secondary.SubjectIndex import (
+    SubjectIndex,
+    parse_rows,
+)
 from naas_abi_core.services.triple_store.TripleStorePorts import (
     Exceptions,
     ITripleStorePort,
     OntologyEvent,
 )
-from rdflib import RDFS, BNode, Graph, URIRef, query
+from rdflib import RDFS, BNode, Graph, Node, URIRef, query
 
 
 class TripleStoreService__SecondaryAdaptor__Filesystem(
@@ -21,18 +43,39 @@ class TripleStoreService__SecondaryAdaptor__Filesystem(
     __store_path: str
     __triples_path: str
 
-    __live_graph: Graph
+    __live_graph: Graph | None
 
     __lock: Lock
 
+    __index: SubjectIndex
+
+    # Subjects rewritten per compaction round, and the pause before a round
+    # so that a burst of writes to the same subjects is written once.
+    COMPACTION_BATCH = 256
+    COMPACTION_DELAY_S = 0.5
+
     def __init__(self, store_path: str, triples_path: str = "triples"):
         self.__store_path = store_path
         self.__triples_path = triples_path
         self.__lock = Lock()
+        self.__compaction_lock = Lock()
+        self.__compaction_guard = Lock()
+        self.__compaction_thread: Thread | None = None
+        self.__compaction_requested = False
+        self.__closing = Event()
 
         os.makedirs(os.path.join(self.__store_path, self.__triples_path), exist_ok=True)
 
-        self.__live_graph = self.load()
+        self.__live_graph = None
+        self.__index = SubjectIndex(os.path.join(self.__store_path, "index.sqlite"))
+
+        if self.__index.is_new or (
+            not self.__index.has_pending()
+            and self.__index.get_meta("files_stamp") != self.__files_stamp()
+        ):
+            self.rebuild_index()
+        elif self.__index.has_pending():
+            self.__schedule_compaction()
 
     def __merge_graphs(self, graphs: list[Graph]) -> Graph:
         merged_graph = Graph()
@@ -63,42 +106,137 @@ class TripleStoreService__SecondaryAdaptor__Filesystem(
         graph.serialize(destination=temp_path, format="turtle")
         os.replace(temp_path, destination)
 
-    ## File System Methods
+    def __files_stamp(self) -> str:
+        """Fingerprint of the subject files (count, total size, newest
+        modification), so that edits in place are noticed as well."""
+        count = size = newest = 0
+        with os.scandir(os.path.join(self.__store_path, "triples")) as entries:
+            for entry in entries:
+                stat = entry.stat()
+                count += 1
+                size += stat.st_size
+                newest = max(newest, stat.st_mtime_ns)
+        return f"{count}:{size}:{newest}"
+
+    def __subject_graph(self, rows: list[tuple[str, str, str]]) -> Graph:
+        graph = parse_rows(rows)
+        for prefix, namespace in self.__index.namespaces():
+            graph.bind(prefix, namespace)
+        return graph
+
+    ## Index and compaction
+
+    def rebuild_index(self) -> None:
+        """Rebuild the index from the subject files (after they were changed
+        outside the adaptor)."""
+        from naas_abi_core import logger
+
+        with self.__compaction_lock, self.__lock:
+            directory = os.path.join(self.__store_path, "triples")
+
+            def graphs() -> Iterator[Graph]:
+                for file in os.listdir(directory):
+                    try:
+                        yield Graph().parse(self.hash_triples_path(file), format="turtle")
+                    except Exception as e:
+                        logger.error(
+                            f"Error loading triples from {self.hash_triples_path(file)}: {e}"
+                        )
+                        raise
+
+            self.__index.rebuild(graphs())
+            self.__index.set_meta("files_stamp", self.__files_stamp())
+            self.__live_graph = None
+
+    def compact(self) -> int:
+        """Rewrite the subject files of every logged change; returns the
+        number of files written."""
+        written = 0
+        with self.__compaction_lock:
+            while batch := self.__index.pending(self.COMPACTION_BATCH):
+                for subject, subject_hash, through_seq in batch:
+                    graph = self.__subject_graph(self.__index.subject_rows(subject))
+                    self.__serialize_atomic(graph, self.hash_triples_path(subject_hash))
+                    self.__index.compacted(subject, through_seq)
+                    written += 1
+            with self.__lock:
+                if not self.__index.has_pending():
+                    self.__index.set_meta("files_stamp", self.__files_stamp())
+        return written
+
+    def close(self) -> None:
+        """Write pending subject files and close the index."""
+        self.__closing.set()
+        with self.__compaction_guard:
+            thread = self.__compaction_thread
+        if thread is not None:
+            thread.join()
+        self.compact()
+        self.__index.close()
+
+    def __schedule_compaction(self) -> None:
+        with self.__compaction_guard:
+            self.__compaction_requested = True
+            if self.__compaction_thread is None:
+                self.__compaction_thread = Thread(
+                    target=self.__compaction_worker,
+                    name="fs-triplestore-compaction",
+                    daemon=True,
+                )
+                self.__compaction_thread.start()
+
+    def __compaction_worker(self) -> None:
+        from naas_abi_core import logger
+
+        try:
+            while True:
+                with self.__compaction_guard:
+                    if not self.__compaction_requested:
+                        self.__compaction_thread = None
+                        return
+                    self.__compaction_requested = False
+                self.__closing.wait(self.COMPACTION_DELAY_S)
+                try:
+                    self.compact()
+                except (OSError, sqlite3.Error) as e:
+                    # The index keeps the changes logged; the next write retries.
+                    logger.error(f"Error compacting filesystem triple store: {e}")
+        except BaseException:
+            # Let the next write start a new worker.
+            with self.__compaction_guard:
+                self.__compaction_thread = None
+            raise
 
-    def insert(self, triples: Graph, graph_name: URIRef | None = None):
-        if graph_name is not None:
-            raise NotImplementedError(
-                "Named graphs are not supported by filesystem triple store adapter"
-            )
+    ## File System Methods
 
+    def __apply(self, triples: Graph, insert: bool) -> None:
         with self.__lock:
-            triples_by_subject: dict[Any, list[tuple[Any, Any]]] = (
-                self.triples_by_subject(triples)
+            self.__index.apply(
+                triples,
+                {
+                    subject: self.iri_hash(cast(URIRef, subject))
+                    for subject in triples.subjects(unique=True)
+                },
+                insert=insert,
             )
 
-            for subject in triples_by_subject:
-                subject_hash = self.iri_hash(subject)
-
-                if not os.path.exists(self.hash_triples_path(subject_hash)):
-                    graph = Graph()
-
+            if self.__live_graph is not None:
+                if insert:
                     for prefix, namespace in triples.namespaces():
-                        graph.bind(prefix, namespace)
+                        self.__live_graph.bind(prefix, namespace)
+                    self.__live_graph += triples
                 else:
-                    graph = Graph().parse(
-                        self.hash_triples_path(subject_hash), format="turtle"
-                    )
-
-                for p, o in triples_by_subject[subject]:
-                    graph.add((subject, p, o))
+                    self.__live_graph -= triples
 
-                self.__serialize_atomic(graph, self.hash_triples_path(subject_hash))
+        self.__schedule_compaction()
 
-            for prefix, namespace in triples.namespaces():
-                self.__live_graph.bind(prefix, namespace)
+    def insert(self, triples: Graph, graph_name: URIRef | None = None):
+        if graph_name is not None:
+            raise NotImplementedError(
+                "Named graphs are not supported by filesystem triple store adapter"
+            )
 
-            # Update the live graph
-            self.__live_graph += triples
+        self.__apply(triples, insert=True)
 
     def remove(self, triples: Graph, graph_name: URIRef | None = None):
         if graph_name is not None:
@@ -106,37 +244,41 @@ class TripleStoreService__SecondaryAdaptor__Filesystem(
                 "Named graphs are not supported by filesystem triple store adapter"
             )
 
-        with self.__lock:
-            triples_by_subject: dict[Any, list[tuple[Any, Any]]] = (
-                self.triples_by_subject(triples)
-            )
-
-            for subject in triples_by_subject:
-                subject_hash = self.iri_hash(subject)
-
-                if os.path.exists(self.hash_triples_path(subject_hash)):
-                    graph = Graph().parse(
-                        self.hash_triples_path(subject_hash), format="turtle"
-                    )
-
-                    for p, o in triples_by_subject[subject]:
-                        graph.remove((subject, p, o))
-
-                    self.__serialize_atomic(graph, self.hash_triples_path(subject_hash))
-
-            # Update the live graph
-            self.__live_graph -= triples
+        self.__apply(triples, insert=False)
 
     ## Ontology Methods
 
-    def get(self) -> Graph:
+    def __materialize(self) -> Graph:
+        """The live graph, built from the index on first use (caller holds
+        the lock)."""
+        if self.__live_graph is None:
+            graph = Graph()
+            for prefix, namespace in self.__index.namespaces():
+                graph.bind(prefix, namespace)
+            for rows in self.__index.rows():
+                graph += parse_rows(rows)
+            self.__live_graph = graph
         return self.__live_graph
 
-    def get_subject_graph(self, subject: URIRef, graph_name: str | URIRef) -> Graph:
-        subject_hash = self.iri_hash(subject)
+    def get(self) -> Graph:
+        with self.__lock:
+            return self.__materialize()
 
-        if os.path.exists(self.hash_triples_path(subject_hash)):
-            return Graph().parse(self.hash_triples_path(subject_hash), format="turtle")
+    def triples(
+        self, pattern: tuple[Node | None, Node | None, Node | None]
+    ) -> Iterator[tuple[Node, Node, Node]]:
+        """Triples matching ``(s, p, o)`` (``None`` is a wildcard), read from
+        the index without building the live graph."""
+        yield from parse_rows(self.__index.match(*pattern))
+
+    def get_subject_graph(self, subject: URIRef, graph_name: str | URIRef) -> Graph:
+        rows = self.__index.match(subject)
+        if (
+            rows
+            or self.__index.logged(subject)
+            or os.path.exists(self.hash_triples_path(self.iri_hash(subject)))
+        ):
+            return self.__subject_graph(rows)
 
         raise Exceptions.SubjectNotFoundError(f"Subject {subject} not found")
 
@@ -164,7 +306,7 @@ class TripleStoreService__SecondaryAdaptor__Filesystem(
 
     def query(self, query: str) -> query.Result:
         with self.__lock:
-            aggregate_graph = self.get()
+            aggregate_graph = self.__materialize()
 
             return aggregate_graph.query(query)
 
@@ -199,14 +341,9 @@ class TripleStoreService__SecondaryAdaptor__Filesystem(
         assert isinstance(s, (BNode, URIRef)), type(s)
         assert isinstance(o, (BNode, URIRef)), type(o)
 
-        partition_hash = self.iri_hash(o)
-
-        if os.path.exists(self.hash_triples_path(partition_hash)):
-            graph = Graph().parse(
-                self.hash_triples_path(partition_hash), format="turtle"
-            )
-
-            label = graph.value(subject=o, predicate=RDFS.label)
+        if self.__index.has_subject(o):
+            labels = [label for _, _, label in self.triples((o, RDFS.label, None))]
+            label = labels[0] if labels else None
             object_id = str(o).split("/")[-1].split("#")[-1]
 
             dir_name = f"{label}_{object_id}"
@@ -0,0 +1,122 @@
+import os
+
+import pytest
+from naas_abi_core.services.triple_store.adaptors.secondary.TripleStoreService__SecondaryAdaptor__Filesystem import (
+    TripleStoreService__SecondaryAdaptor__Filesystem,
+)
+from naas_abi_core.services.triple_store.TripleStorePorts import Exceptions
+from rdflib import RDF, RDFS, Graph, Literal, URIRef
+
+EX = "http://example.org/"
+ALICE = URIRef(f"{EX}alice")
+BOB = URIRef(f"{EX}bob")
+PERSON = URIRef(f"{EX}Person")
+
+
+def _people() -> Graph:
+    graph = Graph()
+    graph.bind("ex", EX)
+    graph.add((ALICE, RDF.type, PERSON))
+    graph.add((ALICE, RDFS.label, Literal("Alice\n\"A\"", lang="en")))
+    graph.add((BOB, RDF.type, PERSON))
+    return graph
+
+
+def _open(tmp_path) -> TripleStoreService__SecondaryAdaptor__Filesystem:
+    return TripleStoreService__SecondaryAdaptor__Filesystem(
+        store_path=str(tmp_path / "triplestore")
+    )
+
+
+def _subject_file(adapter, subject: URIRef) -> str:
+    return adapter.hash_triples_path(adapter.iri_hash(subject))
+
+
+def test_writes_are_served_from_the_index_before_files_are_compacted(tmp_path):
+    adapter = _open(tmp_path)
+    adapter.COMPACTION_DELAY_S = 60
+    adapter.insert(_people())
+
+    assert not os.path.exists(_subject_file(adapter, ALICE))
+    assert len(adapter.get_subject_graph(ALICE, "default")) == 2
+    assert set(adapter.triples((None, RDF.type, PERSON))) == {
+        (ALICE, RDF.type, PERSON),
+        (BOB, RDF.type, PERSON),
+    }
+
+    assert adapter.compact() == 2
+    on_disk = Graph().parse(_subject_file(adapter, ALICE), format="turtle")
+    assert (ALICE, RDFS.label, Literal("Alice\n\"A\"", lang="en")) in on_disk
+    assert dict(on_disk.namespaces())["ex"] == URIRef(EX)
+
+
+def test_removal_empties_the_subject_file(tmp_path):
+    adapter = _open(tmp_path)
+    adapter.insert(_people())
+    adapter.remove(Graph().add((BOB, RDF.type, PERSON)))
+    adapter.compact()
+
+    assert len(adapter.get_subject_graph(BOB, "default")) == 0
+    assert len(Graph().parse(_subject_file(adapter, BOB), format="turtle")) == 0
+    with pytest.raises(Exceptions.SubjectNotFoundError):
+        adapter.get_subject_graph(URIRef(f"{EX}nobody"), "default")
+
+
+def test_reopening_does_not_parse_subject_files(tmp_path, monkeypatch):
+    _open(tmp_path).close()
+    adapter = _open(tmp_path)
+    adapter.insert(_people())
+    adapter.close()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("subject files parsed on open")
+
+    monkeypatch.setattr(Graph, "parse", fail)
+    reopened = _open(tmp_path)
+    monkeypatch.undo()
+
+    assert (ALICE, RDF.type, PERSON) in set(reopened.triples((ALICE, None, None)))
+
+
+def test_query_builds_the_live_graph_lazily_and_tracks_writes(tmp_path):
+    adapter = _open(tmp_path)
+    adapter.insert(_people())
+
+    rows = list(adapter.query(f"SELECT ?s WHERE {{ ?s a <{PERSON}> }}"))
+    assert {row.s for row in rows} == {ALICE, BOB}
+
+    adapter.remove(Graph().add((BOB, RDF.type, PERSON)))
+    rows = list(adapter.query(f"SELECT ?s WHERE {{ ?s a <{PERSON}> }}"))
+    assert [row.s for row in rows] == [ALICE]
+
+
+def test_index_is_rebuilt_when_files_change_outside_the_adapter(tmp_path):
+    adapter = _open(tmp_path)
+    adapter.insert(_people())
+    adapter.close()
+
+    carol = URIRef(f"{EX}carol")
+    Graph().add((carol, RDF.type, PERSON)).serialize(
+        _subject_file(adapter, carol), format="turtle"
+    )
+
+    reopened = _open(tmp_path)
+    assert len(reopened.get_subject_graph(carol, "default")) == 1
+    assert len(reopened.get_subject_graph(ALICE, "default")) == 2
+    reopened.close()
+
+
+def test_index_is_rebuilt_when_a_file_is_edited_in_place(tmp_path):
+    adapter = _open(tmp_path)
+    adapter.insert(_people())
+    adapter.close()
+
+    path = _subject_file(adapter, BOB)
+    stat = os.stat(path)
+    Graph().add((BOB, RDFS.label, Literal("Bob"))).serialize(path, format="turtle")
+    # Make sure the file timestamp moves on coarse-grained filesystems.
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    reopened = _open(tmp_path)
+    assert set(reopened.get_subject_graph(BOB, "default").objects()) == {Literal("Bob")}
+    reopened.close()
@@ -1,7 +1,25 @@
+"""Object-storage triple store: one Turtle object per subject under
+``triples_prefix``, plus (with ``packed=True``) a packed copy for fast cold
+starts.
+
+By default each write reads the touched subjects' objects back, applies the
+change and writes them, so several processes can write to the same store.
+
+``packed=True`` is for a store with a single writing process. Every write is
+also recorded in a delta log, and the in-memory graph is periodically written
+as a packed snapshot (see :mod:`PackedTriples`), under ``packed_prefix``
+(``<triples_prefix>_packed`` by default). Startup then downloads the snapshot
+segments and newer deltas concurrently instead of one object per subject.
+The first start on an existing store, which has no snapshot yet, loads the
+per-subject objects as before and writes the first snapshot in the
+background. Subject objects are written from the in-memory graph without
+reading them back, and a snapshot is skipped (with an error logged) when it
+would fold in a delta this process did not apply.
+"""
+
 import queue
-import time
 from threading import Lock, Thread
-from typing import Any
+from typing import cast
 
 import rdflib
 from naas_abi_core import logger
@@ -14,6 +32,10 @@ from naas_abi_core.services.object_storage.ObjectStorageService import (
 from naas_abi_core.services.triple_store.adaptors.secondary.base.TripleStoreService__SecondaryAdaptor__FileBase import (
     TripleStoreService__SecondaryAdaptor__FileBase,
 )
+from naas_abi_core.services.triple_store.adaptors.secondary.PackedTriples import (
+    Manifest,
+    PackedTriples,
+)
 from naas_abi_core.services.triple_store.TripleStorePorts import (
     Exceptions,
     ITripleStorePort,
@@ -34,21 +56,55 @@ class TripleStoreService__SecondaryAdaptor__ObjectStorage(
 
     __lock: Lock
 
+    __packed: PackedTriples | None
+
     def __init__(
         self,
         object_storage_service: ObjectStorageService,
         triples_prefix: str = "triples",
+        packed: bool = False,
+        packed_prefix: str | None = None,
+        segment_triples: int = 100_000,
+        snapshot_every_deltas: int = 1000,
+        download_workers: int = 16,
     ):
         logger.debug("Initializing TripleStoreService__SecondaryAdaptor__ObjectStorage")
         self.__object_storage_service = object_storage_service
         self.__triples_prefix = triples_prefix
 
         self.__lock = Lock()
+        self.__snapshot_lock = Lock()
+        self.__snapshot_guard = Lock()
+        self.__snapshot_thread: Thread | None = None
 
         self.__insert_pool = WorkerPool(num_workers=50)
 
+        self.__packed = (
+            PackedTriples(
+                object_storage_service,
+                prefix=packed_prefix or f"{triples_prefix}_packed",
+                subject_hash=self.iri_hash,
+                segment_triples=segment_triples,
+                download_workers=download_workers,
+            )
+            if packed
+            else None
+        )
+        self.__manifest: Manifest | None = None
+        self.__deltas_through = ""
+        # Deltas loaded or written by this process, i.e. in the live graph.
+        self.__applied_deltas: set[str] = set()
+        self.__deltas_since_snapshot = 0
+        self.__snapshot_every_deltas = snapshot_every_deltas
+
         self.__live_graph = self.load()
 
+        if self.__packed is not None and (
+            self.__manifest is None
+            or self.__deltas_since_snapshot >= self.__snapshot_every_deltas
+        ):
+            self.__schedule_snapshot()
+
     def load_triples(self, subject_hash: str) -> Graph:
         obj: bytes = self.__object_storage_service.get_object(
             prefix=self.__triples_prefix, key=f"{subject_hash}.ttl"
@@ -64,54 +120,73 @@ class TripleStoreService__SecondaryAdaptor__ObjectStorage(
             prefix=self.__triples_prefix, key=f"{name}.ttl", content=serialized_triples
         )
 
-    def insert(self, triples: Graph, graph_name: URIRef | None = None):
-        if graph_name is not None:
-            raise NotImplementedError(
-                "Named graphs are not supported by object storage triple store adapter"
-            )
-
-        with self.__lock:
-            triples_by_subject: dict[Node, list[tuple[Node, Node]]] = (
-                self.triples_by_subject(triples)
-            )
-
-            def __insert(
-                subject: URIRef, triples_by_subject: dict[Node, list[tuple[Node, Node]]]
-            ):
-                subject_hash = self.iri_hash(subject)
+    def __store_subjects(self, triples: Graph, insert: bool) -> None:
+        """Write the object of every subject of ``triples`` (caller holds the
+        lock). A packed store has a single writer and writes them from the
+        live graph; otherwise each object is read back so that triples
+        written by other processes are kept."""
 
+        def __store(subject: Node) -> None:
+            subject_hash = self.iri_hash(cast(URIRef, subject))
+            graph = Graph()
+            for prefix, namespace in triples.namespaces():
+                graph.bind(prefix, namespace)
+            if self.__packed is not None:
+                for p, o in self.__live_graph.predicate_objects(subject):
+                    graph.add((subject, p, o))
+            else:
                 try:
-                    graph = self.load_triples(subject_hash)
+                    graph += self.load_triples(subject_hash)
                 except ObjectStorageExceptions.ObjectNotFound:
-                    graph = Graph()
-                    for prefix, namespace in triples.namespaces():
-                        graph.bind(prefix, namespace)
-
-                for p, o in triples_by_subject[subject]:
-                    graph.add((subject, p, o))
-
-                self.store(subject_hash, graph)
-
-            jobs: list[Job] = [
-                Job(
-                    queue=None,
-                    func=__insert,
-                    subject=subject,
-                    triples_by_subject=triples_by_subject,
-                )
-                for subject in triples_by_subject
-            ]
-
-            result_queue: queue.Queue[Job] = self.__insert_pool.submit_all(jobs)
+                    if not insert:
+                        return
+                changes = triples.triples((subject, None, None))
+                if insert:
+                    graph += changes
+                else:
+                    graph -= changes
+            self.store(subject_hash, graph)
+
+        jobs: list[Job] = [
+            Job(queue=None, func=__store, subject=subject)
+            for subject in set(triples.subjects())
+        ]
+        for job in jobs:
+            self.__insert_pool.submit(job)
+        for job in jobs:
+            job.wait()
+            job.get_result()
+
+    def __apply(self, triples: Graph, insert: bool) -> None:
+        with self.__lock:
+            if insert:
+                for prefix, namespace in triples.namespaces():
+                    self.__live_graph.bind(prefix, namespace)
+                self.__live_graph += triples
+            else:
+                self.__live_graph -= triples
+
+            self.__store_subjects(triples, insert)
+
+            if self.__packed is None:
+                return
+            self.__deltas_through = self.__packed.append_delta(triples, insert)
+            self.__applied_deltas.add(self.__deltas_through)
+            self.__deltas_since_snapshot += 1
+            snapshot_due = (
+                self.__deltas_since_snapshot >= self.__snapshot_every_deltas
+            )
 
-            while result_queue.qsize() < result_queue.maxsize:
-                logger.debug(f"Inserting {result_queue.qsize()}/{result_queue.maxsize}")
-                time.sleep(0.1)
+        if snapshot_due:
+            self.__schedule_snapshot()
 
-            for prefix, namespace in triples.namespaces():
-                self.__live_graph.bind(prefix, namespace)
+    def insert(self, triples: Graph, graph_name: URIRef | None = None):
+        if graph_name is not None:
+            raise NotImplementedError(
+                "Named graphs are not supported by object storage triple store adapter"
+            )
 
-            self.__live_graph += triples
+        self.__apply(triples, insert=True)
 
     def remove(self, triples: Graph, graph_name: URIRef | None = None):
         if graph_name is not None:
@@ -119,27 +194,78 @@ class TripleStoreService__SecondaryAdaptor__ObjectStorage(
                 "Named graphs are not supported by object storage triple store adapter"
             )
 
-        with self.__lock:
-            triples_by_subject: dict[Any, list[tuple[Any, Any]]] = (
-                self.triples_by_subject(triples)
-            )
-
-            for subject in triples_by_subject:
-                subject_hash = self.iri_hash(subject)
-
-                try:
-                    graph = self.load_triples(subject_hash)
-                    for p, o in triples_by_subject[subject]:
-                        graph.add((subject, p, o))
-
-                    self.store(subject_hash, graph)
-                except ObjectStorageExceptions.ObjectNotFound:
-                    pass
+        self.__apply(triples, insert=False)
+
+    ## Packed snapshots
+
+    def snapshot(self) -> None:
+        """Write the live graph as a new packed snapshot and drop the deltas
+        it folds in. Runs in the background every ``snapshot_every_deltas``
+        writes."""
+        if self.__packed is None:
+            return
+
+        with self.__snapshot_lock:
+            previous = self.__manifest
+            generation = (previous.generation if previous else 0) + 1
+            with self.__lock:
+                # Copy the triples and compress them without the lock held.
+                triples = list(self.__live_graph)
+                namespaces = list(self.__live_graph.namespaces())
+                deltas_through = self.__deltas_through
+                applied = set(self.__applied_deltas)
+                folded = self.__deltas_since_snapshot
+
+            foreign = [
+                key
+                for key in self.__packed.list_deltas(
+                    after=previous.deltas_through if previous else ""
+                )
+                if key <= deltas_through and key not in applied
+            ]
+            if foreign:
+                logger.error(
+                    f"Not writing a packed triple snapshot: {len(foreign)} deltas "
+                    "were written by another process. A packed store must have a "
+                    "single writer."
+                )
+                return
 
-            for prefix, namespace in triples.namespaces():
-                self.__live_graph.bind(prefix, namespace)
+            packed = self.__packed.pack(triples, generation)
+            self.__manifest = self.__packed.publish(
+                packed, namespaces, generation, deltas_through, previous
+            )
+            with self.__lock:
+                self.__deltas_since_snapshot -= folded
+                self.__applied_deltas = {
+                    key for key in self.__applied_deltas if key > deltas_through
+                }
+            logger.debug(
+                f"Wrote packed triple snapshot {generation} ({len(packed)} segments)"
+            )
 
-            self.__live_graph -= triples
+    def wait_for_snapshot(self) -> None:
+        """Block until a background snapshot in progress has finished."""
+        with self.__snapshot_guard:
+            thread = self.__snapshot_thread
+        if thread is not None:
+            thread.join()
+
+    def __schedule_snapshot(self) -> None:
+        def run() -> None:
+            try:
+                self.snapshot()
+            except Exception:  # noqa: BLE001
+                # Deltas are kept until a snapshot succeeds.
+                logger.exception("Error writing packed triple snapshot")
+
+        with self.__snapshot_guard:
+            if self.__snapshot_thread is not None and self.__snapshot_thread.is_alive():
+                return
+            self.__snapshot_thread = Thread(
+                target=run, name="packed-triples-snapshot", daemon=True
+            )
+            self.__snapshot_thread.start()
 
     def get_subject_graph(self, subject: URIRef, graph_name: str | URIRef) -> Graph:
         subject_hash = self.iri_hash(subject)
@@ -151,6 +277,24 @@ class TripleStoreService__SecondaryAdaptor__ObjectStorage(
             raise Exceptions.SubjectNotFoundError(f"Subject {subject} not found")
 
     def load(self) -> Graph:
+        if self.__packed is not None:
+            manifest = self.__packed.read_manifest()
+            if manifest is not None:
+                with self.__lock:
+                    logger.debug("Loading packed triples from object storage")
+                    triples = Graph()
+                    applied = self.__packed.load(triples, manifest)
+                    self.__deltas_through = (
+                        applied[-1] if applied else manifest.deltas_through
+                    )
+                    self.__applied_deltas = set(applied)
+                    self.__deltas_since_snapshot = len(applied)
+                    self.__manifest = manifest
+                    return triples
+
+        return self.__load_subject_objects()
+
+    def __load_subject_objects(self) -> Graph:
         with self.__lock:
             logger.debug("Loading triples from object storage")
             triples = Graph()
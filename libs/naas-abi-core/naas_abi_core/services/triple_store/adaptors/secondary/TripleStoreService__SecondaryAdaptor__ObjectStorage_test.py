@@ -0,0 +1,145 @@
+import os
+
+from naas_abi_core.services.object_storage.adapters.secondary.ObjectStorageSecondaryAdapterFS import (
+    ObjectStorageSecondaryAdapterFS,
+)
+from naas_abi_core.services.object_storage.ObjectStorageService import (
+    ObjectStorageService,
+)
+from naas_abi_core.services.triple_store.adaptors.secondary.TripleStoreService__SecondaryAdaptor__ObjectStorage import (
+    TripleStoreService__SecondaryAdaptor__ObjectStorage as ObjectStorageTripleStore,
+)
+from rdflib import RDF, RDFS, BNode, Graph, Literal, URIRef
+
+EX = "http://example.org/"
+PERSON = URIRef(f"{EX}Person")
+
+
+def _people(n: int) -> Graph:
+    graph = Graph()
+    graph.bind("ex", EX)
+    for i in range(n):
+        subject = URIRef(f"{EX}person/{i}")
+        graph.add((subject, RDF.type, PERSON))
+        graph.add((subject, RDFS.label, Literal(f"Person {i}\nline two", lang="en")))
+    return graph
+
+
+def _open(tmp_path, packed: bool = True, **kwargs) -> ObjectStorageTripleStore:
+    storage = ObjectStorageService(ObjectStorageSecondaryAdapterFS(str(tmp_path / "os")))
+    adapter = ObjectStorageTripleStore(storage, packed=packed, **kwargs)
+    adapter.wait_for_snapshot()
+    return adapter
+
+
+def _files(tmp_path, prefix: str) -> list[str]:
+    directory = tmp_path / "os" / prefix
+    return sorted(os.listdir(directory)) if directory.exists() else []
+
+
+def test_cold_start_reads_the_packed_snapshot_and_newer_deltas(tmp_path, monkeypatch):
+    adapter = _open(tmp_path, segment_triples=50)
+    adapter.insert(_people(100))
+    adapter.snapshot()
+    adapter.insert(_people(101))
+    adapter.remove(Graph().add((URIRef(f"{EX}person/0"), RDF.type, PERSON)))
+    expected = set(adapter.get())
+
+    assert len(_files(tmp_path, "triples_packed/segments")) == 4
+    assert len(_files(tmp_path, "triples_packed/delta")) == 2
+
+    def fail(*args, **kwargs):
+        raise AssertionError("per-subject object read on a packed cold start")
+
+    monkeypatch.setattr(ObjectStorageTripleStore, "load_triples", fail)
+    reopened = _open(tmp_path, segment_triples=50)
+
+    assert set(reopened.get()) == expected
+    assert (URIRef(f"{EX}person/0"), RDF.type, PERSON) not in reopened.get()
+    assert dict(reopened.get().namespaces())["ex"] == URIRef(EX)
+
+
+def test_snapshot_replaces_the_previous_generation_and_folded_deltas(tmp_path):
+    adapter = _open(tmp_path)
+    adapter.insert(_people(3))
+    adapter.snapshot()
+    first_generation = _files(tmp_path, "triples_packed/segments")
+    adapter.insert(_people(4))
+    adapter.snapshot()
+
+    segments = _files(tmp_path, "triples_packed/segments")
+    assert segments and not set(segments) & set(first_generation)
+    assert _files(tmp_path, "triples_packed/delta") == []
+    assert len(_open(tmp_path).get()) == 8
+
+
+def test_snapshot_runs_in_the_background_every_n_deltas(tmp_path):
+    adapter = _open(tmp_path, snapshot_every_deltas=2)
+    adapter.insert(_people(1))
+    adapter.insert(_people(2))
+    adapter.wait_for_snapshot()
+
+    assert _files(tmp_path, "triples_packed/delta") == []
+    assert len(_open(tmp_path).get()) == 4
+
+
+def test_store_without_snapshot_loads_subject_objects_then_packs_them(tmp_path):
+    legacy = _open(tmp_path, packed=False)
+    legacy.insert(_people(5))
+    assert _files(tmp_path, "triples_packed") == []
+
+    adapter = _open(tmp_path)
+
+    assert len(adapter.get()) == 10
+    assert "manifest.json" in _files(tmp_path, "triples_packed")
+
+
+def test_writes_keep_subject_objects_in_sync(tmp_path):
+    adapter = _open(tmp_path)
+    subject = URIRef(f"{EX}person/1")
+    adapter.insert(_people(2))
+    adapter.remove(Graph().add((subject, RDF.type, PERSON)))
+
+    assert set(adapter.get_subject_graph(subject, "default")) == {
+        (subject, RDFS.label, Literal("Person 1\nline two", lang="en"))
+    }
+
+
+def test_blank_nodes_keep_their_identity_across_segments(tmp_path):
+    adapter = _open(tmp_path, segment_triples=1)
+    node = BNode()
+    graph = Graph()
+    graph.add((URIRef(f"{EX}a"), URIRef(f"{EX}address"), node))
+    graph.add((node, URIRef(f"{EX}city"), Literal("Paris")))
+    adapter.insert(graph)
+    adapter.snapshot()
+
+    reopened = _open(tmp_path)
+    [address] = reopened.get().objects(URIRef(f"{EX}a"), URIRef(f"{EX}address"))
+    assert reopened.get().value(address, URIRef(f"{EX}city")) == Literal("Paris")
+
+
+def test_unpacked_writers_keep_each_others_triples(tmp_path):
+    first = _open(tmp_path, packed=False)
+    second = _open(tmp_path, packed=False)
+    subject = URIRef(f"{EX}person/0")
+    first.insert(Graph().add((subject, RDF.type, PERSON)))
+    second.insert(Graph().add((subject, RDFS.label, Literal("Ada"))))
+
+    assert set(_open(tmp_path, packed=False).get_subject_graph(subject, "default")) == {
+        (subject, RDF.type, PERSON),
+        (subject, RDFS.label, Literal("Ada")),
+    }
+
+
+def test_snapshot_is_skipped_when_another_process_wrote_deltas(tmp_path):
+    first = _open(tmp_path)
+    first.insert(_people(1))
+    first.snapshot()
+    second = _open(tmp_path)
+    second.insert(_people(2))
+    first.insert(_people(3))
+    first.snapshot()
+
+    assert len(_files(tmp_path, "triples_packed/delta")) == 2
+    assert len(_open(tmp_path).get()) == 6
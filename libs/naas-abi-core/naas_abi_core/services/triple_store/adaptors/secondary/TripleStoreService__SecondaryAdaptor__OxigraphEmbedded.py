@@ -1,18 +1,25 @@
 from __future__ import annotations
 
+import re
 import threading
-from io import BytesIO
+from collections.abc import Iterator
 from pathlib import Path
 from typing import Any
 
 import rdflib
+from naas_abi_core.services.triple_store.adaptors.secondary.OxigraphNativeResult import (
+    boolean_result,
+    solution_rows,
+    solutions_result,
+    triples_graph,
+)
 from naas_abi_core.services.triple_store.TripleStorePorts import (
     Exceptions,
     ITripleStorePort,
     OntologyEvent,
 )
 from rdflib import BNode, Graph, URIRef
-from rdflib.plugins.sparql.results.jsonresults import JSONResultParser
+from rdflib.query import ResultRow
 
 
 class TripleStoreService__SecondaryAdaptor__OxigraphEmbedded(ITripleStorePort):
@@ -41,6 +48,8 @@ class TripleStoreService__SecondaryAdaptor__OxigraphEmbedded(ITripleStorePort):
 
         self._store: Any = existing
         self._default_graph_iri = URIRef(graph_base_iri)
+        # Serializes writers only. Reads need no lock: pyoxigraph evaluates
+        # each query on a consistent snapshot, concurrently with writes.
         self._lock = threading.RLock()
 
     def _graph_iri(self, graph_name: URIRef | None) -> URIRef:
@@ -117,43 +126,46 @@ class TripleStoreService__SecondaryAdaptor__OxigraphEmbedded(ITripleStorePort):
         return result
 
     def query(self, query: str) -> Any:
-        from pyoxigraph import (
-            QueryBoolean,
-            QueryResultsFormat,
-            QuerySolutions,
-            QueryTriples,
-            RdfFormat,
-        )
+        """Run a read query. SELECT rows are converted lazily as the result
+        is iterated (see ``OxigraphNativeResult``)."""
+        from pyoxigraph import QueryBoolean, QuerySolutions, QueryTriples
 
-        with self._lock:
-            result = self._store.query(query)
+        result = self._store.query(query)
 
         if isinstance(result, QueryTriples):
-            serialized = result.serialize(format=RdfFormat.N_TRIPLES)
-            if serialized is None:
-                raise ValueError("Oxigraph returned no bytes for triple query result")
-            return Graph().parse(
-                data=serialized.decode("utf-8"),
-                format="nt",
-            )
+            return triples_graph(result)
 
         if isinstance(result, QuerySolutions):
-            serialized = result.serialize(format=QueryResultsFormat.JSON)
-            if serialized is None:
-                raise ValueError("Oxigraph returned no bytes for solution query result")
-            return JSONResultParser().parse(BytesIO(serialized))
+            return solutions_result(result)
 
         if isinstance(result, QueryBoolean):
-            serialized = result.serialize(format=QueryResultsFormat.JSON)
-            if serialized is None:
-                raise ValueError("Oxigraph returned no bytes for boolean query result")
-            return JSONResultParser().parse(BytesIO(serialized))
+            return boolean_result(bool(result))
 
         raise ValueError(f"Unsupported query result type: {type(result)}")
 
     def query_view(self, view: str, query: str) -> rdflib.query.Result:
         return self.query(query)
 
+    def iter_query(self, query: str, batch_size: int = 1000) -> Iterator[ResultRow]:
+        """Stream SELECT rows straight from pyoxigraph's solution iterator;
+        nothing is buffered, so ``batch_size`` has no effect."""
+        from pyoxigraph import QuerySolutions
+
+        if not self.__is_select_query(query):
+            raise ValueError("iter_query only supports SELECT queries")
+        solutions = self._store.query(query)
+        if not isinstance(solutions, QuerySolutions):
+            raise TypeError(f"Expected SELECT solutions, got {type(solutions)}")
+        return solution_rows(solutions)
+
+    def __is_select_query(self, query: str) -> bool:
+        stripped = re.sub(
+            r"(?is)^\s*(?:(?:(?:PREFIX\s+[^\s:]*:\s*<[^>]+>)|(?:BASE\s*<[^>]+>))\s*)*",
+            "",
+            query,
+        ).strip()
+        return stripped.upper().startswith("SELECT")
+
     def handle_view_event(
         self,
         view: tuple[URIRef | None, URIRef | None, URIRef | None],
@@ -183,5 +195,4 @@ class TripleStoreService__SecondaryAdaptor__OxigraphEmbedded(ITripleStorePort):
             self._store.remove_graph(self._graph_node(graph_name))
 
     def list_graphs(self) -> list[URIRef]:
-        with self._lock:
-            return [URIRef(graph.value) for graph in self._store.named_graphs()]
+        return [URIRef(graph.value) for graph in self._store.named_graphs()]
@@ -83,3 +83,90 @@ def test_oxigraph_embedded_creates_missing_parent_directories(tmp_path):
     )
 
     assert store_path.exists()
+
+
+def test_oxigraph_embedded_native_results_match_the_sparql_json_path(tmp_path):
+    pytest.importorskip("pyoxigraph")
+    from naas_abi_core.services.triple_store.benchmark import roundtrip_query
+    from rdflib import XSD
+    from rdflib.query import ResultRow
+
+    adapter = TripleStoreService__SecondaryAdaptor__OxigraphEmbedded(
+        store_path=str(tmp_path / "oxigraph"),
+    )
+    graph_name = URIRef("http://example.org/graph/terms")
+    subject = URIRef("http://example.org/s")
+    graph = Graph()
+    for value in (
+        Literal("plain"),
+        Literal("hello", lang="en"),
+        Literal(42),
+        Literal("2026-01-01", datatype=XSD.date),
+        URIRef("http://example.org/o"),
+    ):
+        graph.add((subject, URIRef("http://example.org/p"), value))
+    adapter.insert(graph, graph_name)
+
+    query = f"""
+    SELECT ?p ?o ?missing WHERE {{
+        GRAPH <{graph_name}> {{ ?s ?p ?o OPTIONAL {{ ?o ?x ?missing }} }}
+    }}
+    """
+    native = adapter.query(query)
+    expected = roundtrip_query(adapter._store, query)
+
+    rows = list(native)
+    assert all(isinstance(row, ResultRow) for row in rows)
+    assert native.vars == expected.vars
+    assert [row.asdict() for row in rows] == [row.asdict() for row in expected]
+    assert {row.o for row in rows} == set(graph.objects())
+    assert rows[0].missing is None
+    assert len(native) == 5 and len(list(native)) == 5  # re-iterable
+
+    ask = adapter.query(f"ASK {{ GRAPH <{graph_name}> {{ ?s ?p 42 }} }}")
+    assert ask.type == "ASK" and ask.askAnswer is True
+    constructed = adapter.get_subject_graph(subject, graph_name)
+    assert set(constructed) == set(graph)
+
+
+def test_oxigraph_embedded_lazy_result_reads_a_snapshot(tmp_path):
+    pytest.importorskip("pyoxigraph")
+
+    adapter = TripleStoreService__SecondaryAdaptor__OxigraphEmbedded(
+        store_path=str(tmp_path / "oxigraph"),
+    )
+    graph_name = URIRef("http://example.org/graph/snapshot")
+    for i in range(3):
+        adapter.insert(_build_graph(URIRef(f"http://example.org/s{i}"), i), graph_name)
+
+    result = adapter.query(f"SELECT ?s WHERE {{ GRAPH <{graph_name}> {{ ?s ?p ?o }} }}")
+    adapter.insert(_build_graph(URIRef("http://example.org/late"), 9), graph_name)
+
+    assert len(list(result)) == 3
+
+
+def test_oxigraph_embedded_iter_query_streams_rows(tmp_path):
+    pytest.importorskip("pyoxigraph")
+
+    adapter = TripleStoreService__SecondaryAdaptor__OxigraphEmbedded(
+        store_path=str(tmp_path / "oxigraph"),
+    )
+    graph_name = URIRef("http://example.org/graph/stream")
+    for i in range(5):
+        adapter.insert(_build_graph(URIRef(f"http://example.org/s{i}"), i), graph_name)
+
+    rows = adapter.iter_query(
+        f"SELECT ?s ?o WHERE {{ GRAPH <{graph_name}> {{ ?s ?p ?o }} }} ORDER BY ?o"
+    )
+    first = next(rows)
+    assert (first.s, first.o) == (URIRef("http://example.org/s0"), Literal("v-0"))
+    assert len(list(rows)) == 4
+
+    with pytest.raises(ValueError):
+        adapter.iter_query(f"ASK {{ GRAPH <{graph_name}> {{ ?s ?p ?o }} }}")
+
+    # The query form is checked before execution, so an update never runs.
+    with pytest.raises(ValueError):
+        adapter.iter_query(f"CLEAR GRAPH <{graph_name}>")
+    remaining = adapter.iter_query("SELECT * WHERE { GRAPH ?g { ?s ?p ?o } }")
+    assert len(list(remaining)) == 5
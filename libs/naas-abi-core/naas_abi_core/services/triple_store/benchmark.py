@@ -0,0 +1,198 @@
+"""Query result throughput benchmark for the embedded Oxigraph adaptor.
+
+Single-process microbench on an on-disk pyoxigraph store comparing the
+native result path (``OxigraphNativeResult``: pyoxigraph terms converted to
+rdflib terms row by row) with the previous path, which serialized every
+result to SPARQL JSON / N-Triples and parsed it back with rdflib. Also
+measures time to first row and concurrent readers (previously serialized by
+an instance-wide lock).
+
+Run:
+    uv run python -m naas_abi_core.services.triple_store.benchmark
+    uv run python -m naas_abi_core.services.triple_store.benchmark --triples 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import platform
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from contextlib import contextmanager
+from io import BytesIO
+from typing import Any
+
+from naas_abi_core.services.triple_store.adaptors.secondary.TripleStoreService__SecondaryAdaptor__OxigraphEmbedded import (
+    TripleStoreService__SecondaryAdaptor__OxigraphEmbedded,
+)
+from rdflib import Graph
+from rdflib.plugins.sparql.results.jsonresults import JSONResultParser
+
+GRAPH = "http://ontology.naas.ai/graph/bench"
+XSD_INTEGER = "http://www.w3.org/2001/XMLSchema#integer"
+
+SELECT_IRIS = f"SELECT ?s ?p WHERE {{ GRAPH <{GRAPH}> {{ ?s ?p ?o }} }}"
+SELECT_ALL = f"SELECT ?s ?p ?o WHERE {{ GRAPH <{GRAPH}> {{ ?s ?p ?o }} }}"
+CONSTRUCT = (
+    f"CONSTRUCT {{ ?s ?p ?o }} WHERE {{ GRAPH <{GRAPH}> {{ ?s ?p ?o }} }} LIMIT 100000"
+)
+
+
+@contextmanager
+def timer():
+    t = [0.0]
+    start = time.perf_counter()
+    try:
+        yield t
+    finally:
+        t[0] = time.perf_counter() - start
+
+
+def fmt_rate(n: int, seconds: float) -> str:
+    rate = n / seconds if seconds > 0 else float("inf")
+    return f"{rate:>12,.0f} rows/sec  ({seconds:.2f} s)"
+
+
+def fill_store(store: Any, n: int) -> None:
+    """``n`` triples over ``n / 5`` subjects: a type, an integer, a label and
+    two links per subject."""
+    from pyoxigraph import Literal, NamedNode, Quad
+
+    graph = NamedNode(GRAPH)
+    rdf_type = NamedNode("http://www.w3.org/1999/02/22-rdf-syntax-ns#type")
+    label = NamedNode("http://www.w3.org/2000/01/rdf-schema#label")
+    rank = NamedNode("http://example.org/rank")
+    knows = NamedNode("http://example.org/knows")
+    integer = NamedNode(XSD_INTEGER)
+    classes = [NamedNode(f"http://example.org/Class{i}") for i in range(20)]
+
+    subjects = n // 5
+    batch: list[Any] = []
+    for i in range(subjects):
+        s = NamedNode(f"http://example.org/entity/{i}")
+        batch += [
+            Quad(s, rdf_type, classes[i % 20], graph),
+            Quad(s, rank, Literal(str(i), datatype=integer), graph),
+            Quad(s, label, Literal(f"Entity {i}", language="en"), graph),
+            Quad(s, knows, NamedNode(f"http://example.org/entity/{(i + 1) % subjects}"), graph),
+            Quad(s, knows, NamedNode(f"http://example.org/entity/{(i + 7) % subjects}"), graph),
+        ]
+        if len(batch) >= 100_000:
+            store.extend(batch)
+            batch = []
+    store.extend(batch)
+
+
+def roundtrip_query(store: Any, query: str) -> Any:
+    """The previous result path: serialize, then parse with rdflib."""
+    from pyoxigraph import QueryResultsFormat, QueryTriples, RdfFormat
+
+    result = store.query(query)
+    if isinstance(result, QueryTriples):
+        data = result.serialize(format=RdfFormat.N_TRIPLES) or b""
+        return Graph().parse(data=data.decode("utf-8"), format="nt")
+    return JSONResultParser().parse(BytesIO(result.serialize(format=QueryResultsFormat.JSON)))
+
+
+def consume(result: Any) -> int:
+    return sum(1 for _ in result)
+
+
+def first_row(result: Any) -> None:
+    next(iter(result))
+
+
+def bench_paths(adapter: TripleStoreService__SecondaryAdaptor__OxigraphEmbedded) -> None:
+    store = adapter._store
+    cases: list[tuple[str, str, Callable[[Any], Any]]] = [
+        ("SELECT ?s ?p (IRIs)", SELECT_IRIS, consume),
+        ("SELECT ?s ?p ?o (IRIs + literals)", SELECT_ALL, consume),
+        ("CONSTRUCT, 100k triples", CONSTRUCT, consume),
+    ]
+    for label, query, use in cases:
+        with timer() as t:
+            rows = use(roundtrip_query(store, query))
+        print(f"  {label:36s} serialize+parse {fmt_rate(rows, t[0])}")
+        with timer() as t:
+            rows = use(adapter.query(query))
+        print(f"  {label:36s} native          {fmt_rate(rows, t[0])}")
+
+    with timer() as t:
+        first_row(roundtrip_query(store, SELECT_ALL))
+    print(f"  {'time to first row (full scan)':36s} serialize+parse {t[0] * 1000:>10.1f} ms")
+    with timer() as t:
+        first_row(adapter.query(SELECT_ALL))
+    print(f"  {'time to first row (full scan)':36s} native          {t[0] * 1000:>10.1f} ms")
+
+
+def bench_concurrent_reads(
+    adapter: TripleStoreService__SecondaryAdaptor__OxigraphEmbedded,
+    threads: int,
+    queries_per_thread: int,
+) -> None:
+    # Selective queries, where evaluation (not Python-side conversion) is
+    # the cost: the count of links per class.
+    query = (
+        f"SELECT (COUNT(*) AS ?n) WHERE {{ GRAPH <{GRAPH}> {{ "
+        "?s a <http://example.org/Class{i}> ; <http://example.org/knows> ?o } }"
+    )
+    store_lock = threading.RLock()
+
+    def run(locked: bool) -> float:
+        def worker(k: int) -> None:
+            for j in range(queries_per_thread):
+                q = query.replace("{i}", str((k + j) % 20))
+                if locked:
+                    with store_lock:
+                        result = adapter._store.query(q)
+                else:
+                    result = adapter._store.query(q)
+                consume(result)
+
+        workers = [threading.Thread(target=worker, args=(k,)) for k in range(threads)]
+        with timer() as t:
+            for w in workers:
+                w.start()
+            for w in workers:
+                w.join()
+        return t[0]
+
+    total = threads * queries_per_thread
+    for label, locked in (("instance lock (previous)", True), ("no read lock", False)):
+        seconds = run(locked)
+        print(
+            f"  {threads} readers, {label:26s} "
+            f"{total / seconds:>10,.1f} queries/sec  ({seconds:.2f} s)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--triples", type=int, default=1_000_000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=10)
+    args = parser.parse_args()
+
+    print("\nEmbedded Oxigraph query result benchmark")
+    print(f"  Python   : {sys.version.split()[0]}")
+    print(f"  Platform : {platform.platform()}")
+    print(f"  Machine  : {platform.machine()}")
+    print(f"  triples={args.triples:,}\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        adapter = TripleStoreService__SecondaryAdaptor__OxigraphEmbedded(
+            store_path=f"{tmp}/oxigraph"
+        )
+        with timer() as t:
+            fill_store(adapter._store, args.triples)
+        print(f"  loaded in {t[0]:.1f} s\n")
+        bench_paths(adapter)
+        print()
+        bench_concurrent_reads(adapter, args.threads, args.queries)
+
+
+if __name__ == "__main__":
+    main()
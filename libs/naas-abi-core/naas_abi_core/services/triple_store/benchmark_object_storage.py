@@ -0,0 +1,141 @@
+"""Cold start benchmark for the object-storage triple store adaptor.
+
+Builds a store of ``--subjects`` subjects (5 triples each) on
+``ObjectStorageSecondaryAdapterFS`` and times opening it from the per-subject
+objects (``packed=False``, the default) and from the packed
+snapshot + delta log. ``--latency-ms`` adds a fixed delay to every object
+storage call, to approximate a remote store such as S3/R2 (first-byte
+latency is what dominates one-GET-per-subject loading).
+
+Run:
+    uv run python -m naas_abi_core.services.triple_store.benchmark_object_storage
+    uv run python -m naas_abi_core.services.triple_store.benchmark_object_storage --subjects 100000 --latency-ms 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import platform
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any
+
+from naas_abi_core.services.object_storage.adapters.secondary.ObjectStorageSecondaryAdapterFS import (
+    ObjectStorageSecondaryAdapterFS,
+)
+from naas_abi_core.services.object_storage.ObjectStorageService import (
+    ObjectStorageService,
+)
+from naas_abi_core.services.triple_store.adaptors.secondary.TripleStoreService__SecondaryAdaptor__ObjectStorage import (
+    TripleStoreService__SecondaryAdaptor__ObjectStorage,
+)
+from rdflib import RDF, RDFS, Graph, Literal, URIRef
+
+EX = "http://example.org/"
+
+
+@contextmanager
+def timer():
+    t = [0.0]
+    start = time.perf_counter()
+    try:
+        yield t
+    finally:
+        t[0] = time.perf_counter() - start
+
+
+class DelayedAdapter:
+    """Wraps an object storage adapter, sleeping before every call."""
+
+    def __init__(self, adapter: Any, latency_s: float):
+        self.__adapter = adapter
+        self.__latency_s = latency_s
+        self.calls = 0
+
+    def __getattr__(self, name: str) -> Any:
+        target = getattr(self.__adapter, name)
+        if not callable(target):
+            return target
+
+        def delayed(*args, **kwargs):
+            self.calls += 1
+            if self.__latency_s:
+                time.sleep(self.__latency_s)
+            return target(*args, **kwargs)
+
+        return delayed
+
+
+def build_graph(subjects: int) -> Graph:
+    graph = Graph()
+    graph.bind("ex", EX)
+    classes = [URIRef(f"{EX}Class{i}") for i in range(20)]
+    for i in range(subjects):
+        s = URIRef(f"{EX}entity/{i}")
+        graph.add((s, RDF.type, classes[i % 20]))
+        graph.add((s, RDFS.label, Literal(f"Entity {i}", lang="en")))
+        graph.add((s, URIRef(f"{EX}rank"), Literal(i)))
+        graph.add((s, URIRef(f"{EX}knows"), URIRef(f"{EX}entity/{(i + 1) % subjects}")))
+        graph.add((s, URIRef(f"{EX}knows"), URIRef(f"{EX}entity/{(i + 7) % subjects}")))
+    return graph
+
+
+def open_store(
+    base_path: str, latency_s: float, **kwargs
+) -> tuple[TripleStoreService__SecondaryAdaptor__ObjectStorage, float, int]:
+    adapter = DelayedAdapter(ObjectStorageSecondaryAdapterFS(base_path), latency_s)
+    storage = ObjectStorageService(adapter)  # type: ignore[arg-type]
+    with timer() as t:
+        store = TripleStoreService__SecondaryAdaptor__ObjectStorage(storage, **kwargs)
+    return store, t[0], adapter.calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subjects", type=int, default=100_000)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--segment-triples", type=int, default=100_000)
+    args = parser.parse_args()
+    latency_s = args.latency_ms / 1000
+
+    print("\nObject storage triple store cold start benchmark")
+    print(f"  Python   : {sys.version.split()[0]}")
+    print(f"  Platform : {platform.platform()}")
+    print(f"  Machine  : {platform.machine()}")
+    print(f"  subjects={args.subjects:,} latency={args.latency_ms} ms\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        graph = build_graph(args.subjects)
+        store, _, _ = open_store(tmp, 0.0, packed=False)
+        with timer() as t:
+            store.insert(graph)
+        print(f"  wrote {len(graph):,} triples as per-subject objects in {t[0]:.1f} s")
+
+        store, seconds, calls = open_store(tmp, latency_s, packed=False)
+        print(
+            f"  {'per-subject objects':24s} {seconds:8.2f} s  "
+            f"{calls:>8,} storage calls  {len(store.get()):,} triples"
+        )
+
+        # The first packed open finds no snapshot, loads the per-subject
+        # objects and packs them in the background; snapshot() waits for it.
+        with timer() as t:
+            store, _, _ = open_store(
+                tmp, 0.0, packed=True, segment_triples=args.segment_triples
+            )
+            store.snapshot()
+        print(f"  first packed open + snapshot in {t[0]:.1f} s")
+
+        store, seconds, calls = open_store(
+            tmp, latency_s, packed=True, segment_triples=args.segment_triples
+        )
+        print(
+            f"  {'packed snapshot':24s} {seconds:8.2f} s  "
+            f"{calls:>8,} storage calls  {len(store.get()):,} triples"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,7 @@ Endpoints:
   POST /update  — SPARQL update; body=sparql-update
   GET  /store          — dump default graph (text/turtle)
   POST /store?default  — bulk insert default graph (application/n-triples)
+  POST /store?graph=<iri> — bulk insert into a named graph (application/n-triples)
   DELETE /store?default — bulk delete default graph (application/n-triples)
 
 Run with::
@@ -33,7 +34,14 @@ import logging
 from pathlib import Path
 
 from fastapi import FastAPI, HTTPException, Request, Response
-from pyoxigraph import QueryResultsFormat, QueryTriples, RdfFormat, Store
+from pyoxigraph import (
+    DefaultGraph,
+    NamedNode,
+    QueryResultsFormat,
+    QueryTriples,
+    RdfFormat,
+    Store,
+)
 from starlette.concurrency import run_in_threadpool
 
 logger = logging.getLogger(__name__)
@@ -64,6 +72,14 @@ def _rdf_format_for_accept(accept: str) -> tuple[RdfFormat, str]:
     return RdfFormat.TURTLE, "text/turtle"
 
 
+def _target_graph(request: Request) -> NamedNode | DefaultGraph:
+    """Resolve the Graph Store Protocol target (``?graph=<iri>`` or ``?default``)."""
+    graph = request.query_params.get("graph")
+    if graph:
+        return NamedNode(graph)
+    return DefaultGraph()
+
+
 def create_app(store_path: str) -> FastAPI:
     """Build the FastAPI app for the given store path.
 
@@ -169,7 +185,7 @@ def create_app(store_path: str) -> FastAPI:
         return Response(status_code=204)
 
     # ------------------------------------------------------------------
-    # /store — bulk RDF I/O on the default graph
+    # /store — bulk RDF I/O on the default graph or a ``?graph=`` named graph
     # ------------------------------------------------------------------
     @app.get("/store")
     async def store_get(request: Request) -> Response:
@@ -185,7 +201,12 @@ def create_app(store_path: str) -> FastAPI:
         body = await request.body()
         fmt, _ = _rdf_format_for_accept(content_type)
         try:
-            await run_in_threadpool(store.bulk_load, io.BytesIO(body), format=fmt)
+            await run_in_threadpool(
+                store.bulk_load,
+                io.BytesIO(body),
+                format=fmt,
+                to_graph=_target_graph(request),
+            )
         except Exception as exc:  # pragma: no cover
             logger.exception("bulk load failed")
             raise HTTPException(status_code=500, detail=str(exc))
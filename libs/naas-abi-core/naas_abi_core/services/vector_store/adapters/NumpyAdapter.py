@@ -0,0 +1,607 @@
+"""
+In-process exact vector store backed by contiguous NumPy matrices.
+
+Meant for small and medium collections where running (or even importing)
+Qdrant is not worth it. Each collection is one float32 matrix with a
+parallel id list and per-key metadata columns:
+
+  * ``cosine`` rows are stored L2-normalized (with their norms kept aside to
+    give back the original vectors), so a search is a single BLAS
+    matrix-vector product followed by ``argpartition`` for the top k.
+  * ``euclidean`` uses ``||x||^2 - 2 x.q + ||q||^2`` with cached squared
+    norms; ``dot`` is the raw product.
+  * Filters are single-field equality (same DSL as the Qdrant adapters) and
+    are turned into a boolean pre-mask over the metadata columns before any
+    distance is computed.
+  * ``search_batch`` answers many queries with one matrix-matrix product.
+
+Scores follow the Qdrant adapters: similarity for cosine/dot (higher is
+closer), distance for euclidean (lower is closer), so this adapter can be
+swapped for ``QdrantInMemoryAdapter`` at config time.
+
+With ``persistence_path`` set, collections are written as ``.npy`` files
+(plus a JSON sidecar for ids, metadata and payloads) and loaded
+memory-mapped on ``initialize()``; a collection is copied into memory the
+first time it is modified. Modified collections are written at most
+``flush_interval`` seconds after the first unsaved change (immediately when
+it is 0), on ``flush()``, and on ``close()``, which also runs at interpreter
+exit.
+
+Every write of a collection is a new generation directory inside the
+collection's directory, written under a temporary name and renamed into
+place; the newest generation is loaded. A crash mid-write leaves the previous
+generation intact, and files are never rewritten in place, so a process that
+has an older generation memory-mapped keeps reading it.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import urllib.parse
+import uuid
+from typing import Any, Literal
+
+import numpy as np
+
+from ..IVectorStorePort import IVectorStorePort, SearchResult, VectorDocument
+
+logger = logging.getLogger(__name__)
+
+
+_METRIC_ALIASES = {"cosine": "cosine", "dot": "dot", "euclidean": "euclidean", "l2": "euclidean"}
+
+# Below this fraction of matching rows a filtered search gathers the matching
+# rows first instead of scoring the whole matrix and masking afterwards.
+_GATHER_SELECTIVITY = 0.25
+
+_MISSING = object()
+
+_COLLECTION_FILE = "collection.json"
+_VECTORS_FILE = "vectors.npy"
+_NORMS_FILE = "norms.npy"
+_RECORDS_FILE = "records.json"
+
+
+def _normalize_metric(metric: str) -> str:
+    m = _METRIC_ALIASES.get(metric.lower())
+    if m is None:
+        raise ValueError(
+            f"Unsupported distance_metric: {metric!r}. "
+            f"Supported: {sorted(_METRIC_ALIASES)}"
+        )
+    return m
+
+
+class _Collection:
+    """Column store for one collection. Callers hold the adapter lock."""
+
+    def __init__(self, dimension: int, metric: str, capacity: int = 1024) -> None:
+        self.dimension = dimension
+        self.metric = metric
+        self.size = 0
+        # For cosine: unit rows; otherwise the raw vectors.
+        self.matrix = np.zeros((capacity, dimension), dtype=np.float32)
+        # For cosine: the original norms; for euclidean: squared norms.
+        self.norms = np.zeros(capacity, dtype=np.float32)
+        self.ids: list[str] = []
+        self.rows: dict[str, int] = {}
+        self.metadata: list[dict[str, Any]] = []
+        self.payloads: list[dict[str, Any] | None] = []
+        self.columns: dict[str, np.ndarray] = {}
+
+    # --- storage --------------------------------------------------------
+
+    def _ensure_writable(self) -> None:
+        # Memory-mapped matrices are read-only until the first write.
+        if isinstance(self.matrix, np.memmap) or not self.matrix.flags.writeable:
+            self.matrix = np.array(self.matrix, dtype=np.float32)
+            self.norms = np.array(self.norms, dtype=np.float32)
+
+    def _grow(self, needed: int) -> None:
+        capacity = len(self.matrix)
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2, 16)
+        matrix = np.zeros((new_capacity, self.dimension), dtype=np.float32)
+        matrix[: self.size] = self.matrix[: self.size]
+        norms = np.zeros(new_capacity, dtype=np.float32)
+        norms[: self.size] = self.norms[: self.size]
+        self.matrix, self.norms = matrix, norms
+        for key, column in self.columns.items():
+            grown = np.full(new_capacity, _MISSING, dtype=object)
+            grown[: self.size] = column[: self.size]
+            self.columns[key] = grown
+
+    def _column(self, key: str) -> np.ndarray:
+        column = self.columns.get(key)
+        if column is None:
+            column = np.full(len(self.matrix), _MISSING, dtype=object)
+            self.columns[key] = column
+        return column
+
+    def _encode(self, vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        if self.metric == "cosine":
+            norms = np.linalg.norm(vectors, axis=1)
+            safe = np.where(norms == 0, 1.0, norms)
+            return vectors / safe[:, None], norms
+        if self.metric == "euclidean":
+            return vectors, np.einsum("ij,ij->i", vectors, vectors)
+        return vectors, np.zeros(len(vectors), dtype=np.float32)
+
+    def vector(self, row: int) -> np.ndarray:
+        if self.metric == "cosine":
+            return self.matrix[row] * self.norms[row]
+        return np.array(self.matrix[row])
+
+    def _set_metadata(self, row: int, metadata: dict[str, Any]) -> None:
+        for column in self.columns.values():
+            column[row] = _MISSING
+        for key, value in metadata.items():
+            self._column(key)[row] = value
+
+    def upsert(self, documents: list[VectorDocument]) -> None:
+        vectors = np.empty((len(documents), self.dimension), dtype=np.float32)
+        for i, doc in enumerate(documents):
+            vec = np.asarray(doc.vector, dtype=np.float32)
+            if vec.shape != (self.dimension,):
+                raise ValueError(
+                    f"vector dimension mismatch for id={doc.id}: "
+                    f"expected {self.dimension}, got {vec.shape}"
+                )
+            vectors[i] = vec
+        self._ensure_writable()
+        self._grow(self.size + len(documents))
+        encoded, norms = self._encode(vectors)
+        for i, doc in enumerate(documents):
+            row = self.rows.get(doc.id)
+            if row is None:
+                row = self.size
+                self.size += 1
+                self.rows[doc.id] = row
+                self.ids.append(doc.id)
+                self.metadata.append({})
+                self.payloads.append(None)
+            self.matrix[row] = encoded[i]
+            self.norms[row] = norms[i]
+            self.metadata[row] = dict(doc.metadata or {})
+            self.payloads[row] = doc.payload
+            self._set_metadata(row, self.metadata[row])
+
+    def update(
+        self,
+        vector_id: str,
+        vector: np.ndarray | None,
+        metadata: dict[str, Any] | None,
+        payload: dict[str, Any] | None,
+    ) -> None:
+        row = self.rows.get(vector_id)
+        if row is None:
+            raise KeyError(f"Vector not found: {vector_id}")
+        self._ensure_writable()
+        if vector is not None:
+            arr = np.asarray(vector, dtype=np.float32)
+            if arr.shape != (self.dimension,):
+                raise ValueError(
+                    f"vector dimension mismatch for id={vector_id}: "
+                    f"expected {self.dimension}, got {arr.shape}"
+                )
+            encoded, norms = self._encode(arr[None, :])
+            self.matrix[row] = encoded[0]
+            self.norms[row] = norms[0]
+        if metadata is not None:
+            self.metadata[row] = dict(metadata)
+            self._set_metadata(row, self.metadata[row])
+        if payload is not None:
+            self.payloads[row] = payload
+
+    def delete(self, vector_ids: list[str]) -> None:
+        self._ensure_writable()
+        for vector_id in vector_ids:
+            row = self.rows.pop(vector_id, None)
+            if row is None:
+                continue
+            # Swap-remove: move the last row into the hole so rows stay dense.
+            last = self.size - 1
+            if row != last:
+                moved = self.ids[last]
+                self.matrix[row] = self.matrix[last]
+                self.norms[row] = self.norms[last]
+                self.ids[row] = moved
+                self.metadata[row] = self.metadata[last]
+                self.payloads[row] = self.payloads[last]
+                for column in self.columns.values():
+                    column[row] = column[last]
+                self.rows[moved] = row
+            for column in self.columns.values():
+                column[last] = _MISSING
+            self.ids.pop()
+            self.metadata.pop()
+            self.payloads.pop()
+            self.size = last
+
+    # --- search ---------------------------------------------------------
+
+    def mask(self, filter_spec: dict[str, Any] | None) -> np.ndarray | None:
+        if not filter_spec:
+            return None
+        mask = np.ones(self.size, dtype=bool)
+        for key, value in filter_spec.items():
+            if isinstance(value, (dict, list)):
+                raise NotImplementedError(
+                    f"NumpyAdapter only supports simple equality filters; "
+                    f"got nested value for key {key!r}"
+                )
+            column = self.columns.get(key)
+            if column is None:
+                return np.zeros(self.size, dtype=bool)
+            mask &= column[: self.size] == value
+        return mask
+
+    def _encode_queries(self, queries: np.ndarray) -> np.ndarray:
+        if self.metric == "cosine":
+            norms = np.linalg.norm(queries, axis=1, keepdims=True)
+            return queries / np.where(norms == 0, 1.0, norms)
+        return queries
+
+    def scores(
+        self, queries: np.ndarray, rows: np.ndarray | None
+    ) -> tuple[np.ndarray, bool]:
+        """Score ``queries`` (m, d) against ``rows`` (all rows when None).
+
+        Returns an (m, len(rows)) score matrix and whether higher is closer.
+        """
+        matrix = self.matrix[: self.size] if rows is None else self.matrix[rows]
+        q = self._encode_queries(queries)
+        products = q @ matrix.T
+        if self.metric != "euclidean":
+            return products, True
+        sq_norms = self.norms[: self.size] if rows is None else self.norms[rows]
+        sq = sq_norms[None, :] - 2.0 * products + np.einsum("ij,ij->i", q, q)[:, None]
+        return np.sqrt(np.maximum(sq, 0.0)), False
+
+
+class NumpyAdapter(IVectorStorePort):
+    """Exact in-process vector store over contiguous NumPy matrices."""
+
+    def __init__(
+        self,
+        persistence_path: str | None = None,
+        mmap: bool = True,
+        flush_interval: float = 1.0,
+    ) -> None:
+        self.persistence_path = persistence_path
+        self.mmap = mmap
+        self.flush_interval = flush_interval
+        self._collections: dict[str, _Collection] | None = None
+        self._dirty: set[str] = set()
+        self._flush_timer: threading.Timer | None = None
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def initialize(self) -> None:
+        with self._lock:
+            if self._collections is not None:
+                return
+            self._collections = {}
+            if self.persistence_path is None:
+                logger.info("Initialized in-memory NumpyAdapter")
+                return
+            os.makedirs(self.persistence_path, exist_ok=True)
+            atexit.register(self.close)
+            for entry in sorted(os.listdir(self.persistence_path)):
+                generations = self._generations(os.path.join(self.persistence_path, entry))
+                if generations:
+                    name = urllib.parse.unquote(entry)
+                    self._collections[name] = self._load_collection(generations[0])
+            logger.info(
+                "Initialized NumpyAdapter at %s (%d collections)",
+                self.persistence_path,
+                len(self._collections),
+            )
+
+    def _require(self) -> dict[str, _Collection]:
+        if self._collections is None:
+            raise RuntimeError("Adapter not initialized")
+        return self._collections
+
+    def _get(self, collection_name: str) -> _Collection:
+        collection = self._require().get(collection_name)
+        if collection is None:
+            raise KeyError(f"Collection not found: {collection_name}")
+        return collection
+
+    def _directory(self, collection_name: str) -> str:
+        assert self.persistence_path is not None
+        return os.path.join(
+            self.persistence_path, urllib.parse.quote(collection_name, safe="")
+        )
+
+    @staticmethod
+    def _generations(directory: str) -> list[str]:
+        """Complete generation directories of a collection, newest first."""
+        try:
+            entries = os.listdir(directory)
+        except OSError:
+            return []
+        return [
+            os.path.join(directory, entry)
+            for entry in sorted(entries, reverse=True)
+            if not entry.startswith(".")
+            and os.path.isfile(os.path.join(directory, entry, _COLLECTION_FILE))
+        ]
+
+    def _write_generation(self, directory: str, collection: _Collection) -> None:
+        os.makedirs(directory, exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=".tmp-", dir=directory)
+        try:
+            np.save(
+                os.path.join(tmp, _VECTORS_FILE),
+                np.ascontiguousarray(collection.matrix[: collection.size]),
+            )
+            np.save(os.path.join(tmp, _NORMS_FILE), collection.norms[: collection.size])
+            with open(os.path.join(tmp, _RECORDS_FILE), "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "ids": collection.ids,
+                        "metadata": collection.metadata,
+                        "payloads": collection.payloads,
+                    },
+                    f,
+                )
+            with open(os.path.join(tmp, _COLLECTION_FILE), "w", encoding="utf-8") as f:
+                json.dump({"dimension": collection.dimension, "metric": collection.metric}, f)
+            generation = os.path.join(directory, f"{time.time_ns():020d}-{uuid.uuid4().hex}")
+            os.rename(tmp, generation)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        # Removing (not truncating) the old files keeps existing memory maps valid.
+        for old in self._generations(directory):
+            if old < generation:
+                shutil.rmtree(old, ignore_errors=True)
+
+    def _load_collection(self, directory: str) -> _Collection:
+        with open(os.path.join(directory, _COLLECTION_FILE), encoding="utf-8") as f:
+            info = json.load(f)
+        with open(os.path.join(directory, _RECORDS_FILE), encoding="utf-8") as f:
+            records = json.load(f)
+        collection = _Collection(info["dimension"], info["metric"], capacity=0)
+        mmap_mode: Literal["r", "r+", "w+", "c"] | None = "r" if self.mmap else None
+        collection.matrix = np.load(os.path.join(directory, _VECTORS_FILE), mmap_mode=mmap_mode)
+        collection.norms = np.load(os.path.join(directory, _NORMS_FILE), mmap_mode=mmap_mode)
+        collection.size = len(records["ids"])
+        collection.ids = list(records["ids"])
+        collection.rows = {vector_id: row for row, vector_id in enumerate(collection.ids)}
+        collection.metadata = records["metadata"]
+        collection.payloads = records["payloads"]
+        for row, metadata in enumerate(collection.metadata):
+            for key, value in metadata.items():
+                collection._column(key)[row] = value
+        return collection
+
+    def _mark_dirty(self, collection_name: str) -> None:
+        """Record a change and schedule its write. Callers hold the lock."""
+        self._dirty.add(collection_name)
+        if self.persistence_path is None:
+            return
+        if self.flush_interval <= 0:
+            self.flush()
+        elif self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.flush_interval, self._flush_pending)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _flush_pending(self) -> None:
+        with self._lock:
+            if self._collections is None:
+                return
+            try:
+                self.flush()
+            except OSError:
+                logger.exception("NumpyAdapter background flush failed")
+
+    def flush(self) -> None:
+        """Write every collection modified since the last flush to disk."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if self.persistence_path is None:
+                return
+            collections = self._require()
+            for name in sorted(self._dirty):
+                collection = collections.get(name)
+                if collection is None:
+                    continue
+                self._write_generation(self._directory(name), collection)
+            self._dirty.clear()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._collections is None:
+                return
+            self.flush()
+            self._collections = None
+            atexit.unregister(self.close)
+
+    # ------------------------------------------------------------------
+    # Collections
+    # ------------------------------------------------------------------
+
+    def create_collection(
+        self,
+        collection_name: str,
+        dimension: int,
+        distance_metric: str = "cosine",
+        **kwargs: Any,
+    ) -> None:
+        metric = _normalize_metric(distance_metric)
+        if dimension <= 0:
+            raise ValueError("dimension must be a positive integer")
+        with self._lock:
+            self._require()[collection_name] = _Collection(dimension, metric)
+            self._mark_dirty(collection_name)
+
+    def delete_collection(self, collection_name: str) -> None:
+        with self._lock:
+            self._require().pop(collection_name, None)
+            self._dirty.discard(collection_name)
+            if self.persistence_path is not None:
+                shutil.rmtree(self._directory(collection_name), ignore_errors=True)
+
+    def list_collections(self) -> list[str]:
+        with self._lock:
+            return sorted(self._require())
+
+    # ------------------------------------------------------------------
+    # Vectors
+    # ------------------------------------------------------------------
+
+    def store_vectors(
+        self,
+        collection_name: str,
+        documents: list[VectorDocument],
+    ) -> None:
+        if not documents:
+            return
+        with self._lock:
+            self._get(collection_name).upsert(documents)
+            self._mark_dirty(collection_name)
+
+    def search(
+        self,
+        collection_name: str,
+        query_vector: np.ndarray,
+        k: int = 10,
+        filter: dict[str, Any] | None = None,
+        include_vectors: bool = False,
+        include_metadata: bool = True,
+    ) -> list[SearchResult]:
+        query = np.asarray(query_vector, dtype=np.float32)[None, :]
+        return self.search_batch(
+            collection_name,
+            query,
+            k=k,
+            filter=filter,
+            include_vectors=include_vectors,
+            include_metadata=include_metadata,
+        )[0]
+
+    def search_batch(
+        self,
+        collection_name: str,
+        query_vectors: np.ndarray,
+        k: int = 10,
+        filter: dict[str, Any] | None = None,
+        include_vectors: bool = False,
+        include_metadata: bool = True,
+    ) -> list[list[SearchResult]]:
+        """Top-``k`` results for each row of ``query_vectors`` (shape (m, d))."""
+        queries = np.atleast_2d(np.asarray(query_vectors, dtype=np.float32))
+        with self._lock:
+            collection = self._get(collection_name)
+            if queries.shape[1] != collection.dimension:
+                raise ValueError(
+                    f"query dimension mismatch: expected {collection.dimension}, "
+                    f"got {queries.shape[1]}"
+                )
+            if collection.size == 0 or k <= 0:
+                return [[] for _ in range(len(queries))]
+
+            mask = collection.mask(filter)
+            rows: np.ndarray | None = None
+            if mask is not None:
+                matching = int(mask.sum())
+                if matching == 0:
+                    return [[] for _ in range(len(queries))]
+                if matching < _GATHER_SELECTIVITY * collection.size:
+                    rows = np.flatnonzero(mask)
+                    mask = None
+
+            scores, higher_is_closer = collection.scores(queries, rows)
+            keys = -scores if higher_is_closer else scores
+            if mask is not None:
+                keys = np.where(mask[None, :], keys, np.inf)
+            candidates = keys.shape[1] if mask is None else int(mask.sum())
+            top_k = min(k, candidates)
+
+            if top_k < keys.shape[1]:
+                top = np.argpartition(keys, top_k - 1, axis=1)[:, :top_k]
+            else:
+                top = np.broadcast_to(np.arange(keys.shape[1]), (len(keys), keys.shape[1]))
+            order = np.take_along_axis(keys, top, axis=1).argsort(axis=1, kind="stable")
+            top = np.take_along_axis(top, order, axis=1)
+
+            results: list[list[SearchResult]] = []
+            for qi in range(len(queries)):
+                hits: list[SearchResult] = []
+                for column in top[qi]:
+                    row = int(column if rows is None else rows[column])
+                    hits.append(
+                        SearchResult(
+                            id=collection.ids[row],
+                            score=float(scores[qi, column]),
+                            vector=collection.vector(row) if include_vectors else None,
+                            metadata=dict(collection.metadata[row])
+                            if include_metadata
+                            else None,
+                            payload=collection.payloads[row],
+                        )
+                    )
+                results.append(hits)
+            return results
+
+    def get_vector(
+        self,
+        collection_name: str,
+        vector_id: str,
+        include_vector: bool = True,
+    ) -> VectorDocument | None:
+        with self._lock:
+            collection = self._get(collection_name)
+            row = collection.rows.get(vector_id)
+            if row is None:
+                return None
+            return VectorDocument(
+                id=vector_id,
+                vector=collection.vector(row)
+                if include_vector
+                else np.array([], dtype=np.float32),
+                metadata=dict(collection.metadata[row]),
+                payload=collection.payloads[row],
+            )
+
+    def update_vector(
+        self,
+        collection_name: str,
+        vector_id: str,
+        vector: np.ndarray | None = None,
+        metadata: dict[str, Any] | None = None,
+        payload: dict[str, Any] | None = None,
+    ) -> None:
+        if vector is None and metadata is None and payload is None:
+            return
+        with self._lock:
+            self._get(collection_name).update(vector_id, vector, metadata, payload)
+            self._mark_dirty(collection_name)
+
+    def delete_vectors(self, collection_name: str, vector_ids: list[str]) -> None:
+        if not vector_ids:
+            return
+        with self._lock:
+            self._get(collection_name).delete(vector_ids)
+            self._mark_dirty(collection_name)
+
+    def count_vectors(self, collection_name: str) -> int:
+        with self._lock:
+            return self._get(collection_name).size
@@ -0,0 +1,206 @@
+
+import numpy as np
+import pytest
+from naas_abi_core.services.vector_store.adapters.NumpyAdapter import NumpyAdapter
+from naas_abi_core.services.vector_store.IVectorStorePort import VectorDocument
+from naas_abi_core.services.vector_store.IVectorStorePort_test import (
+    GenericVectorStoreAdapterTest,
+)
+
+
+def _documents(n: int, dim: int, seed: int = 0) -> list[VectorDocument]:
+    rng = np.random.default_rng(seed)
+    return [
+        VectorDocument(
+            id=f"doc-{i}",
+            vector=rng.normal(size=dim).astype(np.float32),
+            metadata={"group": i % 10, "kind": "even" if i % 2 == 0 else "odd"},
+            payload={"i": i},
+        )
+        for i in range(n)
+    ]
+
+
+def _brute_force(documents, query, k, metric):
+    matrix = np.vstack([d.vector for d in documents]).astype(np.float64)
+    q = np.asarray(query, dtype=np.float64)
+    if metric == "cosine":
+        keys = -(matrix @ q) / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(q))
+    elif metric == "dot":
+        keys = -(matrix @ q)
+    else:
+        keys = np.linalg.norm(matrix - q, axis=1)
+    return [documents[i].id for i in np.argsort(keys, kind="stable")[:k]]
+
+
+class TestNumpyAdapter(GenericVectorStoreAdapterTest):
+    @pytest.fixture
+    def adapter(self):
+        adapter = NumpyAdapter()
+        adapter.initialize()
+        yield adapter
+        adapter.close()
+
+    @pytest.mark.parametrize("metric", ["cosine", "dot", "euclidean"])
+    def test_search_matches_brute_force(self, adapter, metric):
+        documents = _documents(500, 16)
+        adapter.create_collection("c", 16, distance_metric=metric)
+        adapter.store_vectors("c", documents)
+
+        query = np.random.default_rng(1).normal(size=16).astype(np.float32)
+        results = adapter.search("c", query, k=10)
+
+        assert [r.id for r in results] == _brute_force(documents, query, 10, metric)
+        if metric == "euclidean":
+            assert results[0].score == pytest.approx(
+                float(np.linalg.norm(documents[int(results[0].id[4:])].vector - query)),
+                rel=1e-4,
+            )
+
+    def test_search_batch_matches_single_queries(self, adapter):
+        documents = _documents(300, 8)
+        adapter.create_collection("c", 8)
+        adapter.store_vectors("c", documents)
+        queries = np.random.default_rng(2).normal(size=(5, 8)).astype(np.float32)
+
+        batched = adapter.search_batch("c", queries, k=4, filter={"kind": "odd"})
+
+        for query, hits in zip(queries, batched):
+            single = adapter.search("c", query, k=4, filter={"kind": "odd"})
+            assert [h.id for h in hits] == [s.id for s in single]
+            assert all(h.metadata["kind"] == "odd" for h in hits)
+
+    @pytest.mark.parametrize("filter_spec", [{"group": 3}, {"kind": "even"}])
+    def test_filtered_search_matches_brute_force(self, adapter, filter_spec):
+        # {"group": 3} is selective enough to take the gather path;
+        # {"kind": "even"} scores every row and masks afterwards.
+        documents = _documents(400, 8)
+        adapter.create_collection("c", 8)
+        adapter.store_vectors("c", documents)
+        query = documents[0].vector
+
+        results = adapter.search("c", query, k=50, filter=filter_spec)
+
+        key, value = next(iter(filter_spec.items()))
+        matching = [d for d in documents if d.metadata[key] == value]
+        assert [r.id for r in results] == _brute_force(matching, query, 50, "cosine")
+
+    def test_filter_on_unknown_key_returns_nothing(self, adapter):
+        adapter.create_collection("c", 8)
+        adapter.store_vectors("c", _documents(10, 8))
+        assert adapter.search("c", np.ones(8), filter={"missing": 1}) == []
+
+    def test_upsert_update_and_delete_keep_rows_consistent(self, adapter):
+        documents = _documents(50, 4)
+        adapter.create_collection("c", 4)
+        adapter.store_vectors("c", documents)
+
+        adapter.delete_vectors("c", ["doc-3", "doc-10", "unknown"])
+        adapter.store_vectors(
+            "c", [VectorDocument(id="doc-5", vector=np.ones(4), metadata={"group": 99})]
+        )
+        adapter.update_vector("c", "doc-49", metadata={"group": 42})
+
+        assert adapter.count_vectors("c") == 48
+        assert adapter.get_vector("c", "doc-3") is None
+        moved = adapter.get_vector("c", "doc-49")
+        np.testing.assert_allclose(moved.vector, documents[49].vector, rtol=1e-5)
+        assert moved.metadata == {"group": 42}
+        assert [r.id for r in adapter.search("c", np.ones(4), k=1, filter={"group": 99})] == [
+            "doc-5"
+        ]
+        assert adapter.search("c", np.ones(4), filter={"group": 3}) != []
+        assert "doc-3" not in {r.id for r in adapter.search("c", np.ones(4), k=50)}
+
+    @pytest.mark.parametrize("mmap", [True, False])
+    def test_persistence_round_trip(self, tmp_path, mmap):
+        documents = _documents(100, 8)
+        first = NumpyAdapter(persistence_path=str(tmp_path / "store"), mmap=mmap)
+        first.initialize()
+        first.create_collection("chat/files", 8, distance_metric="euclidean")
+        first.store_vectors("chat/files", documents)
+        first.delete_vectors("chat/files", ["doc-0"])
+        first.close()
+
+        second = NumpyAdapter(persistence_path=str(tmp_path / "store"), mmap=mmap)
+        second.initialize()
+        assert second.list_collections() == ["chat/files"]
+        assert second.count_vectors("chat/files") == 99
+        query = documents[7].vector
+        assert [r.id for r in second.search("chat/files", query, k=5)] == _brute_force(
+            documents[1:], query, 5, "euclidean"
+        )
+        assert second.get_vector("chat/files", "doc-7").payload == {"i": 7}
+
+        # The first write copies a memory-mapped collection into RAM.
+        second.store_vectors("chat/files", [documents[0]])
+        assert second.count_vectors("chat/files") == 100
+        second.close()
+
+    def test_writes_are_persisted_without_close(self, tmp_path):
+        path = str(tmp_path / "store")
+        writer = NumpyAdapter(persistence_path=path, flush_interval=0)
+        writer.initialize()
+        writer.create_collection("c", 8)
+        writer.store_vectors("c", _documents(10, 8))
+
+        reader = NumpyAdapter(persistence_path=path)
+        reader.initialize()
+        assert reader.count_vectors("c") == 10
+        writer.close()
+        reader.close()
+
+    def test_background_flush_writes_pending_changes(self, tmp_path):
+        path = str(tmp_path / "store")
+        writer = NumpyAdapter(persistence_path=path, flush_interval=3600)
+        writer.initialize()
+        writer.create_collection("c", 8)
+        writer.store_vectors("c", _documents(10, 8))
+        timer = writer._flush_timer
+        assert timer is not None and timer.is_alive()
+        assert NumpyAdapter._generations(str(tmp_path / "store" / "c")) == []
+
+        # Run what the timer would, without racing it.
+        timer.function()
+        assert writer._flush_timer is None and timer.finished.is_set()
+        assert len(NumpyAdapter._generations(str(tmp_path / "store" / "c"))) == 1
+
+        reader = NumpyAdapter(persistence_path=path)
+        reader.initialize()
+        assert reader.count_vectors("c") == 10
+        writer.close()
+        reader.close()
+
+    def test_flush_writes_a_new_generation_and_keeps_readers_valid(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "store")
+        writer = NumpyAdapter(persistence_path=path, flush_interval=0)
+        writer.initialize()
+        writer.create_collection("c", 8)
+        writer.store_vectors("c", _documents(10, 8))
+        reader = NumpyAdapter(persistence_path=path, mmap=True)
+        reader.initialize()
+
+        writer.delete_vectors("c", ["doc-0", "doc-1"])
+        assert len(list((tmp_path / "store" / "c").iterdir())) == 1
+        assert reader.count_vectors("c") == 10
+        assert reader.get_vector("c", "doc-9") is not None
+
+        def fail(*args, **kwargs):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(np, "save", fail)
+        with pytest.raises(OSError):
+            writer.delete_vectors("c", ["doc-2"])
+        monkeypatch.undo()
+        survivor = NumpyAdapter(persistence_path=path)
+        survivor.initialize()
+        assert survivor.count_vectors("c") == 8
+        for adapter in (writer, reader, survivor):
+            adapter.close()
+
+    def test_dimension_mismatch_raises(self, adapter):
+        adapter.create_collection("c", 4)
+        with pytest.raises(ValueError, match="dimension mismatch"):
+            adapter.store_vectors(
+                "c", [VectorDocument(id="x", vector=np.ones(3), metadata={})]
+            )
@@ -8,13 +8,24 @@ plus serialized writers across processes — exactly what we need — and the
 ``sqlite-vec`` extension supplies the vector distance functions.
 
 Tradeoffs vs Qdrant:
-  * Flat scan via ``vec_distance_<metric>``. Fine for dev datasets
-    (<100k vectors); for larger sets we'd switch to a ``vec0`` virtual
-    table. Not implemented here.
+  * Flat scan via ``vec_distance_<metric>`` by default. Fine for dev
+    datasets; collections created with ``index="ivf"`` get an IVF index
+    instead (see below).
   * Filter DSL is restricted to single-field equality on metadata via
     ``json_extract`` — enough for the common case used in dev pipelines.
   * Behavior is intentionally a subset of the Qdrant adapter so it can be
     swapped at config time without code changes.
+
+IVF index (``index="ivf"``):
+  Once a collection holds ``min_train_size`` vectors, k-means centroids are
+  trained with NumPy and every row gets the ``cell`` of its nearest centroid.
+  A search only scans the ``nprobe`` cells closest to the query, and the
+  candidates are then ranked by the exact ``vec_distance_<metric>`` in SQL,
+  so ``nprobe`` is the recall/latency knob. Centroids live in the
+  ``ann_indexes`` table of the same SQLite file, so every process sharing the
+  file sees the same index; new rows are assigned on ``store_vectors`` and
+  the index is retrained when the collection has grown ``retrain_growth``
+  times since the last training.
 """
 
 from __future__ import annotations
@@ -34,6 +45,15 @@ logger = logging.getLogger(__name__)
 
 
 _SUPPORTED_METRICS = {"cosine", "euclidean", "l2", "dot", "l1"}
+_SUPPORTED_INDEXES = {"flat", "ivf"}
+
+# Metrics whose ranking ignores vector magnitude: cluster on the unit sphere.
+_ANGULAR_METRICS = {"cosine", "dot"}
+
+_KMEANS_ITERATIONS = 10
+# k-means is trained on a sample of at most this many vectors per centroid.
+_KMEANS_SAMPLES_PER_CELL = 64
+_ASSIGN_BATCH_SIZE = 4096
 
 
 def _metric_function(metric: str) -> str:
@@ -66,6 +86,52 @@ def _unpack_vector(blob: bytes, dimension: int) -> np.ndarray:
     return np.frombuffer(blob, dtype=np.float32, count=dimension).copy()
 
 
+def _normalize_rows(data: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(data, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return data / norms
+
+
+def _nearest_cells(
+    data: np.ndarray, centroids: np.ndarray, metric: str, nprobe: int = 1
+) -> np.ndarray:
+    """Return the ``nprobe`` closest centroid indices for each row of ``data``."""
+    nprobe = min(nprobe, len(centroids))
+    if metric in _ANGULAR_METRICS:
+        # Centroids are stored normalized; larger dot == closer.
+        scores = -(_normalize_rows(data) @ centroids.T)
+    else:
+        # ||x - c||^2 up to the per-row constant ||x||^2.
+        scores = (centroids * centroids).sum(axis=1) - 2.0 * (data @ centroids.T)
+    if nprobe == 1:
+        return scores.argmin(axis=1)[:, None]
+    top = np.argpartition(scores, nprobe - 1, axis=1)[:, :nprobe]
+    order = np.take_along_axis(scores, top, axis=1).argsort(axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+
+def _train_kmeans(data: np.ndarray, nlist: int, metric: str, seed: int = 0) -> np.ndarray:
+    """Plain Lloyd k-means (spherical for angular metrics) over ``data``."""
+    rng = np.random.default_rng(seed)
+    if metric in _ANGULAR_METRICS:
+        data = _normalize_rows(data)
+    centroids = data[rng.choice(len(data), size=nlist, replace=False)].copy()
+    for _ in range(_KMEANS_ITERATIONS):
+        assignment = _nearest_cells(data, centroids, metric)[:, 0]
+        counts = np.bincount(assignment, minlength=nlist)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, data)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+        empty = np.flatnonzero(~filled)
+        if len(empty):
+            # Re-seed empty cells on random points so every cell stays useful.
+            centroids[empty] = data[rng.choice(len(data), size=len(empty), replace=False)]
+        if metric in _ANGULAR_METRICS:
+            centroids = _normalize_rows(centroids)
+    return centroids.astype(np.float32)
+
+
 class SqliteVecAdapter(IVectorStorePort):
     """File-backed vector store using SQLite WAL + sqlite-vec."""
 
@@ -74,12 +140,28 @@ class SqliteVecAdapter(IVectorStorePort):
         persistence_path: str,
         journal_mode: str = "WAL",
         busy_timeout_ms: int = 5000,
+        default_index: str = "flat",
+        nprobe: int = 8,
+        min_train_size: int = 1024,
+        retrain_growth: float = 4.0,
     ) -> None:
+        if default_index not in _SUPPORTED_INDEXES:
+            raise ValueError(
+                f"Unsupported index: {default_index!r}. "
+                f"Supported: {sorted(_SUPPORTED_INDEXES)}"
+            )
         self.persistence_path = persistence_path
         self.journal_mode = journal_mode
         self.busy_timeout_ms = busy_timeout_ms
+        self.default_index = default_index
+        self.nprobe = nprobe
+        self.min_train_size = min_train_size
+        self.retrain_growth = retrain_growth
         self._conn: sqlite3.Connection | None = None
         self._lock = threading.RLock()
+        # collection -> (ann_indexes.version, centroids); reloaded whenever
+        # another process (or a retrain) bumps the version.
+        self._centroids: dict[str, tuple[int, np.ndarray]] = {}
 
     # ------------------------------------------------------------------
     # Lifecycle
@@ -132,8 +214,17 @@ class SqliteVecAdapter(IVectorStorePort):
                 );
                 CREATE INDEX IF NOT EXISTS idx_vectors_collection
                     ON vectors(collection);
+                CREATE TABLE IF NOT EXISTS ann_indexes (
+                    collection TEXT PRIMARY KEY
+                        REFERENCES collections(name) ON DELETE CASCADE,
+                    version INTEGER NOT NULL,
+                    nlist INTEGER NOT NULL,
+                    trained_size INTEGER NOT NULL,
+                    centroids BLOB NOT NULL
+                );
                 """
             )
+            self._migrate(conn)
 
             self._conn = conn
             logger.info(
@@ -142,6 +233,21 @@ class SqliteVecAdapter(IVectorStorePort):
                 self.busy_timeout_ms,
             )
 
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection) -> None:
+        """Add the IVF columns to stores created before they existed."""
+        collection_columns = {
+            row[1] for row in conn.execute("PRAGMA table_info(collections)")
+        }
+        if "index_params" not in collection_columns:
+            conn.execute("ALTER TABLE collections ADD COLUMN index_params TEXT")
+        vector_columns = {row[1] for row in conn.execute("PRAGMA table_info(vectors)")}
+        if "cell" not in vector_columns:
+            conn.execute("ALTER TABLE vectors ADD COLUMN cell INTEGER")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_vectors_cell ON vectors(collection, cell)"
+        )
+
     def _require(self) -> sqlite3.Connection:
         if self._conn is None:
             raise RuntimeError("Adapter not initialized")
@@ -164,24 +270,58 @@ class SqliteVecAdapter(IVectorStorePort):
         distance_metric: str = "cosine",
         **kwargs: Any,
     ) -> None:
+        """Create (or redefine) a collection.
+
+        Pass ``index="ivf"`` to enable the IVF index for this collection,
+        optionally with ``nprobe``, ``nlist`` (default: sqrt of the size at
+        training time), ``min_train_size`` and ``retrain_growth`` overriding
+        the adapter-wide defaults.
+        """
         # Validate metric early so callers see ValueError, not opaque
         # SQLite syntax errors later at search time.
         _metric_function(distance_metric)
         if dimension <= 0:
             raise ValueError("dimension must be a positive integer")
+        index = kwargs.get("index", self.default_index)
+        if index not in _SUPPORTED_INDEXES:
+            raise ValueError(
+                f"Unsupported index: {index!r}. Supported: {sorted(_SUPPORTED_INDEXES)}"
+            )
+        index_params = None
+        if index == "ivf":
+            index_params = json.dumps(
+                {
+                    "type": "ivf",
+                    "nlist": kwargs.get("nlist"),
+                    "nprobe": int(kwargs.get("nprobe", self.nprobe)),
+                    "min_train_size": int(
+                        kwargs.get("min_train_size", self.min_train_size)
+                    ),
+                    "retrain_growth": float(
+                        kwargs.get("retrain_growth", self.retrain_growth)
+                    ),
+                }
+            )
         with self._lock:
             conn = self._require()
             conn.execute(
-                "INSERT OR REPLACE INTO collections(name, dimension, distance_metric)"
-                " VALUES(?, ?, ?)",
-                (collection_name, dimension, distance_metric.lower()),
+                "INSERT OR REPLACE INTO collections"
+                "(name, dimension, distance_metric, index_params)"
+                " VALUES(?, ?, ?, ?)",
+                (collection_name, dimension, distance_metric.lower(), index_params),
             )
+            conn.execute("DELETE FROM ann_indexes WHERE collection = ?", (collection_name,))
+            conn.execute(
+                "UPDATE vectors SET cell = NULL WHERE collection = ?", (collection_name,)
+            )
+            self._centroids.pop(collection_name, None)
 
     def delete_collection(self, collection_name: str) -> None:
         with self._lock:
             conn = self._require()
             # FK ON DELETE CASCADE removes the vectors rows.
             conn.execute("DELETE FROM collections WHERE name = ?", (collection_name,))
+            self._centroids.pop(collection_name, None)
 
     def list_collections(self) -> list[str]:
         with self._lock:
@@ -201,6 +341,156 @@ class SqliteVecAdapter(IVectorStorePort):
             raise KeyError(f"Collection not found: {name}")
         return row[0], row[1]
 
+    def _index_params(self, name: str) -> dict[str, Any] | None:
+        row = self._require().execute(
+            "SELECT index_params FROM collections WHERE name = ?", (name,)
+        ).fetchone()
+        return json.loads(row[0]) if row is not None and row[0] else None
+
+    # ------------------------------------------------------------------
+    # IVF index
+    # ------------------------------------------------------------------
+
+    def _load_centroids(self, name: str) -> np.ndarray | None:
+        """Current centroids of ``name``, or None while the index is untrained."""
+        conn = self._require()
+        row = conn.execute(
+            "SELECT version FROM ann_indexes WHERE collection = ?", (name,)
+        ).fetchone()
+        if row is None:
+            self._centroids.pop(name, None)
+            return None
+        cached = self._centroids.get(name)
+        if cached is not None and cached[0] == row[0]:
+            return cached[1]
+        row = conn.execute(
+            "SELECT version, nlist, centroids FROM ann_indexes WHERE collection = ?",
+            (name,),
+        ).fetchone()
+        dim, _ = self._collection_info(name)
+        centroids = np.frombuffer(row["centroids"], dtype=np.float32).reshape(
+            row["nlist"], dim
+        )
+        self._centroids[name] = (row["version"], centroids)
+        return centroids
+
+    def rebuild_index(self, collection_name: str) -> int:
+        """(Re)train the IVF index of ``collection_name`` and reassign every row.
+
+        Returns the number of cells. Called automatically from
+        ``store_vectors``; exposed for maintenance and benchmarks.
+        """
+        with self._lock:
+            dim, metric = self._collection_info(collection_name)
+            params = self._index_params(collection_name)
+        if params is None:
+            raise ValueError(f"Collection {collection_name!r} has no IVF index")
+        return self._train(collection_name, dim, metric, params, force=True)
+
+    def _train(
+        self,
+        name: str,
+        dim: int,
+        metric: str,
+        params: dict[str, Any],
+        force: bool = False,
+    ) -> int:
+        """Train k-means on a sample, then install the centroids.
+
+        Only the install (centroids plus the reassignment of every row) runs
+        in a write transaction; sampling is a read and k-means runs without
+        any lock, so writers are not blocked while it trains. Unless
+        ``force``, the install is skipped when another writer trained on at
+        least as many vectors meanwhile.
+        """
+        with self._lock:
+            conn = self._require()
+            size = conn.execute(
+                "SELECT COUNT(*) FROM vectors WHERE collection = ?", (name,)
+            ).fetchone()[0]
+            if size == 0:
+                return 0
+            nlist = int(params.get("nlist") or max(1, round(size**0.5)))
+            nlist = min(nlist, size)
+            sample_rows = conn.execute(
+                "SELECT vector FROM vectors WHERE collection = ? ORDER BY random() LIMIT ?",
+                (name, nlist * _KMEANS_SAMPLES_PER_CELL),
+            ).fetchall()
+        sample = np.vstack([_unpack_vector(r[0], dim) for r in sample_rows])
+        centroids = _train_kmeans(sample, nlist, metric)
+
+        with self._lock:
+            conn = self._require()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                installed = self._install(
+                    conn, name, dim, metric, size, nlist, centroids, force
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        if installed:
+            logger.info(
+                "SqliteVecAdapter trained IVF index for %s: %d vectors, %d cells",
+                name,
+                size,
+                nlist,
+            )
+        return nlist
+
+    def _install(
+        self,
+        conn: sqlite3.Connection,
+        name: str,
+        dim: int,
+        metric: str,
+        size: int,
+        nlist: int,
+        centroids: np.ndarray,
+        force: bool,
+    ) -> bool:
+        previous = conn.execute(
+            "SELECT version, trained_size FROM ann_indexes WHERE collection = ?",
+            (name,),
+        ).fetchone()
+        if previous is not None and not force and previous[1] >= size:
+            return False
+        version = (previous[0] if previous else 0) + 1
+        conn.execute(
+            "INSERT OR REPLACE INTO ann_indexes"
+            "(collection, version, nlist, trained_size, centroids)"
+            " VALUES(?, ?, ?, ?, ?)",
+            (name, version, nlist, size, centroids.tobytes()),
+        )
+
+        cursor = conn.execute(
+            "SELECT rowid, vector FROM vectors WHERE collection = ?", (name,)
+        )
+        updates: list[tuple[int, int]] = []
+        while batch := cursor.fetchmany(_ASSIGN_BATCH_SIZE):
+            vectors = np.vstack([_unpack_vector(r[1], dim) for r in batch])
+            cells = _nearest_cells(vectors, centroids, metric)[:, 0]
+            updates.extend(zip(cells.tolist(), (r[0] for r in batch)))
+        conn.executemany("UPDATE vectors SET cell = ? WHERE rowid = ?", updates)
+
+        self._centroids[name] = (version, centroids)
+        return True
+
+    def _training_due(
+        self, conn: sqlite3.Connection, name: str, params: dict
+    ) -> bool:
+        """Train on reaching ``min_train_size``; retrain after ``retrain_growth``x growth."""
+        size = conn.execute(
+            "SELECT COUNT(*) FROM vectors WHERE collection = ?", (name,)
+        ).fetchone()[0]
+        row = conn.execute(
+            "SELECT trained_size FROM ann_indexes WHERE collection = ?", (name,)
+        ).fetchone()
+        if row is None:
+            return size >= params["min_train_size"]
+        return size >= row[0] * params["retrain_growth"]
+
     # ------------------------------------------------------------------
     # Vectors
     # ------------------------------------------------------------------
@@ -214,8 +504,9 @@ class SqliteVecAdapter(IVectorStorePort):
             return
         with self._lock:
             conn = self._require()
-            dim, _ = self._collection_info(collection_name)
-            rows = []
+            dim, metric = self._collection_info(collection_name)
+            params = self._index_params(collection_name)
+            vectors = []
             for doc in documents:
                 vec = np.asarray(doc.vector, dtype=np.float32)
                 if vec.shape != (dim,):
@@ -223,27 +514,42 @@ class SqliteVecAdapter(IVectorStorePort):
                         f"vector dimension mismatch for id={doc.id}: "
                         f"expected {dim}, got {vec.shape}"
                     )
-                rows.append(
-                    (
-                        collection_name,
-                        doc.id,
-                        _pack_vector(vec),
-                        json.dumps(doc.metadata) if doc.metadata else None,
-                        json.dumps(doc.payload) if doc.payload else None,
-                    )
-                )
+                vectors.append(vec)
             conn.execute("BEGIN IMMEDIATE")
             try:
+                # Read the centroids inside the write transaction so a
+                # concurrent retrain can't leave these rows on stale cells.
+                centroids = self._load_centroids(collection_name) if params else None
+                cells: list[int | None] = [None] * len(documents)
+                if centroids is not None:
+                    cells = _nearest_cells(np.vstack(vectors), centroids, metric)[
+                        :, 0
+                    ].tolist()
                 conn.executemany(
                     "INSERT OR REPLACE INTO vectors"
-                    "(collection, id, vector, metadata, payload)"
-                    " VALUES(?, ?, ?, ?, ?)",
-                    rows,
+                    "(collection, id, vector, metadata, payload, cell)"
+                    " VALUES(?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            collection_name,
+                            doc.id,
+                            _pack_vector(vec),
+                            json.dumps(doc.metadata) if doc.metadata else None,
+                            json.dumps(doc.payload) if doc.payload else None,
+                            cell,
+                        )
+                        for doc, vec, cell in zip(documents, vectors, cells)
+                    ],
+                )
+                due = params is not None and self._training_due(
+                    conn, collection_name, params
                 )
                 conn.execute("COMMIT")
             except Exception:
                 conn.execute("ROLLBACK")
                 raise
+        if due and params is not None:
+            self._train(collection_name, dim, metric, params)
 
     def _build_filter_sql(
         self, filter_spec: dict[str, Any] | None
@@ -284,16 +590,40 @@ class SqliteVecAdapter(IVectorStorePort):
             dim, metric = self._collection_info(collection_name)
             distance_fn = _metric_function(metric)
             filter_sql, filter_params = self._build_filter_sql(filter)
-            sql = (
-                f"SELECT id, vector, metadata, payload, "
-                f"  {distance_fn}(vector, ?) AS distance "
-                f"FROM vectors "
-                f"WHERE collection = ?{filter_sql} "
-                f"ORDER BY distance ASC LIMIT ?"
+            query = np.asarray(query_vector, dtype=np.float32)
+            qbytes = _pack_vector(query)
+
+            # `cell_sql` is only ever "" or "AND (cell IN (?,...) OR cell IS
+            # NULL)"; the probed cell ids are bound parameters.
+            def _select(cell_sql: str, cell_params: list[int]) -> list[sqlite3.Row]:
+                sql = (
+                    f"SELECT id, vector, metadata, payload, "
+                    f"  {distance_fn}(vector, ?) AS distance "
+                    f"FROM vectors "
+                    f"WHERE collection = ?{cell_sql}{filter_sql} "  # nosec B608
+                    f"ORDER BY distance ASC LIMIT ?"
+                )
+                params = [qbytes, collection_name, *cell_params, *filter_params, k]
+                return conn.execute(sql, params).fetchall()
+
+            index_params = self._index_params(collection_name)
+            centroids = (
+                self._load_centroids(collection_name) if index_params else None
             )
-            qbytes = _pack_vector(np.asarray(query_vector, dtype=np.float32))
-            params = [qbytes, collection_name, *filter_params, k]
-            rows = conn.execute(sql, params).fetchall()
+            if centroids is None or index_params is None:
+                rows = _select("", [])
+            else:
+                probes = _nearest_cells(
+                    query[None, :], centroids, metric, index_params["nprobe"]
+                )[0].tolist()
+                placeholders = ",".join("?" * len(probes))
+                rows = _select(
+                    f" AND (cell IN ({placeholders}) OR cell IS NULL)", probes
+                )
+                if len(rows) < k:
+                    # Probed cells ran dry (small k-neighbourhood or selective
+                    # filter): answer exactly rather than return short.
+                    rows = _select("", [])
 
             results: list[SearchResult] = []
             for row in rows:
@@ -355,7 +685,7 @@ class SqliteVecAdapter(IVectorStorePort):
     ) -> None:
         with self._lock:
             conn = self._require()
-            dim, _ = self._collection_info(collection_name)
+            dim, metric = self._collection_info(collection_name)
             sets: list[str] = []
             params: list[Any] = []
             if vector is not None:
@@ -367,6 +697,17 @@ class SqliteVecAdapter(IVectorStorePort):
                     )
                 sets.append("vector = ?")
                 params.append(_pack_vector(arr))
+                centroids = (
+                    self._load_centroids(collection_name)
+                    if self._index_params(collection_name)
+                    else None
+                )
+                sets.append("cell = ?")
+                params.append(
+                    None
+                    if centroids is None
+                    else int(_nearest_cells(arr[None, :], centroids, metric)[0, 0])
+                )
             if metadata is not None:
                 sets.append("metadata = ?")
                 params.append(json.dumps(metadata))
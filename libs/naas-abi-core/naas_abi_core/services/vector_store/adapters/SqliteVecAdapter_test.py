@@ -0,0 +1,209 @@
+import sqlite3
+
+import numpy as np
+import pytest
+from naas_abi_core.services.vector_store.adapters import (
+    SqliteVecAdapter as sqlite_vec_module,
+)
+from naas_abi_core.services.vector_store.adapters.SqliteVecAdapter import (
+    SqliteVecAdapter,
+)
+from naas_abi_core.services.vector_store.IVectorStorePort import VectorDocument
+
+pytest.importorskip("sqlite_vec")
+if not hasattr(sqlite3.Connection, "enable_load_extension"):
+    pytest.skip(
+        "sqlite3 was built without extension loading", allow_module_level=True
+    )
+
+
+def _clustered_documents(n: int, dim: int, seed: int = 0) -> list[VectorDocument]:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(32, dim)).astype(np.float32)
+    labels = rng.integers(0, len(centers), size=n)
+    vectors = centers[labels] + 0.3 * rng.normal(size=(n, dim)).astype(np.float32)
+    return [
+        VectorDocument(
+            id=f"doc-{i}",
+            vector=vectors[i],
+            metadata={"group": int(labels[i] % 4)},
+            payload={"i": i},
+        )
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def adapter(tmp_path):
+    adapter = SqliteVecAdapter(
+        persistence_path=str(tmp_path / "vectors.sqlite3"), min_train_size=500
+    )
+    adapter.initialize()
+    yield adapter
+    adapter.close()
+
+
+def test_flat_search_returns_exact_neighbours(adapter):
+    documents = _clustered_documents(200, 16)
+    adapter.create_collection("flat", 16)
+    adapter.store_vectors("flat", documents)
+
+    results = adapter.search("flat", documents[7].vector, k=5)
+
+    assert results[0].id == "doc-7"
+    assert results[0].score == pytest.approx(0.0, abs=1e-5)
+    assert [r.score for r in results] == sorted(r.score for r in results)
+
+
+def test_ivf_index_trains_at_threshold_and_keeps_recall(adapter):
+    documents = _clustered_documents(3000, 32)
+    adapter.create_collection("ivf", 32, index="ivf", nprobe=8)
+
+    adapter.store_vectors("ivf", documents[:400])
+    assert adapter._load_centroids("ivf") is None
+
+    adapter.store_vectors("ivf", documents[400:])
+    centroids = adapter._load_centroids("ivf")
+    assert centroids is not None
+    # Trained at 3000 vectors: nlist defaults to round(sqrt(3000)).
+    assert centroids.shape == (55, 32)
+
+    exact = SqliteVecAdapter(persistence_path=adapter.persistence_path)
+    exact.initialize()
+    exact_hits = 0
+    for doc in documents[:50]:
+        query = doc.vector + 0.05
+        expected = {r.id for r in adapter.search("ivf", query, k=10)}
+        with exact._lock:
+            exact_rows = (
+                exact._require()
+                .execute(
+                    "SELECT id FROM vectors WHERE collection = 'ivf' "
+                    "ORDER BY vec_distance_cosine(vector, ?) LIMIT 10",
+                    (query.astype(np.float32).tobytes(),),
+                )
+                .fetchall()
+            )
+        exact_hits += len(expected & {r[0] for r in exact_rows})
+    exact.close()
+    assert exact_hits / 500 >= 0.9
+
+
+def test_ivf_assigns_new_rows_and_reassigns_updated_vectors(adapter):
+    documents = _clustered_documents(600, 8)
+    adapter.create_collection("ivf", 8, index="ivf")
+    adapter.store_vectors("ivf", documents)
+
+    extra = VectorDocument(id="extra", vector=documents[0].vector, metadata={})
+    adapter.store_vectors("ivf", [extra])
+    conn = adapter._require()
+    cells = dict(
+        conn.execute(
+            "SELECT id, cell FROM vectors WHERE id IN ('extra', 'doc-0', 'doc-1')"
+        ).fetchall()
+    )
+    assert cells["extra"] == cells["doc-0"]
+    assert adapter.search("ivf", documents[0].vector, k=2)[0].id in {"extra", "doc-0"}
+
+    adapter.update_vector("ivf", "extra", vector=documents[1].vector)
+    (cell,) = conn.execute("SELECT cell FROM vectors WHERE id = 'extra'").fetchone()
+    assert cell == cells["doc-1"]
+
+    adapter.delete_vectors("ivf", ["extra"])
+    assert "extra" not in {r.id for r in adapter.search("ivf", documents[1].vector, k=5)}
+
+
+def test_ivf_filtered_search_falls_back_when_probed_cells_run_dry(adapter):
+    documents = _clustered_documents(600, 8)
+    documents[-1].metadata = {"group": "rare"}
+    adapter.create_collection("ivf", 8, index="ivf", nprobe=1)
+    adapter.store_vectors("ivf", documents)
+
+    results = adapter.search("ivf", documents[0].vector, k=3, filter={"group": "rare"})
+
+    assert [r.id for r in results] == [documents[-1].id]
+
+
+def test_ivf_index_is_shared_through_the_sqlite_file(adapter):
+    documents = _clustered_documents(600, 8)
+    adapter.create_collection("ivf", 8, index="ivf")
+    adapter.store_vectors("ivf", documents)
+
+    other = SqliteVecAdapter(persistence_path=adapter.persistence_path)
+    other.initialize()
+    np.testing.assert_array_equal(
+        other._load_centroids("ivf"), adapter._load_centroids("ivf")
+    )
+
+    other.rebuild_index("ivf")
+    (version,) = (
+        adapter._require()
+        .execute("SELECT version FROM ann_indexes WHERE collection = 'ivf'")
+        .fetchone()
+    )
+    assert version == 2
+    np.testing.assert_array_equal(
+        adapter._load_centroids("ivf"), other._load_centroids("ivf")
+    )
+    other.close()
+
+
+def test_ivf_training_does_not_hold_the_write_lock(adapter, monkeypatch):
+    documents = _clustered_documents(600, 8)
+    adapter.create_collection("ivf", 8, index="ivf")
+    train = sqlite_vec_module._train_kmeans
+    writer = sqlite3.connect(adapter.persistence_path, timeout=0)
+    writes: list[int] = []
+
+    def _train_while_writing(*args, **kwargs):
+        # Another process can write while k-means runs.
+        writer.execute("BEGIN IMMEDIATE")
+        writer.execute("ROLLBACK")
+        writes.append(1)
+        return train(*args, **kwargs)
+
+    monkeypatch.setattr(sqlite_vec_module, "_train_kmeans", _train_while_writing)
+    adapter.store_vectors("ivf", documents)
+    writer.close()
+
+    assert writes == [1]
+    assert adapter._load_centroids("ivf") is not None
+
+
+def test_initialize_migrates_stores_without_ivf_columns(tmp_path):
+    path = str(tmp_path / "legacy.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        """
+        CREATE TABLE collections (
+            name TEXT PRIMARY KEY,
+            dimension INTEGER NOT NULL,
+            distance_metric TEXT NOT NULL DEFAULT 'cosine'
+        );
+        CREATE TABLE vectors (
+            collection TEXT NOT NULL REFERENCES collections(name) ON DELETE CASCADE,
+            id TEXT NOT NULL,
+            vector BLOB NOT NULL,
+            metadata TEXT,
+            payload TEXT,
+            PRIMARY KEY (collection, id)
+        );
+        INSERT INTO collections VALUES ('old', 2, 'cosine');
+        """
+    )
+    conn.execute(
+        "INSERT INTO vectors VALUES ('old', 'a', ?, NULL, NULL)",
+        (np.array([1.0, 0.0], dtype=np.float32).tobytes(),),
+    )
+    conn.commit()
+    conn.close()
+
+    adapter = SqliteVecAdapter(persistence_path=path)
+    adapter.initialize()
+    assert adapter.search("old", np.array([1.0, 0.0]), k=1)[0].id == "a"
+    adapter.close()
+
+
+def test_unknown_index_is_rejected(adapter):
+    with pytest.raises(ValueError, match="Unsupported index"):
+        adapter.create_collection("bad", 4, index="hnsw")
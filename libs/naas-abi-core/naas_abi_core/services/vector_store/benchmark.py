@@ -0,0 +1,167 @@
+"""Search throughput benchmark for the local vector store adapters.
+
+Single-process microbench comparing exact top-k search on the adapters that
+need no server: NumpyAdapter (one query at a time and batched),
+QdrantInMemoryAdapter and SqliteVecAdapter (flat and IVF). Adapters whose
+optional dependency is missing are reported as skipped.
+
+Run:
+    uv run python -m naas_abi_core.services.vector_store.benchmark
+    uv run python -m naas_abi_core.services.vector_store.benchmark --sizes 1000 10000 --dim 768
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import platform
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from contextlib import contextmanager
+
+import numpy as np
+
+from naas_abi_core.services.vector_store.adapters.NumpyAdapter import NumpyAdapter
+from naas_abi_core.services.vector_store.IVectorStorePort import (
+    IVectorStorePort,
+    VectorDocument,
+)
+
+COLLECTION = "bench"
+
+
+@contextmanager
+def timer():
+    t = [0.0]
+    start = time.perf_counter()
+    try:
+        yield t
+    finally:
+        t[0] = time.perf_counter() - start
+
+
+def fmt_rate(n: int, seconds: float) -> str:
+    rate = n / seconds if seconds > 0 else float("inf")
+    return f"{rate:>10,.0f} queries/sec  ({seconds*1000/n:.3f} ms/query)"
+
+
+def make_documents(n: int, dim: int, seed: int = 0) -> list[VectorDocument]:
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(n, dim)).astype(np.float32)
+    return [
+        VectorDocument(
+            id=f"doc-{i}",
+            vector=vectors[i],
+            metadata={"group": i % 10},
+            payload={"i": i},
+        )
+        for i in range(n)
+    ]
+
+
+# ---------------------------------------------------------------------------
+
+
+def _numpy(tmp: str) -> IVectorStorePort:
+    return NumpyAdapter()
+
+
+def _qdrant_in_memory(tmp: str) -> IVectorStorePort:
+    from naas_abi_core.services.vector_store.adapters.QdrantInMemoryAdapter import (
+        QdrantInMemoryAdapter,
+    )
+
+    return QdrantInMemoryAdapter(storage_path=":memory:")
+
+
+def _sqlite_vec(tmp: str) -> IVectorStorePort:
+    from naas_abi_core.services.vector_store.adapters.SqliteVecAdapter import (
+        SqliteVecAdapter,
+    )
+
+    return SqliteVecAdapter(persistence_path=os.path.join(tmp, "vectors.sqlite3"))
+
+
+def _sqlite_vec_ivf(tmp: str) -> IVectorStorePort:
+    from naas_abi_core.services.vector_store.adapters.SqliteVecAdapter import (
+        SqliteVecAdapter,
+    )
+
+    return SqliteVecAdapter(
+        persistence_path=os.path.join(tmp, "vectors.sqlite3"), default_index="ivf"
+    )
+
+
+ADAPTERS: list[tuple[str, Callable[[str], IVectorStorePort]]] = [
+    ("NumpyAdapter", _numpy),
+    ("QdrantInMemoryAdapter", _qdrant_in_memory),
+    ("SqliteVecAdapter (flat)", _sqlite_vec),
+    ("SqliteVecAdapter (ivf)", _sqlite_vec_ivf),
+]
+
+
+def bench_adapter(
+    name: str,
+    factory: Callable[[str], IVectorStorePort],
+    documents: list[VectorDocument],
+    queries: np.ndarray,
+    k: int,
+) -> None:
+    n = len(documents)
+    dim = len(documents[0].vector)
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            adapter = factory(tmp)
+            adapter.initialize()
+        except (ImportError, AttributeError) as exc:
+            # AttributeError: sqlite3 built without enable_load_extension.
+            print(f"  {name:40s} n={n:>7,}   skipped ({exc})")
+            return
+        adapter.create_collection(COLLECTION, dim)
+        for start in range(0, n, 1000):
+            adapter.store_vectors(COLLECTION, documents[start : start + 1000])
+
+        with timer() as t:
+            for q in queries:
+                adapter.search(COLLECTION, q, k=k)
+        print(f"  {name:40s} n={n:>7,}   {fmt_rate(len(queries), t[0])}")
+
+        with timer() as t:
+            for q in queries:
+                adapter.search(COLLECTION, q, k=k, filter={"group": 3})
+        print(f"  {name + ' + filter':40s} n={n:>7,}   {fmt_rate(len(queries), t[0])}")
+
+        if isinstance(adapter, NumpyAdapter):
+            with timer() as t:
+                adapter.search_batch(COLLECTION, queries, k=k)
+            print(f"  {name + ' search_batch':40s} n={n:>7,}   {fmt_rate(len(queries), t[0])}")
+        adapter.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    print("\nVector store search benchmark")
+    print(f"  Python   : {sys.version.split()[0]}")
+    print(f"  Platform : {platform.platform()}")
+    print(f"  Machine  : {platform.machine()}")
+    print(f"  dim={args.dim} k={args.k} queries={args.queries}\n")
+
+    queries = np.random.default_rng(1).normal(size=(args.queries, args.dim)).astype(np.float32)
+    for n in args.sizes:
+        print(f"--- {n:,} vectors ---")
+        documents = make_documents(n, args.dim)
+        for name, factory in ADAPTERS:
+            bench_adapter(name, factory, documents, queries, args.k)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import hashlib
 import json
+from bisect import bisect_left
 from collections.abc import Iterable, Iterator
 from datetime import UTC, datetime, timedelta
 from typing import Any
@@ -325,7 +326,13 @@ def _account_richness(account: dict[str, Any]) -> int:
 
 
 class SnapshotContext:
-    """Runtime context shared by every page/element snapshot script."""
+    """Runtime context shared by every page/element snapshot script.
+
+    A context describes one publish, so it memoizes what several elements read:
+    the hourly count series per query (and the window sums over it) and the
+    tweet rows per query + window. Pass ``memoize=False`` for a long-lived
+    context that must see every new write.
+    """
 
     def __init__(
         self,
@@ -340,6 +347,7 @@ class SnapshotContext:
         app_prefix: str = DEFAULT_APP_PREFIX,
         tweet_limit: int = DEFAULT_TWEET_LIMIT,
         built_at: datetime | None = None,
+        memoize: bool = True,
     ) -> None:
         self.object_storage = object_storage
         self.triple_store = triple_store
@@ -352,6 +360,12 @@ class SnapshotContext:
         self.app_prefix = app_prefix.rstrip("/")
         self.tweet_limit = int(tweet_limit)
         self.built_at = built_at or datetime.now(UTC)
+        self.memoize = memoize
+        self._series_memo: dict[str, list[dict[str, Any]]] = {}
+        # query string -> (bucket start timestamps, running count totals)
+        self._window_index_memo: dict[str, tuple[list[float], list[int]]] = {}
+        self._window_sum_memo: dict[tuple[str, str, str], int] = {}
+        self._tweets_memo: dict[tuple[str, str, str, int | None], list] = {}
 
     def save_json(self, relative_dir: str, filename: str, data: dict | list) -> str:
         """Write JSON under ``x/apps/x/<relative_dir>/<filename>``."""
@@ -393,10 +407,51 @@ class SnapshotContext:
         """
         return self.save_bytes(relative_dir, filename, encode_compact(data))
 
+    # ----- SPARQL: input watermarks ----------------------------------------
+
+    def graph_watermark(self, graph_name: str) -> dict[str, str] | None:
+        """Cheap fingerprint of a graph, used to skip unchanged snapshots.
+
+        One aggregate row computed by the store, so no triple leaves it. The
+        triple count moves on every ingest (each run adds its own result set /
+        process individuals); the sum of numeric literals moves when a value
+        is overwritten in place — a refreshed partial-hour count or an
+        author's follower count; the total length of every term moves on an
+        in-place text edit (delete + insert) that keeps the triple count. An
+        edit that preserves all three is missed until the next full publish.
+        ``None`` when the graph cannot be read, which callers treat as
+        "changed".
+        """
+        sparql = f"""
+        SELECT (COUNT(*) AS ?triples)
+               (SUM(IF(isNumeric(?o), ?o, 0)) AS ?numeric)
+               (SUM(STRLEN(STR(?s)) + STRLEN(STR(?p)) + STRLEN(STR(?o))) AS ?length)
+        WHERE {{
+          GRAPH <{graph_name}> {{ ?s ?p ?o . }}
+        }}
+        """
+        try:
+            rows = list(self.triple_store.query(sparql))
+        except Exception as exc:  # noqa: BLE001
+            logger.warning(
+                f"SnapshotContext.graph_watermark failed for {graph_name} ({exc})"
+            )
+            return None
+        if not rows:
+            return None
+        marks: dict[str, str] = {}
+        for name in ("triples", "numeric", "length"):
+            value = getattr(rows[0], name, None)
+            marks[name] = "0" if value is None else str(value)
+        return marks
+
     # ----- SPARQL: counts (hourly buckets) ---------------------------------
 
     def timeseries(self, query_string: str) -> list[dict[str, Any]]:
         """Hourly ``{start, end, count}`` buckets for *query_string*, oldest first."""
+        cached = self._series_memo.get(query_string)
+        if cached is not None:
+            return list(cached)
         escaped = _escape_sparql_string(query_string)
         sparql = f"""
         PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
@@ -441,22 +496,52 @@ class SnapshotContext:
                     "count": int(str(count)) if count is not None else 0,
                 }
             )
-        return buckets
+        # A failed read is not memoized, so the next element retries it.
+        if self.memoize:
+            self._series_memo[query_string] = buckets
+        return list(buckets)
+
+    def _window_index(self, query_string: str) -> tuple[list[float], list[int]]:
+        """Sorted bucket start times and running totals for *query_string*.
+
+        ``totals[i]`` is the sum of the first ``i`` buckets, so any window sum is
+        two bisections and a subtraction instead of a pass over the series.
+        """
+        cached = self._window_index_memo.get(query_string)
+        if cached is not None:
+            return cached
+        timed: list[tuple[float, int]] = []
+        for bucket in self.timeseries(query_string):
+            try:
+                t = datetime.fromisoformat(str(bucket["start"])).timestamp()
+            except ValueError:
+                continue
+            timed.append((t, int(bucket["count"])))
+        timed.sort(key=lambda item: item[0])
+        starts = [t for t, _ in timed]
+        totals = [0]
+        for _, count in timed:
+            totals.append(totals[-1] + count)
+        if self.memoize and query_string in self._series_memo:
+            self._window_index_memo[query_string] = (starts, totals)
+        return starts, totals
 
     def sum_counts_in_window(
         self, query_string: str, start_time: str, end_time: str
     ) -> int:
         """Sum count-endpoint buckets whose start falls in ``[start, end)``."""
+        key = (query_string, start_time, end_time)
+        cached = self._window_sum_memo.get(key)
+        if cached is not None:
+            return cached
         start_ms = datetime.fromisoformat(start_time).timestamp()
         end_ms = datetime.fromisoformat(end_time).timestamp()
-        total = 0
-        for bucket in self.timeseries(query_string):
-            try:
-                t = datetime.fromisoformat(str(bucket["start"])).timestamp()
-            except ValueError:
-                continue
-            if start_ms <= t < end_ms:
-                total += int(bucket["count"])
+        starts, totals = self._window_index(query_string)
+        lo = bisect_left(starts, start_ms)
+        hi = max(lo, bisect_left(starts, end_ms))
+        total = totals[hi] - totals[lo]
+        if query_string in self._window_index_memo:
+            self._window_sum_memo[key] = total
         return total
 
     # ----- SPARQL: ingested tweets -----------------------------------------
@@ -704,10 +789,21 @@ class SnapshotContext:
         *,
         limit: int | None = None,
     ) -> list[dict[str, Any]]:
-        """Tweet rows for tables/bars in ``[start_time, end_time)``, newest first."""
-        return self.search_tweets(
+        """Tweet rows for tables/bars in ``[start_time, end_time)``, newest first.
+
+        Memoized per window: the tables, bar charts and line charts all read the
+        same current and previous windows.
+        """
+        key = (query_string, start_time, end_time, limit)
+        cached = self._tweets_memo.get(key)
+        if cached is not None:
+            return list(cached)
+        tweets = self.search_tweets(
             query_string, start_time, end_time, filters=None, limit=limit
         )
+        if self.memoize:
+            self._tweets_memo[key] = tweets
+        return list(tweets)
 
     # ----- SPARQL: authors, graph-wide (no query / window scope) -----------
     #
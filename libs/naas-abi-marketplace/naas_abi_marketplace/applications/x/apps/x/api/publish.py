@@ -1,8 +1,24 @@
-"""Orchestrate publishing every X app snapshot + the Next.js web export."""
+"""Orchestrate publishing every X app snapshot + the Next.js web export.
+
+With ``incremental=True`` a page is only rebuilt when its inputs changed since
+the last publish. The inputs of each page — the scenario windows, the followed
+queries and an aggregate watermark of every graph it reads (see
+:meth:`SnapshotContext.graph_watermark`) — are hashed and persisted in
+``<app_prefix>/publish_state.json`` after a successful run; a page whose hash
+matches keeps the snapshots already in object storage and runs no other
+SPARQL. A full publish reads no watermark and resets the persisted hashes.
+
+The watermark can miss an edit that keeps a graph's triple count, numeric
+sum and term length. An incremental run therefore rebuilds every page when
+the last full rebuild is older than ``full_publish_every`` (a day by
+default).
+"""
 
 from __future__ import annotations
 
-from datetime import UTC, datetime
+import json
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
 from typing import Any
 
 from naas_abi_core import logger
@@ -17,6 +33,8 @@ from naas_abi_marketplace.applications.x.apps.x.api.common import (
     DEFAULT_TWEET_GRAPH,
     SnapshotContext,
     build_scenarios,
+    content_digest,
+    slugify,
 )
 from naas_abi_marketplace.applications.x.apps.x.api.count_recent_tweets import (
     publish_page as publish_count_page,
@@ -34,6 +52,68 @@ from naas_abi_marketplace.applications.x.apps.x.web.publish_assets import (
     upload_web_export,
 )
 
+PUBLISH_STATE_FILE = "publish_state.json"
+
+# Bumped whenever a snapshot's shape or the inputs hashed below change, so the
+# first publish after an upgrade rebuilds everything.
+PUBLISH_STATE_FORMAT = 3
+
+FULL_PUBLISH_EVERY = timedelta(days=1)
+
+
+def _full_publish_due(
+    state: dict[str, Any], now: datetime, every: timedelta | None
+) -> bool:
+    """Whether the last full rebuild recorded in *state* is *every* old."""
+    if every is None:
+        return False
+    try:
+        last = datetime.fromisoformat(state["full_published_at"])
+    except (KeyError, TypeError, ValueError):
+        return True
+    return now - last >= every
+
+
+def _page_inputs(ctx: SnapshotContext) -> dict[str, str | None]:
+    """Input hash per page; ``None`` when an input could not be read.
+
+    Runs one aggregate query per graph the pages read (see
+    :meth:`SnapshotContext.graph_watermark`), so it only runs for incremental
+    publishes.
+    """
+    watermarks = {
+        graph: ctx.graph_watermark(graph)
+        for graph in (ctx.graph_name, ctx.tweet_graph_name)
+    }
+    windows = {
+        "scenarios": ctx.scenarios,
+        "queries": ctx.queries,
+        "namespace": ctx.namespace,
+    }
+    reads: dict[str, tuple[dict[str, Any], list[str]]] = {
+        "globals": (windows, []),
+        "count_recent_tweets": (windows, [ctx.graph_name]),
+        "search_recents_tweets": (
+            dict(windows, tweet_limit=ctx.tweet_limit),
+            [ctx.graph_name, ctx.tweet_graph_name],
+        ),
+        # Graph-wide: no query or scenario scope.
+        "search_users": ({"namespace": ctx.namespace}, [ctx.tweet_graph_name]),
+    }
+    hashes: dict[str, str | None] = {}
+    for page, (params, graphs) in reads.items():
+        marks = {graph: watermarks[graph] for graph in graphs}
+        if any(mark is None for mark in marks.values()):
+            hashes[page] = None
+            continue
+        payload = json.dumps(
+            {"format": PUBLISH_STATE_FORMAT, "params": params, "graphs": marks},
+            sort_keys=True,
+            default=str,
+        )
+        hashes[page] = content_digest(payload.encode("utf-8"))
+    return hashes
+
 
 def publish_app(
     object_storage: ObjectStorageService,
@@ -43,6 +123,8 @@ def publish_app(
     namespace: str = DEFAULT_NAMESPACE,
     app_prefix: str = DEFAULT_APP_PREFIX,
     require_web: bool = True,
+    incremental: bool = False,
+    full_publish_every: timedelta | None = FULL_PUBLISH_EVERY,
 ) -> dict[str, Any]:
     """Run every page/element script and publish the web static export.
 
@@ -50,6 +132,13 @@ def publish_app(
     orchestration path, where the image has no Node to build it. The CLI keeps
     it true so a forgotten ``pnpm build`` fails loudly instead of silently
     publishing snapshots against stale assets.
+
+    *incremental* true skips the pages whose inputs are unchanged since the
+    last publish (see the module docstring); false rebuilds every page without
+    reading a graph watermark and clears the persisted hashes, so
+    the next incremental run rebuilds everything once. An incremental run
+    also rebuilds every page once the last full rebuild is
+    *full_publish_every* old (``None`` never forces one).
     """
     built_at = datetime.now(UTC)
     scenarios = build_scenarios(built_at)
@@ -65,29 +154,66 @@ def publish_app(
         built_at=built_at,
     )
 
-    globals_doc = publish_globals(ctx)
-    count_doc = publish_count_page(ctx)
-    search_doc = publish_search_page(ctx)
-    users_doc = publish_users_page(ctx)
+    pages: list[tuple[str, Callable[[SnapshotContext], dict]]] = [
+        ("globals", publish_globals),
+        ("count_recent_tweets", publish_count_page),
+        ("search_recents_tweets", publish_search_page),
+        ("search_users", publish_users_page),
+    ]
+    inputs: dict[str, str | None] = {page: None for page, _ in pages}
+    previous: dict[str, Any] = {}
+    full_published_at = built_at.isoformat()
+    if incremental:
+        inputs = _page_inputs(ctx)
+        state = ctx.read_json("", PUBLISH_STATE_FILE)
+        if state.get("format") == PUBLISH_STATE_FORMAT and not _full_publish_due(
+            state, built_at, full_publish_every
+        ):
+            previous = state.get("pages") or {}
+            full_published_at = state.get("full_published_at", full_published_at)
+
+    docs: dict[str, dict] = {}
+    unchanged: list[str] = []
+    for page, publish_page in pages:
+        if inputs[page] is not None and previous.get(page) == inputs[page]:
+            unchanged.append(page)
+            continue
+        docs[page] = publish_page(ctx)
+
+    # Written last: a run that fails part-way leaves the previous watermark, so
+    # the next run rebuilds whatever this one did not finish.
+    ctx.save_json(
+        "",
+        PUBLISH_STATE_FILE,
+        {
+            "format": PUBLISH_STATE_FORMAT,
+            "updated_at": built_at.isoformat(),
+            "full_published_at": full_published_at,
+            "pages": inputs,
+        },
+    )
 
     web = upload_web_export(object_storage, ctx.app_prefix, required=require_web)
 
+    page_summary: dict[str, Any] = {
+        page: list(doc.keys()) for page, doc in docs.items() if page != "search_users"
+    }
+    if "search_users" in docs:
+        # Counts rather than file names: the users dataset is 256 shards, and
+        # how many of them actually changed is the useful signal when this runs
+        # after every ingest tick.
+        page_summary["search_users"] = docs["search_users"].get("users", {})
     summary = {
         "app_prefix": ctx.app_prefix,
         "built_at": built_at.isoformat(),
         "scenarios": [s["id"] for s in scenarios],
         "queries": [
-            q.get("slug") for q in (globals_doc.get("queries") or {}).get("queries", [])
+            slugify(q.get("name") or str(q.get("query") or "").strip())
+            for q in ctx.queries
+            if str(q.get("query") or "").strip()
         ],
-        "pages": {
-            "globals": list(globals_doc.keys()),
-            "count_recent_tweets": list(count_doc.keys()),
-            "search_recents_tweets": list(search_doc.keys()),
-            # Counts rather than file names: the users dataset is 256 shards,
-            # and how many of them actually changed is the useful signal when
-            # this runs after every ingest tick.
-            "search_users": users_doc.get("users", {}),
-        },
+        "pages": page_summary,
+        "unchanged_pages": unchanged,
         "web": web,
         "index_file": f"{ctx.app_prefix}/index.html",
     }
@@ -8,10 +8,14 @@ under ``x/apps/x/`` in object storage:
 x/apps/x/
 ├── index.html
 ├── globals/{scenarios,queries,timezone}.json
+├── publish_state.json
 ├── count_recent_tweets/{kpis,barcharts,linecharts}.json
 └── search_recents_tweets/{kpis,barcharts,linecharts,tables}.json
 ```
 
+``--incremental`` only rebuilds the pages whose inputs changed since the last
+publish (tracked in ``publish_state.json``).
+
 Followed queries default to the module's ``count_recent_tweets_workflow`` +
 search filters with ``count_recent_tweets: true``; pass ``--query`` to override.
 """
@@ -47,6 +51,11 @@ def main() -> None:
             "Use config.local.yaml to hit the local stack."
         ),
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Skip pages whose inputs are unchanged since the last publish.",
+    )
     args = parser.parse_args()
 
     from naas_abi_core.engine.Engine import Engine
@@ -87,6 +96,7 @@ def main() -> None:
         module.engine.services.triple_store,
         queries,
         namespace=module.configuration.ontology_namespace,
+        incremental=args.incremental,
     )
     print(json.dumps(result, indent=2))
 
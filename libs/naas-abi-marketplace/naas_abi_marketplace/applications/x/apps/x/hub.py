@@ -67,6 +67,8 @@ class XAppHubBuilder:
             tweet_graph_name=tweet_graph_name,
             namespace=namespace,
             app_prefix=app_prefix,
+            # Long-lived: the compatibility readers must see every new ingest.
+            memoize=False,
         )
 
     def _timeseries(self, query_string: str) -> list[dict[str, Any]]:
@@ -93,7 +95,10 @@ class XAppHubBuilder:
 
         Called from the orchestration, which runs in an image without Node, so
         a missing ``web/out/`` skips the asset upload instead of failing the
-        whole run — the snapshot refresh is what the schedule is for.
+        whole run — the snapshot refresh is what the schedule is for. The
+        refresh is incremental: pages whose inputs did not change since the
+        last tick are left as they are, except that every page is rebuilt
+        once a day in case the graph watermark missed an edit.
         """
         return publish_app(
             self._object_storage,
@@ -102,4 +107,5 @@ class XAppHubBuilder:
             namespace=self.namespace,
             app_prefix=self.app_prefix,
             require_web=False,
+            incremental=True,
         )
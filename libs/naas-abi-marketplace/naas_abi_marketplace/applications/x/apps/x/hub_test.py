@@ -38,6 +38,9 @@ class _FakeTripleStore:
     def query(self, sparql: str):
         return self.dataset.query(sparql)
 
+    def iter_query(self, sparql: str, batch_size: int = 1000):
+        return iter(self.dataset.query(sparql))
+
 
 def _seed_store() -> _FakeTripleStore:
     graph = Graph()
@@ -541,3 +544,150 @@ def test_partial_bucket_is_none_when_only_complete_hours_exist():
     store.insert_graph(g, _GRAPH)
     ctx = SnapshotContext(None, store, queries=[])  # type: ignore[arg-type]
     assert ctx.partial_bucket(_QUERY) is None
+
+
+class _CountingTripleStore(_FakeTripleStore):
+    def __init__(self) -> None:
+        super().__init__()
+        self.queries: list[str] = []
+
+    def query(self, sparql: str):
+        self.queries.append(sparql)
+        return super().query(sparql)
+
+    def iter_query(self, sparql: str, batch_size: int = 1000):
+        self.queries.append(sparql)
+        return super().iter_query(sparql, batch_size)
+
+
+class _FakeObjectStorage:
+    def __init__(self) -> None:
+        self.objects: dict[str, bytes] = {}
+
+    def put_object(self, prefix: str, key: str, content: bytes) -> None:
+        self.objects[f"{prefix}/{key}"] = content
+
+    def get_object(self, prefix: str, key: str) -> bytes:
+        return self.objects[f"{prefix}/{key}"]
+
+
+def test_sum_counts_in_window_reads_the_series_once_per_context():
+    store = _CountingTripleStore()
+    store.dataset = _seed_store().dataset
+    ctx = SnapshotContext(None, store, queries=[])  # type: ignore[arg-type]
+    assert ctx.sum_counts_in_window(_QUERY, *_WINDOW) == 32
+    assert (
+        ctx.sum_counts_in_window(
+            _QUERY, "2026-07-07T13:00:00+00:00", "2026-07-07T14:00:00+00:00"
+        )
+        == 22
+    )
+    assert (
+        ctx.sum_counts_in_window(
+            _QUERY, "2026-07-08T00:00:00+00:00", "2026-07-07T00:00:00+00:00"
+        )
+        == 0
+    )
+    assert ctx.sum_counts_in_window(_QUERY, *_WINDOW) == 32
+    assert len(store.queries) == 1
+
+
+def test_graph_watermark_moves_on_an_in_place_text_edit():
+    store = _seed_tweet_corpus()
+    ctx = SnapshotContext(None, store, queries=[])  # type: ignore[arg-type]
+    before = ctx.graph_watermark(_TWEET_GRAPH)
+    assert before is not None
+    assert ctx.graph_watermark(_TWEET_GRAPH) == before
+
+    named = store.dataset.graph(URIRef(_TWEET_GRAPH))
+    tweet = _X["Tweet/1"]
+    named.remove((tweet, _X.full_text, None))
+    named.add((tweet, _X.full_text, Literal("Big drone sighting")))
+    after = ctx.graph_watermark(_TWEET_GRAPH)
+    assert after is not None
+    assert after["triples"] == before["triples"]
+    assert after != before
+
+
+def test_incremental_publish_rebuilds_only_pages_whose_inputs_changed(monkeypatch):
+    from naas_abi_marketplace.applications.x.apps.x.api import publish as publish_mod
+
+    # The users dataset query relies on Jena's GROUP_CONCAT over unbound
+    # values; count its runs instead of evaluating it on rdflib.
+    users_runs: list[int] = []
+    monkeypatch.setattr(
+        publish_mod,
+        "publish_users_page",
+        lambda ctx: users_runs.append(1) or {"users": {"users": len(users_runs)}},
+    )
+    store = _CountingTripleStore()
+    store.dataset = _seed_tweet_corpus().dataset
+    storage = _FakeObjectStorage()
+    queries = [{"name": "drones", "query": _QUERY}]
+
+    def publish() -> dict:
+        return publish_mod.publish_app(
+            storage,  # type: ignore[arg-type]
+            store,  # type: ignore[arg-type]
+            queries,
+            require_web=False,
+            incremental=True,
+        )
+
+    first = publish()
+    assert first["unchanged_pages"] == []
+    assert "x/apps/x/publish_state.json" in storage.objects
+
+    store.queries.clear()
+    second = publish()
+    assert set(second["unchanged_pages"]) == {
+        "globals",
+        "count_recent_tweets",
+        "search_recents_tweets",
+        "search_users",
+    }
+    assert len(store.queries) == 2  # the two graph watermarks
+
+    _seed_tweet(
+        store,
+        index=5,
+        created="2026-07-07T17:00:00+00:00",
+        text="One more drone",
+        username="newcomer",
+        location="Oslo",
+    )
+    third = publish()
+    assert set(third["unchanged_pages"]) == {"globals", "count_recent_tweets"}
+    assert len(users_runs) == 2
+
+
+def test_incremental_publish_rebuilds_everything_once_a_day(monkeypatch):
+    import json
+    from datetime import UTC, datetime, timedelta
+
+    from naas_abi_marketplace.applications.x.apps.x.api import publish as publish_mod
+
+    monkeypatch.setattr(publish_mod, "publish_users_page", lambda ctx: {"users": {}})
+    store = _seed_tweet_corpus()
+    storage = _FakeObjectStorage()
+    state_key = "x/apps/x/publish_state.json"
+
+    def publish() -> dict:
+        return publish_mod.publish_app(
+            storage,  # type: ignore[arg-type]
+            store,  # type: ignore[arg-type]
+            [{"name": "drones", "query": _QUERY}],
+            require_web=False,
+            incremental=True,
+        )
+
+    publish()
+    full_at = json.loads(storage.objects[state_key])["full_published_at"]
+    assert len(publish()["unchanged_pages"]) == 4
+    assert json.loads(storage.objects[state_key])["full_published_at"] == full_at
+
+    state = json.loads(storage.objects[state_key])
+    state["full_published_at"] = (datetime.now(UTC) - timedelta(days=1)).isoformat()
+    storage.objects[state_key] = json.dumps(state).encode("utf-8")
+    assert publish()["unchanged_pages"] == []
+    assert json.loads(storage.objects[state_key])["full_published_at"] > full_at
@@ -0,0 +1,178 @@
+"""Candidate generation for fuzzy entity resolution.
+
+Scoring every pair of key strings with ``fuzz.token_sort_ratio`` is
+quadratic. The indexes below return, for each string, the later strings
+worth scoring:
+
+- ``exhaustive``: every pair.
+- ``ngram``: q-gram blocking with a length filter and a q-gram count filter.
+  Both bounds follow from the InDel ratio that ``token_sort_ratio`` computes,
+  so every pair that can reach the threshold is kept: same result as
+  ``exhaustive``, far fewer comparisons.
+- ``minhash``: MinHash LSH over character q-grams. Approximate (pairs with
+  little q-gram overlap can be missed) but close to linear on large,
+  diverse inputs.
+"""
+
+import math
+import random
+import zlib
+from collections import Counter, defaultdict
+from typing import Literal
+
+from thefuzz import utils  # type: ignore
+
+CandidateStrategy = Literal["ngram", "minhash", "exhaustive"]
+
+Q = 3
+MINHASH_BANDS = 16
+MINHASH_ROWS = 4
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+def token_sort_key(value: str) -> str:
+    """The string ``fuzz.token_sort_ratio`` actually compares."""
+    return " ".join(sorted(utils.full_process(value, force_ascii=True).split()))
+
+
+def _min_ratio(threshold: float) -> float:
+    # token_sort_ratio rounds to an integer, so a raw ratio of threshold - 0.5
+    # can still score threshold.
+    return (threshold - 0.5) / 100
+
+
+def _length_range(length: int, ratio: float) -> range:
+    """Lengths whose InDel ratio with ``length`` can reach ``ratio``
+    (2 * min / (l1 + l2) >= ratio)."""
+    low = math.ceil(length * ratio / (2 - ratio))
+    high = math.floor(length * (2 - ratio) / ratio)
+    return range(low, high + 1)
+
+
+def _shared_qgrams_bound(l1: int, l2: int, ratio: float) -> int:
+    """Minimum number of q-grams two strings of these lengths share when
+    their InDel ratio reaches ``ratio`` (each of the at most
+    (1 - ratio) * (l1 + l2) edits destroys at most Q q-grams)."""
+    edits = math.floor((1 - ratio) * (l1 + l2))
+    return max(l1, l2) - Q + 1 - Q * edits
+
+
+def _qgrams(value: str) -> Counter:
+    return Counter(value[i : i + Q] for i in range(len(value) - Q + 1))
+
+
+class CandidateIndex:
+    """Every later string, for the ``exhaustive`` strategy.
+
+    Candidates are computed per string on demand, so strings the caller
+    skips (already resolved as duplicates) cost nothing.
+    """
+
+    def __init__(self, keys: list[str], threshold: float):
+        self.keys = keys
+        self.ratio = _min_ratio(threshold)
+
+    def candidates(self, i: int) -> list[int]:
+        """Ascending indexes ``j > i`` worth scoring against ``keys[i]``."""
+        return list(range(i + 1, len(self.keys)))
+
+
+class NgramIndex(CandidateIndex):
+    def __init__(self, keys: list[str], threshold: float):
+        super().__init__(keys, threshold)
+        self.__by_length: dict[int, list[int]] = defaultdict(list)
+        self.__postings: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        self.__grams: list[Counter] = []
+        for i, key in enumerate(keys):
+            self.__by_length[len(key)].append(i)
+            counts = _qgrams(key)
+            self.__grams.append(counts)
+            for gram, count in counts.items():
+                self.__postings[gram].append((i, count))
+
+    def candidates(self, i: int) -> list[int]:
+        if self.ratio <= 0:
+            return super().candidates(i)
+        length = len(self.keys[i])
+        lengths = _length_range(length, self.ratio)
+        found = set()
+        # Pairs whose q-gram bound is vacuous (short strings) cannot be found
+        # through the index: take every length-compatible string.
+        for other, members in self.__by_length.items():
+            if other in lengths and (
+                _shared_qgrams_bound(length, other, self.ratio) <= 0
+            ):
+                found.update(j for j in members if j > i)
+
+        shared: Counter = Counter()
+        for gram, count in self.__grams[i].items():
+            for j, other_count in self.__postings[gram]:
+                if j > i:
+                    shared[j] += min(count, other_count)
+        for j, common in shared.items():
+            other = len(self.keys[j])
+            if other in lengths and common >= _shared_qgrams_bound(
+                length, other, self.ratio
+            ):
+                found.add(j)
+        return sorted(found)
+
+
+class MinHashIndex(CandidateIndex):
+    def __init__(
+        self,
+        keys: list[str],
+        threshold: float,
+        bands: int = MINHASH_BANDS,
+        rows: int = MINHASH_ROWS,
+        seed: int = 0,
+    ):
+        super().__init__(keys, threshold)
+        rng = random.Random(seed)
+        permutations = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(bands * rows)
+        ]
+        self.__buckets: dict[tuple, list[int]] = defaultdict(list)
+        self.__bucket_keys: list[list[tuple]] = []
+        for i, key in enumerate(keys):
+            hashes = [
+                zlib.crc32(gram.encode("utf-8")) for gram in (_qgrams(key) or {key: 1})
+            ]
+            signature = [
+                min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+                for a, b in permutations
+            ]
+            bucket_keys = [
+                (band, *signature[band * rows : (band + 1) * rows])
+                for band in range(bands)
+            ]
+            self.__bucket_keys.append(bucket_keys)
+            for bucket_key in bucket_keys:
+                self.__buckets[bucket_key].append(i)
+
+    def candidates(self, i: int) -> list[int]:
+        if self.ratio <= 0:
+            return super().candidates(i)
+        lengths = _length_range(len(self.keys[i]), self.ratio)
+        found = set()
+        for bucket_key in self.__bucket_keys[i]:
+            found.update(
+                j
+                for j in self.__buckets[bucket_key]
+                if j > i and len(self.keys[j]) in lengths
+            )
+        return sorted(found)
+
+
+def candidate_index(
+    keys: list[str], threshold: float, strategy: CandidateStrategy = "ngram"
+) -> CandidateIndex:
+    """Candidate index over ``keys`` (already ``token_sort_key``-normalised)."""
+    if strategy == "exhaustive":
+        return CandidateIndex(keys, threshold)
+    if strategy == "ngram":
+        return NgramIndex(keys, threshold)
+    if strategy == "minhash":
+        return MinHashIndex(keys, threshold)
+    raise ValueError(f"Unknown candidate strategy: {strategy}")
@@ -0,0 +1,46 @@
+import random
+import string
+
+from naas_abi_marketplace.domains.ontology_engineer.utils.candidate_pairs import (
+    candidate_index,
+    token_sort_key,
+)
+from thefuzz import fuzz  # type: ignore
+
+WORDS = ["acme", "corp", "inc", "naas", "ai", "data", "labs", "global", "of", "group"]
+
+
+def _labels(n: int, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    labels = []
+    for _ in range(n):
+        label = list(" ".join(rng.sample(WORDS, rng.randint(0, 4))))
+        for _ in range(rng.randint(0, 2)):
+            if label:
+                label[rng.randrange(len(label))] = rng.choice(string.ascii_lowercase)
+        labels.append("".join(label))
+    return labels
+
+
+def test_ngram_candidates_keep_every_pair_reaching_the_threshold():
+    labels = _labels(300)
+    keys = [token_sort_key(label) for label in labels]
+    for threshold in (60, 85, 100):
+        index = candidate_index(keys, threshold, "ngram")
+        candidates = 0
+        for i in range(len(labels)):
+            found = set(index.candidates(i))
+            candidates += len(found)
+            for j in range(i + 1, len(labels)):
+                if fuzz.token_sort_ratio(labels[i], labels[j]) >= threshold:
+                    assert j in found, (threshold, labels[i], labels[j])
+        assert candidates < len(labels) * (len(labels) - 1) // 2
+
+
+def test_minhash_candidates_find_identical_and_near_identical_keys():
+    keys = [token_sort_key(k) for k in ["Naas AI Corp", "corp naas ai", "Naas AI Crop", "Acme"]]
+    index = candidate_index(keys, 85, "minhash")
+
+    assert 1 in index.candidates(0)
+    assert 3 not in index.candidates(0)
+    assert index.candidates(3) == []
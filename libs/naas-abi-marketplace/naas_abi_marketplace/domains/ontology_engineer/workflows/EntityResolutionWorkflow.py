@@ -5,10 +5,15 @@ This workflow identifies duplicate entities (owl:NamedIndividual) based on:
 1. Business rules (e.g., entities with "unknown" key values)
 2. Fuzzy matching using key values (owl:hasKey)
 
+Fuzzy matching only scores candidate pairs (see utils/candidate_pairs.py):
+the default ``ngram`` strategy keeps every pair that can reach the threshold,
+``minhash`` trades some recall for speed, ``exhaustive`` scores all pairs.
+
 Usage:
     uv run python libs/naas-abi-marketplace/naas_abi_marketplace/domains/ontology_engineer/workflows/EntityResolutionWorkflow.py
 """
 
+import time
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
@@ -20,6 +25,11 @@ from naas_abi_core import logger
 from naas_abi_core.services.triple_store.TripleStorePorts import ITripleStoreService
 from naas_abi_core.workflow import Workflow, WorkflowConfiguration
 from naas_abi_core.workflow.workflow import WorkflowParameters
+from naas_abi_marketplace.domains.ontology_engineer.utils.candidate_pairs import (
+    CandidateStrategy,
+    candidate_index,
+    token_sort_key,
+)
 from pydantic import Field
 from rdflib import RDFS, Graph, Literal, Node, URIRef
 from rdflib.collection import Collection
@@ -48,6 +58,8 @@ class EntityResolutionWorkflowParameters(WorkflowParameters):
                                          If not provided, individuals will be loaded from triplestore.
         similarity_threshold (int): Minimum similarity score (0-100) to consider entities as duplicates.
         uri_prefix_filter (Optional[str]): Optional URI prefix filter for individuals (e.g., "http://ontology.naas.ai/abi/").
+        candidate_strategy (str): How pairs to score are selected: "ngram", "minhash" or "exhaustive".
+        report_recall (bool): Also run the exhaustive comparison and report the recall of the candidate strategy.
     """
 
     tbox_paths: Annotated[
@@ -80,6 +92,18 @@ class EntityResolutionWorkflowParameters(WorkflowParameters):
             description="Limit the number of individuals to load from triplestore.",
         ),
     ] = None
+    candidate_strategy: Annotated[
+        CandidateStrategy,
+        Field(
+            description="How pairs to score are selected: 'ngram' (same results as exhaustive, far fewer comparisons), 'minhash' (approximate, fastest) or 'exhaustive' (every pair).",
+        ),
+    ] = "ngram"
+    report_recall: Annotated[
+        bool,
+        Field(
+            description="Also run the exhaustive comparison and report how many of its duplicates the candidate strategy found.",
+        ),
+    ] = False
 
 
 class EntityResolutionWorkflow(Workflow[EntityResolutionWorkflowParameters]):
@@ -300,7 +324,10 @@ class EntityResolutionWorkflow(Workflow[EntityResolutionWorkflowParameters]):
         return list(classes)
 
     def resolve_duplicate_entities(
-        self, result_rows: List[ResultRow], similarity_threshold: int = 90
+        self,
+        result_rows: List[ResultRow],
+        similarity_threshold: int = 90,
+        candidate_strategy: CandidateStrategy = "ngram",
     ) -> List[Tuple[URIRef, URIRef]]:
         """
         Efficient entity resolution using business rules and fuzzy matching.
@@ -313,13 +340,28 @@ class EntityResolutionWorkflow(Workflow[EntityResolutionWorkflowParameters]):
         3. If similarity score >= threshold, consider them duplicates.
         4. Keep the first occurrence and mark others for removal.
 
+        Only candidate pairs selected by ``candidate_strategy`` are scored.
+
         :param result_rows: List of ResultRow tuples, where first element is URIRef (individual URI)
                            and remaining elements are Literal values (key values).
         :param similarity_threshold: Minimum similarity score (0-100) to consider entities as duplicates.
+        :param candidate_strategy: "ngram" (default, same result as "exhaustive"), "minhash" or "exhaustive".
         :return: List of tuples (uri_to_keep, uri_to_remove) indicating which URIs should be kept and removed.
         """
+        duplicates, _ = self._resolve_duplicate_entities(
+            result_rows, similarity_threshold, candidate_strategy
+        )
+        return duplicates
+
+    def _resolve_duplicate_entities(
+        self,
+        result_rows: list[ResultRow],
+        similarity_threshold: int,
+        candidate_strategy: CandidateStrategy,
+    ) -> tuple[list[tuple[URIRef, URIRef]], int]:
+        """``resolve_duplicate_entities`` plus the number of pairs scored."""
         if len(result_rows) < 2:
-            return []
+            return [], 0
 
         duplicates_to_remove: List[Tuple[URIRef, URIRef]] = []
         uris_to_remove: Set[URIRef] = set()
@@ -353,27 +395,34 @@ class EntityResolutionWorkflow(Workflow[EntityResolutionWorkflowParameters]):
                     uris_to_remove.add(uri)
 
         # Step 2: Fuzzy matching for duplicates
-        # Compare each entity with all subsequent entities
+        # Create a normalized string representation of key values for comparison
+        # Use the first key value, or concatenate all if multiple
+        key_strs = [" ".join(key_values).strip().lower() for _, key_values in entities]
+        index = candidate_index(
+            [token_sort_key(key_str) for key_str in key_strs],
+            similarity_threshold,
+            candidate_strategy,
+        )
+
+        # Compare each entity with its candidates among the subsequent entities
+        scored = 0
         for i in range(len(entities)):
-            uri_i, key_values_i = entities[i]
+            uri_i = entities[i][0]
 
             # Skip if this URI is already marked for removal
             if uri_i in uris_to_remove:
                 continue
 
-            # Create a normalized string representation of key values for comparison
-            # Use the first key value, or concatenate all if multiple
-            key_str_i = " ".join(key_values_i).strip().lower()
+            key_str_i = key_strs[i]
 
-            for j in range(i + 1, len(entities)):
-                uri_j, key_values_j = entities[j]
+            for j in index.candidates(i):
+                uri_j = entities[j][0]
 
                 # Skip if this URI is already marked for removal
                 if uri_j in uris_to_remove:
                     continue
 
-                # Create normalized string for comparison
-                key_str_j = " ".join(key_values_j).strip().lower()
+                key_str_j = key_strs[j]
 
                 # Skip if both are "unknown" (already handled by business rule)
                 if key_str_i == "unknown" and key_str_j == "unknown":
@@ -381,13 +430,49 @@ class EntityResolutionWorkflow(Workflow[EntityResolutionWorkflowParameters]):
 
                 # Calculate similarity using token_sort_ratio (good for order-independent matching)
                 similarity = fuzz.token_sort_ratio(key_str_i, key_str_j)
+                scored += 1
 
                 if similarity >= similarity_threshold:
                     # Keep the first one (uri_i), remove the duplicate (uri_j)
                     duplicates_to_remove.append((uri_i, uri_j))
                     uris_to_remove.add(uri_j)
 
-        return duplicates_to_remove
+        return duplicates_to_remove, scored
+
+    def compare_with_exhaustive(
+        self,
+        result_rows: list[ResultRow],
+        similarity_threshold: int,
+        candidate_strategy: CandidateStrategy,
+    ) -> dict[str, float]:
+        """Run ``candidate_strategy`` and the exhaustive comparison on the same
+        rows and report how the duplicates found differ.
+
+        Recall is the share of exhaustive duplicate pairs also found with the
+        candidate strategy (1.0 when there are none).
+        """
+        report: dict[str, float] = {}
+        found: dict[str, set[tuple[URIRef, URIRef]]] = {}
+        for name, strategy in (
+            ("candidates", candidate_strategy),
+            ("exhaustive", "exhaustive"),
+        ):
+            start = time.perf_counter()
+            duplicates, scored = self._resolve_duplicate_entities(
+                result_rows, similarity_threshold, cast(CandidateStrategy, strategy)
+            )
+            report[f"{name}_seconds"] = time.perf_counter() - start
+            report[f"{name}_scored_pairs"] = scored
+            report[f"{name}_duplicates"] = len(duplicates)
+            found[name] = set(duplicates)
+
+        report["matched_duplicates"] = len(found["candidates"] & found["exhaustive"])
+        report["recall"] = (
+            report["matched_duplicates"] / len(found["exhaustive"])
+            if found["exhaustive"]
+            else 1.0
+        )
+        return report
 
     def run(self, parameters: EntityResolutionWorkflowParameters) -> dict:
         """
@@ -401,6 +486,7 @@ class EntityResolutionWorkflow(Workflow[EntityResolutionWorkflowParameters]):
                 - classes: List of classes found
                 - duplicates: List of duplicate pairs (uri_to_keep, uri_to_remove)
                 - summary: Summary statistics
+                - recall: Candidate strategy vs exhaustive comparison (only with report_recall)
         """
         # Load schema graph (TBox)
         if parameters.tbox_paths:
@@ -421,6 +507,9 @@ class EntityResolutionWorkflow(Workflow[EntityResolutionWorkflowParameters]):
         logger.info(f"Found {len(classes)} classes from individuals")
 
         all_duplicates: List[Tuple[URIRef, URIRef]] = []
+        scored_pairs = 0
+        all_pairs = 0
+        recall_totals: dict[str, float] = {}
 
         # Process each class
         for c in classes:
@@ -458,17 +547,35 @@ class EntityResolutionWorkflow(Workflow[EntityResolutionWorkflowParameters]):
 
                     # Apply entity resolution
                     if len(result_rows) > 0:
-                        duplicates = self.resolve_duplicate_entities(
-                            result_rows, parameters.similarity_threshold
+                        duplicates, scored = self._resolve_duplicate_entities(
+                            result_rows,
+                            parameters.similarity_threshold,
+                            parameters.candidate_strategy,
                         )
+                        scored_pairs += scored
+                        all_pairs += len(result_rows) * (len(result_rows) - 1) // 2
                         logger.info(
-                            f"Entity resolution found {len(duplicates)} duplicate(s) for class {c}"
+                            f"Entity resolution found {len(duplicates)} duplicate(s) for class {c} "
+                            f"({scored} pairs scored)"
                         )
                         all_duplicates.extend(duplicates)
+
+                        if parameters.report_recall:
+                            comparison = self.compare_with_exhaustive(
+                                result_rows,
+                                parameters.similarity_threshold,
+                                parameters.candidate_strategy,
+                            )
+                            logger.info(f"Recall for class {c}: {comparison}")
+                            for name, value in comparison.items():
+                                if name != "recall":
+                                    recall_totals[name] = (
+                                        recall_totals.get(name, 0) + value
+                                    )
                 except Exception as e:
                     logger.error(f"SPARQL query failed for class {c}: {e}")
 
-        return {
+        result = {
             "classes": [str(c) for c in classes],
             "duplicates": [
                 {"keep": str(keep), "remove": str(remove)}
@@ -478,8 +585,22 @@ class EntityResolutionWorkflow(Workflow[EntityResolutionWorkflowParameters]):
                 "total_classes": len(classes),
                 "total_individuals": len(individual_graph),
                 "total_duplicates": len(all_duplicates),
+                "candidate_strategy": parameters.candidate_strategy,
+                "scored_pairs": scored_pairs,
+                "all_pairs": all_pairs,
             },
         }
+        if parameters.report_recall:
+            exhaustive = recall_totals.get("exhaustive_duplicates", 0)
+            result["recall"] = {
+                **recall_totals,
+                "recall": (
+                    recall_totals.get("matched_duplicates", 0) / exhaustive
+                    if exhaustive
+                    else 1.0
+                ),
+            }
+        return result
 
     def as_tools(self) -> list[BaseTool]:
         """
@@ -378,6 +378,16 @@ class NexusConfig(BaseModel):
     rate_limit_enabled: bool = True
     rate_limit_login_attempts: int = 5
     rate_limit_window_seconds: int = 300
+    rate_limit_backend: Literal["memory", "kv", "postgres"] = "kv"
+    rate_limit_audit_enabled: bool = False
+    rate_limit_audit_flush_seconds: float = 5.0
+
+    authz_cache_ttl_seconds: float = 30.0
+    authz_cache_max_entries: int = 10000
+    authz_valid_token_ttl_seconds: float = 1.0
+
+    ontology_search_index_enabled: bool = True
+    ontology_search_index_rebuild_seconds: float = 600.0
 
     enable_security_headers: bool = True
     content_security_policy: str | None = None
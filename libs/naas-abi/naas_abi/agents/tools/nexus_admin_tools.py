@@ -155,6 +155,9 @@ async def _with_db(
 
 
 def _workspace_service(db: Any) -> Any:
+    from naas_abi.apps.nexus.apps.api.app.services.iam.decision_cache import (
+        workspace_role_cache,
+    )
     from naas_abi.apps.nexus.apps.api.app.services.workspaces.adapters.secondary.postgres import (
         WorkspaceSecondaryAdapterPostgres,
     )
@@ -162,7 +165,10 @@ def _workspace_service(db: Any) -> Any:
         WorkspaceService,
     )
 
-    return WorkspaceService(adapter=WorkspaceSecondaryAdapterPostgres(db=db))
+    return WorkspaceService(
+        adapter=WorkspaceSecondaryAdapterPostgres(db=db),
+        role_cache=workspace_role_cache,
+    )
 
 
 def _organization_service(db: Any) -> Any:
@@ -6,6 +6,9 @@ from typing import Any
 from unittest.mock import AsyncMock, MagicMock, patch
 
 from naas_abi.agents.tools import nexus_admin_tools as mod
+from naas_abi.apps.nexus.apps.api.app.services.iam.decision_cache import (
+    workspace_role_cache,
+)
 from naas_abi_core.services.agent.context import agent_user_id, agent_workspace_id
 
 
@@ -71,6 +74,11 @@ def test_invite_workspace_member_requires_admin() -> None:
     mock_ws.invite_workspace_member.assert_not_called()
 
 
+def test_workspace_service_shares_the_role_cache() -> None:
+    # Membership changes made by the agent must drop the roles the API cached.
+    assert mod._workspace_service(MagicMock()).role_cache is workspace_role_cache
+
+
 def test_nexus_admin_tools_exported_names() -> None:
     names = sorted(t.name for t in mod.nexus_admin_tools())
     assert "create_workspace" in names
@@ -425,6 +425,24 @@ class Settings(BaseSettings):
     rate_limit_enabled: bool = True
     rate_limit_login_attempts: int = 5  # Max login attempts per window
     rate_limit_window_seconds: int = 300  # 5-minute window
+    # Where attempts are counted: "kv" (engine KeyValueService, shared across
+    # processes), "postgres" (rate_limit_events) or "memory" (per API process)
+    rate_limit_backend: Literal["memory", "kv", "postgres"] = "kv"
+    # Also record allowed attempts in rate_limit_events, written in batches
+    rate_limit_audit_enabled: bool = False
+    rate_limit_audit_flush_seconds: float = 5.0
+
+    # Authorization decision cache (workspace roles, revoked tokens); 0 disables
+    authz_cache_ttl_seconds: float = 30.0
+    authz_cache_max_entries: int = 10000
+    # How long a "not revoked" answer is cached: a revocation made by another
+    # process is honoured here after at most this long (0 disables)
+    authz_valid_token_ttl_seconds: float = 1.0
+
+    # In-memory FTS5 index of ontology labels for ontology search (SPARQL otherwise)
+    ontology_search_index_enabled: bool = True
+    # Full rebuild period; picks up writes made by other processes (0 disables)
+    ontology_search_index_rebuild_seconds: float = 600.0
 
     def model_post_init(self, __context: Any) -> None:
         """Adjust settings based on environment after initialization (pydantic v2 hook)."""
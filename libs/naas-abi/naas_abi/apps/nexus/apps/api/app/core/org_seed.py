@@ -33,6 +33,9 @@ from naas_abi.apps.nexus.apps.api.app.models import (
     WorkspaceMemberModel,
     WorkspaceModel,
 )
+from naas_abi.apps.nexus.apps.api.app.services.iam.decision_cache import (
+    workspace_role_cache,
+)
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker
@@ -353,6 +356,10 @@ async def _upsert_workspace(
         member_role = "owner" if member.id == owner.id else membership.role
         await _ensure_workspace_member(session, workspace.id, member.id, member_role)
 
+    # Owner and memberships may have changed; drop roles this process cached.
+    workspace_id = workspace.id
+    workspace_role_cache.invalidate_where(lambda key: key[1] == workspace_id)  # type: ignore[index]
+
 
 async def _upsert_organization(
     session: AsyncSession,
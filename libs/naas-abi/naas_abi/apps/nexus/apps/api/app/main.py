@@ -194,6 +194,13 @@ async def _startup(app: FastAPI) -> None:
 
 async def _shutdown(app: FastAPI) -> None:
     """Application shutdown handler."""
+    from naas_abi.apps.nexus.apps.api.app.services.rate_limit import flush_rate_limit_audit
+
+    await flush_rate_limit_audit()
+
+    analytics_service = getattr(app.state, "analytics_service", None)
+    if analytics_service is not None:
+        await asyncio.to_thread(analytics_service.flush)
 
 
 @asynccontextmanager
@@ -90,9 +90,18 @@ def _get_object_storage(request: Request) -> ObjectStorageService:
 
 
 def get_analytics_service(
+    request: Request,
     storage: ObjectStorageService = Depends(_get_object_storage),
 ) -> AnalyticsService:
-    return AnalyticsService(storage=AnalyticsSecondaryAdapterObjectStorage(object_storage=storage))
+    # One service per app: the debounced rebuild and the day-partition cache
+    # are process-wide state and must survive across requests.
+    service = getattr(request.app.state, "analytics_service", None)
+    if service is None:
+        service = AnalyticsService(
+            storage=AnalyticsSecondaryAdapterObjectStorage(object_storage=storage)
+        )
+        request.app.state.analytics_service = service
+    return service
 
 
 # ---------------------------------------------------------------------------
@@ -113,7 +122,7 @@ async def ingest_event(
 async def rebuild_now(
     service: AnalyticsService = Depends(get_analytics_service),
 ) -> RebuildResponse:
-    metadata = service.rebuild()
+    metadata = service.rebuild(full=True)
     return RebuildResponse(metadata=metadata)
 
 
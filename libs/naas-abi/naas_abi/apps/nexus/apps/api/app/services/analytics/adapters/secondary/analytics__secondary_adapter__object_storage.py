@@ -2,30 +2,50 @@
 
 Layout under ``naas_abi/nexus/analytics/``:
 
-* ``events/<sha256>.pkl`` — one pickle per raw event (content-hashed key,
-  so re-ingesting the same payload is naturally idempotent).
+* ``events/<YYYY-MM-DD>/<sha256>.pkl`` — one pickle per raw event under its
+  UTC day (content-hashed key, so re-ingesting the same payload is naturally
+  idempotent). Events without a day, and those written before events were
+  grouped by day, are ``events/<sha256>.pkl``.
+* ``partitions.json`` + ``partition-<YYYY-MM-DD>.json`` — day partitions
+  (events and rollup) the aggregates are composed from.
 * ``<aggregate>.json`` — prebuilt aggregate consumed by the read endpoints
   (overview.json, users.json, sessions.json, pages.json, workspaces.json,
-  user_details.json, recent_events.json, events.json, metadata.json,
-  ref-users.json, ref-workspaces.json).
+  recent_events.json, metadata.json, ref-users.json, ref-workspaces.json).
+
+``partitions_lock`` is an ``flock`` on a file in the system temp directory:
+it serializes the API workers of one host. Workers on several hosts sharing
+one bucket are not coordinated.
 """
 
 from __future__ import annotations
 
+import contextlib
 import hashlib
 import json
 import os
 import pickle
+import tempfile
+from collections.abc import Iterator
 from typing import Any
 
-from naas_abi.apps.nexus.apps.api.app.services.analytics.port import AnalyticsStoragePort
+from naas_abi.apps.nexus.apps.api.app.services.analytics.port import (
+    EVENT_DAY_PATTERN,
+    AnalyticsStoragePort,
+    event_day,
+)
 from naas_abi_core import logger
 from naas_abi_core.services.object_storage.ObjectStoragePort import Exceptions
 from naas_abi_core.services.object_storage.ObjectStorageService import ObjectStorageService
 from naas_abi_core.utils.StorageUtils import StorageUtils
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None  # type: ignore[assignment]
+
 OUTPUT_DIR = "naas_abi/nexus/analytics"
 EVENTS_PREFIX = f"{OUTPUT_DIR}/events"
+PARTITIONS_LOCK_FILE = os.path.join(tempfile.gettempdir(), "nexus-analytics-partitions.lock")
 
 
 class AnalyticsSecondaryAdapterObjectStorage(AnalyticsStoragePort):
@@ -38,33 +58,67 @@ class AnalyticsSecondaryAdapterObjectStorage(AnalyticsStoragePort):
     def save_event(self, event: dict[str, Any]) -> str:
         digest = hashlib.sha256(pickle.dumps(event)).hexdigest()
         file_name = f"{digest}.pkl"
+        day = event_day(event)
+        dir_path = f"{EVENTS_PREFIX}/{day}" if day else EVENTS_PREFIX
         self._utils.save_pickle(
             obj=event,
-            dir_path=EVENTS_PREFIX,
+            dir_path=dir_path,
             file_name=file_name,
             # Filename is already content-hashed; no audit copy needed.
             copy=False,
         )
-        return f"{EVENTS_PREFIX}/{file_name}"
+        return f"{dir_path}/{file_name}"
 
     def list_events(self) -> list[dict[str, Any]]:
-        try:
-            keys = self._storage.list_objects(prefix=EVENTS_PREFIX)
-        except Exceptions.ObjectNotFound:
-            return []
-
         events: list[dict[str, Any]] = []
-        for full_key in keys:
-            filename = os.path.basename(full_key)
-            if not filename.endswith(".pkl"):
-                continue
-            event = self._utils.get_pickle(EVENTS_PREFIX, filename)
-            if isinstance(event, dict):
+        for key in self.list_event_keys():
+            event = self.load_event(key)
+            if event is not None:
                 events.append(event)
-            else:
-                logger.debug(f"[analytics] skip {filename}: not a dict")
         return events
 
+    def _list_pickles(self, dir_path: str) -> tuple[list[str], list[str]]:
+        """``(event keys, sub-directory names)`` directly under ``dir_path``."""
+        try:
+            entries = self._storage.list_objects(prefix=dir_path)
+        except Exceptions.ObjectNotFound:
+            return [], []
+        keys, dirs = [], []
+        for entry in entries:
+            name = os.path.basename(entry.rstrip("/"))
+            if name.endswith(".pkl"):
+                keys.append(f"{dir_path}/{name}")
+            else:
+                dirs.append(name)
+        return keys, dirs
+
+    def list_event_keys(self, since: str | None = None) -> list[str]:
+        keys, dirs = self._list_pickles(EVENTS_PREFIX)
+        for day in sorted(dirs):
+            if EVENT_DAY_PATTERN.fullmatch(day) and (since is None or day >= since):
+                keys.extend(self._list_pickles(f"{EVENTS_PREFIX}/{day}")[0])
+        return keys
+
+    def load_event(self, key: str) -> dict[str, Any] | None:
+        dir_path, filename = key.rsplit("/", 1)
+        event = self._utils.get_pickle(dir_path, filename)
+        if isinstance(event, dict):
+            return event
+        logger.debug(f"[analytics] skip {filename}: not a dict")
+        return None
+
+    @contextlib.contextmanager
+    def partitions_lock(self) -> Iterator[None]:
+        if fcntl is None:
+            yield
+            return
+        with open(PARTITIONS_LOCK_FILE, "a") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
     # --- JSON aggregates ----------------------------------------------------
 
     def save_json(self, file_name: str, data: Any) -> None:
@@ -0,0 +1,153 @@
+"""Rebuild benchmark for the AnalyticsService.
+
+Compares a full rebuild (every stored event re-listed and re-partitioned)
+against the incremental path (only a fresh burst of events is applied to its
+day partition) at increasing event-log sizes. Storage is in memory but still
+serializes payloads, so JSON encode/decode cost is part of the numbers.
+
+Run:
+    uv run python -m naas_abi.apps.nexus.apps.api.app.services.analytics.benchmark
+    uv run python -m naas_abi.apps.nexus.apps.api.app.services.analytics.benchmark --sizes 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import pickle
+import platform
+import random
+import sys
+import time
+from contextlib import contextmanager
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from naas_abi.apps.nexus.apps.api.app.services.analytics.port import (
+    AnalyticsEvent,
+    AnalyticsStoragePort,
+    event_day,
+    event_key_day,
+)
+from naas_abi.apps.nexus.apps.api.app.services.analytics.service import AnalyticsService
+
+
+class _InMemoryStorage(AnalyticsStoragePort):
+    """Object-storage stand-in: events pickled, aggregates JSON-encoded."""
+
+    def __init__(self) -> None:
+        self._events: list[bytes] = []
+        self._files: dict[str, bytes] = {}
+        self._keys: list[str] = []
+
+    def save_event(self, event: dict[str, Any]) -> str:
+        self._events.append(pickle.dumps(event))
+        self._keys.append(f"events/{event_day(event)}/{len(self._events)}.pkl")
+        return self._keys[-1]
+
+    def list_events(self) -> list[dict[str, Any]]:
+        return [pickle.loads(raw) for raw in self._events]
+
+    def list_event_keys(self, since: str | None = None) -> list[str]:
+        return [k for k in self._keys if since is None or (event_key_day(k) or since) >= since]
+
+    def load_event(self, key: str) -> dict[str, Any] | None:
+        return pickle.loads(self._events[int(key.rsplit("/", 1)[1].split(".")[0]) - 1])
+
+    def save_json(self, file_name: str, data: Any) -> None:
+        self._files[file_name] = json.dumps(data).encode("utf-8")
+
+    def load_json(self, file_name: str, fallback: Any = None) -> Any:
+        raw = self._files.get(file_name)
+        return fallback if raw is None else json.loads(raw)
+
+
+# ---------------------------------------------------------------------------
+
+
+@contextmanager
+def timer():
+    t = [0.0]
+    start = time.perf_counter()
+    try:
+        yield t
+    finally:
+        t[0] = time.perf_counter() - start
+
+
+def fmt_rate(n: int, seconds: float) -> str:
+    rate = n / seconds if seconds > 0 else float("inf")
+    return f"{rate:>12,.0f} events/sec  ({seconds * 1000:>9.1f} ms)"
+
+
+def make_event(i: int, now: datetime, rng: random.Random, max_age_s: int) -> dict[str, Any]:
+    user = rng.randrange(500)
+    ts = now - timedelta(seconds=rng.randrange(max_age_s))
+    return AnalyticsEvent(
+        event_id=f"evt-{i:08d}",
+        timestamp=ts.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        user_id=f"user-{user}",
+        user_email=f"user{user}@example.com",
+        workspace_id=f"ws-{user % 40}",
+        workspace_name=f"Workspace {user % 40}",
+        session_id=f"sess-{user}-{ts.strftime('%Y%m%d%H')}",
+        event_name=rng.choice(["page_viewed", "page_viewed", "button_clicked"]),
+        page_path=rng.choice(["/", "/graph", "/files", f"/chat/conv-{user % 97}"]),
+        page_title="Page",
+        device="desktop",
+        browser="firefox",
+    ).model_dump(exclude_none=True)
+
+
+# ---------------------------------------------------------------------------
+
+
+def bench_size(n: int, burst: int) -> None:
+    rng = random.Random(n)
+    now = datetime.now(UTC)
+    storage = _InMemoryStorage()
+    for i in range(n):
+        storage.save_event(make_event(i, now, rng, max_age_s=90 * 24 * 3600))
+
+    service = AnalyticsService(storage)
+    with timer() as full:
+        service.rebuild(full=True)
+    print(f"  {'rebuild(full=True)':36s} n={n:>9,}   {fmt_rate(n, full[0])}")
+
+    # A burst of fresh events, as collected between two debounced rebuilds.
+    for i in range(n, n + burst):
+        payload = make_event(i, now, rng, max_age_s=600)
+        service._partitions.add(payload, key=storage.save_event(payload))
+    with timer() as incremental:
+        service.rebuild()
+    print(
+        f"  {'rebuild() after burst':36s} n={burst:>9,}   {fmt_rate(burst, incremental[0])}"
+        f"   speedup x{full[0] / incremental[0]:.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10_000, 100_000, 1_000_000],
+        help="Stored event counts to benchmark.",
+    )
+    parser.add_argument("--burst", type=int, default=100, help="Events ingested between rebuilds.")
+    args = parser.parse_args()
+
+    print("\nAnalyticsService rebuild benchmark")
+    print(f"  Python   : {sys.version.split()[0]}")
+    print(f"  Platform : {platform.platform()}")
+    print(f"  Machine  : {platform.machine()}\n")
+
+    for n in args.sizes:
+        print(f"--- {n:,} stored events ---")
+        bench_size(n, args.burst)
+    print()
+
+
+if __name__ == "__main__":
+    main()
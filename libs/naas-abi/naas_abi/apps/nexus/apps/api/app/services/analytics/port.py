@@ -9,7 +9,10 @@ storage and the responses served by the read endpoints.
 
 from __future__ import annotations
 
+import contextlib
+import re
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
 from typing import Any, Literal
 
 from pydantic import BaseModel, ConfigDict, Field
@@ -353,18 +356,39 @@ class ChatNotFound(AnalyticsDomainError):
 # ---------------------------------------------------------------------------
 
 
+EVENT_DAY_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def event_day(event: dict[str, Any]) -> str | None:
+    """UTC day (``YYYY-MM-DD``) of an event's timestamp, or None."""
+    day = str(event.get("timestamp", ""))[:10]
+    return day if EVENT_DAY_PATTERN.fullmatch(day) else None
+
+
+def event_key_day(key: str) -> str | None:
+    """Day of an event key written by ``save_event``: dated events live in a
+    ``<YYYY-MM-DD>/`` directory. None for undated (and legacy flat) keys."""
+    parts = key.split("/")
+    if len(parts) >= 2 and EVENT_DAY_PATTERN.fullmatch(parts[-2]):
+        return parts[-2]
+    return None
+
+
 class AnalyticsStoragePort(ABC):
     """Persistence contract for analytics events and prebuilt aggregates.
 
     The domain owns the file naming convention (which keys mean what) — the
     adapter only knows how to read/write opaque blobs by ``(dir, name)``.
+    Events are stored under a directory named after their ``event_day``, so
+    the keys of the retained days can be listed without the older ones.
     """
 
     # --- per-event pickle store ---------------------------------------------
 
     @abstractmethod
     def save_event(self, event: dict[str, Any]) -> str:
-        """Persist one analytics event. Returns the storage key it landed at."""
+        """Persist one analytics event. Returns the storage key it landed at,
+        under a ``<event_day>/`` directory when the event has a day."""
         raise NotImplementedError
 
     @abstractmethod
@@ -372,6 +396,25 @@ class AnalyticsStoragePort(ABC):
         """Return every persisted per-event payload, unordered."""
         raise NotImplementedError
 
+    @abstractmethod
+    def list_event_keys(self, since: str | None = None) -> list[str]:
+        """Return the storage key of every persisted event (as returned by
+        ``save_event``) without loading the payloads. With ``since``
+        (``YYYY-MM-DD``), dated keys of earlier days are left out; undated
+        keys are always returned."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def load_event(self, key: str) -> dict[str, Any] | None:
+        """Return the event stored at ``key``, or ``None`` if it is unreadable."""
+        raise NotImplementedError
+
+    @contextlib.contextmanager
+    def partitions_lock(self) -> Iterator[None]:
+        """Serialize partition read-modify-writes across processes sharing
+        this store. The default is a no-op, for single-process stores."""
+        yield
+
     # --- JSON aggregates (overview.json, users.json, ...) -------------------
 
     @abstractmethod
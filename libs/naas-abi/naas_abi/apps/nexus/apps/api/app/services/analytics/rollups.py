@@ -0,0 +1,586 @@
+"""Incremental analytics aggregation state.
+
+Events are partitioned by UTC day. Each :class:`DayPartition` keeps the raw
+events of that day (sorted by timestamp) plus a :class:`Rollup`: mergeable
+per-session / per-user / per-page / per-workspace state and per-hour
+active-user sets. Adding an event to a partition updates its rollup in O(1),
+so ingesting a burst costs O(new events) instead of a full re-aggregation.
+
+:class:`PartitionedEventStore` owns the partitions that any scenario window
+can touch, persists only the partitions that changed since the last flush,
+and composes a window by merging the rollups of fully covered days and
+re-rolling only the (at most two) partially covered boundary days.
+
+The per-event pickles written by ``AnalyticsStoragePort.save_event`` stay the
+source of truth: loading reconciles the partitions with them, and a full
+reseed rebuilds every partition from them.
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+import uuid
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from naas_abi.apps.nexus.apps.api.app.services.analytics.port import (
+    AnalyticsStoragePort,
+    event_key_day,
+)
+
+PARTITIONS_MANIFEST_FILE = "partitions.json"
+_PARTITION_FILE_PREFIX = "partition-"
+
+
+def partition_file_name(day: str) -> str:
+    return f"{_PARTITION_FILE_PREFIX}{day}.json"
+
+
+def _timestamp(event: dict) -> str:
+    return event.get("timestamp", "")
+
+
+class Rollup:
+    """Mergeable aggregate state for a set of events.
+
+    First/last semantics follow the list-based builders in ``service.py``:
+    "first" values come from the earliest event, ``last_seen``/``user_id``
+    from the latest one, so merging day rollups in any order yields the same
+    rows as aggregating the concatenated events.
+    """
+
+    __slots__ = (
+        "events",
+        "page_views",
+        "pages",
+        "sessions",
+        "users",
+        "users_by_hour",
+        "workspaces",
+    )
+
+    def __init__(self) -> None:
+        self.events = 0
+        self.page_views = 0
+        self.sessions: dict[str, dict[str, Any]] = {}
+        self.users: dict[str, dict[str, Any]] = {}
+        self.pages: dict[str, dict[str, Any]] = {}
+        self.workspaces: dict[str, dict[str, Any]] = {}
+        self.users_by_hour: dict[str, set[str]] = {}
+
+    @classmethod
+    def from_events(cls, events: list[dict]) -> Rollup:
+        rollup = cls()
+        for event in events:
+            rollup.add(event)
+        return rollup
+
+    def add(self, event: dict) -> None:
+        ts = _timestamp(event)
+        is_view = event.get("event_name") == "page_viewed"
+        email = event.get("user_email")
+        session_id = event.get("session_id")
+        workspace_id = event.get("workspace_id")
+
+        self.events += 1
+        if is_view:
+            self.page_views += 1
+
+        if session_id:
+            session = self.sessions.get(session_id)
+            first = {
+                "first": ts,
+                "user_email": email,
+                "workspace_name": event.get("workspace_name"),
+                "device": event.get("device"),
+                "browser": event.get("browser"),
+            }
+            if session is None:
+                self.sessions[session_id] = {
+                    **first,
+                    "last": ts,
+                    "page_views": int(is_view),
+                    "events": 1,
+                }
+            else:
+                if ts < session["first"]:
+                    session.update(first)
+                if ts >= session["last"]:
+                    session["last"] = ts
+                session["page_views"] += int(is_view)
+                session["events"] += 1
+
+        if email:
+            user = self.users.get(email)
+            if user is None:
+                user = self.users[email] = {
+                    "first": ts,
+                    "last": ts,
+                    "user_id": event.get("user_id"),
+                    "sessions": set(),
+                    "workspaces": set(),
+                    "page_views": 0,
+                    "total_events": 0,
+                }
+            else:
+                user["first"] = min(user["first"], ts)
+                if ts > user["last"]:
+                    user["last"] = ts
+                    user["user_id"] = event.get("user_id")
+            if session_id:
+                user["sessions"].add(session_id)
+            if workspace_id:
+                user["workspaces"].add(workspace_id)
+            user["page_views"] += int(is_view)
+            user["total_events"] += 1
+            self.users_by_hour.setdefault(ts[:13], set()).add(email)
+
+        page_path = event.get("page_path")
+        if is_view and page_path:
+            page = self.pages.get(page_path)
+            if page is None:
+                page = self.pages[page_path] = {
+                    "first": ts,
+                    "title": event.get("page_title"),
+                    "views": 0,
+                    "users": set(),
+                }
+            elif ts < page["first"]:
+                page["first"] = ts
+                page["title"] = event.get("page_title")
+            page["views"] += 1
+            if email:
+                page["users"].add(email)
+
+        if workspace_id:
+            workspace = self.workspaces.get(workspace_id)
+            if workspace is None:
+                workspace = self.workspaces[workspace_id] = {
+                    "first": ts,
+                    "name": event.get("workspace_name"),
+                    "users": set(),
+                    "sessions": set(),
+                    "events": 0,
+                }
+            elif ts < workspace["first"]:
+                workspace["first"] = ts
+                workspace["name"] = event.get("workspace_name")
+            workspace["events"] += 1
+            if email:
+                workspace["users"].add(email)
+            if session_id:
+                workspace["sessions"].add(session_id)
+
+    def merge(self, other: Rollup) -> None:
+        self.events += other.events
+        self.page_views += other.page_views
+
+        for session_id, theirs in other.sessions.items():
+            ours = self.sessions.get(session_id)
+            if ours is None:
+                self.sessions[session_id] = dict(theirs)
+                continue
+            if theirs["first"] < ours["first"]:
+                for key in ("first", "user_email", "workspace_name", "device", "browser"):
+                    ours[key] = theirs[key]
+            if theirs["last"] >= ours["last"]:
+                ours["last"] = theirs["last"]
+            ours["page_views"] += theirs["page_views"]
+            ours["events"] += theirs["events"]
+
+        for email, theirs in other.users.items():
+            ours = self.users.get(email)
+            if ours is None:
+                self.users[email] = {
+                    **theirs,
+                    "sessions": set(theirs["sessions"]),
+                    "workspaces": set(theirs["workspaces"]),
+                }
+                continue
+            ours["first"] = min(ours["first"], theirs["first"])
+            if theirs["last"] > ours["last"]:
+                ours["last"] = theirs["last"]
+                ours["user_id"] = theirs["user_id"]
+            ours["sessions"] |= theirs["sessions"]
+            ours["workspaces"] |= theirs["workspaces"]
+            ours["page_views"] += theirs["page_views"]
+            ours["total_events"] += theirs["total_events"]
+
+        for page_path, theirs in other.pages.items():
+            ours = self.pages.get(page_path)
+            if ours is None:
+                self.pages[page_path] = {**theirs, "users": set(theirs["users"])}
+                continue
+            if theirs["first"] < ours["first"]:
+                ours["first"] = theirs["first"]
+                ours["title"] = theirs["title"]
+            ours["views"] += theirs["views"]
+            ours["users"] |= theirs["users"]
+
+        for workspace_id, theirs in other.workspaces.items():
+            ours = self.workspaces.get(workspace_id)
+            if ours is None:
+                self.workspaces[workspace_id] = {
+                    **theirs,
+                    "users": set(theirs["users"]),
+                    "sessions": set(theirs["sessions"]),
+                }
+                continue
+            if theirs["first"] < ours["first"]:
+                ours["first"] = theirs["first"]
+                ours["name"] = theirs["name"]
+            ours["events"] += theirs["events"]
+            ours["users"] |= theirs["users"]
+            ours["sessions"] |= theirs["sessions"]
+
+        for hour, emails in other.users_by_hour.items():
+            self.users_by_hour.setdefault(hour, set()).update(emails)
+
+    # --- JSON round-trip ------------------------------------------------------
+
+    def to_json(self) -> dict[str, Any]:
+        def _dump(rows: dict[str, dict[str, Any]]) -> dict[str, dict[str, Any]]:
+            return {
+                key: {k: sorted(v) if isinstance(v, set) else v for k, v in row.items()}
+                for key, row in rows.items()
+            }
+
+        return {
+            "events": self.events,
+            "page_views": self.page_views,
+            "sessions": self.sessions,
+            "users": _dump(self.users),
+            "pages": _dump(self.pages),
+            "workspaces": _dump(self.workspaces),
+            "users_by_hour": {hour: sorted(v) for hour, v in self.users_by_hour.items()},
+        }
+
+    @classmethod
+    def from_json(cls, raw: dict[str, Any]) -> Rollup:
+        def _load(rows: dict[str, dict[str, Any]]) -> dict[str, dict[str, Any]]:
+            return {
+                key: {k: set(v) if isinstance(v, list) else v for k, v in row.items()}
+                for key, row in rows.items()
+            }
+
+        rollup = cls()
+        rollup.events = int(raw.get("events", 0))
+        rollup.page_views = int(raw.get("page_views", 0))
+        rollup.sessions = {k: dict(v) for k, v in raw.get("sessions", {}).items()}
+        rollup.users = _load(raw.get("users", {}))
+        rollup.pages = _load(raw.get("pages", {}))
+        rollup.workspaces = _load(raw.get("workspaces", {}))
+        rollup.users_by_hour = {h: set(v) for h, v in raw.get("users_by_hour", {}).items()}
+        return rollup
+
+
+@dataclass
+class DayPartition:
+    """Raw events of one UTC day (sorted by timestamp) and their rollup.
+
+    ``keys`` are the storage keys of the events applied (duplicates
+    included), ``version`` changes on every write of the partition file.
+    """
+
+    day: str
+    events: list[dict] = field(default_factory=list)
+    rollup: Rollup = field(default_factory=Rollup)
+    event_ids: set[str] = field(default_factory=set)
+    keys: set[str] = field(default_factory=set)
+    version: str = ""
+    dirty: bool = False
+
+    def add(self, event: dict, key: str | None = None) -> bool:
+        """Add one event; returns ``False`` for an already-seen ``event_id``."""
+        if key and key not in self.keys:
+            self.keys.add(key)
+            self.dirty = True
+        event_id = event.get("event_id")
+        if event_id:
+            if event_id in self.event_ids:
+                return False
+            self.event_ids.add(event_id)
+        ts = _timestamp(event)
+        if not self.events or ts >= _timestamp(self.events[-1]):
+            self.events.append(event)
+        else:
+            bisect.insort_right(self.events, event, key=_timestamp)
+        self.rollup.add(event)
+        self.dirty = True
+        return True
+
+    def merge(self, other: DayPartition) -> None:
+        """Add the events and keys of another copy of this day (another
+        worker's write) without marking the partition dirty."""
+        dirty = self.dirty
+        for event in other.events:
+            self.add(event)
+        self.keys |= other.keys
+        self.version = other.version
+        self.dirty = dirty
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "day": self.day,
+            "version": self.version,
+            "events": self.events,
+            "keys": sorted(self.keys),
+            "rollup": self.rollup.to_json(),
+        }
+
+    @classmethod
+    def from_json(cls, day: str, raw: dict[str, Any]) -> DayPartition:
+        events = list(raw.get("events", []))
+        events.sort(key=_timestamp)
+        rollup_raw = raw.get("rollup")
+        return cls(
+            day=day,
+            events=events,
+            rollup=(
+                Rollup.from_json(rollup_raw)
+                if isinstance(rollup_raw, dict)
+                else Rollup.from_events(events)
+            ),
+            event_ids={e["event_id"] for e in events if e.get("event_id")},
+            keys=set(raw.get("keys", [])),
+            version=str(raw.get("version", "")),
+        )
+
+
+@dataclass
+class RefreshStats:
+    events: int
+    partitions: int
+    written_partitions: int
+    seeded: bool
+
+
+class PartitionedEventStore:
+    """Day-partitioned, incrementally rolled-up view over analytics events.
+
+    Only partitions at most ``retention_days`` old are kept: no scenario
+    window reaches further back, so older days are never loaded or merged.
+
+    Events are persisted by ``save_event`` before :meth:`add` queues them, so
+    nothing is lost if the process stops before the next :meth:`refresh`:
+    loading the partitions lists the keys of the retained days and re-applies
+    the stored events no partition records. A key's day is part of the key,
+    so older events are neither listed nor remembered. Only undated keys
+    (events without a timestamp, or written before events were grouped by
+    day) that fall outside the window are kept, in the manifest's
+    ``skipped_keys``.
+
+    :meth:`refresh` runs under ``AnalyticsStoragePort.partitions_lock`` and
+    first merges the partitions other processes wrote since this one last
+    read them (the manifest records each partition's ``version``), so
+    concurrent workers never overwrite each other's events. :meth:`sync` does
+    the same merge for readers, so a worker that never refreshes still serves
+    the partitions the others wrote.
+    """
+
+    def __init__(self, storage: AnalyticsStoragePort, retention_days: int) -> None:
+        self._storage = storage
+        self._retention_days = retention_days
+        self._partitions: dict[str, DayPartition] = {}
+        self._skipped_keys: set[str] = set()
+        self._pending: list[tuple[dict, str | None]] = []
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    def add(self, event: dict, key: str | None = None) -> None:
+        """Queue an event already persisted at ``key``; applied on the next :meth:`refresh`."""
+        with self._lock:
+            self._pending.append((event, key))
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def _retention_start(self, now: datetime) -> str:
+        return (now.date() - timedelta(days=self._retention_days)).isoformat()
+
+    def _apply(self, event: dict, key: str | None, start: str) -> None:
+        day = _timestamp(event)[:10]
+        if len(day) == 10 and day >= start:
+            self._partition(day).add(event, key)
+        elif key:
+            self._skip([key])
+
+    def _skip(self, keys: Iterable[str]) -> None:
+        """Remember the undated ``keys`` of events outside the window; a dated
+        key is not listed again once its day is older than the window."""
+        self._skipped_keys.update(key for key in keys if event_key_day(key) is None)
+
+    def _load(self, now: datetime) -> bool:
+        """Load retained partitions listed in the manifest and re-apply the
+        stored events none of them records; ``False`` if there is no manifest."""
+        manifest = self._storage.load_json(PARTITIONS_MANIFEST_FILE, fallback=None)
+        if not isinstance(manifest, dict):
+            return False
+        start = self._retention_start(now)
+        self._partitions = {}
+        self._skipped_keys = set()
+        self._skip(manifest.get("skipped_keys", []))
+        for day in manifest.get("days", []):
+            raw = self._storage.load_json(partition_file_name(day), fallback=None)
+            if not isinstance(raw, dict):
+                continue
+            partition = DayPartition.from_json(day, raw)
+            if day < start:
+                self._skip(partition.keys)
+            else:
+                self._partitions[day] = partition
+
+        listed = self._storage.list_event_keys(since=start)
+        # Drop the skipped keys whose event no longer exists.
+        self._skipped_keys &= set(listed)
+        known = set(self._skipped_keys)
+        for partition in self._partitions.values():
+            known |= partition.keys
+        missing = [key for key in listed if key not in known]
+        for key in missing:
+            event = self._storage.load_event(key)
+            if event is not None:
+                self._apply(event, key, start)
+        self._loaded = True
+        return True
+
+    def _seed(self, now: datetime) -> None:
+        """Rebuild every retained partition from the raw per-event store."""
+        start = self._retention_start(now)
+        stored = []
+        for key in self._storage.list_event_keys(since=start):
+            event = self._storage.load_event(key)
+            if event is not None:
+                stored.append((event, key))
+        stored.sort(key=lambda item: _timestamp(item[0]))
+        self._partitions = {}
+        self._skipped_keys = set()
+        for event, key in stored:
+            self._apply(event, key, start)
+        self._pending = []
+        self._loaded = True
+
+    def _partition(self, day: str) -> DayPartition:
+        partition = self._partitions.get(day)
+        if partition is None:
+            partition = self._partitions[day] = DayPartition(day=day)
+        return partition
+
+    def _merge_stored(self, manifest: dict[str, Any], start: str) -> None:
+        """Merge the partitions whose stored version differs from ours."""
+        self._skip(manifest.get("skipped_keys", []))
+        for day, version in manifest.get("versions", {}).items():
+            if day < start:
+                continue
+            ours = self._partitions.get(day)
+            if ours is not None and ours.version == version:
+                continue
+            raw = self._storage.load_json(partition_file_name(day), fallback=None)
+            if isinstance(raw, dict):
+                self._partition(day).merge(DayPartition.from_json(day, raw))
+
+    def sync(self, now: datetime) -> bool:
+        """Load the persisted partitions once, then merge the ones other
+        processes wrote since; ``False`` if none were ever written.
+
+        Costs one manifest read when nothing changed, so readers can call it
+        on every request.
+        """
+        with self._lock:
+            if not self._loaded:
+                return self._load(now)
+            start = self._retention_start(now)
+            manifest = self._storage.load_json(PARTITIONS_MANIFEST_FILE, fallback=None)
+            if not isinstance(manifest, dict) or not self._stale(manifest, start):
+                return True
+            with self._storage.partitions_lock():
+                manifest = self._storage.load_json(PARTITIONS_MANIFEST_FILE, fallback=None)
+                if isinstance(manifest, dict):
+                    self._merge_stored(manifest, start)
+            return True
+
+    def _stale(self, manifest: dict[str, Any], start: str) -> bool:
+        """Whether ``manifest`` lists a retained partition we have not read."""
+        for day, version in manifest.get("versions", {}).items():
+            ours = self._partitions.get(day)
+            if day >= start and (ours is None or ours.version != version):
+                return True
+        return False
+
+    def refresh(self, now: datetime, full: bool = False) -> RefreshStats:
+        """Apply pending events and persist the partitions that changed.
+
+        ``full`` (or a store that was never partitioned) reseeds every
+        partition from the stored events.
+        """
+        with self._lock, self._storage.partitions_lock():
+            seeded = False
+            if full or not (self._loaded or self._load(now)):
+                self._seed(now)
+                seeded = True
+
+            start = self._retention_start(now)
+            manifest = self._storage.load_json(PARTITIONS_MANIFEST_FILE, fallback=None)
+            if isinstance(manifest, dict) and not seeded:
+                self._merge_stored(manifest, start)
+            skipped = len(self._skipped_keys)
+
+            pending, self._pending = self._pending, []
+            for event, key in pending:
+                self._apply(event, key, start)
+
+            for day in [d for d in self._partitions if d < start]:
+                self._skip(self._partitions.pop(day).keys)
+
+            dirty = [p for p in self._partitions.values() if p.dirty]
+            for partition in dirty:
+                partition.version = uuid.uuid4().hex
+                self._storage.save_json(partition_file_name(partition.day), partition.to_json())
+                partition.dirty = False
+            if dirty or seeded or len(self._skipped_keys) != skipped:
+                self._storage.save_json(
+                    PARTITIONS_MANIFEST_FILE,
+                    {
+                        "days": sorted(self._partitions),
+                        "versions": {
+                            day: self._partitions[day].version for day in sorted(self._partitions)
+                        },
+                        "skipped_keys": sorted(self._skipped_keys),
+                        "updated_at": now.isoformat(),
+                    },
+                )
+
+            return RefreshStats(
+                events=sum(len(p.events) for p in self._partitions.values()),
+                partitions=len(self._partitions),
+                written_partitions=len(dirty),
+                seeded=seeded,
+            )
+
+    def window(self, date_start: str, date_end: str) -> tuple[Rollup, list[dict]]:
+        """Compose the rollup and the sorted raw events of ``[date_start, date_end]``."""
+        rollup = Rollup()
+        events: list[dict] = []
+        with self._lock:
+            cursor = date.fromisoformat(date_start[:10])
+            end = date.fromisoformat(date_end[:10])
+            while cursor <= end:
+                partition = self._partitions.get(cursor.isoformat())
+                cursor += timedelta(days=1)
+                if partition is None or not partition.events:
+                    continue
+                if (
+                    date_start <= _timestamp(partition.events[0])
+                    and _timestamp(partition.events[-1]) <= date_end
+                ):
+                    rollup.merge(partition.rollup)
+                    events.extend(partition.events)
+                    continue
+                inside = [e for e in partition.events if date_start <= _timestamp(e) <= date_end]
+                rollup.merge(Rollup.from_events(inside))
+                events.extend(inside)
+        return rollup, events
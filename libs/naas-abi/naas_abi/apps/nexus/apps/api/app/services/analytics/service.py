@@ -2,18 +2,26 @@
 
 Write path:
 
-1. ``ingest_event`` persists one event as a pickle via the storage port and
-   updates the ref-users / ref-workspaces directories.
-2. A debounced background rebuild reads every per-event pickle, then for
-   **each scenario** (Last 7/30/90 days) it computes the full set of
-   aggregates against that scenario's time window. Every aggregate JSON is
-   written as a ``{scenario_id: <payload>}`` map so the read endpoints can
-   serve any scenario with a single dict lookup.
+1. ``ingest_event`` persists one event as a pickle via the storage port,
+   updates the ref-users / ref-workspaces directories and queues the event
+   on the day-partitioned store (see ``rollups.py``).
+2. A background rebuild, started at most ``_REBUILD_DEBOUNCE_SECONDS`` after
+   the first queued event (and by ``flush`` at shutdown), applies the queued
+   events to their day partitions (O(new events)), rewrites only the
+   partitions that changed,
+   then for **each scenario** (Today, Yesterday, Last 7/30/90 days) composes
+   the aggregates from the partition rollups of that scenario's time window.
+   Every aggregate JSON is written as a ``{scenario_id: <payload>}`` map so
+   the read endpoints can serve any scenario with a single dict lookup.
+   ``rebuild(full=True)`` reseeds every partition from the per-event pickles;
+   events queued when the process stopped are recovered from them on the
+   next load.
 
 Read path:
 
 The ``get_*`` methods take a ``scenario_id`` and return the matching slice
-of the prebuilt JSON. No aggregation or filtering happens at request time.
+of the prebuilt JSON. Filtered requests, chats and per-user detail are
+computed at request time from the window's events in the loaded partitions.
 Line-graph timeseries always cover every day in the scenario window
 (missing days are filled with ``0``).
 """
@@ -45,6 +53,11 @@ from naas_abi.apps.nexus.apps.api.app.services.analytics.port import (
     UsersResponse,
     WorkspacesResponse,
 )
+from naas_abi.apps.nexus.apps.api.app.services.analytics.rollups import (
+    PARTITIONS_MANIFEST_FILE,
+    PartitionedEventStore,
+    Rollup,
+)
 from naas_abi_core import logger
 
 # ---------------------------------------------------------------------------
@@ -55,7 +68,6 @@ EVENTS_FILE = "events.json"
 RECENT_EVENTS_FILE = "recent_events.json"
 OVERVIEW_FILE = "overview.json"
 USERS_FILE = "users.json"
-USER_DETAILS_FILE = "user_details.json"
 SESSIONS_FILE = "sessions.json"
 PAGES_FILE = "pages.json"
 WORKSPACES_FILE = "workspaces.json"
@@ -78,6 +90,9 @@ _SCENARIOS: list[tuple[str, str, int]] = [
 ]
 DEFAULT_SCENARIO_ID = "last_7_days"
 
+# Oldest day any scenario window can reach; older partitions are dropped.
+_RETENTION_DAYS = max(days for _, _, days in _SCENARIOS)
+
 # Scenarios that use hourly buckets instead of daily ones.
 _HOURLY_SCENARIOS: frozenset[str] = frozenset({"today", "yesterday"})
 
@@ -407,6 +422,134 @@ def _build_user_detail_map(events: list[dict]) -> dict[str, dict]:
     return out
 
 
+# ---------------------------------------------------------------------------
+# Rollup renderers (same rows as the list-based helpers above, built from a
+# composed ``Rollup`` instead of re-scanning the window's events)
+# ---------------------------------------------------------------------------
+
+
+def _rollup_session_rows(rollup: Rollup) -> list[dict]:
+    rows = [
+        {
+            "session_id": session_id,
+            "user_email": s["user_email"] or "unknown",
+            "workspace_name": s["workspace_name"],
+            "started_at": s["first"],
+            "ended_at": s["last"],
+            "duration_seconds": _session_duration_sec(s["first"], s["last"]),
+            "page_views": s["page_views"],
+            "events": s["events"],
+            "device": s["device"],
+            "browser": s["browser"],
+        }
+        for session_id, s in rollup.sessions.items()
+    ]
+    rows.sort(key=lambda x: x["started_at"], reverse=True)
+    return rows
+
+
+def _rollup_user_rows(rollup: Rollup) -> list[dict]:
+    rows = [
+        {
+            "user_id": u["user_id"] or "",
+            "user_email": email,
+            "sessions": len(u["sessions"]),
+            "page_views": u["page_views"],
+            "workspaces": len(u["workspaces"]),
+            "last_seen": u["last"] or "",
+            "total_events": u["total_events"],
+        }
+        for email, u in sorted(rollup.users.items(), key=lambda kv: kv[1]["first"])
+    ]
+    rows.sort(key=lambda x: x["total_events"], reverse=True)
+    return rows
+
+
+def _rollup_page_rows(rollup: Rollup) -> list[dict]:
+    rows = [
+        {
+            "page_path": page_path,
+            "page_title": _decorate_page_title(p["title"] or page_path, page_path),
+            "views": p["views"],
+            "unique_users": len(p["users"]),
+        }
+        for page_path, p in sorted(rollup.pages.items(), key=lambda kv: kv[1]["first"])
+    ]
+    rows.sort(key=lambda x: x["views"], reverse=True)
+    return rows
+
+
+def _rollup_workspace_rows(rollup: Rollup) -> list[dict]:
+    rows = [
+        {
+            "workspace_id": ws_id,
+            "workspace_name": w["name"] or ws_id,
+            "active_users": len(w["users"]),
+            "sessions": len(w["sessions"]),
+            "events": w["events"],
+        }
+        for ws_id, w in sorted(rollup.workspaces.items(), key=lambda kv: kv[1]["first"])
+    ]
+    rows.sort(key=lambda x: x["events"], reverse=True)
+    return rows
+
+
+def _rollup_overview(
+    rollup: Rollup, sessions: list[dict], days: list[str], events: list[dict]
+) -> dict:
+    """``_build_overview`` for a composed rollup; ``events`` are sorted by timestamp."""
+    sessions_by_user: dict[str, int] = defaultdict(int)
+    for s in sessions:
+        if s.get("user_email") and s["user_email"] != "unknown":
+            sessions_by_user[s["user_email"]] += 1
+
+    total_duration = sum(s["duration_seconds"] for s in sessions)
+    avg_session_duration = int(total_duration / len(sessions)) if sessions else 0
+    active_users = len(rollup.users)
+    avg_sessions_per_user = round(len(sessions) / active_users, 1) if active_users else 0.0
+
+    most_active_workspace = None
+    for ws_id, w in sorted(rollup.workspaces.items(), key=lambda kv: kv[1]["first"]):
+        if most_active_workspace is None or w["events"] > most_active_workspace["events"]:
+            most_active_workspace = {"id": ws_id, "name": w["name"] or ws_id, "events": w["events"]}
+
+    kpi = {
+        "active_users": active_users,
+        "total_sessions": len(sessions),
+        "avg_sessions_per_user": avg_sessions_per_user,
+        "total_page_views": rollup.page_views,
+        "workspaces_used": len(rollup.workspaces),
+        "avg_session_duration_seconds": avg_session_duration,
+        "returning_users": sum(1 for n in sessions_by_user.values() if n > 1),
+        "most_active_workspace": most_active_workspace,
+    }
+
+    hourly = bool(days and "T" in days[0])
+    key_len = 13 if hourly else 10
+
+    sessions_by_slot: dict[str, int] = dict.fromkeys(days, 0)
+    for s in sessions:
+        k = s["started_at"][:key_len]
+        if k in sessions_by_slot:
+            sessions_by_slot[k] += 1
+
+    users_by_slot: dict[str, set] = {d: set() for d in days}
+    for hour, emails in rollup.users_by_hour.items():
+        k = hour[:key_len]
+        if k in users_by_slot:
+            users_by_slot[k] |= emails
+
+    return {
+        "kpi": kpi,
+        "sessions_over_time": [{"date": d, "value": sessions_by_slot[d]} for d in days],
+        "active_users_over_time": [{"date": d, "value": len(users_by_slot[d])} for d in days],
+        "top_users": _rollup_user_rows(rollup)[:10],
+        "top_pages": _rollup_page_rows(rollup)[:10],
+        "workspace_activity": _rollup_workspace_rows(rollup),
+        "recent_activity": list(reversed(events[-25:])),
+    }
+
+
 # ---------------------------------------------------------------------------
 # Service
 # ---------------------------------------------------------------------------
@@ -415,6 +558,7 @@ def _build_user_detail_map(events: list[dict]) -> dict[str, dict]:
 class AnalyticsService:
     def __init__(self, storage: AnalyticsStoragePort) -> None:
         self._storage = storage
+        self._partitions = PartitionedEventStore(storage, retention_days=_RETENTION_DAYS)
 
         # Debounced rebuild bookkeeping.
         self._rebuild_lock = threading.Lock()
@@ -427,6 +571,7 @@ class AnalyticsService:
     def ingest_event(self, event: AnalyticsEvent) -> str:
         payload = event.model_dump(exclude_none=True)
         stored_at = self._storage.save_event(payload)
+        self._partitions.add(payload, key=stored_at)
         self._upsert_refs(event)
         self._schedule_rebuild()
         return stored_at
@@ -486,20 +631,24 @@ class AnalyticsService:
 
     # --- rebuild ------------------------------------------------------------
 
-    def rebuild(self) -> Metadata:
-        overall_start = time.monotonic()
+    def rebuild(self, full: bool = False) -> Metadata:
+        """Refresh the day partitions and rewrite every scenario aggregate.
 
-        events_start = time.monotonic()
-        events = self._storage.list_events()
-        events.sort(key=lambda e: e.get("timestamp", ""))
-        self._storage.save_json(EVENTS_FILE, {"events": events})
-        events_ms = int((time.monotonic() - events_start) * 1000)
+        By default only events ingested since the last rebuild are applied to
+        their partitions. ``full`` reseeds the partitions from every stored
+        per-event pickle (also done automatically the first time).
+        """
+        overall_start = time.monotonic()
 
         # Anchor every scenario at the same "now" so a single rebuild produces
         # a consistent snapshot across windows.
         now = datetime.now(UTC)
         scenarios = _build_scenarios(now)
 
+        events_start = time.monotonic()
+        refresh = self._partitions.refresh(now, full=full)
+        events_ms = int((time.monotonic() - events_start) * 1000)
+
         ref_users = self._storage.load_json(REF_USERS_FILE, fallback=[])
         ref_workspaces = self._storage.load_json(REF_WORKSPACES_FILE, fallback=[])
         if not isinstance(ref_users, list):
@@ -512,24 +661,25 @@ class AnalyticsService:
         sessions_by_scenario: dict[str, dict] = {}
         pages_by_scenario: dict[str, dict] = {}
         workspaces_by_scenario: dict[str, dict] = {}
-        user_details_by_scenario: dict[str, dict] = {}
         recent_events_by_scenario: dict[str, dict] = {}
 
         for scenario in scenarios:
             sid = scenario["scenario_id"]
             ds = scenario["date_start"]
             de = scenario["date_end"]
-            window_events = _filter_events_to_window(events, ds, de)
+            rollup, window_events = self._partitions.window(ds, de)
             days = _enumerate_hours(ds, de) if sid in _HOURLY_SCENARIOS else _enumerate_days(ds, de)
 
-            session_rows = _build_sessions(window_events)
-            user_rows = _build_user_rows(window_events)
-            page_rows = _build_page_rows(window_events)
-            workspace_rows = _build_workspace_rows(window_events)
+            session_rows = _rollup_session_rows(rollup)
+            user_rows = _rollup_user_rows(rollup)
+            page_rows = _rollup_page_rows(rollup)
+            workspace_rows = _rollup_workspace_rows(rollup)
 
-            # _build_overview already returns a fully zeroed overview when
-            # given empty inputs; no special-case branch needed.
-            overview_by_scenario[sid] = _build_overview(window_events, session_rows, days)
+            # An empty rollup renders a fully zeroed overview; no special-case
+            # branch needed.
+            overview_by_scenario[sid] = _rollup_overview(
+                rollup, session_rows, days, window_events
+            )
             users_by_scenario[sid] = {"users": user_rows, "directory": ref_users}
             sessions_by_scenario[sid] = {"sessions": session_rows}
             pages_by_scenario[sid] = {"pages": page_rows}
@@ -537,9 +687,8 @@ class AnalyticsService:
                 "workspaces": workspace_rows,
                 "directory": ref_workspaces,
             }
-            user_details_by_scenario[sid] = _build_user_detail_map(window_events)
             recent_events_by_scenario[sid] = {
-                "events": list(reversed(window_events))[:RECENT_EVENTS_LIMIT]
+                "events": window_events[-RECENT_EVENTS_LIMIT:][::-1]
             }
 
         aggregate_stats: list[FileStats] = []
@@ -561,28 +710,33 @@ class AnalyticsService:
         _write(SESSIONS_FILE, sessions_by_scenario, count=len(scenarios))
         _write(PAGES_FILE, pages_by_scenario, count=len(scenarios))
         _write(WORKSPACES_FILE, workspaces_by_scenario, count=len(scenarios))
-        _write(USER_DETAILS_FILE, user_details_by_scenario, count=len(scenarios))
         _write(RECENT_EVENTS_FILE, recent_events_by_scenario, count=len(scenarios))
 
         metadata = Metadata(
             updated_at=datetime.now(UTC).isoformat(),
             duration_ms=int((time.monotonic() - overall_start) * 1000),
-            events=FileStats(file=EVENTS_FILE, count=len(events), duration_ms=events_ms),
+            events=FileStats(
+                file=PARTITIONS_MANIFEST_FILE, count=refresh.events, duration_ms=events_ms
+            ),
             aggregates=aggregate_stats,
         )
         self._storage.save_json(METADATA_FILE, metadata.model_dump())
         return metadata
 
     def _schedule_rebuild(self) -> None:
+        # The timer is armed by the first event after a rebuild and not pushed
+        # back by later ones, so events reach the partitions within
+        # _REBUILD_DEBOUNCE_SECONDS even under steady traffic.
         with self._rebuild_lock:
             if self._rebuild_timer is not None:
-                self._rebuild_timer.cancel()
+                return
             self._rebuild_timer = threading.Timer(_REBUILD_DEBOUNCE_SECONDS, self._run_rebuild)
             self._rebuild_timer.daemon = True
             self._rebuild_timer.start()
 
     def _run_rebuild(self) -> None:
         with self._rebuild_lock:
+            self._rebuild_timer = None
             if self._rebuild_running:
                 self._rebuild_pending = True
                 return
@@ -603,6 +757,15 @@ class AnalyticsService:
             if rerun:
                 self._run_rebuild()
 
+    def flush(self) -> None:
+        """Rebuild now if events are queued (application shutdown)."""
+        with self._rebuild_lock:
+            if self._rebuild_timer is not None:
+                self._rebuild_timer.cancel()
+                self._rebuild_timer = None
+        if self._partitions.pending:
+            self._run_rebuild()
+
     # --- read endpoints -----------------------------------------------------
 
     def get_metadata(self) -> Metadata | None:
@@ -643,11 +806,20 @@ class AnalyticsService:
 
     def _load_window_events(self, scenario_id: str) -> list[dict]:
         """All raw events that fall inside the named scenario's window."""
+        now = datetime.now(UTC)
+        scenarios = _build_scenarios(now)
+        if self._partitions.sync(now):
+            for s in scenarios:
+                if s["scenario_id"] == scenario_id:
+                    return self._partitions.window(s["date_start"], s["date_end"])[1]
+            return self._partitions.window(scenarios[-1]["date_start"], _iso_z(now))[1]
+
+        # Legacy layout: never rebuilt since partitions were introduced.
         raw = self._storage.load_json(EVENTS_FILE, fallback={"events": []})
         events = raw.get("events", []) if isinstance(raw, dict) else []
-        for s in self.get_scenarios().scenarios:
-            if s.scenario_id == scenario_id:
-                return _filter_events_to_window(events, s.date_start, s.date_end)
+        for s in scenarios:
+            if s["scenario_id"] == scenario_id:
+                return _filter_events_to_window(events, s["date_start"], s["date_end"])
         return events
 
     def _has_filters(self, workspace_id: str | None, user_email: str | None) -> bool:
@@ -712,21 +884,17 @@ class AnalyticsService:
     ) -> UserDetail:
         decoded = urllib.parse.unquote(email)
 
-        if workspace_id and workspace_id != "all":
-            events = self._filter_events(
-                self._load_window_events(scenario_id),
-                workspace_id=workspace_id,
-                user_email=decoded,
-            )
-            details = _build_user_detail_map(events)
-            if decoded not in details:
-                raise UserDetailNotFound(decoded)
-            return UserDetail.model_validate(details[decoded])
-
-        scenario_data = self._load_scenario_slice(USER_DETAILS_FILE, scenario_id, fallback={})
-        if not isinstance(scenario_data, dict) or decoded not in scenario_data:
+        # Built on demand: a user's detail embeds every one of their events,
+        # so prebuilding it for every user made each rebuild O(all events).
+        events = self._filter_events(
+            self._load_window_events(scenario_id),
+            workspace_id=workspace_id,
+            user_email=decoded,
+        )
+        details = _build_user_detail_map(events)
+        if decoded not in details:
             raise UserDetailNotFound(decoded)
-        return UserDetail.model_validate(scenario_data[decoded])
+        return UserDetail.model_validate(details[decoded])
 
     def get_sessions(
         self,
@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import json
+import random
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import pytest
+from naas_abi.apps.nexus.apps.api.app.services.analytics.port import (
+    AnalyticsEvent,
+    AnalyticsStoragePort,
+    event_day,
+    event_key_day,
+)
+from naas_abi.apps.nexus.apps.api.app.services.analytics.rollups import (
+    PARTITIONS_MANIFEST_FILE,
+    partition_file_name,
+)
+from naas_abi.apps.nexus.apps.api.app.services.analytics.service import (
+    _HOURLY_SCENARIOS,
+    OVERVIEW_FILE,
+    PAGES_FILE,
+    SCENARIO_FILE,
+    SESSIONS_FILE,
+    USERS_FILE,
+    WORKSPACES_FILE,
+    AnalyticsService,
+    _build_overview,
+    _build_page_rows,
+    _build_sessions,
+    _build_user_rows,
+    _build_workspace_rows,
+    _enumerate_days,
+    _enumerate_hours,
+    _filter_events_to_window,
+)
+
+
+class InMemoryAnalyticsStorage(AnalyticsStoragePort):
+    def __init__(self) -> None:
+        self.events: list[dict[str, Any]] = []
+        self.files: dict[str, str] = {}
+        self.writes: list[str] = []
+
+    def _key(self, i: int) -> str:
+        return f"events/{event_day(self.events[i - 1])}/{i}.pkl"
+
+    def save_event(self, event: dict[str, Any]) -> str:
+        self.events.append(json.loads(json.dumps(event)))
+        return self._key(len(self.events))
+
+    def list_events(self) -> list[dict[str, Any]]:
+        return [dict(e) for e in self.events]
+
+    def list_event_keys(self, since: str | None = None) -> list[str]:
+        keys = [self._key(i) for i in range(1, len(self.events) + 1)]
+        return [k for k in keys if since is None or (event_key_day(k) or since) >= since]
+
+    def load_event(self, key: str) -> dict[str, Any] | None:
+        return dict(self.events[int(key.rsplit("/", 1)[1].split(".")[0]) - 1])
+
+    def save_json(self, file_name: str, data: Any) -> None:
+        self.files[file_name] = json.dumps(data)
+        self.writes.append(file_name)
+
+    def load_json(self, file_name: str, fallback: Any = None) -> Any:
+        raw = self.files.get(file_name)
+        return fallback if raw is None else json.loads(raw)
+
+
+@pytest.fixture(autouse=True)
+def _no_debounced_rebuild(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(AnalyticsService, "_schedule_rebuild", lambda self: None)
+
+
+def _make_events(n: int, now: datetime, seed: int = 7) -> list[AnalyticsEvent]:
+    rng = random.Random(seed)
+    seconds = rng.sample(range(95 * 24 * 3600), n)
+    events = []
+    for i, offset in enumerate(seconds):
+        user = rng.randrange(12)
+        ts = now - timedelta(seconds=offset)
+        events.append(
+            AnalyticsEvent(
+                event_id=f"evt-{i}",
+                timestamp=ts.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                user_id=f"user-{user}",
+                user_email=f"user{user}@example.com" if rng.random() > 0.05 else None,
+                workspace_id=f"ws-{rng.randrange(4)}" if rng.random() > 0.2 else None,
+                workspace_name=f"Workspace {rng.randrange(4)}",
+                session_id=f"sess-{user}-{offset // 7200}",
+                event_name=rng.choice(["page_viewed", "page_viewed", "button_clicked"]),
+                page_path=rng.choice(["/", "/chat/conv-1", "/graph", "/files"]),
+                page_title=rng.choice(["Home", "Chat", None]),
+                device="desktop",
+                browser="firefox",
+            )
+        )
+    return events
+
+
+def _reference_aggregates(storage: InMemoryAnalyticsStorage) -> dict[str, dict]:
+    """Aggregates computed the pre-partitioning way: filter everything, rebuild."""
+    unique = {e["event_id"]: e for e in storage.list_events()}
+    events = sorted(unique.values(), key=lambda e: e.get("timestamp", ""))
+    scenarios = json.loads(storage.files[SCENARIO_FILE])["scenarios"]
+    out: dict[str, dict] = {}
+    for scenario in scenarios:
+        sid, ds, de = scenario["scenario_id"], scenario["date_start"], scenario["date_end"]
+        window = _filter_events_to_window(events, ds, de)
+        days = _enumerate_hours(ds, de) if sid in _HOURLY_SCENARIOS else _enumerate_days(ds, de)
+        sessions = _build_sessions(window)
+        overview = _build_overview(window, sessions, days)
+        overview.pop("recent_activity")
+        out[sid] = {
+            "overview": overview,
+            "sessions": sessions,
+            "users": _build_user_rows(window),
+            "pages": _build_page_rows(window),
+            "workspaces": _build_workspace_rows(window),
+        }
+    return out
+
+
+def _stored_aggregates(storage: InMemoryAnalyticsStorage) -> dict[str, dict]:
+    overview = storage.load_json(OVERVIEW_FILE)
+    users = storage.load_json(USERS_FILE)
+    sessions = storage.load_json(SESSIONS_FILE)
+    pages = storage.load_json(PAGES_FILE)
+    workspaces = storage.load_json(WORKSPACES_FILE)
+    out: dict[str, dict] = {}
+    for sid, payload in overview.items():
+        payload = dict(payload)
+        payload.pop("recent_activity")
+        out[sid] = {
+            "overview": payload,
+            "sessions": sessions[sid]["sessions"],
+            "users": users[sid]["users"],
+            "pages": pages[sid]["pages"],
+            "workspaces": workspaces[sid]["workspaces"],
+        }
+    return out
+
+
+def test_rebuild_from_partitions_matches_full_scan_aggregation() -> None:
+    now = datetime.now(UTC)
+    storage = InMemoryAnalyticsStorage()
+    service = AnalyticsService(storage)
+    for event in _make_events(1500, now):
+        service.ingest_event(event)
+
+    metadata = service.rebuild()
+
+    assert metadata.events.file == PARTITIONS_MANIFEST_FILE
+    assert _stored_aggregates(storage) == _reference_aggregates(storage)
+
+
+def test_incremental_rebuild_only_rewrites_dirty_partitions() -> None:
+    now = datetime.now(UTC)
+    storage = InMemoryAnalyticsStorage()
+    service = AnalyticsService(storage)
+    for event in _make_events(800, now):
+        service.ingest_event(event)
+    service.rebuild()
+
+    storage.writes.clear()
+    fresh = AnalyticsEvent(
+        event_id="evt-new",
+        timestamp=(now - timedelta(seconds=5)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        user_id="user-new",
+        user_email="new@example.com",
+        session_id="sess-new",
+        event_name="page_viewed",
+        page_path="/graph",
+    )
+    service.ingest_event(fresh)
+    service.ingest_event(fresh)  # duplicate delivery is ignored
+    service.rebuild()
+
+    written_partitions = [f for f in storage.writes if f.startswith("partition-")]
+    assert written_partitions == [partition_file_name(fresh.timestamp[:10])]
+    assert _stored_aggregates(storage) == _reference_aggregates(storage)
+    users = storage.load_json(USERS_FILE)["last_7_days"]["users"]
+    assert [u["total_events"] for u in users if u["user_email"] == "new@example.com"] == [1]
+
+
+def test_new_service_loads_persisted_partitions_without_listing_events() -> None:
+    now = datetime.now(UTC)
+    storage = InMemoryAnalyticsStorage()
+    first = AnalyticsService(storage)
+    for event in _make_events(300, now):
+        first.ingest_event(event)
+    first.rebuild()
+    expected = _stored_aggregates(storage)
+
+    def _fail_list_events() -> list[dict[str, Any]]:
+        raise AssertionError("partitions should be loaded from storage")
+
+    storage.list_events = _fail_list_events  # type: ignore[method-assign]
+    second = AnalyticsService(storage)
+    second.rebuild()
+
+    assert _stored_aggregates(storage) == expected
+    scenarios = json.loads(storage.files[SCENARIO_FILE])["scenarios"]
+    last_90 = next(s for s in scenarios if s["scenario_id"] == "last_90_days")
+    in_window = _filter_events_to_window(
+        [e.model_dump() for e in _make_events(300, now)],
+        last_90["date_start"],
+        last_90["date_end"],
+    )
+    assert len(second._load_window_events("last_90_days")) == len(in_window)
+
+
+def test_events_queued_before_a_restart_are_recovered_on_load() -> None:
+    now = datetime.now(UTC)
+    storage = InMemoryAnalyticsStorage()
+    events = _make_events(400, now)
+    first = AnalyticsService(storage)
+    for event in events[:300]:
+        first.ingest_event(event)
+    first.rebuild()
+    for event in events[300:]:
+        first.ingest_event(event)  # persisted, never rebuilt: the process stops here
+
+    second = AnalyticsService(storage)
+    second.rebuild()
+
+    assert _stored_aggregates(storage) == _reference_aggregates(storage)
+
+
+def test_workers_sharing_a_store_keep_each_others_events() -> None:
+    now = datetime.now(UTC)
+    storage = InMemoryAnalyticsStorage()
+    events = _make_events(600, now)
+    worker_a, worker_b = AnalyticsService(storage), AnalyticsService(storage)
+    worker_a.rebuild()
+    worker_b.rebuild()
+    for i, event in enumerate(events):
+        (worker_a if i % 2 else worker_b).ingest_event(event)
+    worker_a.rebuild()
+    worker_b.rebuild()
+
+    assert _stored_aggregates(storage) == _reference_aggregates(storage)
+
+
+def test_reads_see_partitions_written_by_another_worker() -> None:
+    now = datetime.now(UTC)
+    storage = InMemoryAnalyticsStorage()
+    events = _make_events(200, now)
+    reader, writer = AnalyticsService(storage), AnalyticsService(storage)
+    for event in events[:100]:
+        writer.ingest_event(event)
+    writer.rebuild()
+    before = len(reader._load_window_events("last_90_days"))
+
+    loaded: list[str] = []
+    load_json = storage.load_json
+
+    def _load_json(file_name: str, fallback: Any = None) -> Any:
+        loaded.append(file_name)
+        return load_json(file_name, fallback)
+
+    storage.load_json = _load_json  # type: ignore[method-assign]
+    assert len(reader._load_window_events("last_90_days")) == before
+    assert loaded == [PARTITIONS_MANIFEST_FILE]  # unchanged: no partition re-read
+
+    for event in events[100:]:
+        writer.ingest_event(event)
+    writer.rebuild()
+    unique = {e.event_id: e.model_dump() for e in events}
+    scenarios = json.loads(storage.files[SCENARIO_FILE])["scenarios"]
+    last_90 = next(s for s in scenarios if s["scenario_id"] == "last_90_days")
+    in_window = _filter_events_to_window(
+        sorted(unique.values(), key=lambda e: e["timestamp"]),
+        last_90["date_start"],
+        last_90["date_end"],
+    )
+    assert len(reader._load_window_events("last_90_days")) == len(in_window) > before
+
+
+def test_events_older_than_retention_are_not_tracked_or_listed() -> None:
+    now = datetime.now(UTC)
+    storage = InMemoryAnalyticsStorage()
+    first = AnalyticsService(storage)
+    for event in _make_events(300, now):
+        first.ingest_event(event)
+    first.rebuild()
+    manifest = json.loads(storage.files[PARTITIONS_MANIFEST_FILE])
+    assert manifest["skipped_keys"] == []
+    oldest = min(manifest["days"])
+
+    listed_since: list[str | None] = []
+    list_event_keys = storage.list_event_keys
+
+    def _list_event_keys(since: str | None = None) -> list[str]:
+        listed_since.append(since)
+        return list_event_keys(since)
+
+    storage.list_event_keys = _list_event_keys  # type: ignore[method-assign]
+    storage.load_event = lambda key: pytest.fail(f"{key} reloaded")  # type: ignore[method-assign]
+    AnalyticsService(storage).rebuild()
+
+    assert listed_since and all(since is not None and since <= oldest for since in listed_since)
@@ -15,6 +15,9 @@ from naas_abi.apps.nexus.apps.api.app.services.auth.port import (
     AuthUserRecord,
     MagicLinkTokenRecord,
 )
+from naas_abi.apps.nexus.apps.api.app.services.iam.decision_cache import (
+    workspace_role_cache,
+)
 from naas_abi.apps.nexus.apps.api.app.services.refresh_token import (
     create_refresh_token,
     hash_otp_code,
@@ -186,6 +189,8 @@ class AuthService:
             now=now_utc_naive(),
         )
         await self.adapter.commit()
+        # The personal workspace's id is the user id.
+        workspace_role_cache.invalidate((user_id, user_id))
 
         access_token, jti = create_access_token(data={"sub": user_id})
         refresh_token = await create_refresh_token(
@@ -491,6 +496,7 @@ class AuthService:
                     hashed_password=get_password_hash(secrets.token_urlsafe(32)),
                     now=now_utc_naive(),
                 )
+                workspace_role_cache.invalidate((user.id, user.id))
             else:
                 return None
 
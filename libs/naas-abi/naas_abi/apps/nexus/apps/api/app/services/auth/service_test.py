@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
 from datetime import datetime
+from types import SimpleNamespace
 from unittest.mock import AsyncMock
 
 import pytest
+from naas_abi.apps.nexus.apps.api.app.core import database
 from naas_abi.apps.nexus.apps.api.app.core.config import settings
 from naas_abi.apps.nexus.apps.api.app.services.auth.port import (
     AuthUserRecord,
@@ -15,7 +18,16 @@ from naas_abi.apps.nexus.apps.api.app.services.auth.service import (
     InvalidOtpError,
     PasswordAuthenticationDisabledError,
 )
-from naas_abi.apps.nexus.apps.api.app.services.refresh_token import hash_otp_code, hash_token
+from naas_abi.apps.nexus.apps.api.app.services.iam.decision_cache import (
+    MISSING,
+    revoked_token_cache,
+    workspace_role_cache,
+)
+from naas_abi.apps.nexus.apps.api.app.services.refresh_token import (
+    hash_otp_code,
+    hash_token,
+    is_access_token_revoked,
+)
 
 
 @pytest.mark.asyncio
@@ -185,10 +197,12 @@ async def test_request_magic_link_public_signup_creates_default_workspace(
         created_at=datetime.utcnow(),
     )
     service = AuthService(adapter=adapter)
+    workspace_role_cache.set(("user-2", "user-2"), None)
 
     challenge = await service.request_magic_link("unknown@example.com")
 
     assert challenge
+    assert workspace_role_cache.get(("user-2", "user-2")) is MISSING
     adapter.create_user_with_default_workspace.assert_awaited_once()
     assert (
         adapter.create_user_with_default_workspace.await_args.kwargs["name"] == "Unknown"
@@ -389,3 +403,36 @@ async def test_verify_otp_rejects_wrong_code_and_increments(monkeypatch) -> None
 
     adapter.increment_magic_link_otp_attempts.assert_awaited_once_with("ml-1")
     adapter.mark_magic_link_token_used.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_valid_token_answers_are_cached_for_a_shorter_ttl(monkeypatch) -> None:
+    revoked: set[str] = set()
+    queries: list[str] = []
+
+    async def execute(_sql, params):
+        queries.append(params["jti"])
+        return SimpleNamespace(fetchone=lambda: (1,) if params["jti"] in revoked else None)
+
+    @asynccontextmanager
+    async def begin():
+        yield SimpleNamespace(execute=execute)
+
+    now = [0.0]
+    monkeypatch.setattr(database, "async_engine", SimpleNamespace(begin=begin))
+    monkeypatch.setattr(settings, "authz_valid_token_ttl_seconds", 1.0)
+    monkeypatch.setattr(revoked_token_cache, "ttl_seconds", 30.0)
+    monkeypatch.setattr(revoked_token_cache, "_clock", lambda: now[0])
+    revoked_token_cache.clear()
+
+    assert await is_access_token_revoked("jti-1") is False
+    assert await is_access_token_revoked("jti-1") is False
+    assert queries == ["jti-1"]
+
+    revoked.add("jti-1")  # by another process
+    now[0] = 1.0
+    assert await is_access_token_revoked("jti-1") is True
+    now[0] = 20.0
+    assert await is_access_token_revoked("jti-1") is True
+    assert queries == ["jti-1", "jti-1"]
+    revoked_token_cache.clear()
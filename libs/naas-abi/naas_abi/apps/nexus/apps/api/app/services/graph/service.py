@@ -220,14 +220,17 @@ def _invalidate_graph_cache(graph_uri: str) -> None:
             pass
 
 
-def clear_graph_service_caches() -> None:
-    """Wipe every filesystem graph cache (KPIs, network schema, BFO buckets, …).
+def clear_graph_service_caches(triple_store: TripleStoreService | None = None) -> None:
+    """Wipe every filesystem graph cache (KPIs, network schema, BFO buckets, …)
+    and, when given, the triple store's query cache.
 
     Per-graph invalidation only clears a fixed set of keys; the schema-derived
     caches (``bfo_parent_*``, ``property_kind_*``, ``ontology_label_*``) are keyed
     by class/property URI with a 1-day TTL, so they outlive ontology changes.
     The sidebar Refresh button calls this to force a full rebuild on next request.
     """
+    if triple_store is not None:
+        triple_store.clear_query_cache()
     for _, adapter in _cache._adapters:
         cache_dir = getattr(adapter, "cache_dir", None)
         if cache_dir and Path(cache_dir).exists():
@@ -1554,8 +1557,12 @@ class GraphService:
     # ── Public API ────────────────────────────────────────────────────────────
 
     async def clear_cache(self) -> None:
-        """Clear all filesystem graph caches (KPIs, network schema, BFO buckets, …)."""
-        clear_graph_service_caches()
+        """Clear the graph caches and the triple store query cache."""
+        try:
+            store = self._get_triple_store()
+        except GraphServiceUnavailableError:
+            store = None
+        clear_graph_service_caches(store)
 
     async def list_graphs(self, workspace_id: str) -> list[GraphPackData]:
         store = self._get_triple_store()
@@ -2136,8 +2143,10 @@ class GraphService:
     ) -> tuple[str, int, int]:
         """Export all triples from *graph_uri* as Turtle with bound namespaces.
 
-        Fetches triples in batches of *batch_size*, incrementing OFFSET until
-        fewer than *batch_size* triples are returned (end of graph).
+        Streams the graph with one ``iter_query`` SELECT (rows parsed
+        *batch_size* at a time) instead of paging with LIMIT/OFFSET, which
+        re-scans the graph for every page and is not stable without an
+        ORDER BY.
 
         Returns (serialized_content, total_triple_count, named_individual_count).
         """
@@ -2155,35 +2164,17 @@ class GraphService:
         except Exception:
             pass
 
-        total_count = 0
-        offset = 0
-
-        while True:
-            query = f"""
-            CONSTRUCT {{ ?s ?p ?o }}
-            WHERE {{
-                GRAPH <{graph_uri}> {{
-                    ?s ?p ?o .
-                }}
+        query = f"""
+        SELECT ?s ?p ?o
+        WHERE {{
+            GRAPH <{graph_uri}> {{
+                ?s ?p ?o .
             }}
-            LIMIT {int(batch_size)}
-            OFFSET {int(offset)}
-            """
-            result = store.query(query)
-            batch_count = 0
-            if isinstance(result, Graph):
-                for triple in result:
-                    g.add(triple)  # type: ignore[arg-type]
-                    batch_count += 1
-            else:
-                for triple in result:
-                    g.add(triple)  # type: ignore[arg-type]
-                    batch_count += 1
-
-            total_count += batch_count
-            if batch_count < batch_size:
-                break
-            offset += batch_size
+        }}
+        """
+        for row in store.iter_query(query, batch_size=batch_size):
+            g.add((row.s, row.p, row.o))  # type: ignore[arg-type]
+        total_count = len(g)
 
         named_individual_count = len(set(g.subjects(RDF.type, OWL.NamedIndividual)))
         return g.serialize(format=format), total_count, named_individual_count
@@ -0,0 +1,105 @@
+"""Short-lived cache of authorization decisions.
+
+A page load runs the same checks many times: every request resolves the
+caller's role in the workspace and checks the access token against the
+revocation list. Answers are cached here for ``authz_cache_ttl_seconds``
+(in at most ``authz_cache_max_entries`` entries each, least recently used
+evicted first):
+
+- ``workspace_role_cache``: ``(user_id, workspace_id) -> role | None``, filled
+  by ``WorkspaceService.get_workspace_role``. Every writer of workspace
+  membership or ownership invalidates it: the ``WorkspaceService`` methods
+  (used by the API routes and the Nexus admin agent tools), signup's personal
+  workspace in ``AuthService`` and the startup seeds in ``core.org_seed``.
+- ``revoked_token_cache``: ``jti -> bool``, filled by
+  ``is_access_token_revoked`` and ``revoke_access_token``. A "not revoked"
+  answer is only kept for ``authz_valid_token_ttl_seconds`` (a second by
+  default), so a burst of requests with the same token runs one
+  ``revoked_tokens`` query, and a revocation made by another process applies
+  there within that time.
+
+Invalidation is local to the API process; other workers pick up a membership
+change when their entry expires, so the TTL bounds how long a revoked
+membership can still be honoured there. A TTL of 0 disables caching.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+from naas_abi.apps.nexus.apps.api.app.core.config import settings
+
+MISSING: Any = object()
+
+
+class DecisionCache:
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_entries: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def get(self, key: Hashable) -> Any:
+        """The cached decision, or ``MISSING`` (decisions may be ``None``)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: float | None = None) -> None:
+        """Cache ``value`` for ``ttl_seconds`` (default: the cache's TTL)."""
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        if not self.enabled or ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        """Drop every entry whose key matches ``predicate``."""
+        with self._lock:
+            for key in [k for k in self._entries if predicate(k)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+workspace_role_cache = DecisionCache(
+    ttl_seconds=settings.authz_cache_ttl_seconds,
+    max_entries=settings.authz_cache_max_entries,
+)
+revoked_token_cache = DecisionCache(
+    ttl_seconds=settings.authz_cache_ttl_seconds,
+    max_entries=settings.authz_cache_max_entries,
+)
@@ -18,6 +18,7 @@ from naas_abi.apps.nexus.apps.api.app.services.auth.adapters.primary.auth__prima
     get_auth_service,
 )
 from naas_abi.apps.nexus.apps.api.app.services.auth.service import AuthService
+from naas_abi.apps.nexus.apps.api.app.services.iam.decision_cache import workspace_role_cache
 from naas_abi.apps.nexus.apps.api.app.services.invites.sign_in_email import (
     issue_and_send_invite_sign_in,
 )
@@ -63,7 +64,9 @@ def get_organization_service(db: AsyncSession = Depends(get_db)) -> Organization
 def get_workspace_service_for_org_invite(
     db: AsyncSession = Depends(get_db),
 ) -> WorkspaceService:
-    return WorkspaceService(adapter=WorkspaceSecondaryAdapterPostgres(db=db))
+    return WorkspaceService(
+        adapter=WorkspaceSecondaryAdapterPostgres(db=db), role_cache=workspace_role_cache
+    )
 
 
 def _get_email_service(request: Request) -> EmailService | None:
@@ -1,8 +1,36 @@
 """
 Rate Limiting Middleware
 Protects auth endpoints from brute force attacks.
+
+Every backend applies the same sliding-window rule: an attempt is allowed while
+fewer than ``rate_limit_login_attempts`` attempts were *allowed* for the same
+identifier and endpoint during the last ``rate_limit_window_seconds``; denied
+attempts are not counted. ``settings.rate_limit_backend`` selects where those
+attempts are kept:
+
+- ``kv`` (default): the engine's KeyValueService (Python or Redis adapter),
+  shared by every worker pointing at the same store. An allowed attempt
+  claims one of the ``limit`` slot keys with ``set_if_not_exists`` and a TTL
+  of one window, so the check is atomic without a lock.
+- ``postgres``: the ``rate_limit_events`` table (a ``COUNT(*)`` and an
+  ``INSERT`` per check); opt-in, for deployments that want every attempt in
+  the database.
+- ``memory``: a bounded per-key log in this process. No I/O on the request
+  path, but each API worker counts on its own, so it is only suitable for a
+  single worker.
+
+With ``rate_limit_audit_enabled``, the ``memory`` and ``kv`` backends still
+record allowed attempts in ``rate_limit_events``, in batches written by a
+background task instead of on the request path.
 """
 
+import asyncio
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Callable
 from datetime import datetime, timedelta
 from uuid import uuid4
 
@@ -11,6 +39,237 @@ from naas_abi.apps.nexus.apps.api.app.core.config import settings
 from naas_abi.apps.nexus.apps.api.app.core.database import async_engine
 from naas_abi.apps.nexus.apps.api.app.core.datetime_compat import UTC
 from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+Clock = Callable[[], float]
+
+# Allowed attempts are kept in rate_limit_events for a day (see
+# cleanup_old_rate_limit_events), far longer than any window.
+EVENT_RETENTION = timedelta(hours=24)
+
+
+def _to_db_time(timestamp: float) -> datetime:
+    """Naive UTC datetime, as stored in ``rate_limit_events.created_at``."""
+    return datetime.fromtimestamp(timestamp, UTC).replace(tzinfo=None)
+
+
+class RateLimiter(ABC):
+    """Sliding-window limiter: records and allows, or denies, one attempt."""
+
+    @abstractmethod
+    async def hit(self, identifier: str, endpoint: str, limit: int, window_seconds: int) -> bool:
+        """Return True (and count the attempt) when it is within the limit."""
+
+    @abstractmethod
+    async def cleanup(self) -> None:
+        """Drop state that can no longer affect a decision."""
+
+
+class MemoryRateLimiter(RateLimiter):
+    """Per-key log of the allowed attempts, at most ``limit`` long."""
+
+    def __init__(self, clock: Clock = time.time) -> None:
+        self._clock = clock
+        self._attempts: dict[tuple[str, str], deque[float]] = {}
+        self._lock = threading.Lock()
+        self._longest_window = 0
+        self._next_sweep = 0.0
+
+    async def hit(self, identifier: str, endpoint: str, limit: int, window_seconds: int) -> bool:
+        now = self._clock()
+        window_start = now - window_seconds
+        with self._lock:
+            self._longest_window = max(self._longest_window, window_seconds)
+            if now >= self._next_sweep:
+                self._sweep(now)
+            key = (identifier, endpoint)
+            attempts = self._attempts.get(key)
+            if attempts is None:
+                attempts = self._attempts[key] = deque()
+            while attempts and attempts[0] < window_start:
+                attempts.popleft()
+            if len(attempts) >= limit:
+                return False
+            attempts.append(now)
+            return True
+
+    def _sweep(self, now: float) -> None:
+        # Keys whose newest attempt left the longest window seen are empty for
+        # every later check; dropping them keeps memory proportional to the
+        # identifiers active in the last window.
+        cutoff = now - self._longest_window
+        for key in [k for k, attempts in self._attempts.items() if not attempts or attempts[-1] < cutoff]:
+            del self._attempts[key]
+        self._next_sweep = now + max(self._longest_window, 1)
+
+    async def cleanup(self) -> None:
+        with self._lock:
+            self._sweep(self._clock())
+
+
+class KeyValueRateLimiter(RateLimiter):
+    """``limit`` slot keys per identifier and endpoint in the KeyValueService.
+
+    A slot is held for one window by the attempt that claimed it, so the number
+    of held slots is the number of attempts allowed during the last window.
+    Expiry is handled by the store (TTLs are whole seconds).
+    """
+
+    def __init__(self, kv_getter: Callable[[], object], prefix: str = "nexus:rate_limit") -> None:
+        self._kv_getter = kv_getter
+        self._prefix = prefix
+
+    def _claim(self, identifier: str, endpoint: str, limit: int, window_seconds: int) -> bool:
+        kv = self._kv_getter()
+        marker = uuid4().hex.encode("utf-8")
+        for slot in range(limit):
+            key = f"{self._prefix}:{endpoint}:{identifier}:{slot}"
+            if kv.set_if_not_exists(key, marker, ttl=window_seconds):  # type: ignore[attr-defined]
+                return True
+        return False
+
+    async def hit(self, identifier: str, endpoint: str, limit: int, window_seconds: int) -> bool:
+        return await asyncio.to_thread(self._claim, identifier, endpoint, limit, window_seconds)
+
+    async def cleanup(self) -> None:
+        """Nothing to do: the store expires the slot keys."""
+
+
+class PostgresRateLimiter(RateLimiter):
+    """The ``rate_limit_events`` table: one row per allowed attempt."""
+
+    def __init__(self, engine: AsyncEngine | None = None, clock: Clock = time.time) -> None:
+        self._engine = engine
+        self._clock = clock
+
+    @property
+    def engine(self) -> AsyncEngine:
+        return self._engine or async_engine
+
+    async def hit(self, identifier: str, endpoint: str, limit: int, window_seconds: int) -> bool:
+        now = _to_db_time(self._clock())
+        window_start = now - timedelta(seconds=window_seconds)
+
+        async with self.engine.begin() as conn:
+            # Count recent attempts
+            result = await conn.execute(
+                text("""
+                    SELECT COUNT(*) as count
+                    FROM rate_limit_events
+                    WHERE identifier = :identifier
+                      AND endpoint = :endpoint
+                      AND created_at >= :window_start
+                """),
+                {"identifier": identifier, "endpoint": endpoint, "window_start": window_start},
+            )
+            if result.fetchone().count >= limit:
+                return False
+
+            # Record this attempt
+            await conn.execute(
+                text("""
+                    INSERT INTO rate_limit_events (id, identifier, endpoint, created_at)
+                    VALUES (:id, :identifier, :endpoint, :created_at)
+                """),
+                {"id": f"rl-{uuid4().hex[:12]}", "identifier": identifier, "endpoint": endpoint, "created_at": now},
+            )
+        return True
+
+    async def cleanup(self) -> None:
+        cutoff = _to_db_time(self._clock()) - EVENT_RETENTION
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                text("DELETE FROM rate_limit_events WHERE created_at < :cutoff"),
+                {"cutoff": cutoff},
+            )
+
+
+class RateLimitAuditLog:
+    """Buffers allowed attempts and writes them to ``rate_limit_events`` in batches.
+
+    The writer task starts with the first recorded attempt and flushes every
+    ``flush_seconds``. A failed flush is logged and its rows are dropped: the
+    audit trail must never slow down or fail a request.
+    """
+
+    def __init__(self, engine: AsyncEngine | None = None, flush_seconds: float = 5.0, clock: Clock = time.time) -> None:
+        self._engine = engine
+        self._flush_seconds = flush_seconds
+        self._clock = clock
+        self._pending: list[dict] = []
+        self._task: asyncio.Task | None = None
+
+    def record(self, identifier: str, endpoint: str) -> None:
+        self._pending.append(
+            {
+                "id": f"rl-{uuid4().hex[:12]}",
+                "identifier": identifier,
+                "endpoint": endpoint,
+                "created_at": _to_db_time(self._clock()),
+            }
+        )
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while self._pending:
+            await asyncio.sleep(self._flush_seconds)
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Write the buffered attempts now; returns how many were written."""
+        rows, self._pending = self._pending, []
+        if not rows:
+            return 0
+        try:
+            async with (self._engine or async_engine).begin() as conn:
+                await conn.execute(
+                    text("""
+                        INSERT INTO rate_limit_events (id, identifier, endpoint, created_at)
+                        VALUES (:id, :identifier, :endpoint, :created_at)
+                    """),
+                    rows,
+                )
+        except Exception as e:
+            logger.warning(f"Rate limit audit flush failed, dropped {len(rows)} event(s): {e}")
+            return 0
+        return len(rows)
+
+
+def _engine_kv():
+    from naas_abi import ABIModule
+
+    return ABIModule.get_instance().engine.services.kv
+
+
+_limiter: RateLimiter | None = None
+_audit_log: RateLimitAuditLog | None = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """The limiter selected by ``settings.rate_limit_backend`` (built once)."""
+    global _limiter
+    if _limiter is None:
+        backend = settings.rate_limit_backend
+        if backend == "postgres":
+            _limiter = PostgresRateLimiter()
+        elif backend == "kv":
+            _limiter = KeyValueRateLimiter(_engine_kv)
+        else:
+            _limiter = MemoryRateLimiter()
+    return _limiter
+
+
+def get_rate_limit_audit_log() -> RateLimitAuditLog | None:
+    """The audit writer, or None when auditing is off or Postgres already is the store."""
+    global _audit_log
+    if not settings.rate_limit_audit_enabled or settings.rate_limit_backend == "postgres":
+        return None
+    if _audit_log is None:
+        _audit_log = RateLimitAuditLog(flush_seconds=settings.rate_limit_audit_flush_seconds)
+    return _audit_log
 
 
 async def check_rate_limit(identifier: str, endpoint: str) -> None:
@@ -27,52 +286,38 @@ async def check_rate_limit(identifier: str, endpoint: str) -> None:
     if not settings.rate_limit_enabled:
         return
 
-    # Calculate the window start time
-    window_start = datetime.now(UTC).replace(tzinfo=None) - timedelta(seconds=settings.rate_limit_window_seconds)
-    # removed isoformat
-
-    async with async_engine.begin() as conn:
-        # Count recent attempts
-        result = await conn.execute(
-            text("""
-                SELECT COUNT(*) as count
-                FROM rate_limit_events
-                WHERE identifier = :identifier
-                  AND endpoint = :endpoint
-                  AND created_at >= :window_start
-            """),
-            {"identifier": identifier, "endpoint": endpoint, "window_start": window_start},
+    allowed = await get_rate_limiter().hit(
+        identifier,
+        endpoint,
+        settings.rate_limit_login_attempts,
+        settings.rate_limit_window_seconds,
+    )
+    if not allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Too many attempts. Please try again in {settings.rate_limit_window_seconds // 60} minutes.",
+            headers={"Retry-After": str(settings.rate_limit_window_seconds)},
         )
-        count = result.fetchone().count
 
-        if count >= settings.rate_limit_login_attempts:
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail=f"Too many attempts. Please try again in {settings.rate_limit_window_seconds // 60} minutes.",
-                headers={"Retry-After": str(settings.rate_limit_window_seconds)},
-            )
+    audit_log = get_rate_limit_audit_log()
+    if audit_log is not None:
+        audit_log.record(identifier, endpoint)
+
+
+async def flush_rate_limit_audit() -> None:
+    """Write buffered audit events (application shutdown)."""
+    if _audit_log is not None:
+        await _audit_log.flush()
 
-        # Record this attempt
-        event_id = f"rl-{uuid4().hex[:12]}"
-        now = datetime.now(UTC).replace(tzinfo=None)
-        await conn.execute(
-            text("""
-                INSERT INTO rate_limit_events (id, identifier, endpoint, created_at)
-                VALUES (:id, :identifier, :endpoint, :created_at)
-            """),
-            {"id": event_id, "identifier": identifier, "endpoint": endpoint, "created_at": now},
-        )
 
 async def cleanup_old_rate_limit_events() -> None:
     """Clean up rate limit events older than 24 hours (background task)."""
-    cutoff = datetime.now(UTC).replace(tzinfo=None) - timedelta(hours=24)
-    # cutoff_str removed
+    limiter = get_rate_limiter()
+    await limiter.cleanup()
+    if not isinstance(limiter, PostgresRateLimiter):
+        # Rows from the audit trail or from an earlier postgres backend.
+        await PostgresRateLimiter().cleanup()
 
-    async with async_engine.begin() as conn:
-        await conn.execute(
-            text("DELETE FROM rate_limit_events WHERE created_at < :cutoff"),
-            {"cutoff": cutoff},
-        )
 
 def get_rate_limit_identifier(request: Request, user_id: str | None = None) -> str:
     """Get the identifier for rate limiting (user_id if authenticated, otherwise IP)."""
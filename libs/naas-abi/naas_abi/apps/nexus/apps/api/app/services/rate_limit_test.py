@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import pytest
+from fastapi import HTTPException
+from naas_abi.apps.nexus.apps.api.app.core.config import settings
+from naas_abi.apps.nexus.apps.api.app.services import rate_limit
+from naas_abi.apps.nexus.apps.api.app.services.rate_limit import (
+    KeyValueRateLimiter,
+    MemoryRateLimiter,
+    PostgresRateLimiter,
+    RateLimitAuditLog,
+)
+from naas_abi_core.services.keyvalue.adapters.secondary.PythonAdapter import PythonAdapter
+from naas_abi_core.services.keyvalue.KeyValueService import KeyValueService
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+LIMIT = 3
+WINDOW = 10
+START = 1_750_000_000.0
+
+# (seconds after START, identifier, endpoint). Offsets avoid landing exactly on
+# a window edge, where the KV store's whole-second TTLs round.
+SCRIPT = [
+    (0.1, "ip:1", "/login"),
+    (0.2, "ip:1", "/login"),
+    (0.3, "ip:2", "/login"),
+    (1.1, "ip:1", "/login"),
+    (2.1, "ip:1", "/login"),  # fourth in the window: denied
+    (2.2, "ip:1", "/register"),  # other endpoint: own window
+    (5.5, "ip:1", "/login"),  # still denied; denials are not counted
+    (10.15, "ip:1", "/login"),  # 0.1 left the window
+    (10.16, "ip:1", "/login"),  # 0.2, 1.1 and 10.15 fill it again
+    (10.25, "ip:1", "/login"),  # 0.2 left the window
+    (11.5, "ip:1", "/login"),  # 1.1 left, 10.15 and 10.25 remain
+    (25.0, "ip:1", "/login"),
+    (25.1, "ip:2", "/login"),
+]
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = START
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def _sqlite_engine():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.execute(
+            text(
+                "CREATE TABLE rate_limit_events "
+                "(id TEXT PRIMARY KEY, identifier TEXT, endpoint TEXT, created_at TIMESTAMP)"
+            )
+        )
+    return engine
+
+
+@pytest.mark.asyncio
+async def test_backends_make_the_same_decisions_as_the_postgres_table(monkeypatch) -> None:
+    clock = _Clock()
+    monkeypatch.setattr(PythonAdapter, "_now", staticmethod(clock))
+    monkeypatch.setattr(
+        PythonAdapter,
+        "_compute_expiration",
+        staticmethod(lambda ttl: None if ttl is None else clock() + ttl),
+    )
+    engine = await _sqlite_engine()
+    kv = KeyValueService(PythonAdapter())
+    limiters = {
+        "postgres": PostgresRateLimiter(engine=engine, clock=clock),
+        "memory": MemoryRateLimiter(clock=clock),
+        "kv": KeyValueRateLimiter(lambda: kv),
+    }
+
+    decisions: dict[str, list[bool]] = {name: [] for name in limiters}
+    for offset, identifier, endpoint in SCRIPT:
+        clock.now = START + offset
+        for name, limiter in limiters.items():
+            decisions[name].append(await limiter.hit(identifier, endpoint, LIMIT, WINDOW))
+    await engine.dispose()
+
+    assert decisions["postgres"] == [
+        True, True, True, True, False, True, False, True, False, True, True, True, True,
+    ]  # fmt: skip
+    assert decisions["memory"] == decisions["postgres"]
+    assert decisions["kv"] == decisions["postgres"]
+
+
+@pytest.mark.asyncio
+async def test_memory_limiter_forgets_idle_identifiers() -> None:
+    clock = _Clock()
+    limiter = MemoryRateLimiter(clock=clock)
+    for i in range(100):
+        await limiter.hit(f"ip:{i}", "/login", LIMIT, WINDOW)
+    clock.now += WINDOW + 1
+    await limiter.hit("ip:new", "/login", LIMIT, WINDOW)
+    assert list(limiter._attempts) == [("ip:new", "/login")]
+
+
+@pytest.mark.asyncio
+async def test_check_rate_limit_denies_and_audits_in_batches(monkeypatch) -> None:
+    engine = await _sqlite_engine()
+    audit_log = RateLimitAuditLog(engine=engine, flush_seconds=3600)
+    monkeypatch.setattr(settings, "rate_limit_enabled", True)
+    monkeypatch.setattr(settings, "rate_limit_login_attempts", 2)
+    monkeypatch.setattr(settings, "rate_limit_backend", "memory")
+    monkeypatch.setattr(settings, "rate_limit_audit_enabled", True)
+    monkeypatch.setattr(rate_limit, "_limiter", MemoryRateLimiter())
+    monkeypatch.setattr(rate_limit, "_audit_log", audit_log)
+
+    await rate_limit.check_rate_limit("ip:1", "/login")
+    await rate_limit.check_rate_limit("ip:1", "/login")
+    with pytest.raises(HTTPException) as exc_info:
+        await rate_limit.check_rate_limit("ip:1", "/login")
+    assert exc_info.value.status_code == 429
+
+    async with engine.connect() as conn:
+        rows = (await conn.execute(text("SELECT COUNT(*) FROM rate_limit_events"))).scalar()
+    assert rows == 0  # nothing written on the request path
+
+    await rate_limit.flush_rate_limit_audit()
+    async with engine.connect() as conn:
+        rows = (await conn.execute(text("SELECT COUNT(*) FROM rate_limit_events"))).scalar()
+    assert rows == 2
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_cleanup_purges_old_events_when_the_audit_is_off(monkeypatch) -> None:
+    engine = await _sqlite_engine()
+    monkeypatch.setattr(settings, "rate_limit_backend", "memory")
+    monkeypatch.setattr(settings, "rate_limit_audit_enabled", False)
+    monkeypatch.setattr(rate_limit, "_limiter", MemoryRateLimiter())
+    monkeypatch.setattr(rate_limit, "async_engine", engine)
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("INSERT INTO rate_limit_events VALUES ('rl-old', 'ip:1', '/login', :created_at)"),
+            {"created_at": rate_limit._to_db_time(START)},
+        )
+
+    await rate_limit.cleanup_old_rate_limit_events()
+
+    async with engine.connect() as conn:
+        rows = (await conn.execute(text("SELECT COUNT(*) FROM rate_limit_events"))).scalar()
+    assert rows == 0
+    await engine.dispose()
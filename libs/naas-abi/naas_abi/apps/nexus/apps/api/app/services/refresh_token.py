@@ -14,6 +14,10 @@ from fastapi import HTTPException, status
 from naas_abi.apps.nexus.apps.api.app.core.config import settings
 from naas_abi.apps.nexus.apps.api.app.core.database import async_engine
 from naas_abi.apps.nexus.apps.api.app.core.datetime_compat import UTC
+from naas_abi.apps.nexus.apps.api.app.services.iam.decision_cache import (
+    MISSING,
+    revoked_token_cache,
+)
 from sqlalchemy import text
 
 
@@ -210,17 +214,31 @@ async def revoke_access_token(jti: str, user_id: str, expires_at: datetime, reas
                 "expires_at": expires_at,
             },
         )
+    revoked_token_cache.set(jti, True)
 
 
 async def is_access_token_revoked(jti: str) -> bool:
-    """Check if an access token has been revoked."""
+    """Check if an access token has been revoked.
+
+    Answers are cached (see ``iam.decision_cache``); a "not revoked" one only
+    for ``authz_valid_token_ttl_seconds``, which bounds how long a revocation
+    made by another process takes to apply here.
+    """
+    cached = revoked_token_cache.get(jti)
+    if cached is not MISSING:
+        return cached
     from naas_abi.apps.nexus.apps.api.app.core.database import async_engine
     async with async_engine.begin() as conn:
         result = await conn.execute(
             text("SELECT 1 FROM revoked_tokens WHERE jti = :jti"),
             {"jti": jti},
         )
-        return result.fetchone() is not None
+        revoked = result.fetchone() is not None
+    if revoked:
+        revoked_token_cache.set(jti, True)
+    else:
+        revoked_token_cache.set(jti, False, ttl_seconds=settings.authz_valid_token_ttl_seconds)
+    return revoked
 
 
 async def cleanup_expired_tokens() -> None:
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from naas_abi.apps.nexus.apps.api.app.core.config import settings
 from naas_abi.apps.nexus.apps.api.app.core.postgres_session_registry import (
     PostgresSessionRegistry,
 )
@@ -22,6 +23,7 @@ from naas_abi.apps.nexus.apps.api.app.services.graph.service import GraphService
 from naas_abi.apps.nexus.apps.api.app.services.iam.adapters.secondary.postgres import (
     IAMSecondaryAdapterPostgres,
 )
+from naas_abi.apps.nexus.apps.api.app.services.iam.decision_cache import workspace_role_cache
 from naas_abi.apps.nexus.apps.api.app.services.iam.service import IAMService
 from naas_abi.apps.nexus.apps.api.app.services.ontology.service import OntologyService
 from naas_abi.apps.nexus.apps.api.app.services.organizations.adapters.secondary.postgres import (
@@ -32,6 +34,7 @@ from naas_abi.apps.nexus.apps.api.app.services.registry import (
     RegistryServices,
     ServiceRegistry,
 )
+from naas_abi.apps.nexus.apps.api.app.services.search.label_index import OntologyLabelIndex
 from naas_abi.apps.nexus.apps.api.app.services.search.service import SearchService
 from naas_abi.apps.nexus.apps.api.app.services.skills.adapters.secondary.postgres import (
     SkillSecondaryAdapterPostgres,
@@ -53,7 +56,9 @@ def initialize_nexus_service_registry() -> ServiceRegistry:
         return PostgresSessionRegistry.instance().current_session()
 
     iam_service = IAMService(IAMSecondaryAdapterPostgres(db_getter=db_getter))
-    workspace_service = WorkspaceService(WorkspaceSecondaryAdapterPostgres(db_getter=db_getter))
+    workspace_service = WorkspaceService(
+        WorkspaceSecondaryAdapterPostgres(db_getter=db_getter), role_cache=workspace_role_cache
+    )
     organization_service = OrganizationService(
         OrganizationSecondaryAdapterPostgres(db_getter=db_getter)
     )
@@ -67,7 +72,13 @@ def initialize_nexus_service_registry() -> ServiceRegistry:
         auth_adapter=AuthSecondaryAdapterPostgres(db_getter=db_getter),
         skills_service=skills_service,
     )
-    search_service = SearchService()
+    search_service = SearchService(
+        label_index=(
+            OntologyLabelIndex(rebuild_interval=settings.ontology_search_index_rebuild_seconds)
+            if settings.ontology_search_index_enabled
+            else None
+        )
+    )
     agents_service = AgentService(
         AgentSecondaryAdapterPostgres(db_getter=db_getter),
         iam_service=iam_service,
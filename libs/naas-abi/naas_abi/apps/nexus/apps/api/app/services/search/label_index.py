@@ -0,0 +1,318 @@
+"""Full-text index of ontology labels for ontology search.
+
+``SearchService._search_ontology`` used to scan every subject with a
+``CONTAINS(LCASE(...))`` filter, which grows with the graph and cannot rank.
+``OntologyLabelIndex`` keeps the ``rdfs:label``, ``skos:altLabel`` and
+``skos:definition`` literals of every named graph in an in-memory SQLite
+FTS5 table and answers token-prefix queries ranked by BM25 (labels weigh
+more than alternative labels, which weigh more than definitions).
+
+The index starts cold. The first search subscribes to the triple store's
+graph changes and builds it from one SPARQL scan on a background thread.
+Until then ``search`` returns None and the caller falls back to SPARQL.
+
+The subscription does not ask for the changed triples, so writes (bulk
+imports included) are never serialised for the index. A change only marks
+its graph dirty; a later search re-scans the dirty graphs in the background,
+at most every ``refresh_interval`` seconds. Cleared and dropped graphs are
+removed at once.
+
+Graph changes made by other processes only reach this one over a shared bus,
+and only from writers that turn ``publish_graph_changes`` on. The index is
+therefore rebuilt in the background every ``rebuild_interval`` seconds (while
+the previous one keeps serving), which bounds how stale it can get. Like the
+SPARQL query it replaces, the build only indexes subjects that have an
+``rdf:type``. Default-graph triples are indexed too, unless the default graph
+is just the union of the named graphs.
+
+A failed build is retried after ``retry_interval`` seconds, not on the next
+search. Stores without named graphs (the filesystem and object storage
+adaptors) cannot run the build query; the index disables itself for them and
+every search goes to SPARQL.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from rdflib import URIRef
+from rdflib.namespace import RDFS, SKOS
+
+logger = logging.getLogger(__name__)
+
+FIELDS = {
+    str(RDFS.label): "label",
+    str(SKOS.altLabel): "alt_label",
+    str(SKOS.definition): "definition",
+}
+FIELD_WEIGHTS = {"label": 4.0, "alt_label": 2.0, "definition": 1.0}
+
+SCHEMA = """
+CREATE TABLE terms (
+    id INTEGER PRIMARY KEY,
+    graph TEXT NOT NULL,
+    uri TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value TEXT NOT NULL,
+    UNIQUE (graph, uri, field, value)
+);
+CREATE INDEX terms_uri ON terms (uri);
+CREATE VIRTUAL TABLE labels USING fts5(
+    value,
+    content = 'terms',
+    content_rowid = 'id',
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+CREATE TRIGGER terms_ai AFTER INSERT ON terms BEGIN
+    INSERT INTO labels (rowid, value) VALUES (new.id, new.value);
+END;
+CREATE TRIGGER terms_ad AFTER DELETE ON terms BEGIN
+    INSERT INTO labels (labels, rowid, value) VALUES ('delete', old.id, old.value);
+END;
+"""
+
+# ?g is unbound for default-graph rows. Those are skipped when the same triple
+# is in a named graph, so stores whose default graph is the union of the named
+# graphs do not index every label twice.
+BUILD_QUERY = """
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
+SELECT ?g ?uri ?p ?value WHERE {
+    VALUES ?p { rdfs:label skos:altLabel skos:definition }
+    {
+        GRAPH ?g { ?uri ?p ?value . }
+        FILTER EXISTS { GRAPH ?types { ?uri a ?type . } }
+    } UNION {
+        ?uri ?p ?value .
+        FILTER NOT EXISTS { GRAPH ?named { ?uri ?p ?value . } }
+        FILTER EXISTS { ?uri a ?type . }
+    }
+    FILTER (isLiteral(?value))
+}
+"""
+
+# Re-scans the named graphs in {graphs}.
+REFRESH_QUERY = """
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
+SELECT ?g ?uri ?p ?value WHERE {{
+    VALUES ?p {{ rdfs:label skos:altLabel skos:definition }}
+    VALUES ?g {{ {graphs} }}
+    GRAPH ?g {{ ?uri ?p ?value . }}
+    FILTER EXISTS {{ GRAPH ?types {{ ?uri a ?type . }} }}
+    FILTER (isLiteral(?value))
+}}
+"""
+
+# bm25() is not allowed inside an aggregate, so rank the matching rows first
+# and keep the best (lowest) weighted score per subject.
+SEARCH_SQL = """
+WITH hits AS MATERIALIZED (
+    SELECT rowid AS id, bm25(labels) AS score FROM labels WHERE labels MATCH ?
+)
+SELECT t.uri, MIN(h.score * CASE t.field
+    WHEN 'label' THEN {label} WHEN 'alt_label' THEN {alt_label} ELSE {definition} END) AS rank
+FROM hits h JOIN terms t ON t.id = h.id
+GROUP BY t.uri
+ORDER BY rank
+LIMIT ?
+""".format(**FIELD_WEIGHTS)
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+class OntologyLabelIndex:
+    """In-memory FTS5 index of ontology labels; thread safe."""
+
+    def __init__(
+        self,
+        build_batch_size: int = 5000,
+        rebuild_interval: float = 600.0,
+        refresh_interval: float = 5.0,
+        retry_interval: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._build_batch_size = build_batch_size
+        self._rebuild_interval = rebuild_interval
+        self._refresh_interval = refresh_interval
+        self._retry_interval = retry_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._state = "cold"  # cold -> building -> ready, or disabled
+        self._rebuilding = False
+        self._next_rebuild = 0.0
+        self._next_refresh = 0.0
+        self._subscribed = False
+        self._dirty: set[str] = set()
+
+    @property
+    def ready(self) -> bool:
+        return self._state == "ready"
+
+    def ensure_started(self, triple_store: Any) -> None:
+        """Subscribe to graph changes and start building, once; start a
+        background rebuild when ``rebuild_interval`` has elapsed, re-scan the
+        dirty graphs once ``refresh_interval`` has, or retry a failed build
+        once ``retry_interval`` has."""
+        with self._lock:
+            if self._state in ("building", "disabled") or self._rebuilding:
+                return
+            now = self._clock()
+            graphs: set[str] | None = None  # None: every graph
+            if self._state == "ready":
+                if self._rebuild_interval <= 0 or now < self._next_rebuild:
+                    if not self._dirty or now < self._next_refresh:
+                        return
+                    graphs = self._dirty
+                self._rebuilding = True
+            else:
+                if now < self._next_rebuild:
+                    return
+                self._state = "building"
+            # Changes from here on are not guaranteed to be in the scan.
+            dirty, self._dirty = self._dirty, set()
+            if not self._subscribed:
+                triple_store.subscribe_graph_changes(
+                    self._on_graph_change, with_triples=False
+                )
+                self._subscribed = True
+        threading.Thread(
+            target=self._build,
+            args=(triple_store, graphs, dirty),
+            name="nexus-ontology-label-index",
+            daemon=True,
+        ).start()
+
+    def _build(self, triple_store: Any, graphs: set[str] | None, dirty: set[str]) -> None:
+        rows: list[tuple[str, str, str, str]] = []
+        try:
+            if graphs is None and not _has_named_graphs(triple_store):
+                logger.info("Ontology label index disabled: the triple store has no named graphs")
+                with self._lock:
+                    self._state = "disabled"
+                    self._rebuilding = False
+                return
+            if graphs is None:
+                query = BUILD_QUERY
+            else:
+                query = REFRESH_QUERY.format(
+                    graphs=" ".join(URIRef(graph).n3() for graph in sorted(graphs))
+                )
+            for row in triple_store.iter_query(query, self._build_batch_size):
+                field = FIELDS.get(str(row[2]))
+                if field is not None:
+                    graph = "" if row[0] is None else str(row[0])
+                    rows.append((graph, str(row[1]), field, str(row[3])))
+        except Exception:
+            logger.warning("Ontology label index build failed", exc_info=True)
+            with self._lock:
+                self._dirty |= dirty
+                if graphs is not None:
+                    self._next_refresh = self._clock() + self._retry_interval
+                elif self._state == "building":
+                    self._state = "cold"
+                    self._next_rebuild = self._clock() + self._retry_interval
+                else:
+                    self._next_rebuild = self._clock() + self._rebuild_interval
+                self._rebuilding = False
+            return
+
+        with self._lock, self._conn:
+            if graphs is None:
+                self._conn.execute("DELETE FROM terms")
+            else:
+                self._conn.executemany(
+                    "DELETE FROM terms WHERE graph = ?", [(graph,) for graph in graphs]
+                )
+            self._insert(rows)
+            self._state = "ready"
+            self._rebuilding = False
+            if graphs is None:
+                self._next_rebuild = self._clock() + self._rebuild_interval
+            self._next_refresh = self._clock() + self._refresh_interval
+        if graphs is None:
+            logger.info(f"Ontology label index ready ({len(rows)} labels)")
+
+    def _on_graph_change(self, payload: bytes) -> None:
+        try:
+            change = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed graph change payload")
+            return
+        graph_name = str(change.get("graph_name", ""))
+        with self._lock:
+            if self._state == "disabled":
+                raise StopIteration  # unsubscribes
+            # Re-scanned later even when removed now: a scan in flight may
+            # predate the change.
+            if graph_name:
+                self._dirty.add(graph_name)
+            if self._state == "ready" and change.get("operation") in ("clear", "drop"):
+                with self._conn:
+                    self._conn.execute("DELETE FROM terms WHERE graph = ?", (graph_name,))
+
+    def _insert(self, rows: list[tuple[str, str, str, str]]) -> None:
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO terms (graph, uri, field, value) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+
+    def search(self, query: str, limit: int = 100) -> list[dict[str, Any]] | None:
+        """Best matches for ``query`` as ``{uri, label, definition, score}``
+        dicts, best first (``score`` is 1.0 for the best match), or None when
+        the index is not ready or the query has no searchable token.
+
+        Every token must match the start of a word; when nothing does, any
+        token may.
+        """
+        tokens = _TOKEN.findall((query or "").lower())
+        if not tokens or not self.ready:
+            return None
+        terms = [f'"{token}"*' for token in tokens]
+        with self._lock:
+            ranked = self._conn.execute(SEARCH_SQL, (" ".join(terms), limit)).fetchall()
+            if not ranked and len(terms) > 1:
+                ranked = self._conn.execute(SEARCH_SQL, (" OR ".join(terms), limit)).fetchall()
+            if not ranked:
+                return []
+            uris = [uri for uri, _ in ranked]
+            placeholders = ",".join("?" * len(uris))
+            values: dict[str, dict[str, str]] = {}
+            for uri, field, value in self._conn.execute(
+                f"SELECT uri, field, value FROM terms WHERE uri IN ({placeholders}) ORDER BY id",
+                uris,
+            ):
+                values.setdefault(uri, {}).setdefault(field, value)
+
+        best = ranked[0][1]
+        results: list[dict[str, Any]] = []
+        for uri, rank in ranked:
+            fields = values.get(uri, {})
+            results.append(
+                {
+                    "uri": uri,
+                    "label": fields.get("label") or fields.get("alt_label") or uri.split("/")[-1],
+                    "definition": fields.get("definition", ""),
+                    "score": rank / best if best else 1.0,
+                }
+            )
+        return results
+
+
+def _has_named_graphs(triple_store: Any) -> bool:
+    """Whether ``triple_store`` keeps named graphs. The service always writes
+    its schema graph, so an empty list means the adaptor has none."""
+    try:
+        return bool(triple_store.list_graphs())
+    except NotImplementedError:
+        return False
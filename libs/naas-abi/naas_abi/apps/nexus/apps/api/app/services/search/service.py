@@ -6,6 +6,7 @@ from collections.abc import Callable
 from typing import Any
 
 import httpx
+from naas_abi.apps.nexus.apps.api.app.services.search.label_index import OntologyLabelIndex
 from naas_abi.apps.nexus.apps.api.app.services.search.search__schema import (
     PrivateSearchRequestData,
     PrivateSearchResponseData,
@@ -27,8 +28,10 @@ class SearchService:
     def __init__(
         self,
         triple_store_getter: Callable[[], Any] | None = None,
+        label_index: OntologyLabelIndex | None = None,
     ) -> None:
         self._triple_store_getter = triple_store_getter
+        self._label_index = label_index
 
     async def search(self, request: SearchRequestData) -> SearchResponseData:
         return SearchResponseData(
@@ -258,6 +261,26 @@ class SearchService:
         if triple_store_service is None:
             return []
 
+        if self._label_index is not None:
+            try:
+                self._label_index.ensure_started(triple_store_service)
+                matches = self._label_index.search(query)
+            except Exception:
+                logger.warning("Ontology label index search failed", exc_info=True)
+                matches = None
+            if matches is not None:
+                return [
+                    WebSearchResultData(
+                        id=match["uri"],
+                        title=match["label"],
+                        snippet=match["definition"],
+                        url=None,
+                        relevance=match["score"],
+                        metadata={},
+                    )
+                    for match in matches
+                ]
+
         escaped_query = self._escape_sparql_literal(query)
         sparql_query = f"""
         PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import json
+import threading
+import time
 from types import SimpleNamespace
 from unittest.mock import AsyncMock
 
 import pytest
+from naas_abi.apps.nexus.apps.api.app.services.search.label_index import OntologyLabelIndex
 from naas_abi.apps.nexus.apps.api.app.services.search.search__schema import (
     PrivateSearchRequestData,
     WebSearchRequestData,
@@ -94,3 +98,174 @@ def test_build_duckduckgo_results_respects_limit() -> None:
     results = SearchService._build_duckduckgo_results(data=data, query="q", limit=2)
 
     assert len(results) == 2
+
+
+class _LabelTripleStore:
+    """Serves the label index build and records the graph-change callback."""
+
+    RDFS_LABEL = "http://www.w3.org/2000/01/rdf-schema#label"
+    SKOS_DEFINITION = "http://www.w3.org/2004/02/skos/core#definition"
+
+    def __init__(self, rows: list[tuple[str, str, str, str]]) -> None:
+        self.rows = rows
+        self.graphs = ["urn:g"]
+        self.release_build = threading.Event()
+        self.on_change = None
+        self.with_triples = None
+        self.sparql_queries = 0
+        self.builds = 0
+        self.fail_builds = False
+
+    def subscribe_graph_changes(self, callback, graph_name="*", with_triples=True) -> None:
+        self.on_change = callback
+        self.with_triples = with_triples
+
+    def list_graphs(self) -> list[str]:
+        return self.graphs
+
+    def iter_query(self, _query, _batch_size):
+        self.builds += 1
+        self.release_build.wait(5)
+        if self.fail_builds:
+            raise RuntimeError("store unavailable")
+        return iter(self.rows)
+
+    def query(self, _query):
+        self.sparql_queries += 1
+        return []
+
+    def change(self, operation: str) -> None:
+        payload = {"operation": operation, "graph_name": "urn:g", "ntriples": ""}
+        self.on_change(json.dumps(payload).encode("utf-8"))
+
+
+@pytest.mark.asyncio
+async def test_private_search_ontology_uses_label_index_once_built() -> None:
+    store = _LabelTripleStore(
+        [
+            ("urn:g", "urn:person", _LabelTripleStore.RDFS_LABEL, "Person"),
+            ("urn:g", "urn:person", _LabelTripleStore.SKOS_DEFINITION, "A human being"),
+            ("urn:g", "urn:data", _LabelTripleStore.RDFS_LABEL, "Personal Data"),
+            ("urn:g", "urn:owner", _LabelTripleStore.SKOS_DEFINITION, "The person who owns it"),
+        ]
+    )
+    index = OntologyLabelIndex(refresh_interval=0)
+    service = SearchService(triple_store_getter=lambda: store, label_index=index)
+    request = PrivateSearchRequestData(query="pers", source="ontology")
+
+    await service.private_search(request)  # cold: SPARQL, starts the build
+    assert store.sparql_queries == 1
+    assert store.with_triples is False
+    store.change("insert")  # lands during the build: re-scanned afterwards
+    store.release_build.set()
+    _wait_until(lambda: index.ready)
+    store.rows = store.rows + [("urn:g", "urn:org", _LabelTripleStore.RDFS_LABEL, "Persona")]
+
+    async def search_ids() -> list[str]:
+        return [result.id for result in (await service.private_search(request)).results]
+
+    await search_ids()  # starts the re-scan of urn:g
+    _wait_until(lambda: not index._rebuilding)
+    response = await service.private_search(request)
+    assert store.sparql_queries == 1
+    assert store.builds == 2
+    ids = [result.id for result in response.results]
+    assert set(ids) == {"urn:person", "urn:data", "urn:owner", "urn:org"}
+    assert ids[-1] == "urn:owner"  # definition matches rank below labels
+    assert response.results[0].relevance == 1.0
+
+    store.rows = [row for row in store.rows if row[1] != "urn:data"]
+    store.change("delete")
+    await search_ids()
+    _wait_until(lambda: not index._rebuilding)
+    assert "urn:data" not in await search_ids()
+    assert store.builds == 3
+
+    store.rows = []
+    store.change("clear")
+    assert await search_ids() == []
+
+
+def test_label_index_only_rescans_when_a_graph_changed() -> None:
+    store = _LabelTripleStore([("urn:g", "urn:person", _LabelTripleStore.RDFS_LABEL, "Person")])
+    store.release_build.set()
+    now = [0.0]
+    index = OntologyLabelIndex(refresh_interval=10, clock=lambda: now[0])
+    index.ensure_started(store)
+    _wait_until(lambda: index.ready)
+    index.ensure_started(store)
+    assert store.builds == 1
+
+    store.change("insert")
+    store.change("insert")
+    index.ensure_started(store)
+    assert store.builds == 1  # within refresh_interval of the build
+
+    now[0] = 10.0
+    index.ensure_started(store)
+    _wait_until(lambda: not index._rebuilding)
+    index.ensure_started(store)
+    assert store.builds == 2
+
+
+def _wait_until(condition) -> None:
+    deadline = time.monotonic() + 5
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_label_index_rebuilds_after_the_interval() -> None:
+    store = _LabelTripleStore([("urn:g", "urn:person", _LabelTripleStore.RDFS_LABEL, "Person")])
+    store.release_build.set()
+    now = [0.0]
+    index = OntologyLabelIndex(rebuild_interval=60, clock=lambda: now[0])
+    index.ensure_started(store)
+    _wait_until(lambda: index.ready)
+
+    # Written by another process: no graph change reaches this one.
+    store.rows = store.rows + [("urn:g", "urn:org", _LabelTripleStore.RDFS_LABEL, "Persona")]
+    now[0] = 59.0
+    index.ensure_started(store)
+    assert [r["uri"] for r in index.search("pers") or []] == ["urn:person"]
+
+    now[0] = 60.0
+    index.ensure_started(store)
+    _wait_until(lambda: len(index.search("pers") or []) == 2)
+    assert {r["uri"] for r in index.search("pers") or []} == {"urn:person", "urn:org"}
+
+
+def test_label_index_retries_a_failed_build_after_the_retry_interval() -> None:
+    store = _LabelTripleStore([("urn:g", "urn:person", _LabelTripleStore.RDFS_LABEL, "Person")])
+    store.release_build.set()
+    store.fail_builds = True
+    now = [0.0]
+    index = OntologyLabelIndex(retry_interval=30, clock=lambda: now[0])
+    index.ensure_started(store)
+    _wait_until(lambda: index._state == "cold")
+    assert store.builds == 1
+
+    now[0] = 29.0
+    index.ensure_started(store)
+    assert store.builds == 1 and not index.ready
+
+    store.fail_builds = False
+    now[0] = 30.0
+    index.ensure_started(store)
+    _wait_until(lambda: index.ready)
+    assert store.builds == 2
+    assert [r["uri"] for r in index.search("pers") or []] == ["urn:person"]
+
+
+def test_label_index_disables_itself_without_named_graphs() -> None:
+    store = _LabelTripleStore([])
+    store.graphs = []
+    store.release_build.set()
+    index = OntologyLabelIndex()
+    index.ensure_started(store)
+    _wait_until(lambda: index._state == "disabled")
+    index.ensure_started(store)
+
+    assert store.builds == 0
+    assert index.search("pers") is None
+    with pytest.raises(StopIteration):
+        store.change("insert")
@@ -21,6 +21,7 @@ from naas_abi.apps.nexus.apps.api.app.services.auth.adapters.primary.auth__prima
     get_auth_service,
 )
 from naas_abi.apps.nexus.apps.api.app.services.auth.service import AuthService
+from naas_abi.apps.nexus.apps.api.app.services.iam.decision_cache import workspace_role_cache
 from naas_abi.apps.nexus.apps.api.app.services.invites.sign_in_email import (
     issue_and_send_invite_sign_in,
 )
@@ -54,7 +55,9 @@ router = APIRouter()
 
 
 def get_workspace_service(db: AsyncSession = Depends(get_db)) -> WorkspaceService:
-    return WorkspaceService(adapter=WorkspaceSecondaryAdapterPostgres(db=db))
+    return WorkspaceService(
+        adapter=WorkspaceSecondaryAdapterPostgres(db=db), role_cache=workspace_role_cache
+    )
 
 
 def get_organization_service(db: AsyncSession = Depends(get_db)) -> OrganizationService:
@@ -4,6 +4,10 @@ from dataclasses import dataclass
 from typing import Any
 from uuid import uuid4
 
+from naas_abi.apps.nexus.apps.api.app.services.iam.decision_cache import (
+    MISSING,
+    DecisionCache,
+)
 from naas_abi.apps.nexus.apps.api.app.services.workspaces.port import (
     InferenceServerCreateInput,
     InferenceServerRecord,
@@ -44,11 +48,34 @@ class WorkspaceMemberAlreadyExistsError(ValueError):
 
 
 class WorkspaceService:
-    def __init__(self, adapter: WorkspacePermissionPort):
+    def __init__(
+        self,
+        adapter: WorkspacePermissionPort,
+        role_cache: DecisionCache | None = None,
+    ):
+        """``role_cache`` (normally ``decision_cache.workspace_role_cache``)
+        memoizes ``get_workspace_role``; the membership methods below
+        invalidate it."""
         self.adapter = adapter
+        self.role_cache = role_cache
+
+    def _invalidate_roles(self, workspace_id: str, user_id: str | None = None) -> None:
+        if self.role_cache is None:
+            return
+        if user_id is not None:
+            self.role_cache.invalidate((user_id, workspace_id))
+        else:
+            self.role_cache.invalidate_where(lambda key: key[1] == workspace_id)  # type: ignore[index]
 
     async def get_workspace_role(self, user_id: str, workspace_id: str) -> str | None:
-        return await self.adapter.get_workspace_role(user_id=user_id, workspace_id=workspace_id)
+        if self.role_cache is not None:
+            cached = self.role_cache.get((user_id, workspace_id))
+            if cached is not MISSING:
+                return cached
+        role = await self.adapter.get_workspace_role(user_id=user_id, workspace_id=workspace_id)
+        if self.role_cache is not None:
+            self.role_cache.set((user_id, workspace_id), role)
+        return role
 
     async def require_workspace_access(self, user_id: str, workspace_id: str) -> str:
         role = await self.get_workspace_role(user_id=user_id, workspace_id=workspace_id)
@@ -68,10 +95,14 @@ class WorkspaceService:
     async def create_workspace(self, workspace: WorkspaceCreateInput) -> WorkspaceRecord:
         if await self.adapter.workspace_slug_exists(slug=workspace.slug):
             raise WorkspaceSlugAlreadyExistsError(slug=workspace.slug)
-        return await self.adapter.create_workspace(workspace=workspace)
+        created = await self.adapter.create_workspace(workspace=workspace)
+        self._invalidate_roles(created.id)
+        return created
 
     async def delete_workspace(self, workspace_id: str) -> bool:
-        return await self.adapter.delete_workspace(workspace_id=workspace_id)
+        deleted = await self.adapter.delete_workspace(workspace_id=workspace_id)
+        self._invalidate_roles(workspace_id)
+        return deleted
 
     async def update_workspace(
         self, workspace_id: str, updates: WorkspaceUpdateInput
@@ -96,16 +127,20 @@ class WorkspaceService:
             return None
         if await self.adapter.is_workspace_member(workspace_id=workspace_id, user_id=user.id):
             raise WorkspaceMemberAlreadyExistsError(workspace_id=workspace_id, user_id=user.id)
-        return await self.adapter.add_workspace_member(
+        member = await self.adapter.add_workspace_member(
             workspace_id=workspace_id,
             user_id=user.id,
             role=role,
         )
+        self._invalidate_roles(workspace_id, user.id)
+        return member
 
     async def remove_workspace_member(self, workspace_id: str, user_id: str) -> bool:
-        return await self.adapter.remove_workspace_member(
+        removed = await self.adapter.remove_workspace_member(
             workspace_id=workspace_id, user_id=user_id
         )
+        self._invalidate_roles(workspace_id, user_id)
+        return removed
 
     async def update_workspace_member(
         self, workspace_id: str, user_id: str, updates: dict[str, Any]
@@ -113,11 +148,13 @@ class WorkspaceService:
         role = updates.get("role")
         if role not in ["admin", "member", "viewer"]:
             return False
-        return await self.adapter.update_workspace_member_role(
+        updated = await self.adapter.update_workspace_member_role(
             workspace_id=workspace_id,
             user_id=user_id,
             role=role,
         )
+        self._invalidate_roles(workspace_id, user_id)
+        return updated
 
     async def list_inference_servers(self, workspace_id: str) -> list[InferenceServerRecord]:
         return await self.adapter.list_inference_servers(workspace_id=workspace_id)
@@ -4,6 +4,7 @@ from types import SimpleNamespace
 from unittest.mock import AsyncMock
 
 import pytest
+from naas_abi.apps.nexus.apps.api.app.services.iam.decision_cache import MISSING, DecisionCache
 from naas_abi.apps.nexus.apps.api.app.services.workspaces.service import (
     WorkspacePermissionError,
     WorkspaceService,
@@ -28,3 +29,47 @@ async def test_require_workspace_access_raises_when_missing_role() -> None:
 
     with pytest.raises(WorkspacePermissionError):
         await service.require_workspace_access(user_id="user-1", workspace_id="ws-1")
+
+
+@pytest.mark.asyncio
+async def test_role_cache_serves_repeated_checks_until_membership_changes() -> None:
+    adapter = SimpleNamespace(
+        get_workspace_role=AsyncMock(side_effect=[None, "member", "admin"]),
+        get_user_by_email=AsyncMock(return_value=SimpleNamespace(id="user-1")),
+        is_workspace_member=AsyncMock(return_value=False),
+        add_workspace_member=AsyncMock(return_value=SimpleNamespace(role="member")),
+        update_workspace_member_role=AsyncMock(return_value=True),
+    )
+    service = WorkspaceService(adapter=adapter, role_cache=DecisionCache(30, 100))
+
+    for _ in range(3):
+        with pytest.raises(WorkspacePermissionError):
+            await service.require_workspace_access(user_id="user-1", workspace_id="ws-1")
+    assert adapter.get_workspace_role.await_count == 1
+
+    await service.invite_workspace_member(workspace_id="ws-1", email="u@x.io", role="member")
+    for _ in range(3):
+        assert await service.require_workspace_access(user_id="user-1", workspace_id="ws-1") == "member"
+    assert adapter.get_workspace_role.await_count == 2
+
+    await service.update_workspace_member("ws-1", "user-1", {"role": "admin"})
+    assert await service.get_workspace_role(user_id="user-1", workspace_id="ws-1") == "admin"
+    assert adapter.get_workspace_role.await_count == 3
+
+
+def test_decision_cache_expires_and_evicts_least_recently_used() -> None:
+    now = [0.0]
+    cache = DecisionCache(ttl_seconds=10, max_entries=2, clock=lambda: now[0])
+    cache.set(("user-1", "ws-1"), "member")
+    cache.set(("user-2", "ws-1"), None)
+    assert cache.get(("user-1", "ws-1")) == "member"
+    assert cache.get(("user-2", "ws-1")) is None
+
+    cache.get(("user-1", "ws-1"))
+    cache.set(("user-3", "ws-2"), "owner")
+    assert cache.get(("user-2", "ws-1")) is MISSING
+    cache.invalidate_where(lambda key: key[1] == "ws-1")
+    assert cache.get(("user-1", "ws-1")) is MISSING
+
+    now[0] = 10.0
+    assert cache.get(("user-3", "ws-2")) is MISSING